@@ -0,0 +1,73 @@
+"""
+Generadores de datos sinteticos para benchmarks (no se distribuyen con el paquete).
+
+Los datasets son deterministas (semilla fija) para que los tiempos sean comparables entre corridas.
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from conciliador_bancario.models import (  # noqa: E402
+    CampoConConfianza,
+    MetadataConfianza,
+    MovimientoEsperado,
+    NivelConfianza,
+    OrigenDato,
+    TransaccionBancaria,
+)
+
+_CONF = MetadataConfianza(score=0.9, nivel=NivelConfianza.alta, origen=OrigenDato.csv)
+
+
+def campo(valor: object) -> CampoConConfianza:
+    return CampoConConfianza(valor=valor, confianza=_CONF)
+
+
+def dataset_mensual(
+    n: int, *, seed: int = 1, dias: int = 31, con_referencia: float = 0.0
+) -> tuple[list[TransaccionBancaria], list[MovimientoEsperado]]:
+    """
+    Genera `n` transacciones y `n` esperados con montos mayormente distintos (cartola realista):
+    cada esperado tiene su transaccion gemela con un desfase de 0..2 dias.
+    """
+    rng = random.Random(seed)
+    base = date(2026, 1, 1)
+    txs: list[TransaccionBancaria] = []
+    exps: list[MovimientoEsperado] = []
+    for i in range(n):
+        monto = Decimal(rng.randint(1_000, 50_000_000))
+        fecha = base + timedelta(days=rng.randint(0, dias - 1))
+        ref = f"FAC-{i}" if rng.random() < con_referencia else None
+        exps.append(
+            MovimientoEsperado(
+                id=f"EXP-{i:08d}",
+                fecha=campo(fecha),
+                monto=campo(monto),
+                descripcion=campo(f"Factura {i}"),
+                referencia=campo(ref) if ref else None,
+            )
+        )
+        txs.append(
+            TransaccionBancaria(
+                id=f"TX-{i:08d}",
+                fecha_operacion=campo(fecha + timedelta(days=rng.randint(0, 2))),
+                monto=campo(monto),
+                descripcion=campo(f"Transferencia {i}"),
+                referencia=campo(ref) if ref else None,
+                archivo_origen="bench.csv",
+                origen=OrigenDato.csv,
+            )
+        )
+    rng.shuffle(txs)
+    rng.shuffle(exps)
+    return txs, exps
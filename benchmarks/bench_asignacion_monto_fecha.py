@@ -0,0 +1,42 @@
+"""
+Benchmark: `asignacion_minima` (flujo de costo minimo con nodos agrupados por dia) sobre
+clusters de pagos recurrentes del mismo monto, por tamano de cluster.
+
+Uso:
+    python benchmarks/bench_asignacion_monto_fecha.py
+    python benchmarks/bench_asignacion_monto_fecha.py --ventana 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from conciliador_bancario.matching.asignacion import asignacion_minima
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--ventana", type=int, default=3)
+    args = ap.parse_args()
+    print(f"ventana={args.ventana}")
+    print(
+        f"{'por_lado':>9} {'dias':>6} {'tiempo':>8} {'asignados':>10} {'unicos':>8} {'operaciones':>12}"
+    )
+    for n, dias in ((500, 30), (1_000, 365), (2_000, 60), (5_000, 1_000), (20_000, 3_650)):
+        rng = random.Random(1)
+        # Cada esperado con su tx a +-2 dias: muchos candidatos por movimiento (cluster ambiguo).
+        fe = [rng.randint(0, dias) for _ in range(n)]
+        ft = [min(dias, max(0, f + rng.randint(-2, 2))) for f in fe]
+        t0 = time.perf_counter()
+        r = asignacion_minima(ft, fe, args.ventana, max_operaciones=10**12)
+        dt = time.perf_counter() - t0
+        print(
+            f"{n:>9} {dias:>6} {dt:>7.2f}s {r.asignados:>10} {len(r.unicos):>8} {r.operaciones:>12}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,93 @@
+"""
+Benchmark de regresion: cluster degenerado de `monto_fecha` (miles de montos redondos identicos
+en la misma fecha). Compara el corte temprano (`max_candidatos_ambiguedad`) contra listar todos
+los candidatos: tiempo, candidatos evaluados y tamano de los hallazgos en run.json.
+
+Uso:
+    python benchmarks/bench_candidatos_degenerados.py
+    python benchmarks/bench_candidatos_degenerados.py --n 10000 --k 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from datetime import date
+from decimal import Decimal
+
+from _sintetico import campo
+from conciliador_bancario.audit.audit_log import AuditEvent
+from conciliador_bancario.matching.engine import conciliar
+from conciliador_bancario.models import (
+    ConfiguracionCliente,
+    MovimientoEsperado,
+    OrigenDato,
+    TransaccionBancaria,
+)
+
+
+class _Audit:
+    def __init__(self) -> None:
+        self.eventos: list[AuditEvent] = []
+
+    def write(self, event: AuditEvent) -> None:
+        self.eventos.append(event)
+
+
+def _dataset(n: int) -> tuple[list[TransaccionBancaria], list[MovimientoEsperado]]:
+    d = date(2026, 1, 31)
+    txs = [
+        TransaccionBancaria(
+            id=f"TX-{i:08d}",
+            fecha_operacion=campo(d),
+            monto=campo(Decimal(100_000)),
+            descripcion=campo("Abono"),
+            archivo_origen="x.csv",
+            origen=OrigenDato.csv,
+        )
+        for i in range(n)
+    ]
+    exps = [
+        MovimientoEsperado(
+            id=f"EXP-{i:08d}",
+            fecha=campo(d),
+            monto=campo(Decimal(100_000)),
+            descripcion=campo("Cuota"),
+        )
+        for i in range(n)
+    ]
+    return txs, exps
+
+
+def _medir(n: int, k: int) -> tuple[float, int, int]:
+    txs, exps = _dataset(n)
+    cfg = ConfiguracionCliente(cliente="X", max_candidatos_ambiguedad=k)
+    audit = _Audit()
+    t0 = time.perf_counter()
+    res = conciliar(cfg=cfg, transacciones=txs, esperados=exps, audit=audit, run_id="r")  # type: ignore[arg-type]
+    dt = time.perf_counter() - t0
+    (stats,) = (e.detalles for e in audit.eventos if e.mensaje == "matching_stats")
+    cands = next(r["candidatos"] for r in stats["reglas"] if r["regla"] == "monto_fecha")
+    size = len(json.dumps([h.model_dump() for h in res.hallazgos], separators=(",", ":")))
+    return dt, cands, size
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--n", type=int, default=5_000, help="Tx y esperados del mismo monto/fecha")
+    ap.add_argument("--k", type=int, default=50, help="max_candidatos_ambiguedad")
+    args = ap.parse_args()
+
+    print(f"n={args.n} (todas las tx compiten por los mismos {args.n} esperados)")
+    for etiqueta, k in ((f"corte k={args.k}", args.k), ("sin corte", args.n)):
+        dt, cands, size = _medir(args.n, k)
+        print(
+            f"{etiqueta:>12}: {dt:7.2f} s  candidatos evaluados {cands:>12,}  "
+            f"hallazgos {size / 1e6:8.1f} MB"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
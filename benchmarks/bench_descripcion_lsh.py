@@ -0,0 +1,103 @@
+"""
+Benchmark: bloqueo MinHash/LSH sobre descripciones vs oraculo de fuerza bruta (recall vs tiempo).
+
+Para cada configuracion `bandasxfilas` reporta el recall de pares con Jaccard >= umbral (respecto
+de comparar todos contra todos), los pares comparados y el tiempo por consulta.
+
+Uso:
+    python benchmarks/bench_descripcion_lsh.py
+    python benchmarks/bench_descripcion_lsh.py --n 50000 --configs 16x4,20x3,32x2
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from datetime import date
+from decimal import Decimal
+
+from _sintetico import campo
+from conciliador_bancario.matching.descripcion_similar import tokens_descripcion
+from conciliador_bancario.matching.indices import IndiceMinHashLSH, jaccard
+from conciliador_bancario.models import MovimientoEsperado
+
+_RAZONES = ["SPA", "LTDA", "SA", "EIRL"]
+_GLOSAS = ["PAGO", "FACTURA", "ABONO", "TRANSF", "CUOTA", "SERVICIOS", "ARRIENDO", "HONORARIOS"]
+
+
+def _descripciones(n: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    nombres = [f"EMPRESA{i}" for i in range(n // 4 + 1)]
+    rubros = [f"RUBRO{i}" for i in range(200)]
+    return [
+        " ".join(
+            [rng.choice(nombres), rng.choice(rubros), rng.choice(_RAZONES)]
+            + rng.sample(_GLOSAS, 2)
+            + [str(rng.randrange(100, 999))]
+        )
+        for _ in range(n)
+    ]
+
+
+def _perturbar(rng: random.Random, desc: str) -> str:
+    toks = desc.split()
+    toks[rng.randrange(len(toks))] = rng.choice(_GLOSAS)
+    if rng.random() < 0.5:
+        toks.append(rng.choice(_GLOSAS))
+    return " ".join(toks)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--n", type=int, default=20_000)
+    ap.add_argument("--consultas", type=int, default=300)
+    ap.add_argument("--umbral", type=float, default=0.5)
+    ap.add_argument("--configs", default="8x4,16x4,20x3,32x2,64x2")
+    args = ap.parse_args()
+
+    descs = _descripciones(args.n, seed=1)
+    tokens = [tokens_descripcion(d) for d in descs]
+    exps = [
+        MovimientoEsperado(
+            id=f"EXP-{i:08d}",
+            fecha=campo(date(2026, 1, 1)),
+            monto=campo(Decimal(1000)),
+            descripcion=campo(d),
+        )
+        for i, d in enumerate(descs)
+    ]
+    rng = random.Random(2)
+    consultas = [
+        tokens_descripcion(_perturbar(rng, rng.choice(descs))) for _ in range(args.consultas)
+    ]
+
+    t0 = time.perf_counter()
+    oraculo = [
+        {e.id for t, e in zip(tokens, exps, strict=True) if jaccard(q, t) >= args.umbral}
+        for q in consultas
+    ]
+    t_bruta = (time.perf_counter() - t0) / len(consultas)
+    total = sum(len(o) for o in oraculo)
+
+    print(f"descripciones={args.n} consultas={len(consultas)} umbral={args.umbral} pares={total}")
+    print(f"fuerza bruta: {t_bruta * 1e3:8.3f} ms/consulta  comparados/consulta: {args.n}")
+    for cfg in args.configs.split(","):
+        bandas, filas = (int(x) for x in cfg.split("x"))
+        t0 = time.perf_counter()
+        indice = IndiceMinHashLSH(zip(tokens, exps, strict=True), bandas=bandas, filas=filas)
+        t_build = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        hallados = [{e.id for _, e in indice.buscar(q, args.umbral)} for q in consultas]
+        t_q = (time.perf_counter() - t0) / len(consultas)
+        recall = sum(len(h & o) for h, o in zip(hallados, oraculo, strict=True)) / max(1, total)
+        print(
+            f"lsh {cfg:>5}: {t_q * 1e3:8.3f} ms/consulta  recall={recall:.3f}  "
+            f"comparados/consulta: {indice.comparados / len(consultas):.0f}  "
+            f"construccion: {t_build:.2f} s  speedup x{t_bruta / t_q:.0f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
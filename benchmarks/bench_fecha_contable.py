@@ -0,0 +1,80 @@
+"""
+Benchmark: regla `fecha_contable` (intervalo operacion/contable) con `IndiceMontoFecha.en_intervalo`
+vs recorrido lineal de los esperados, a 100k filas.
+
+Uso:
+    python benchmarks/bench_fecha_contable.py
+    python benchmarks/bench_fecha_contable.py --n 200000 --montos 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from _sintetico import campo
+from conciliador_bancario.matching.indices import IndiceMontoFecha
+from conciliador_bancario.models import MovimientoEsperado
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--n", type=int, default=100_000)
+    ap.add_argument("--montos", type=int, default=20_000, help="Montos distintos")
+    ap.add_argument("--ventana", type=int, default=3)
+    ap.add_argument("--lineal", type=int, default=50, help="Consultas medidas con recorrido lineal")
+    args = ap.parse_args()
+
+    rng = random.Random(1)
+    base = date(2026, 1, 1)
+    exps = [
+        MovimientoEsperado(
+            id=f"EXP-{i:08d}",
+            fecha=campo(base + timedelta(days=rng.randint(0, 364))),
+            monto=campo(Decimal(rng.randint(1, args.montos) * 1000)),
+            descripcion=campo("F"),
+        )
+        for i in range(args.n)
+    ]
+    # Intervalos de tx: operacion + 0..5 dias hasta la fecha contable.
+    consultas = []
+    for _ in range(args.n):
+        o = base.toordinal() + rng.randint(0, 364)
+        consultas.append(
+            (
+                Decimal(rng.randint(1, args.montos) * 1000),
+                o - args.ventana,
+                o + rng.randint(0, 5) + args.ventana,
+            )
+        )
+
+    t0 = time.perf_counter()
+    indice = IndiceMontoFecha(exps)
+    t_build = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    hits = sum(len(indice.en_intervalo(m, lo, hi)) for m, lo, hi in consultas)
+    t_idx = (time.perf_counter() - t0) / len(consultas)
+
+    filas = [(e.monto.valor, e.fecha.valor.toordinal()) for e in exps]
+    t0 = time.perf_counter()
+    for m, lo, hi in consultas[: args.lineal]:
+        [f for f in filas if f[0] == m and lo <= f[1] <= hi]
+    t_lin = (time.perf_counter() - t0) / max(1, min(args.lineal, len(consultas)))
+
+    print(f"esperados={args.n} consultas={len(consultas)} montos={args.montos}")
+    print(f"construccion indice: {t_build:.3f} s")
+    print(
+        f"indice:  {t_idx * 1e6:9.1f} us/consulta  total {t_idx * len(consultas):.2f} s  hits={hits}"
+    )
+    print(
+        f"lineal:  {t_lin * 1e6:9.1f} us/consulta  total estimado {t_lin * len(consultas):.0f} s  "
+        f"speedup x{t_lin / t_idx:.0f}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
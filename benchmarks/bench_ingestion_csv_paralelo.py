@@ -0,0 +1,71 @@
+"""
+Benchmark: ingesta de un CSV banco grande en serie vs por chunks (`--workers-ingesta`).
+
+Genera una cartola sintetica (con glosas multilinea entre comillas) y compara tiempos; verifica
+que ambos modos entreguen las mismas transacciones (filas e IDs).
+
+Uso:
+    python benchmarks/bench_ingestion_csv_paralelo.py
+    python benchmarks/bench_ingestion_csv_paralelo.py --filas 400000 --workers 2 4 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from conciliador_bancario.audit.audit_log import NullAuditWriter
+from conciliador_bancario.ingestion.csv_adapter import cargar_transacciones_csv
+from conciliador_bancario.ingestion.csv_paralelo import cargar_transacciones_csv_paralelo
+from conciliador_bancario.models import ConfiguracionCliente, LimitesIngesta
+
+
+def _escribir_cartola(path: Path, filas: int) -> None:
+    rng = random.Random(7)
+    with path.open("w", encoding="utf-8", newline="") as f:
+        f.write("fecha_operacion;monto;descripcion;referencia;cuenta\r\n")
+        for i in range(filas):
+            desc = f'"Transferencia\n{i}"' if i % 10 == 0 else f"Pago proveedor {i}"
+            f.write(
+                f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/2025;"
+                f"{rng.randint(1_000, 9_000_000)};{desc};FAC-{i};{rng.randint(10**8, 10**9)}\r\n"
+            )
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--filas", type=int, default=200_000)
+    ap.add_argument("--workers", type=int, nargs="+", default=[2, 4])
+    args = ap.parse_args()
+
+    cfg = ConfiguracionCliente(
+        cliente="bench",
+        limites_ingesta=LimitesIngesta(
+            max_input_bytes=2**40, max_tabular_rows=2**40, max_tabular_cells=2**40
+        ),
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "cartola.csv"
+        _escribir_cartola(path, args.filas)
+        print(f"filas={args.filas} tamano={path.stat().st_size / 2**20:.1f} MB")
+
+        t0 = time.perf_counter()
+        serial = cargar_transacciones_csv(path, cfg=cfg, audit=NullAuditWriter())
+        t_serial = time.perf_counter() - t0
+        print(f"serial       {t_serial:7.2f} s")
+        for w in args.workers:
+            t0 = time.perf_counter()
+            paralelo = cargar_transacciones_csv_paralelo(
+                path, cfg=cfg, audit=NullAuditWriter(), workers=w
+            )
+            t = time.perf_counter() - t0
+            assert paralelo == serial, "divergencia serial/paralelo"
+            print(f"workers={w:<4d} {t:7.2f} s  x{t_serial / t:4.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
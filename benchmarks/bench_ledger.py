@@ -0,0 +1,105 @@
+"""
+Benchmark: arrastre de partidas abiertas (`--ledger`) con ledgers de 1 a N anos de historia.
+
+La consulta cruza los montos de la corrida con el indice `(lado, monto, fecha)`: el tiempo de
+arrastre de un mes no deberia crecer con los anos acumulados.
+
+Uso:
+    python benchmarks/bench_ledger.py
+    python benchmarks/bench_ledger.py --anos 1 2 4 8 --por-mes 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+from _sintetico import campo
+from conciliador_bancario.ledger import LedgerPartidas
+from conciliador_bancario.models import (
+    MovimientoEsperado,
+    OrigenDato,
+    ResultadoConciliacion,
+    TransaccionBancaria,
+)
+
+
+def _mes(rng: random.Random, inicio: date, n: int, prefijo: str) -> list[MovimientoEsperado]:
+    return [
+        MovimientoEsperado(
+            id=f"{prefijo}-{i:06d}",
+            fecha=campo(inicio + timedelta(days=rng.randint(0, 27))),
+            monto=campo(Decimal(rng.randint(1_000, 5_000_000))),
+            descripcion=campo("Factura"),
+        )
+        for i in range(n)
+    ]
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--anos", type=int, nargs="+", default=[1, 2, 4])
+    ap.add_argument("--por-mes", type=int, default=2000, help="Pendientes nuevos por mes")
+    ap.add_argument("--tx", type=int, default=5000, help="Transacciones del mes actual")
+    ap.add_argument("--antiguedad", type=int, default=180)
+    args = ap.parse_args()
+
+    actual = date(2026, 1, 1)
+    rng = random.Random(3)
+    pendientes = [
+        e
+        for m in range(max(args.anos) * 12, 0, -1)
+        for e in _mes(rng, actual - timedelta(days=30 * m), args.por_mes, f"EXP-{m:03d}")
+    ]
+    # La mitad de las tx del mes comparte monto con algun pendiente.
+    txs = [
+        TransaccionBancaria(
+            id=f"TX-{i:06d}",
+            fecha_operacion=campo(actual + timedelta(days=rng.randint(0, 27))),
+            monto=(
+                pendientes[rng.randrange(len(pendientes))].monto
+                if i % 2
+                else campo(Decimal(rng.randint(1_000, 5_000_000)))
+            ),
+            descripcion=campo("Abono"),
+            archivo_origen="bench.csv",
+            origen=OrigenDato.csv,
+        )
+        for i in range(args.tx)
+    ]
+
+    print(f"tx mes={args.tx} pendientes/mes={args.por_mes} antiguedad={args.antiguedad} dias")
+    for anos in args.anos:
+        historia = pendientes[-anos * 12 * args.por_mes :]
+        with tempfile.TemporaryDirectory() as tmp, LedgerPartidas(Path(tmp) / "l.db") as libro:
+            res = ResultadoConciliacion(
+                transacciones_bancarias=[],
+                movimientos_esperados=historia,
+                matches=[],
+                hallazgos=[],
+                run_id="bench",
+            )
+            t0 = time.perf_counter()
+            libro.actualizar(resultado=res, run_id="bench")
+            t_carga = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            _, arr = libro.arrastre(
+                transacciones=txs,
+                esperados=[],
+                desde=actual - timedelta(days=args.antiguedad),
+            )
+            t_arr = time.perf_counter() - t0
+        print(
+            f"anos={anos:2d} partidas={len(historia):8d}  carga {t_carga:6.2f} s  "
+            f"arrastre {t_arr * 1e3:7.1f} ms  arrastradas={len(arr)}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,53 @@
+"""
+Benchmark: motor de referencia (`conciliar`) vs backend vectorizado (`conciliar_vectorizado`).
+
+Requiere el extra `perf` (numpy). Verifica ademas que ambos backends entreguen el mismo resultado.
+
+Uso:
+    python benchmarks/bench_matching_backends.py --sizes 20000 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from _sintetico import dataset_mensual
+from conciliador_bancario.audit.audit_log import NullAuditWriter
+from conciliador_bancario.matching.engine import conciliar
+from conciliador_bancario.matching.vectorizado import conciliar_vectorizado
+from conciliador_bancario.models import ConfiguracionCliente
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10_000, 40_000])
+    args = ap.parse_args()
+
+    cfg = ConfiguracionCliente(cliente="bench")
+    print(f"{'n':>10} {'python_s':>10} {'numpy_s':>10} {'speedup':>8}")
+    for n in args.sizes:
+        txs, exps = dataset_mensual(n, con_referencia=0.3)
+        tiempos = []
+        resultados = []
+        for motor in (conciliar, conciliar_vectorizado):
+            t0 = time.perf_counter()
+            resultados.append(
+                motor(
+                    cfg=cfg,
+                    transacciones=txs,
+                    esperados=exps,
+                    audit=NullAuditWriter(),  # type: ignore[arg-type]
+                    run_id="bench",
+                )
+            )
+            tiempos.append(time.perf_counter() - t0)
+        if resultados[0] != resultados[1]:
+            print(f"{n:>10} DIVERGENCIA entre backends")
+            return 1
+        print(f"{n:>10} {tiempos[0]:>10.3f} {tiempos[1]:>10.3f} {tiempos[0] / tiempos[1]:>8.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
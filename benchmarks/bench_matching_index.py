@@ -0,0 +1,43 @@
+"""
+Benchmark: regla `monto_fecha` con `IndiceMontoFecha` (escalamiento ~lineal).
+
+Uso:
+    python benchmarks/bench_matching_index.py
+    python benchmarks/bench_matching_index.py --sizes 10000 50000 200000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from _sintetico import dataset_mensual
+from conciliador_bancario.audit.audit_log import NullAuditWriter
+from conciliador_bancario.matching.engine import conciliar
+from conciliador_bancario.models import ConfiguracionCliente
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--sizes", type=int, nargs="+", default=[5_000, 10_000, 20_000, 40_000])
+    args = ap.parse_args()
+
+    cfg = ConfiguracionCliente(cliente="bench")
+    prev: tuple[int, float] | None = None
+    print(f"{'n':>10} {'segundos':>10} {'us/tx':>10} {'factor':>8}")
+    for n in args.sizes:
+        txs, exps = dataset_mensual(n)
+        t0 = time.perf_counter()
+        res = conciliar(
+            cfg=cfg, transacciones=txs, esperados=exps, audit=NullAuditWriter(), run_id="bench"
+        )  # type: ignore[arg-type]
+        dt = time.perf_counter() - t0
+        # factor: crecimiento de tiempo normalizado por crecimiento de n (1.0 = lineal).
+        factor = "" if prev is None else f"{(dt / prev[1]) / (n / prev[0]):.2f}"
+        print(f"{n:>10} {dt:>10.3f} {dt / n * 1e6:>10.1f} {factor:>8}  matches={len(res.matches)}")
+        prev = (n, dt)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,107 @@
+"""
+Benchmark: memoria pico de `conciliar_streaming` (fuentes generadoras ordenadas por fecha) vs
+`conciliar()` sobre listas en memoria, para un backfill de varios anos.
+
+Uso:
+    python benchmarks/bench_matching_streaming.py
+    python benchmarks/bench_matching_streaming.py --anios 5 --por-dia 40
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+import tracemalloc
+from collections.abc import Iterator
+from datetime import date, timedelta
+from decimal import Decimal
+
+from _sintetico import campo
+from conciliador_bancario.audit.audit_log import NullAuditWriter
+from conciliador_bancario.matching.engine import conciliar
+from conciliador_bancario.matching.streaming import conciliar_streaming
+from conciliador_bancario.models import (
+    ConfiguracionCliente,
+    MovimientoEsperado,
+    OrigenDato,
+    TransaccionBancaria,
+)
+
+
+def _esperados(dias: int, por_dia: int) -> Iterator[MovimientoEsperado]:
+    rng = random.Random(1)
+    base = date(2020, 1, 1)
+    for d in range(dias):
+        for k in range(por_dia):
+            yield MovimientoEsperado(
+                id=f"EXP-{d:05d}{k:04d}",
+                fecha=campo(base + timedelta(days=d)),
+                monto=campo(Decimal(rng.randint(1_000, 50_000_000))),
+                descripcion=campo("Factura"),
+            )
+
+
+def _transacciones(dias: int, por_dia: int) -> Iterator[TransaccionBancaria]:
+    # Gemelas de los esperados con 1 dia de desfase (mismo generador de montos).
+    for e in _esperados(dias, por_dia):
+        yield TransaccionBancaria(
+            id="TX-" + e.id[4:],
+            fecha_operacion=campo(e.fecha.valor + timedelta(days=1)),
+            monto=e.monto,
+            descripcion=campo("Transferencia"),
+            archivo_origen="bench.csv",
+            origen=OrigenDato.csv,
+        )
+
+
+def _medir(fn) -> tuple[float, float, object]:
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    out = fn()
+    dt = time.perf_counter() - t0
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return dt, pico / 2**20, out
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--anios", type=int, default=3)
+    ap.add_argument("--por-dia", type=int, default=20)
+    args = ap.parse_args()
+    dias = 365 * args.anios
+    cfg = ConfiguracionCliente(cliente="bench")
+
+    def streaming() -> int:
+        n = 0
+        for _ in conciliar_streaming(
+            cfg=cfg,
+            transacciones=lambda: _transacciones(dias, args.por_dia),
+            esperados=lambda: _esperados(dias, args.por_dia),
+            audit=NullAuditWriter(),  # type: ignore[arg-type]
+            run_id="bench",
+        ):
+            n += 1
+        return n
+
+    def en_memoria() -> int:
+        res = conciliar(
+            cfg=cfg,
+            transacciones=list(_transacciones(dias, args.por_dia)),
+            esperados=list(_esperados(dias, args.por_dia)),
+            audit=NullAuditWriter(),  # type: ignore[arg-type]
+            run_id="bench",
+        )
+        return len(res.matches) + len(res.hallazgos)
+
+    n = dias * args.por_dia
+    print(f"movimientos por lado={n} ({args.anios} anios, {args.por_dia}/dia)")
+    for nombre, fn in (("streaming", streaming), ("conciliar", en_memoria)):
+        dt, pico, salida = _medir(fn)
+        print(f"{nombre:>10}: {dt:7.2f} s  memoria pico {pico:8.1f} MiB  salidas={salida}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,76 @@
+"""
+Microbenchmark: parseo de montos por celda con el camino completo (regex + `Decimal` +
+`quantize`) vs `parse_monto_clp` (atajo para enteros planos + memo LRU) vs `parse_montos` en
+bloque (`array("q")`).
+
+Mezcla sintetica de cartola: enteros planos, montos con separadores de miles y `$`, y montos
+repetidos (comisiones, cuotas). Verifica que los tres entreguen los mismos valores.
+
+Uso:
+    python benchmarks/bench_parse_montos.py
+    python benchmarks/bench_parse_montos.py --celdas 1000000 --planos 0.5
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from collections.abc import Callable
+
+from conciliador_bancario.utils.parsing import _parse_monto_memo, parse_monto_clp, parse_montos
+
+
+def _celdas(n: int, planos: float) -> list[str]:
+    rng = random.Random(7)
+    repetidos = [f"{rng.randint(1, 99) * 1000:,}".replace(",", ".") for _ in range(50)]
+    out = []
+    for _ in range(n):
+        r = rng.random()
+        if r < planos:
+            out.append(str(rng.randint(-9_000_000, 9_000_000)))
+        elif r < planos + (1 - planos) / 2:
+            out.append(rng.choice(repetidos))
+        else:
+            out.append(f"$ {rng.randint(1_000, 90_000_000):,}".replace(",", "."))
+    return out
+
+
+def _mejor_de(n: int, fn: Callable[[], object]) -> tuple[float, object]:
+    """Menor tiempo de `n` corridas (memo vacio en cada una) y el resultado de la ultima."""
+    mejor, out = float("inf"), None
+    for _ in range(n):
+        _parse_monto_memo.cache_clear()
+        t0 = time.perf_counter()
+        out = fn()
+        mejor = min(mejor, time.perf_counter() - t0)
+    return mejor, out
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--celdas", type=int, default=300_000)
+    ap.add_argument("--planos", type=float, default=0.7, help="fraccion de enteros planos")
+    ap.add_argument("--repeticiones", type=int, default=3)
+    args = ap.parse_args()
+
+    celdas = _celdas(args.celdas, args.planos)
+    completo = _parse_monto_memo.__wrapped__
+    n = args.repeticiones
+    print(f"celdas={args.celdas} planos={args.planos:.0%} (mejor de {n})")
+
+    t_ref, ref = _mejor_de(n, lambda: [int(completo(c)) for c in celdas])
+    print(f"camino completo   {t_ref:7.3f} s")
+
+    t, por_celda = _mejor_de(n, lambda: [int(parse_monto_clp(c)) for c in celdas])
+    assert por_celda == ref, "divergencia parse_monto_clp"
+    print(f"parse_monto_clp   {t:7.3f} s  x{t_ref / t:4.1f}")
+
+    t, (montos, errores) = _mejor_de(n, lambda: parse_montos(celdas))
+    assert not errores and list(montos) == ref, "divergencia parse_montos"
+    print(f"parse_montos      {t:7.3f} s  x{t_ref / t:4.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,82 @@
+"""
+Benchmark: busqueda aproximada de referencias con `IndiceTrigramas` vs recorrido lineal.
+
+Uso:
+    python benchmarks/bench_referencias_trigramas.py
+    python benchmarks/bench_referencias_trigramas.py --n 100000 --consultas 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from datetime import date
+from decimal import Decimal
+
+from _sintetico import campo
+from conciliador_bancario.matching.indices import IndiceTrigramas, distancia_edicion_acotada
+from conciliador_bancario.matching.referencia_aproximada import clave_referencia
+from conciliador_bancario.models import MovimientoEsperado
+
+
+def _referencias(n: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    prefijos = ["FAC", "F", "NC", "OC", "BOL"]
+    return [f"{rng.choice(prefijos)}-{rng.randrange(10**7):07d}" for _ in range(n)]
+
+
+def _perturbar(rng: random.Random, ref: str) -> str:
+    s = list(ref)
+    i = rng.randrange(len(s))
+    s[i] = rng.choice("0123456789")
+    return "".join(s)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--n", type=int, default=100_000)
+    ap.add_argument("--consultas", type=int, default=1_000)
+    ap.add_argument("--max-distancia", type=int, default=2)
+    ap.add_argument("--lineal", type=int, default=20, help="Consultas medidas con recorrido lineal")
+    args = ap.parse_args()
+
+    refs = _referencias(args.n, seed=1)
+    exps = [
+        MovimientoEsperado(
+            id=f"EXP-{i:08d}",
+            fecha=campo(date(2026, 1, 1)),
+            monto=campo(Decimal(1000)),
+            descripcion=campo("F"),
+            referencia=campo(r),
+        )
+        for i, r in enumerate(refs)
+    ]
+    claves = [clave_referencia(r.upper()) for r in refs]
+
+    t0 = time.perf_counter()
+    indice = IndiceTrigramas(zip(claves, exps, strict=True))
+    t_build = time.perf_counter() - t0
+
+    rng = random.Random(2)
+    consultas = [clave_referencia(_perturbar(rng, rng.choice(refs))) for _ in range(args.consultas)]
+    t0 = time.perf_counter()
+    hits = sum(len(indice.buscar(q, args.max_distancia)) for q in consultas)
+    t_idx = (time.perf_counter() - t0) / len(consultas)
+
+    t0 = time.perf_counter()
+    for q in consultas[: args.lineal]:
+        [c for c in claves if distancia_edicion_acotada(q, c, args.max_distancia) is not None]
+    t_lin = (time.perf_counter() - t0) / max(1, min(args.lineal, len(consultas)))
+
+    print(f"referencias={args.n} consultas={len(consultas)} k={args.max_distancia}")
+    print(f"construccion indice: {t_build:.3f} s")
+    print(
+        f"indice:  {t_idx * 1e3:8.3f} ms/consulta  (verificados/consulta: {indice.verificados / len(consultas):.0f})"
+    )
+    print(f"lineal:  {t_lin * 1e3:8.3f} ms/consulta  speedup x{t_lin / t_idx:.0f}  hits={hits}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -15,13 +15,26 @@ class AuditEvent:
 
 
 class JsonlAuditWriter:
-    def __init__(self, path: Path, *, run_id: str | None = None) -> None:
+    def __init__(self, path: Path, *, run_id: str | None = None, diferido: bool = False) -> None:
         self._path = path
         self._path.parent.mkdir(parents=True, exist_ok=True)
         self._run_id = run_id
         self._seq = 0
+        # Con `diferido` los eventos quedan en memoria hasta `fijar_run_id`: el run_id de una
+        # corrida con ledger depende del arrastre, que se conoce recien despues de la ingesta.
+        self._pendientes: list[AuditEvent] | None = [] if diferido else None
+
+    def fijar_run_id(self, run_id: str) -> None:
+        """Fija el run_id y escribe, en orden, los eventos retenidos."""
+        self._run_id = run_id
+        pendientes, self._pendientes = self._pendientes or [], None
+        for event in pendientes:
+            self.write(event)
 
     def write(self, event: AuditEvent) -> None:
+        if self._pendientes is not None:
+            self._pendientes.append(event)
+            return
         payload: dict[str, Any] = {
             "seq": self._seq,
             "tipo": event.tipo,
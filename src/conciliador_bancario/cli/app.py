@@ -16,9 +16,20 @@ from conciliador_bancario.errors import (
     ErrorOperacionIO,
 )
 from conciliador_bancario.ingestion.base import ErrorIngestion
-from conciliador_bancario.pipeline import ejecutar_run, ejecutar_validate, generar_plantillas_init
+from conciliador_bancario.pipeline import (
+    ejecutar_memoria_aprender,
+    ejecutar_memoria_compactar,
+    ejecutar_run,
+    ejecutar_selfcheck,
+    ejecutar_validate,
+    generar_plantillas_init,
+)
 
 app = typer.Typer(add_completion=False, no_args_is_help=True)
+memoria_app = typer.Typer(
+    no_args_is_help=True, help="Memoria de pareos recurrentes (regla opcional `memoria`)."
+)
+app.add_typer(memoria_app, name="memoria")
 console = Console()
 
 
@@ -131,6 +142,39 @@ def cmd_run(
     max_xml_movimientos: Optional[int] = typer.Option(
         None, "--max-xml-movimientos", help="Limite maximo de nodos <movimiento> en XML"
     ),
+    matching_backend: str = typer.Option(
+        "python",
+        "--matching-backend",
+        help="Implementacion del matching: python (referencia) o numpy (requiere extra perf).",
+    ),
+    workers: int = typer.Option(
+        1,
+        "--workers",
+        help="Procesos para matching monto+fecha particionado por monto (mismo run.json).",
+    ),
+    since_run: Optional[Path] = typer.Option(
+        None,
+        "--since-run",
+        exists=True,
+        file_okay=False,
+        help="Directorio de un run previo: reutiliza sus matches y solo re-concilia lo nuevo.",
+    ),
+    perfil_matching: bool = typer.Option(
+        False,
+        "--perfil-matching",
+        help="Agrega tiempos por regla a matching_stats en audit.jsonl (deja de ser reproducible).",
+    ),
+    ledger: Optional[Path] = typer.Option(
+        None,
+        "--ledger",
+        dir_okay=False,
+        help="Ledger SQLite de partidas abiertas: arrastra pendientes de periodos anteriores.",
+    ),
+    workers_ingesta: int = typer.Option(
+        1,
+        "--workers-ingesta",
+        help="Procesos para parsear CSV por chunks (mismas filas e IDs que en serie).",
+    ),
     debug: bool = typer.Option(False, "--debug", help="Muestra traceback completo en errores."),
 ) -> None:
     try:
@@ -165,6 +209,12 @@ def cmd_run(
             max_pdf_pages=max_pdf_pages,
             max_pdf_text_chars=max_pdf_text_chars,
             max_xml_movimientos=max_xml_movimientos,
+            matching_backend=matching_backend,
+            workers=workers,
+            since_run=since_run,
+            perfil_matching=perfil_matching,
+            ledger=ledger,
+            workers_ingesta=workers_ingesta,
         )
     except Exception as e:  # noqa: BLE001
         emit_failure_audit_best_effort(out_dir=out, command="run", exc=e)
@@ -174,6 +224,53 @@ def cmd_run(
         console.print(f"[green]Reporte[/green]: {out / 'reporte_conciliacion.xlsx'}")
 
 
+@app.command("selfcheck")
+def cmd_selfcheck(
+    config: Path = typer.Option(..., "--config", exists=True, readable=True),
+    bank: Path = typer.Option(..., "--bank", exists=True, readable=True),
+    expected: Path = typer.Option(..., "--expected", exists=True, readable=True),
+    out: Path = typer.Option(
+        Path("./selfcheck"), "--out", help="Directorio (vacio) para los artefactos por variante"
+    ),
+    workers: list[int] = typer.Option(
+        [2, 4], "--workers", help="Cantidades de workers a comparar contra la corrida serial."
+    ),
+    ordenes: int = typer.Option(
+        2, "--ordenes", help="Rotaciones del orden de shards por cada cantidad de workers."
+    ),
+    log_level: str = typer.Option("WARNING", "--log-level"),
+    enable_ocr: bool = typer.Option(False, "--enable-ocr"),
+    debug: bool = typer.Option(False, "--debug", help="Muestra traceback completo en errores."),
+) -> None:
+    """Corre las mismas entradas en serie y en paralelo y compara run.json y audit.jsonl."""
+    try:
+        informe = ejecutar_selfcheck(
+            config=config,
+            bank=bank,
+            expected=expected,
+            out_dir=out,
+            workers=workers,
+            ordenes=ordenes,
+            log_level=log_level,
+            enable_ocr=enable_ocr,
+        )
+        for v in informe["variantes"]:
+            estado = "[green]OK[/green]" if v["ok"] else "[red]DIVERGE[/red]"
+            console.print(f"{estado} {v['variante']} ({v['eventos']} eventos)")
+        for nombre, motivo in informe["omitidas"].items():
+            console.print(f"[yellow]Omitida[/yellow] {nombre}: {motivo}")
+        div = informe["primera_divergencia"]
+        if div is not None:
+            raise ErrorContrato(
+                f"Determinismo roto en la variante {div['variante']} ({div['artefacto']}).",
+                details={k: div[k] for k in ("ruta", "referencia", "obtenido", "contexto")},
+                hint=f"Detalle completo en {out / 'selfcheck.json'}.",
+            )
+    except Exception as e:  # noqa: BLE001
+        raise render_and_exit(console=console, exc=e, debug=debug) from e
+    console.print(f"[green]Selfcheck OK[/green]: run_id {informe['run_id']}")
+
+
 @app.command("explain")
 def cmd_explain(
     run_dir: Path = typer.Option(..., "--run-dir", exists=True, file_okay=False),
@@ -230,3 +327,118 @@ def cmd_explain(
         raise
     except Exception as e:  # noqa: BLE001
         raise render_and_exit(console=console, exc=e, debug=debug) from e
+
+
+def _cmd_memoria_aprender(
+    *,
+    memoria: Path,
+    config: Path,
+    run_dirs: list[Path],
+    banks: list[Path],
+    expecteds: list[Path],
+    incluir_sugeridos: bool,
+    reconstruir: bool,
+    debug: bool,
+) -> None:
+    try:
+        res = ejecutar_memoria_aprender(
+            memoria=memoria,
+            config=config,
+            run_dirs=run_dirs,
+            banks=banks,
+            expecteds=expecteds,
+            incluir_sugeridos=incluir_sugeridos,
+            reconstruir=reconstruir,
+        )
+    except Exception as e:  # noqa: BLE001
+        raise render_and_exit(console=console, exc=e, debug=debug) from e
+    console.print(
+        f"[green]Memoria actualizada[/green]: {memoria} "
+        f"({res['runs_nuevos']} corridas nuevas, {res['pareos']} pareos, {res['pares']} pares)"
+    )
+
+
+_OPT_MEMORIA = typer.Option(..., "--memoria", help="Archivo de memoria (JSON)")
+_OPT_RUN_DIRS = typer.Option(
+    ..., "--run-dir", exists=True, file_okay=False, help="--out de una corrida (repetible)"
+)
+_OPT_BANKS = typer.Option(
+    ..., "--bank", exists=True, readable=True, help="Cartola de esa corrida (mismo orden)"
+)
+_OPT_EXPECTEDS = typer.Option(
+    ..., "--expected", exists=True, readable=True, help="Esperados de esa corrida (mismo orden)"
+)
+_OPT_INCLUIR_SUGERIDOS = typer.Option(
+    False,
+    "--incluir-sugeridos",
+    help="Aprende tambien matches sugeridos (por defecto solo conciliados).",
+)
+
+
+@memoria_app.command("aprender")
+def cmd_memoria_aprender(
+    memoria: Path = _OPT_MEMORIA,
+    config: Path = typer.Option(..., "--config", exists=True, readable=True),
+    run_dirs: list[Path] = _OPT_RUN_DIRS,
+    banks: list[Path] = _OPT_BANKS,
+    expecteds: list[Path] = _OPT_EXPECTEDS,
+    incluir_sugeridos: bool = _OPT_INCLUIR_SUGERIDOS,
+    debug: bool = typer.Option(False, "--debug", help="Muestra traceback completo en errores."),
+) -> None:
+    """Agrega a la memoria los pareos de corridas previas (idempotente por run_id)."""
+    _cmd_memoria_aprender(
+        memoria=memoria,
+        config=config,
+        run_dirs=run_dirs,
+        banks=banks,
+        expecteds=expecteds,
+        incluir_sugeridos=incluir_sugeridos,
+        reconstruir=False,
+        debug=debug,
+    )
+
+
+@memoria_app.command("reconstruir")
+def cmd_memoria_reconstruir(
+    memoria: Path = _OPT_MEMORIA,
+    config: Path = typer.Option(..., "--config", exists=True, readable=True),
+    run_dirs: list[Path] = _OPT_RUN_DIRS,
+    banks: list[Path] = _OPT_BANKS,
+    expecteds: list[Path] = _OPT_EXPECTEDS,
+    incluir_sugeridos: bool = _OPT_INCLUIR_SUGERIDOS,
+    debug: bool = typer.Option(False, "--debug", help="Muestra traceback completo en errores."),
+) -> None:
+    """Regenera la memoria desde cero con las corridas indicadas."""
+    _cmd_memoria_aprender(
+        memoria=memoria,
+        config=config,
+        run_dirs=run_dirs,
+        banks=banks,
+        expecteds=expecteds,
+        incluir_sugeridos=incluir_sugeridos,
+        reconstruir=True,
+        debug=debug,
+    )
+
+
+@memoria_app.command("compactar")
+def cmd_memoria_compactar(
+    memoria: Path = typer.Option(..., "--memoria", exists=True, dir_okay=False),
+    min_ocurrencias: int = typer.Option(
+        1, "--min-ocurrencias", help="Descarta pares vistos menos veces."
+    ),
+    max_runs: Optional[int] = typer.Option(
+        None, "--max-runs", help="Descarta pares no vistos en las ultimas N corridas."
+    ),
+    debug: bool = typer.Option(False, "--debug", help="Muestra traceback completo en errores."),
+) -> None:
+    """Elimina pares poco frecuentes u obsoletos de la memoria."""
+    try:
+        res = ejecutar_memoria_compactar(
+            memoria=memoria, min_ocurrencias=min_ocurrencias, max_runs=max_runs
+        )
+    except Exception as e:  # noqa: BLE001
+        raise render_and_exit(console=console, exc=e, debug=debug) from e
+    console.print(
+        f"[green]Memoria compactada[/green]: {memoria} ({res['pares_antes']} -> {res['pares']} pares)"
+    )
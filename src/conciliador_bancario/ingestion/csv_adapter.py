@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+import codecs
 import csv
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from dataclasses import dataclass, field
 from datetime import date
 from decimal import Decimal
+from functools import partial
 from pathlib import Path
-from typing import Any
+from typing import Any, TypeVar
 
 from conciliador_bancario.audit.audit_log import AuditEvent, JsonlAuditWriter
 from conciliador_bancario.ingestion.base import ErrorIngestion
@@ -22,20 +26,71 @@ from conciliador_bancario.utils.hashing import sha256_json_estable
 from conciliador_bancario.utils.masking import enmascarar_cuenta
 from conciliador_bancario.utils.parsing import (
     ErrorParseo,
+    ParserFechaColumna,
     normalizar_referencia,
     normalizar_texto,
-    parse_fecha_chile,
     parse_monto_clp,
 )
 
+_M = TypeVar("_M", TransaccionBancaria, MovimientoEsperado)
+# Fila tal como la entrega `csv.DictReader`: la llave None agrupa las celdas sobrantes.
+_Fila = dict[str | None, Any]
 
-def _detectar_delimitador(path: Path) -> str:
-    sample = path.read_text(encoding="utf-8", errors="replace")[:4096]
+# Prefijo acotado para el perfil: alcanza para los 4096 caracteres de muestra incluso si todos
+# fueran de 4 bytes en UTF-8. Nunca se lee ni decodifica el archivo completo para detectar.
+_BYTES_PERFIL = 16 * 1024
+_CARACTERES_MUESTRA = 4096
+_MAX_PERFILES_CACHE = 256
+
+_delimitador_por_encabezado: dict[str, str] = {}
+
+
+@dataclass(frozen=True)
+class PerfilCSV:
+    """Encoding y delimitador de un CSV, detectados desde un prefijo acotado del archivo."""
+
+    encoding: str
+    delimiter: str
+
+
+def _detectar_encoding(prefijo: bytes, *, completo: bool) -> str:
+    """BOM UTF-8 => `utf-8-sig`; UTF-8 valido => `utf-8`; si no, CP1252 (exportes Latin-1)."""
+    if prefijo.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
     try:
-        dialect = csv.Sniffer().sniff(sample, delimiters=[",", ";", "\t", "|"])
-        return dialect.delimiter
-    except csv.Error:
-        return ","
+        # Decodificador incremental: un caracter multibyte cortado al final del prefijo no es error.
+        codecs.getincrementaldecoder("utf-8")().decode(prefijo, final=completo)
+    except UnicodeDecodeError:
+        return "cp1252"
+    return "utf-8"
+
+
+def detectar_perfil_csv(path: Path) -> PerfilCSV:
+    """
+    Perfil (encoding + delimitador) leyendo solo los primeros `_BYTES_PERFIL` bytes.
+
+    El delimitador es propiedad del formato de exportacion: se cachea por huella del encabezado
+    (primera linea ya decodificada), asi archivos del mismo banco no vuelven a pasar por
+    `csv.Sniffer`. El encoding se detecta siempre (los datos pueden cambiar aunque el encabezado
+    sea el mismo).
+    """
+    with path.open("rb") as f:
+        prefijo = f.read(_BYTES_PERFIL)
+    encoding = _detectar_encoding(prefijo, completo=len(prefijo) < _BYTES_PERFIL)
+    sample = prefijo.decode(encoding, errors="replace")[:_CARACTERES_MUESTRA]
+    encabezado = sample.split("\n", 1)[0].rstrip("\r")
+    huella = sha256_json_estable({"encoding": encoding, "encabezado": encabezado})
+    delimiter = _delimitador_por_encabezado.get(huella)
+    if delimiter is None:
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=[",", ";", "\t", "|"])
+            delimiter = dialect.delimiter
+        except csv.Error:
+            delimiter = ","
+        if len(_delimitador_por_encabezado) >= _MAX_PERFILES_CACHE:
+            _delimitador_por_encabezado.clear()
+        _delimitador_por_encabezado[huella] = delimiter
+    return PerfilCSV(encoding=encoding, delimiter=delimiter)
 
 
 def _confianza_por_origen(origen: OrigenDato) -> tuple[float, NivelConfianza]:
@@ -77,259 +132,323 @@ def _id_exp(path: Path, fila: int, data_norm: dict[str, Any], id_externo: str |
     return "EXP-" + sha256_json_estable({"file": path.name, "row": fila, "data": data_norm})[:12]
 
 
-def cargar_transacciones_csv(
-    path: Path, *, cfg: ConfiguracionCliente, audit: JsonlAuditWriter
-) -> list[TransaccionBancaria]:
+def _keynorm(s: str) -> str:
+    return normalizar_texto(s).lower().replace(" ", "_")
+
+
+def _columna(headers: dict[str, str], *names: str) -> str | None:
+    for n in names:
+        if n in headers:
+            return headers[n]
+    return None
+
+
+@dataclass(frozen=True)
+class _ColumnasBanco:
+    fecha_op: str
+    fecha_ct: str | None
+    monto: str
+    moneda: str | None
+    desc: str
+    ref: str | None
+    cuenta: str | None
+    # Un parser por columna de fecha y por archivo: fija el formato tras una muestra.
+    fechas_op: ParserFechaColumna = field(default_factory=ParserFechaColumna, compare=False)
+    fechas_ct: ParserFechaColumna = field(default_factory=ParserFechaColumna, compare=False)
+
+
+@dataclass(frozen=True)
+class _ColumnasEsperados:
+    id: str | None
+    fecha: str
+    monto: str
+    moneda: str | None
+    desc: str
+    ref: str | None
+    terc: str | None
+    fechas: ParserFechaColumna = field(default_factory=ParserFechaColumna, compare=False)
+
+
+def _columnas_banco(fieldnames: Sequence[str]) -> _ColumnasBanco:
+    headers = {_keynorm(h): h for h in fieldnames}
+    c_fecha_op = _columna(headers, "fecha_operacion", "fecha", "fecha_movimiento")
+    c_monto = _columna(headers, "monto", "importe", "valor")
+    c_desc = _columna(headers, "descripcion", "glosa", "detalle", "concepto")
+    faltantes = [
+        n
+        for n, c in (
+            ("fecha_operacion", c_fecha_op),
+            ("monto", c_monto),
+            ("descripcion", c_desc),
+        )
+        if c is None
+    ]
+    if c_fecha_op is None or c_monto is None or c_desc is None:
+        raise ErrorIngestion(f"CSV banco sin columnas requeridas: {', '.join(faltantes)}")
+    return _ColumnasBanco(
+        fecha_op=c_fecha_op,
+        fecha_ct=_columna(headers, "fecha_contable", "fecha_valor", "fecha_proceso"),
+        monto=c_monto,
+        moneda=_columna(headers, "moneda", "currency"),
+        desc=c_desc,
+        ref=_columna(headers, "referencia", "ref", "comprobante", "folio", "nro_referencia"),
+        cuenta=_columna(headers, "cuenta", "nro_cuenta", "cuenta_origen"),
+    )
+
+
+def _columnas_esperados(fieldnames: Sequence[str]) -> _ColumnasEsperados:
+    headers = {_keynorm(h): h for h in fieldnames}
+    c_fecha = _columna(headers, "fecha", "fecha_documento")
+    c_monto = _columna(headers, "monto", "importe", "valor")
+    c_desc = _columna(headers, "descripcion", "glosa", "detalle", "concepto")
+    faltantes = [
+        n for n, c in (("fecha", c_fecha), ("monto", c_monto), ("descripcion", c_desc)) if c is None
+    ]
+    if c_fecha is None or c_monto is None or c_desc is None:
+        raise ErrorIngestion(f"CSV esperados sin columnas requeridas: {', '.join(faltantes)}")
+    return _ColumnasEsperados(
+        id=_columna(headers, "id", "id_externo"),
+        fecha=c_fecha,
+        monto=c_monto,
+        moneda=_columna(headers, "moneda", "currency"),
+        desc=c_desc,
+        ref=_columna(headers, "referencia", "ref", "folio", "nro_referencia"),
+        terc=_columna(headers, "tercero", "proveedor", "cliente"),
+    )
+
+
+def _fila_vacia(row: _Fila) -> bool:
+    return not any((v or "").strip() for v in row.values())
+
+
+def _transaccion_desde_fila(
+    path: Path, cols: _ColumnasBanco, cfg: ConfiguracionCliente, i: int, row: _Fila
+) -> TransaccionBancaria:
+    try:
+        fecha_op: date = cols.fechas_op(row[cols.fecha_op] or "")
+    except ErrorParseo as e:
+        raise ErrorIngestion(f"Fila {i}: fecha_operacion invalida: {e}") from e
+    fecha_ct_val: date | None = None
+    if cols.fecha_ct and (row.get(cols.fecha_ct) or "").strip():
+        try:
+            fecha_ct_val = cols.fechas_ct(row[cols.fecha_ct] or "")
+        except ErrorParseo:
+            fecha_ct_val = None
+    try:
+        monto: Decimal = parse_monto_clp(row[cols.monto] or "")
+    except ErrorParseo as e:
+        raise ErrorIngestion(f"Fila {i}: monto invalido: {e}") from e
+    moneda = (normalizar_texto(row.get(cols.moneda, "") or "") or cfg.moneda_default).upper()
+    desc = normalizar_texto(row[cols.desc] or "")
+    ref_raw = normalizar_texto(row.get(cols.ref, "") or "")
+    ref = normalizar_referencia(ref_raw) if ref_raw else ""
+    cuenta_raw = normalizar_texto(row.get(cols.cuenta, "") or "")
+
+    data_norm = {
+        "fecha_operacion": str(fecha_op),
+        "fecha_contable": str(fecha_ct_val) if fecha_ct_val else None,
+        "monto": str(monto),
+        "moneda": moneda,
+        "descripcion": desc,
+        "referencia": ref or None,
+    }
+    tx_id = _id_tx(path, i, data_norm)
+    cuenta_mask = enmascarar_cuenta(cuenta_raw) if cuenta_raw else None
+
+    origen = OrigenDato.csv
+    return TransaccionBancaria(
+        id=tx_id,
+        cuenta_mask=cuenta_mask,
+        bloquea_autoconcilia=False,
+        motivo_bloqueo_autoconcilia=None,
+        fecha_operacion=_campo(fecha_op, origen=origen),
+        fecha_contable=(
+            _campo(fecha_ct_val, origen=origen, degrade=0.10) if fecha_ct_val else None
+        ),
+        monto=_campo(monto, origen=origen),
+        moneda=moneda,
+        descripcion=_campo(desc, origen=origen),
+        referencia=_campo(ref, origen=origen) if ref else None,
+        archivo_origen=path.name,
+        origen=origen,
+        fila_origen=i,
+    )
+
+
+def _esperado_desde_fila(
+    path: Path, cols: _ColumnasEsperados, cfg: ConfiguracionCliente, i: int, row: _Fila
+) -> MovimientoEsperado:
+    try:
+        fecha = cols.fechas(row[cols.fecha] or "")
+    except ErrorParseo as e:
+        raise ErrorIngestion(f"Fila {i}: fecha invalida: {e}") from e
+    try:
+        monto = parse_monto_clp(row[cols.monto] or "")
+    except ErrorParseo as e:
+        raise ErrorIngestion(f"Fila {i}: monto invalido: {e}") from e
+    moneda = (normalizar_texto(row.get(cols.moneda, "") or "") or cfg.moneda_default).upper()
+    desc = normalizar_texto(row[cols.desc] or "")
+    ref_raw = normalizar_texto(row.get(cols.ref, "") or "")
+    ref = normalizar_referencia(ref_raw) if ref_raw else ""
+    tercero = normalizar_texto(row.get(cols.terc, "") or "")
+    id_ext = normalizar_texto(row.get(cols.id, "") or "") if cols.id else ""
+
+    data_norm = {
+        "fecha": str(fecha),
+        "monto": str(monto),
+        "moneda": moneda,
+        "descripcion": desc,
+        "referencia": ref or None,
+        "tercero": tercero or None,
+    }
+    exp_id = _id_exp(path, i, data_norm, id_ext if id_ext else None)
+
+    origen = OrigenDato.csv
+    return MovimientoEsperado(
+        id=exp_id,
+        fecha=_campo(fecha, origen=origen),
+        monto=_campo(monto, origen=origen),
+        moneda=moneda,
+        descripcion=_campo(desc, origen=origen),
+        referencia=_campo(ref, origen=origen) if ref else None,
+        tercero=_campo(tercero, origen=origen, degrade=0.20) if tercero else None,
+    )
+
+
+def _preparar_csv(
+    path: Path, *, cfg: ConfiguracionCliente, audit: JsonlAuditWriter, label: str, mensaje: str
+) -> PerfilCSV:
     enforce_file_size(
         path=path,
         max_bytes=cfg.limites_ingesta.max_input_bytes,
         audit=audit,
         hints=LimitHints(cfg_path="limites_ingesta.max_input_bytes", cli_flag="--max-input-bytes"),
-        label="CSV banco",
+        label=label,
     )
-
-    delimiter = _detectar_delimitador(path)
+    perfil = detectar_perfil_csv(path)
     audit.write(
         AuditEvent(
-            "ingestion", "Detectado delimitador CSV", {"archivo": path.name, "delimiter": delimiter}
+            "ingestion",
+            mensaje,
+            {"archivo": path.name, "delimiter": perfil.delimiter, "encoding": perfil.encoding},
         )
     )
-    with path.open("r", encoding="utf-8", errors="replace", newline="") as f:
-        reader = csv.DictReader(f, delimiter=delimiter)
+    return perfil
+
+
+def _enforce_limites_tabulares(
+    path: Path,
+    *,
+    cfg: ConfiguracionCliente,
+    audit: JsonlAuditWriter,
+    label: str,
+    filas: int,
+    celdas: int,
+) -> None:
+    enforce_counter(
+        path=path,
+        audit=audit,
+        name="max_tabular_rows",
+        value=filas,
+        max_value=cfg.limites_ingesta.max_tabular_rows,
+        hints=LimitHints(
+            cfg_path="limites_ingesta.max_tabular_rows", cli_flag="--max-tabular-rows"
+        ),
+        label=label,
+    )
+    enforce_counter(
+        path=path,
+        audit=audit,
+        name="max_tabular_cells",
+        value=celdas,
+        max_value=cfg.limites_ingesta.max_tabular_cells,
+        hints=LimitHints(
+            cfg_path="limites_ingesta.max_tabular_cells", cli_flag="--max-tabular-cells"
+        ),
+        label=label,
+    )
+
+
+def _iter_filas(
+    path: Path,
+    reader: Iterable[_Fila],
+    *,
+    cfg: ConfiguracionCliente,
+    audit: JsonlAuditWriter,
+    label: str,
+    construir: Callable[[int, _Fila], _M],
+) -> Iterator[_M]:
+    data_rows = 0
+    data_cells = 0
+    for i, row in enumerate(reader, start=2):  # 1=header
+        if _fila_vacia(row):
+            continue
+        data_rows += 1
+        data_cells += len(row)
+        _enforce_limites_tabulares(
+            path, cfg=cfg, audit=audit, label=label, filas=data_rows, celdas=data_cells
+        )
+        yield construir(i, row)
+
+
+def iter_transacciones_csv(
+    path: Path, *, cfg: ConfiguracionCliente, audit: JsonlAuditWriter
+) -> Iterator[TransaccionBancaria]:
+    """
+    Generador: una `TransaccionBancaria` validada por fila, leyendo el CSV a medida que se
+    consume. Los limites de `limites_ingesta` se aplican fila a fila (fail-closed al cruzarlos);
+    las validaciones y eventos de auditoria ocurren al iterar, no al llamar.
+    """
+    perfil = _preparar_csv(
+        path, cfg=cfg, audit=audit, label="CSV banco", mensaje="Detectado delimitador CSV"
+    )
+    with path.open("r", encoding=perfil.encoding, errors="replace", newline="") as f:
+        reader = csv.DictReader(f, delimiter=perfil.delimiter)
         if reader.fieldnames is None:
             raise ErrorIngestion("CSV sin encabezados (fieldnames vacios)")
+        cols = _columnas_banco(reader.fieldnames)
+        yield from _iter_filas(
+            path,
+            reader,
+            cfg=cfg,
+            audit=audit,
+            label="CSV banco",
+            construir=partial(_transaccion_desde_fila, path, cols, cfg),
+        )
+
 
-        def keynorm(s: str) -> str:
-            return normalizar_texto(s).lower().replace(" ", "_")
-
-        headers = {keynorm(h): h for h in reader.fieldnames}
-
-        def col(*names: str) -> str | None:
-            for n in names:
-                if n in headers:
-                    return headers[n]
-            return None
-
-        c_fecha_op = col("fecha_operacion", "fecha", "fecha_movimiento")
-        c_fecha_ct = col("fecha_contable", "fecha_valor", "fecha_proceso")
-        c_monto = col("monto", "importe", "valor")
-        c_moneda = col("moneda", "currency")
-        c_desc = col("descripcion", "glosa", "detalle", "concepto")
-        c_ref = col("referencia", "ref", "comprobante", "folio", "nro_referencia")
-        c_cuenta = col("cuenta", "nro_cuenta", "cuenta_origen")
-
-        faltantes = [
-            n
-            for n, c in (
-                ("fecha_operacion", c_fecha_op),
-                ("monto", c_monto),
-                ("descripcion", c_desc),
-            )
-            if c is None
-        ]
-        if faltantes:
-            raise ErrorIngestion(f"CSV banco sin columnas requeridas: {', '.join(faltantes)}")
-
-        out: list[TransaccionBancaria] = []
-        data_rows = 0
-        data_cells = 0
-        for i, row in enumerate(reader, start=2):  # 1=header
-            if not any((v or "").strip() for v in row.values()):
-                continue
-            data_rows += 1
-            data_cells += len(row)
-            enforce_counter(
-                path=path,
-                audit=audit,
-                name="max_tabular_rows",
-                value=data_rows,
-                max_value=cfg.limites_ingesta.max_tabular_rows,
-                hints=LimitHints(
-                    cfg_path="limites_ingesta.max_tabular_rows", cli_flag="--max-tabular-rows"
-                ),
-                label="CSV banco",
-            )
-            enforce_counter(
-                path=path,
-                audit=audit,
-                name="max_tabular_cells",
-                value=data_cells,
-                max_value=cfg.limites_ingesta.max_tabular_cells,
-                hints=LimitHints(
-                    cfg_path="limites_ingesta.max_tabular_cells", cli_flag="--max-tabular-cells"
-                ),
-                label="CSV banco",
-            )
-            try:
-                fecha_op: date = parse_fecha_chile(row[c_fecha_op] or "")
-            except ErrorParseo as e:
-                raise ErrorIngestion(f"Fila {i}: fecha_operacion invalida: {e}") from e
-            fecha_ct_val: date | None = None
-            if c_fecha_ct and (row.get(c_fecha_ct) or "").strip():
-                try:
-                    fecha_ct_val = parse_fecha_chile(row[c_fecha_ct] or "")
-                except ErrorParseo:
-                    fecha_ct_val = None
-            try:
-                monto: Decimal = parse_monto_clp(row[c_monto] or "")
-            except ErrorParseo as e:
-                raise ErrorIngestion(f"Fila {i}: monto invalido: {e}") from e
-            moneda = (normalizar_texto(row.get(c_moneda, "") or "") or cfg.moneda_default).upper()
-            desc = normalizar_texto(row[c_desc] or "")
-            ref_raw = normalizar_texto(row.get(c_ref, "") or "")
-            ref = normalizar_referencia(ref_raw) if ref_raw else ""
-            cuenta_raw = normalizar_texto(row.get(c_cuenta, "") or "")
-
-            data_norm = {
-                "fecha_operacion": str(fecha_op),
-                "fecha_contable": str(fecha_ct_val) if fecha_ct_val else None,
-                "monto": str(monto),
-                "moneda": moneda,
-                "descripcion": desc,
-                "referencia": ref or None,
-            }
-            tx_id = _id_tx(path, i, data_norm)
-            cuenta_mask = enmascarar_cuenta(cuenta_raw) if cuenta_raw else None
-
-            origen = OrigenDato.csv
-            out.append(
-                TransaccionBancaria(
-                    id=tx_id,
-                    cuenta_mask=cuenta_mask,
-                    bloquea_autoconcilia=False,
-                    motivo_bloqueo_autoconcilia=None,
-                    fecha_operacion=_campo(fecha_op, origen=origen),
-                    fecha_contable=(
-                        _campo(fecha_ct_val, origen=origen, degrade=0.10) if fecha_ct_val else None
-                    ),
-                    monto=_campo(monto, origen=origen),
-                    moneda=moneda,
-                    descripcion=_campo(desc, origen=origen),
-                    referencia=_campo(ref, origen=origen) if ref else None,
-                    archivo_origen=path.name,
-                    origen=origen,
-                    fila_origen=i,
-                )
-            )
-        return out
+def cargar_transacciones_csv(
+    path: Path, *, cfg: ConfiguracionCliente, audit: JsonlAuditWriter
+) -> list[TransaccionBancaria]:
+    return list(iter_transacciones_csv(path, cfg=cfg, audit=audit))
 
 
-def cargar_movimientos_esperados_csv(
+def iter_movimientos_esperados_csv(
     path: Path, *, cfg: ConfiguracionCliente, audit: JsonlAuditWriter
-) -> list[MovimientoEsperado]:
-    enforce_file_size(
-        path=path,
-        max_bytes=cfg.limites_ingesta.max_input_bytes,
+) -> Iterator[MovimientoEsperado]:
+    perfil = _preparar_csv(
+        path,
+        cfg=cfg,
         audit=audit,
-        hints=LimitHints(cfg_path="limites_ingesta.max_input_bytes", cli_flag="--max-input-bytes"),
         label="CSV esperados",
+        mensaje="Detectado delimitador CSV (esperados)",
     )
-
-    delimiter = _detectar_delimitador(path)
-    audit.write(
-        AuditEvent(
-            "ingestion",
-            "Detectado delimitador CSV (esperados)",
-            {"archivo": path.name, "delimiter": delimiter},
-        )
-    )
-    with path.open("r", encoding="utf-8", errors="replace", newline="") as f:
-        reader = csv.DictReader(f, delimiter=delimiter)
+    with path.open("r", encoding=perfil.encoding, errors="replace", newline="") as f:
+        reader = csv.DictReader(f, delimiter=perfil.delimiter)
         if reader.fieldnames is None:
             raise ErrorIngestion("CSV esperados sin encabezados")
+        cols = _columnas_esperados(reader.fieldnames)
+        yield from _iter_filas(
+            path,
+            reader,
+            cfg=cfg,
+            audit=audit,
+            label="CSV esperados",
+            construir=partial(_esperado_desde_fila, path, cols, cfg),
+        )
 
-        def keynorm(s: str) -> str:
-            return normalizar_texto(s).lower().replace(" ", "_")
-
-        headers = {keynorm(h): h for h in reader.fieldnames}
-
-        def col(*names: str) -> str | None:
-            for n in names:
-                if n in headers:
-                    return headers[n]
-            return None
-
-        c_id = col("id", "id_externo")
-        c_fecha = col("fecha", "fecha_documento")
-        c_monto = col("monto", "importe", "valor")
-        c_moneda = col("moneda", "currency")
-        c_desc = col("descripcion", "glosa", "detalle", "concepto")
-        c_ref = col("referencia", "ref", "folio", "nro_referencia")
-        c_terc = col("tercero", "proveedor", "cliente")
-
-        faltantes = [
-            n
-            for n, c in (("fecha", c_fecha), ("monto", c_monto), ("descripcion", c_desc))
-            if c is None
-        ]
-        if faltantes:
-            raise ErrorIngestion(f"CSV esperados sin columnas requeridas: {', '.join(faltantes)}")
-
-        out: list[MovimientoEsperado] = []
-        data_rows = 0
-        data_cells = 0
-        for i, row in enumerate(reader, start=2):
-            if not any((v or "").strip() for v in row.values()):
-                continue
-            data_rows += 1
-            data_cells += len(row)
-            enforce_counter(
-                path=path,
-                audit=audit,
-                name="max_tabular_rows",
-                value=data_rows,
-                max_value=cfg.limites_ingesta.max_tabular_rows,
-                hints=LimitHints(
-                    cfg_path="limites_ingesta.max_tabular_rows", cli_flag="--max-tabular-rows"
-                ),
-                label="CSV esperados",
-            )
-            enforce_counter(
-                path=path,
-                audit=audit,
-                name="max_tabular_cells",
-                value=data_cells,
-                max_value=cfg.limites_ingesta.max_tabular_cells,
-                hints=LimitHints(
-                    cfg_path="limites_ingesta.max_tabular_cells", cli_flag="--max-tabular-cells"
-                ),
-                label="CSV esperados",
-            )
-            try:
-                fecha = parse_fecha_chile(row[c_fecha] or "")
-            except ErrorParseo as e:
-                raise ErrorIngestion(f"Fila {i}: fecha invalida: {e}") from e
-            try:
-                monto = parse_monto_clp(row[c_monto] or "")
-            except ErrorParseo as e:
-                raise ErrorIngestion(f"Fila {i}: monto invalido: {e}") from e
-            moneda = (normalizar_texto(row.get(c_moneda, "") or "") or cfg.moneda_default).upper()
-            desc = normalizar_texto(row[c_desc] or "")
-            ref_raw = normalizar_texto(row.get(c_ref, "") or "")
-            ref = normalizar_referencia(ref_raw) if ref_raw else ""
-            tercero = normalizar_texto(row.get(c_terc, "") or "")
-            id_ext = normalizar_texto(row.get(c_id, "") or "") if c_id else ""
-
-            data_norm = {
-                "fecha": str(fecha),
-                "monto": str(monto),
-                "moneda": moneda,
-                "descripcion": desc,
-                "referencia": ref or None,
-                "tercero": tercero or None,
-            }
-            exp_id = _id_exp(path, i, data_norm, id_ext if id_ext else None)
-
-            origen = OrigenDato.csv
-            out.append(
-                MovimientoEsperado(
-                    id=exp_id,
-                    fecha=_campo(fecha, origen=origen),
-                    monto=_campo(monto, origen=origen),
-                    moneda=moneda,
-                    descripcion=_campo(desc, origen=origen),
-                    referencia=_campo(ref, origen=origen) if ref else None,
-                    tercero=_campo(tercero, origen=origen, degrade=0.20) if tercero else None,
-                )
-            )
-        return out
+
+def cargar_movimientos_esperados_csv(
+    path: Path, *, cfg: ConfiguracionCliente, audit: JsonlAuditWriter
+) -> list[MovimientoEsperado]:
+    return list(iter_movimientos_esperados_csv(path, cfg=cfg, audit=audit))
@@ -0,0 +1,301 @@
+from __future__ import annotations
+
+import csv
+import io
+from collections.abc import Callable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Any
+
+from conciliador_bancario.audit.audit_log import JsonlAuditWriter
+from conciliador_bancario.ingestion.base import ErrorIngestion
+from conciliador_bancario.ingestion.csv_adapter import (
+    _M,
+    PerfilCSV,
+    _columnas_banco,
+    _columnas_esperados,
+    _enforce_limites_tabulares,
+    _esperado_desde_fila,
+    _Fila,
+    _fila_vacia,
+    _iter_filas,
+    _preparar_csv,
+    _transaccion_desde_fila,
+)
+from conciliador_bancario.models import (
+    ConfiguracionCliente,
+    MovimientoEsperado,
+    TransaccionBancaria,
+)
+
+# Chunks por worker: mas chunks que workers para balancear filas de largo desigual.
+_CHUNKS_POR_WORKER = 4
+# Bajo este tamano por chunk el costo de levantar procesos supera al de parsear en serie.
+MIN_BYTES_CHUNK = 256 * 1024
+
+# Rango de bytes [inicio, fin) que empieza y termina en limite de registro.
+Rango = tuple[int, int]
+# (registros, filas con datos, celdas) de un chunk; None si el chunk no es CSV estricto.
+Conteo = tuple[int, int, int] | None
+# Primer fallo de un chunk: ("limite", (filas, celdas)) o ("error", mensaje).
+Fallo = tuple[str, Any]
+# (fila inicial, filas y celdas de los chunks previos, max_tabular_rows, max_tabular_cells).
+Limites = tuple[int, int, int, int, int]
+
+
+def _fin_de_registro(data: bytes, pos: int, comillas: int) -> tuple[int, int]:
+    """
+    Primer fin de linea desde `pos` fuera de un campo entre comillas.
+
+    `comillas` es la cantidad de `"` en el rango ya recorrido: con paridad par no hay campo
+    abierto (las comillas escapadas `""` suman dos). Devuelve (posicion tras el `\\n`, comillas).
+    """
+    while True:
+        nl = data.find(b"\n", pos)
+        if nl == -1:
+            return len(data), comillas + data.count(b'"', pos)
+        comillas += data.count(b'"', pos, nl + 1)
+        pos = nl + 1
+        if comillas % 2 == 0:
+            return pos, comillas
+
+
+def rangos_de_registros(data: bytes, n_chunks: int) -> tuple[int, list[Rango]]:
+    """
+    Fin del encabezado y rangos de bytes de datos cortados en limites de registro.
+
+    Los cortes buscan el primer `\\n` con paridad de comillas par despues de cada objetivo
+    `len(data) * k / n_chunks`, asi un salto de linea dentro de un campo entre comillas nunca
+    separa un registro. Solo busca bytes ASCII (`"`, `\\n`): vale para UTF-8 y CP1252.
+    """
+    inicio, comillas = _fin_de_registro(data, 0, 0)
+    cortes = [inicio]
+    pos = inicio
+    for k in range(1, n_chunks):
+        objetivo = inicio + (len(data) - inicio) * k // n_chunks
+        if objetivo <= pos:
+            continue
+        comillas += data.count(b'"', pos, objetivo)
+        pos, comillas = _fin_de_registro(data, objetivo, comillas)
+        if pos >= len(data):
+            break
+        cortes.append(pos)
+    cortes.append(len(data))
+    return inicio, [(a, b) for a, b in zip(cortes, cortes[1:], strict=False) if b > a]
+
+
+def _leer_rango(path: Path, perfil: PerfilCSV, rango: Rango) -> io.StringIO:
+    with path.open("rb") as f:
+        f.seek(rango[0])
+        crudo = f.read(rango[1] - rango[0])
+    return io.StringIO(crudo.decode(perfil.encoding, errors="replace"), newline="")
+
+
+def _contar_lineas(path: Path, perfil: PerfilCSV, rango: Rango) -> int:
+    """Lineas fisicas del rango, con la misma particion que `csv` (`newline=""`)."""
+    return sum(1 for _ in _leer_rango(path, perfil, rango))
+
+
+def _contar_chunk(args: tuple[Path, PerfilCSV, list[str], Rango]) -> Conteo:
+    """Pasada 1 (en el pool): cuenta registros/filas/celdas; `strict` valida el corte."""
+    path, perfil, fieldnames, rango = args
+    reader = csv.DictReader(
+        _leer_rango(path, perfil, rango),
+        fieldnames=fieldnames,
+        delimiter=perfil.delimiter,
+        strict=True,
+    )
+    registros = filas = celdas = 0
+    try:
+        for row in reader:
+            registros += 1
+            if not _fila_vacia(row):
+                filas += 1
+                celdas += len(row)
+    except csv.Error:
+        return None
+    return registros, filas, celdas
+
+
+def _parsear_chunk(
+    args: tuple[Path, PerfilCSV, list[str], Rango, Callable[[int, _Fila], _M], Limites],
+) -> tuple[list[_M], Fallo | None]:
+    """
+    Pasada 2 (en el pool): construye los modelos del chunk con la numeracion global de filas.
+
+    Mismo recorrido que `_iter_filas` partiendo de los contadores acumulados de los chunks
+    previos; en vez de auditar y lanzar, devuelve el primer fallo para que el proceso principal
+    lo reproduzca en orden.
+    """
+    path, perfil, fieldnames, rango, construir, (fila0, filas, celdas, max_filas, max_celdas) = args
+    reader = csv.DictReader(
+        _leer_rango(path, perfil, rango), fieldnames=fieldnames, delimiter=perfil.delimiter
+    )
+    out: list[_M] = []
+    for i, row in enumerate(reader, start=fila0):
+        if _fila_vacia(row):
+            continue
+        filas += 1
+        celdas += len(row)
+        if filas > max_filas or celdas > max_celdas:
+            return out, ("limite", (filas, celdas))
+        try:
+            out.append(construir(i, row))
+        except ErrorIngestion as e:
+            return out, ("error", str(e))
+    return out, None
+
+
+def _parsear_en_pool(
+    path: Path,
+    perfil: PerfilCSV,
+    fieldnames: list[str],
+    rangos: list[Rango],
+    *,
+    cfg: ConfiguracionCliente,
+    audit: JsonlAuditWriter,
+    workers: int,
+    label: str,
+    construir: Callable[[int, _Fila], _M],
+) -> list[_M] | None:
+    """Ambas pasadas en un mismo pool; None si algun chunk no es CSV estricto."""
+    lim = cfg.limites_ingesta
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        conteos = [
+            c
+            for c in pool.map(_contar_chunk, [(path, perfil, fieldnames, r) for r in rangos])
+            if c is not None
+        ]
+        if len(conteos) != len(rangos):
+            return None
+        args = []
+        fila0, filas, celdas = 2, 0, 0  # 1=header
+        for r, (registros, filas_chunk, celdas_chunk) in zip(rangos, conteos, strict=True):
+            limites = (fila0, filas, celdas, lim.max_tabular_rows, lim.max_tabular_cells)
+            args.append((path, perfil, fieldnames, r, construir, limites))
+            fila0, filas, celdas = fila0 + registros, filas + filas_chunk, celdas + celdas_chunk
+        out: list[_M] = []
+        for parcial, fallo in pool.map(_parsear_chunk, args):
+            out.extend(parcial)
+            if fallo is None:
+                continue
+            tipo, valor = fallo
+            if tipo == "error":
+                raise ErrorIngestion(valor)
+            # Mismo evento y mensaje que el modo serial (fail-closed exacto).
+            _enforce_limites_tabulares(
+                path, cfg=cfg, audit=audit, label=label, filas=valor[0], celdas=valor[1]
+            )
+    return out
+
+
+def _cargar_csv_paralelo(
+    path: Path,
+    *,
+    cfg: ConfiguracionCliente,
+    audit: JsonlAuditWriter,
+    workers: int,
+    min_bytes_chunk: int,
+    label: str,
+    mensaje: str,
+    sin_encabezados: str,
+    columnas: Callable[[Sequence[str]], Any],
+    desde_fila: Callable[..., _M],
+) -> list[_M]:
+    perfil = _preparar_csv(path, cfg=cfg, audit=audit, label=label, mensaje=mensaje)
+    with path.open("r", encoding=perfil.encoding, errors="replace", newline="") as f:
+        reader = csv.DictReader(f, delimiter=perfil.delimiter)
+        if reader.fieldnames is None:
+            raise ErrorIngestion(sin_encabezados)
+        fieldnames = list(reader.fieldnames)
+        # Lineas fisicas que `DictReader` consumio para el encabezado.
+        lineas_encabezado = reader.line_num
+        construir = partial(desde_fila, path, columnas(fieldnames), cfg)
+
+        n_chunks = min(workers * _CHUNKS_POR_WORKER, path.stat().st_size // max(1, min_bytes_chunk))
+        if workers > 1 and n_chunks > 1:
+            fin_encabezado, rangos = rangos_de_registros(path.read_bytes(), n_chunks)
+            # El corte por paridad debe terminar donde `DictReader` termino el encabezado: una
+            # comilla suelta en el encabezado lo correria sobre filas de datos (que se perderian).
+            encabezado_alineado = (
+                _contar_lineas(path, perfil, (0, fin_encabezado)) == lineas_encabezado
+            )
+            if len(rangos) > 1 and encabezado_alineado:
+                out = _parsear_en_pool(
+                    path,
+                    perfil,
+                    fieldnames,
+                    rangos,
+                    cfg=cfg,
+                    audit=audit,
+                    workers=workers,
+                    label=label,
+                    construir=construir,
+                )
+                if out is not None:
+                    return out
+
+        # Archivo chico, un solo registro largo, encabezado desalineado o CSV no estricto (comillas
+        # sueltas): en serie.
+        return list(
+            _iter_filas(path, reader, cfg=cfg, audit=audit, label=label, construir=construir)
+        )
+
+
+def cargar_transacciones_csv_paralelo(
+    path: Path,
+    *,
+    cfg: ConfiguracionCliente,
+    audit: JsonlAuditWriter,
+    workers: int,
+    min_bytes_chunk: int = MIN_BYTES_CHUNK,
+) -> list[TransaccionBancaria]:
+    """
+    CSV banco parseado por chunks en un `ProcessPoolExecutor` (`--workers-ingesta`).
+
+    - El archivo se corta en rangos de bytes en limites de registro (respetando saltos de linea
+      dentro de comillas). Pasada 1: cada chunk cuenta sus registros, filas y celdas con
+      `csv` estricto; pasada 2: cada chunk construye sus transacciones partiendo de la fila y
+      los contadores acumulados de los chunks previos.
+    - Los resultados se concatenan en orden: filas 1-based, IDs (`_id_tx`), `max_tabular_rows`
+      / `max_tabular_cells` (mismo valor, mensaje y evento) y errores de parseo (el de la fila
+      mas temprana) son identicos al modo serial.
+    - Si algun chunk no es CSV estricto (p. ej. comillas sueltas que invalidan la paridad) o el
+      archivo es chico, se parsea en serie.
+    """
+    return _cargar_csv_paralelo(
+        path,
+        cfg=cfg,
+        audit=audit,
+        workers=workers,
+        min_bytes_chunk=min_bytes_chunk,
+        label="CSV banco",
+        mensaje="Detectado delimitador CSV",
+        sin_encabezados="CSV sin encabezados (fieldnames vacios)",
+        columnas=_columnas_banco,
+        desde_fila=_transaccion_desde_fila,
+    )
+
+
+def cargar_movimientos_esperados_csv_paralelo(
+    path: Path,
+    *,
+    cfg: ConfiguracionCliente,
+    audit: JsonlAuditWriter,
+    workers: int,
+    min_bytes_chunk: int = MIN_BYTES_CHUNK,
+) -> list[MovimientoEsperado]:
+    """Como `cargar_transacciones_csv_paralelo`, para el CSV de movimientos esperados."""
+    return _cargar_csv_paralelo(
+        path,
+        cfg=cfg,
+        audit=audit,
+        workers=workers,
+        min_bytes_chunk=min_bytes_chunk,
+        label="CSV esperados",
+        mensaje="Detectado delimitador CSV (esperados)",
+        sin_encabezados="CSV esperados sin encabezados",
+        columnas=_columnas_esperados,
+        desde_fila=_esperado_desde_fila,
+    )
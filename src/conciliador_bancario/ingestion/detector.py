@@ -1,20 +1,21 @@
 from __future__ import annotations
 
+from collections.abc import Iterator
 from pathlib import Path
 
 from conciliador_bancario.audit.audit_log import AuditEvent, JsonlAuditWriter
 from conciliador_bancario.ingestion.base import ErrorIngestion
 from conciliador_bancario.ingestion.csv_adapter import (
-    cargar_movimientos_esperados_csv,
-    cargar_transacciones_csv,
+    iter_movimientos_esperados_csv,
+    iter_transacciones_csv,
 )
 from conciliador_bancario.ingestion.pdf_ocr_adapter import cargar_transacciones_pdf_ocr
 from conciliador_bancario.ingestion.pdf_text_adapter import cargar_transacciones_pdf_texto
 from conciliador_bancario.ingestion.xlsx_adapter import (
-    cargar_movimientos_esperados_xlsx,
-    cargar_transacciones_xlsx,
+    iter_movimientos_esperados_xlsx,
+    iter_transacciones_xlsx,
 )
-from conciliador_bancario.ingestion.xml_adapter import cargar_transacciones_xml
+from conciliador_bancario.ingestion.xml_adapter import iter_transacciones_xml
 from conciliador_bancario.models import (
     ConfiguracionCliente,
     MovimientoEsperado,
@@ -29,40 +30,55 @@ def _format_supported_suffixes(suffixes: tuple[str, ...]) -> str:
     return ", ".join(sorted(suffixes))
 
 
-def cargar_transacciones_bancarias(
+def iter_transacciones_bancarias(
     path: Path, *, cfg: ConfiguracionCliente, audit: JsonlAuditWriter
-) -> list[TransaccionBancaria]:
+) -> Iterator[TransaccionBancaria]:
+    """
+    Generador: transacciones validadas de a una, segun la extension del archivo.
+
+    CSV/XLSX/XML se leen a medida que se consumen (limites de ingesta fila a fila); un PDF se
+    extrae completo antes de entregar la primera transaccion. Cada recorrido vuelve a leer el
+    archivo y a escribir sus eventos de auditoria.
+    """
     suf = path.suffix.lower()
     if suf == ".csv":
-        return cargar_transacciones_csv(path, cfg=cfg, audit=audit)
+        yield from iter_transacciones_csv(path, cfg=cfg, audit=audit)
+        return
     if suf == ".xlsx":
-        return cargar_transacciones_xlsx(path, cfg=cfg, audit=audit)
+        yield from iter_transacciones_xlsx(path, cfg=cfg, audit=audit)
+        return
     if suf == ".xml":
-        return cargar_transacciones_xml(path, cfg=cfg, audit=audit)
+        yield from iter_transacciones_xml(path, cfg=cfg, audit=audit)
+        return
     if suf == ".pdf":
         txs, parece_escaneado = cargar_transacciones_pdf_texto(path, cfg=cfg, audit=audit)
         if not parece_escaneado:
-            return txs
+            yield from txs
+            return
         if not cfg.permitir_ocr:
             raise ErrorIngestion(
                 "PDF parece escaneado (sin texto extraible) y OCR esta deshabilitado. "
                 "Ejecute con --enable-ocr e instale extras."
             )
-        return cargar_transacciones_pdf_ocr(path, cfg=cfg, audit=audit)
+        yield from cargar_transacciones_pdf_ocr(path, cfg=cfg, audit=audit)
+        return
     raise ErrorIngestion(
         f"Formato banco no soportado: {path.name}. "
         f"Soportados: {_format_supported_suffixes(BANK_SUPPORTED_SUFFIXES)}"
     )
 
 
-def cargar_movimientos_esperados(
+def iter_movimientos_esperados(
     path: Path, *, cfg: ConfiguracionCliente, audit: JsonlAuditWriter
-) -> list[MovimientoEsperado]:
+) -> Iterator[MovimientoEsperado]:
+    """Generador: movimientos esperados validados de a uno (CSV/XLSX)."""
     suf = path.suffix.lower()
     if suf == ".csv":
-        return cargar_movimientos_esperados_csv(path, cfg=cfg, audit=audit)
+        yield from iter_movimientos_esperados_csv(path, cfg=cfg, audit=audit)
+        return
     if suf == ".xlsx":
-        return cargar_movimientos_esperados_xlsx(path, cfg=cfg, audit=audit)
+        yield from iter_movimientos_esperados_xlsx(path, cfg=cfg, audit=audit)
+        return
     audit.write(
         AuditEvent(
             "ingestion",
@@ -74,3 +90,28 @@ def cargar_movimientos_esperados(
         f"Formato de movimientos esperados no soportado: {path.name}. "
         f"Soportados: {_format_supported_suffixes(EXPECTED_SUPPORTED_SUFFIXES)}"
     )
+
+
+def cargar_transacciones_bancarias(
+    path: Path, *, cfg: ConfiguracionCliente, audit: JsonlAuditWriter, workers: int = 1
+) -> list[TransaccionBancaria]:
+    """`workers > 1`: un CSV se parsea por chunks en paralelo (mismo resultado que en serie)."""
+    if workers > 1 and path.suffix.lower() == ".csv":
+        from conciliador_bancario.ingestion.csv_paralelo import cargar_transacciones_csv_paralelo
+
+        return cargar_transacciones_csv_paralelo(path, cfg=cfg, audit=audit, workers=workers)
+    return list(iter_transacciones_bancarias(path, cfg=cfg, audit=audit))
+
+
+def cargar_movimientos_esperados(
+    path: Path, *, cfg: ConfiguracionCliente, audit: JsonlAuditWriter, workers: int = 1
+) -> list[MovimientoEsperado]:
+    if workers > 1 and path.suffix.lower() == ".csv":
+        from conciliador_bancario.ingestion.csv_paralelo import (
+            cargar_movimientos_esperados_csv_paralelo,
+        )
+
+        return cargar_movimientos_esperados_csv_paralelo(
+            path, cfg=cfg, audit=audit, workers=workers
+        )
+    return list(iter_movimientos_esperados(path, cfg=cfg, audit=audit))
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from collections.abc import Callable, Iterator
 from datetime import date, datetime
 from decimal import Decimal
 from pathlib import Path
@@ -23,6 +24,7 @@ from conciliador_bancario.utils.hashing import sha256_json_estable
 from conciliador_bancario.utils.masking import enmascarar_cuenta
 from conciliador_bancario.utils.parsing import (
     ErrorParseo,
+    ParserFechaColumna,
     normalizar_referencia,
     normalizar_texto,
     parse_fecha_chile,
@@ -53,12 +55,12 @@ def _as_text(v: Any) -> str:
     return "" if v is None else str(v)
 
 
-def _as_date(v: Any) -> date:
+def _as_date(v: Any, parser: Callable[[str], date] = parse_fecha_chile) -> date:
     if isinstance(v, date) and not isinstance(v, datetime):
         return v
     if isinstance(v, datetime):
         return v.date()
-    return parse_fecha_chile(_as_text(v))
+    return parser(_as_text(v))
 
 
 def _keynorm(s: str) -> str:
@@ -95,9 +97,10 @@ def _select_worksheet_with_columns(
     raise ErrorIngestion("XLSX: no se encontro una hoja con las columnas requeridas.")
 
 
-def cargar_transacciones_xlsx(
+def iter_transacciones_xlsx(
     path: Path, *, cfg: ConfiguracionCliente, audit: JsonlAuditWriter
-) -> list[TransaccionBancaria]:
+) -> Iterator[TransaccionBancaria]:
+    """Generador por fila sobre la hoja elegida (openpyxl `read_only`: no carga el libro entero)."""
     enforce_file_size(
         path=path,
         max_bytes=cfg.limites_ingesta.max_input_bytes,
@@ -129,12 +132,12 @@ def cargar_transacciones_xlsx(
     c_desc = col("descripcion", "glosa", "detalle", "concepto")
     c_ref = col("referencia", "ref", "comprobante", "folio", "nro_referencia")
     c_cuenta = col("cuenta", "nro_cuenta", "cuenta_origen")
+    fechas_op, fechas_ct = ParserFechaColumna(), ParserFechaColumna()
 
     audit.write(
         AuditEvent("ingestion", "XLSX banco cargado", {"archivo": path.name, "hoja": ws.title})
     )
 
-    out: list[TransaccionBancaria] = []
     rows = ws.iter_rows(values_only=True)
     _ = next(rows, None)  # header
     data_rows = 0
@@ -167,9 +170,11 @@ def cargar_transacciones_xlsx(
             label="XLSX banco",
         )
         try:
-            fecha_op = _as_date(row[c_fecha_op])
+            fecha_op = _as_date(row[c_fecha_op], fechas_op)
             fecha_ct = (
-                _as_date(row[c_fecha_ct]) if (c_fecha_ct is not None and row[c_fecha_ct]) else None
+                _as_date(row[c_fecha_ct], fechas_ct)
+                if (c_fecha_ct is not None and row[c_fecha_ct])
+                else None
             )
             monto: Decimal = parse_monto_clp(_as_text(row[c_monto]))
         except (ErrorParseo, IndexError) as e:
@@ -195,29 +200,32 @@ def cargar_transacciones_xlsx(
         tx_id = _id(path, excel_row_idx, data_norm, "TX")
 
         origen = OrigenDato.xlsx
-        out.append(
-            TransaccionBancaria(
-                id=tx_id,
-                cuenta_mask=enmascarar_cuenta(cuenta_raw) if cuenta_raw else None,
-                bloquea_autoconcilia=False,
-                motivo_bloqueo_autoconcilia=None,
-                fecha_operacion=_campo(fecha_op, origen=origen),
-                fecha_contable=_campo(fecha_ct, origen=origen, degrade=0.10) if fecha_ct else None,
-                monto=_campo(monto, origen=origen),
-                moneda=moneda,
-                descripcion=_campo(desc, origen=origen),
-                referencia=_campo(ref, origen=origen) if ref else None,
-                archivo_origen=path.name,
-                origen=origen,
-                fila_origen=excel_row_idx,
-            )
+        yield TransaccionBancaria(
+            id=tx_id,
+            cuenta_mask=enmascarar_cuenta(cuenta_raw) if cuenta_raw else None,
+            bloquea_autoconcilia=False,
+            motivo_bloqueo_autoconcilia=None,
+            fecha_operacion=_campo(fecha_op, origen=origen),
+            fecha_contable=_campo(fecha_ct, origen=origen, degrade=0.10) if fecha_ct else None,
+            monto=_campo(monto, origen=origen),
+            moneda=moneda,
+            descripcion=_campo(desc, origen=origen),
+            referencia=_campo(ref, origen=origen) if ref else None,
+            archivo_origen=path.name,
+            origen=origen,
+            fila_origen=excel_row_idx,
         )
-    return out
 
 
-def cargar_movimientos_esperados_xlsx(
+def cargar_transacciones_xlsx(
     path: Path, *, cfg: ConfiguracionCliente, audit: JsonlAuditWriter
-) -> list[MovimientoEsperado]:
+) -> list[TransaccionBancaria]:
+    return list(iter_transacciones_xlsx(path, cfg=cfg, audit=audit))
+
+
+def iter_movimientos_esperados_xlsx(
+    path: Path, *, cfg: ConfiguracionCliente, audit: JsonlAuditWriter
+) -> Iterator[MovimientoEsperado]:
     enforce_file_size(
         path=path,
         max_bytes=cfg.limites_ingesta.max_input_bytes,
@@ -249,12 +257,12 @@ def cargar_movimientos_esperados_xlsx(
     c_desc = col("descripcion", "glosa", "detalle", "concepto")
     c_ref = col("referencia", "ref", "folio", "nro_referencia")
     c_terc = col("tercero", "proveedor", "cliente")
+    fechas = ParserFechaColumna()
 
     audit.write(
         AuditEvent("ingestion", "XLSX esperados cargado", {"archivo": path.name, "hoja": ws.title})
     )
 
-    out: list[MovimientoEsperado] = []
     rows = ws.iter_rows(values_only=True)
     _ = next(rows, None)  # header
     data_rows = 0
@@ -287,7 +295,7 @@ def cargar_movimientos_esperados_xlsx(
             label="XLSX esperados",
         )
         try:
-            fecha = _as_date(row[c_fecha])
+            fecha = _as_date(row[c_fecha], fechas)
             monto: Decimal = parse_monto_clp(_as_text(row[c_monto]))
         except (ErrorParseo, IndexError) as e:
             raise ErrorIngestion(f"Fila {excel_row_idx}: parseo invalido: {e}") from e
@@ -313,15 +321,18 @@ def cargar_movimientos_esperados_xlsx(
         exp_id = id_ext if id_ext else _id(path, excel_row_idx, data_norm, "EXP")
 
         origen = OrigenDato.xlsx
-        out.append(
-            MovimientoEsperado(
-                id=exp_id,
-                fecha=_campo(fecha, origen=origen),
-                monto=_campo(monto, origen=origen),
-                moneda=moneda,
-                descripcion=_campo(desc, origen=origen),
-                referencia=_campo(ref, origen=origen) if ref else None,
-                tercero=_campo(tercero, origen=origen, degrade=0.20) if tercero else None,
-            )
+        yield MovimientoEsperado(
+            id=exp_id,
+            fecha=_campo(fecha, origen=origen),
+            monto=_campo(monto, origen=origen),
+            moneda=moneda,
+            descripcion=_campo(desc, origen=origen),
+            referencia=_campo(ref, origen=origen) if ref else None,
+            tercero=_campo(tercero, origen=origen, degrade=0.20) if tercero else None,
         )
-    return out
+
+
+def cargar_movimientos_esperados_xlsx(
+    path: Path, *, cfg: ConfiguracionCliente, audit: JsonlAuditWriter
+) -> list[MovimientoEsperado]:
+    return list(iter_movimientos_esperados_xlsx(path, cfg=cfg, audit=audit))
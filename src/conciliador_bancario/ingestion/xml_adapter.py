@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from collections.abc import Iterator
 from datetime import date
 from decimal import Decimal
 from pathlib import Path
@@ -47,9 +48,9 @@ def _txt(node: ET.Element, tag: str) -> str:
     return normalizar_texto(el.text if el is not None and el.text else "")
 
 
-def cargar_transacciones_xml(
+def iter_transacciones_xml(
     path: Path, *, cfg: ConfiguracionCliente, audit: JsonlAuditWriter
-) -> list[TransaccionBancaria]:
+) -> Iterator[TransaccionBancaria]:
     """
     XML MVP (extensible):
 
@@ -63,6 +64,9 @@ def cargar_transacciones_xml(
         <referencia>FAC-1001</referencia>
       </movimiento>
     </cartola>
+
+    Generador: el arbol se parsea completo (acotado por `max_input_bytes` y
+    `max_xml_movimientos`), pero los modelos se construyen y entregan de a uno.
     """
     enforce_file_size(
         path=path,
@@ -99,7 +103,6 @@ def cargar_transacciones_xml(
         )
     )
 
-    out: list[TransaccionBancaria] = []
     for idx, m in enumerate(movs, start=1):
         try:
             fecha_op: date = parse_fecha_chile(_txt(m, "fecha_operacion"))
@@ -123,22 +126,25 @@ def cargar_transacciones_xml(
             "referencia": ref or None,
         }
         tx_id = _id_tx(path, idx, data_norm)
-        out.append(
-            TransaccionBancaria(
-                id=tx_id,
-                cuenta_mask=cuenta_mask,
-                banco=banco or None,
-                bloquea_autoconcilia=False,
-                motivo_bloqueo_autoconcilia=None,
-                fecha_operacion=_campo(fecha_op),
-                fecha_contable=_campo(fecha_ct) if fecha_ct else None,
-                monto=_campo(monto),
-                moneda=moneda,
-                descripcion=_campo(desc),
-                referencia=_campo(ref) if ref else None,
-                archivo_origen=path.name,
-                origen=OrigenDato.xml,
-                fila_origen=idx,
-            )
+        yield TransaccionBancaria(
+            id=tx_id,
+            cuenta_mask=cuenta_mask,
+            banco=banco or None,
+            bloquea_autoconcilia=False,
+            motivo_bloqueo_autoconcilia=None,
+            fecha_operacion=_campo(fecha_op),
+            fecha_contable=_campo(fecha_ct) if fecha_ct else None,
+            monto=_campo(monto),
+            moneda=moneda,
+            descripcion=_campo(desc),
+            referencia=_campo(ref) if ref else None,
+            archivo_origen=path.name,
+            origen=OrigenDato.xml,
+            fila_origen=idx,
         )
-    return out
+
+
+def cargar_transacciones_xml(
+    path: Path, *, cfg: ConfiguracionCliente, audit: JsonlAuditWriter
+) -> list[TransaccionBancaria]:
+    return list(iter_transacciones_xml(path, cfg=cfg, audit=audit))
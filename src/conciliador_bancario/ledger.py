@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+from collections.abc import Iterable
+from datetime import date
+from decimal import Decimal
+from enum import Enum
+from pathlib import Path
+from typing import Any
+
+from conciliador_bancario.errors import ErrorContrato, ErrorOperacionIO
+from conciliador_bancario.models import (
+    EstadoMatch,
+    MovimientoEsperado,
+    ResultadoConciliacion,
+    TransaccionBancaria,
+)
+from conciliador_bancario.utils.hashing import sha256_json_estable
+from conciliador_bancario.utils.parsing import monto_canonico
+
+LEDGER_VERSION = 1
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS meta (clave TEXT PRIMARY KEY, valor TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS partidas (
+    lado TEXT NOT NULL CHECK (lado IN ('banco', 'esperado')),
+    id TEXT NOT NULL,
+    monto TEXT NOT NULL,
+    fecha INTEGER NOT NULL,
+    run_id TEXT NOT NULL,
+    datos TEXT NOT NULL,
+    PRIMARY KEY (lado, id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS ix_partidas_monto_fecha ON partidas (lado, monto, fecha);
+"""
+
+# Consulta de arrastre: join de los montos de la corrida contra el indice (lado, monto, fecha).
+# El costo depende de los montos consultados y sus partidas, no del total historico del ledger.
+# CROSS JOIN fija `consulta_montos` como tabla externa (sin estadisticas, SQLite podria preferir
+# recorrer `partidas` por su clave primaria).
+_SQL_ARRASTRE = """
+SELECT p.datos FROM consulta_montos c
+CROSS JOIN partidas p ON p.lado = ? AND p.monto = c.monto AND p.fecha >= ?
+ORDER BY p.id
+"""
+
+
+def _codificar(valor: Any) -> Any:
+    # `CampoConConfianza.valor` es Any: fechas y montos deben volver con su tipo.
+    if isinstance(valor, Enum):
+        return valor.value
+    if isinstance(valor, date):
+        return {"$fecha": valor.isoformat()}
+    if isinstance(valor, Decimal):
+        return {"$decimal": str(valor)}
+    if isinstance(valor, dict):
+        return {k: _codificar(v) for k, v in valor.items()}
+    if isinstance(valor, list):
+        return [_codificar(v) for v in valor]
+    return valor
+
+
+def _decodificar(valor: Any) -> Any:
+    if isinstance(valor, dict):
+        if set(valor) == {"$fecha"}:
+            return date.fromisoformat(valor["$fecha"])
+        if set(valor) == {"$decimal"}:
+            return Decimal(valor["$decimal"])
+        return {k: _decodificar(v) for k, v in valor.items()}
+    if isinstance(valor, list):
+        return [_decodificar(v) for v in valor]
+    return valor
+
+
+def _datos(entidad: TransaccionBancaria | MovimientoEsperado) -> str:
+    return json.dumps(
+        _codificar(entidad.model_dump(mode="python")),
+        ensure_ascii=True,
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+
+
+class LedgerPartidas:
+    """
+    Ledger local (SQLite) de partidas abiertas entre periodos (`concilia run --ledger`).
+
+    - Guarda transacciones bancarias y movimientos esperados que quedaron sin conciliar, ya
+      normalizados, con su monto canonico y fecha ordinal indexados (`lado, monto, fecha`).
+    - `arrastre()` trae solo las partidas cuyo monto aparece en el lado opuesto de la corrida
+      actual y cuya fecha no es anterior a `desde`: consultas por indice, sin recorrer anos de
+      historia.
+    - `actualizar()` retira las partidas que quedaron en un match `conciliado` y registra las
+      remanentes de la corrida, en una sola transaccion.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._con = sqlite3.connect(path)
+            self._con.executescript(_ESQUEMA)
+            self._con.execute("CREATE TEMP TABLE consulta_montos (monto TEXT PRIMARY KEY)")
+            fila = self._con.execute("SELECT valor FROM meta WHERE clave = 'version'").fetchone()
+            if fila is None:
+                with self._con:
+                    self._con.execute(
+                        "INSERT INTO meta (clave, valor) VALUES ('version', ?)",
+                        (str(LEDGER_VERSION),),
+                    )
+            elif fila[0] != str(LEDGER_VERSION):
+                self._con.close()
+                raise ErrorContrato(
+                    "Version de ledger incompatible (fail-closed).",
+                    details={"archivo": str(path), "version": fila[0]},
+                    hint="Use un ledger generado por esta version del conciliador.",
+                )
+        except sqlite3.DatabaseError as e:
+            raise ErrorContrato(
+                "El ledger no es una base SQLite valida (fail-closed).",
+                details={"archivo": str(path), "error": str(e)},
+                hint="Revise la ruta de --ledger o restaure el archivo desde un respaldo.",
+            ) from e
+        except OSError as e:
+            raise ErrorOperacionIO(
+                "No se pudo abrir el ledger.",
+                details={"archivo": str(path)},
+                hint="Verifique permisos y ruta de --ledger.",
+            ) from e
+
+    def __enter__(self) -> LedgerPartidas:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._con.close()
+
+    def contar(self) -> dict[str, int]:
+        filas = self._con.execute("SELECT lado, COUNT(*) FROM partidas GROUP BY lado").fetchall()
+        conteo = dict(filas)
+        return {"banco": conteo.get("banco", 0), "esperados": conteo.get("esperado", 0)}
+
+    def _consultar(self, lado: str, montos: Iterable[Decimal], desde: date) -> list[str]:
+        cur = self._con.cursor()
+        cur.execute("DELETE FROM consulta_montos")
+        cur.executemany(
+            "INSERT OR IGNORE INTO consulta_montos (monto) VALUES (?)",
+            ((monto_canonico(m),) for m in montos),
+        )
+        return [r[0] for r in cur.execute(_SQL_ARRASTRE, (lado, desde.toordinal()))]
+
+    def arrastre(
+        self,
+        *,
+        transacciones: list[TransaccionBancaria],
+        esperados: list[MovimientoEsperado],
+        desde: date,
+    ) -> tuple[list[TransaccionBancaria], list[MovimientoEsperado]]:
+        """Partidas abiertas candidatas para la corrida (sin IDs ya presentes en ella)."""
+        ids_tx = {t.id for t in transacciones}
+        ids_exp = {e.id for e in esperados}
+        try:
+            exps = [
+                MovimientoEsperado.model_validate(_decodificar(json.loads(d)))
+                for d in self._consultar("esperado", (t.monto.valor for t in transacciones), desde)
+            ]
+            txs = [
+                TransaccionBancaria.model_validate(_decodificar(json.loads(d)))
+                for d in self._consultar("banco", (e.monto.valor for e in esperados), desde)
+            ]
+        except (sqlite3.DatabaseError, ValueError) as e:
+            raise ErrorContrato(
+                "Partida invalida en el ledger (fail-closed).",
+                details={"archivo": str(self.path), "error": str(e)},
+                hint="Restaure el ledger desde un respaldo.",
+            ) from e
+        return [t for t in txs if t.id not in ids_tx], [e for e in exps if e.id not in ids_exp]
+
+    def actualizar(self, *, resultado: ResultadoConciliacion, run_id: str) -> dict[str, int]:
+        conciliados_tx: set[str] = set()
+        conciliados_exp: set[str] = set()
+        for m in resultado.matches:
+            if m.estado == EstadoMatch.conciliado:
+                conciliados_tx.update(m.transacciones_bancarias)
+                conciliados_exp.update(m.movimientos_esperados)
+        filas = [
+            ("banco", t.id, monto_canonico(t.monto.valor), t.fecha_operacion.valor, _datos(t))
+            for t in resultado.transacciones_bancarias
+            if t.id not in conciliados_tx
+        ] + [
+            ("esperado", e.id, monto_canonico(e.monto.valor), e.fecha.valor, _datos(e))
+            for e in resultado.movimientos_esperados
+            if e.id not in conciliados_exp
+        ]
+        retirar = [("banco", i) for i in sorted(conciliados_tx)] + [
+            ("esperado", i) for i in sorted(conciliados_exp)
+        ]
+        try:
+            with self._con:
+                antes = self._con.total_changes
+                self._con.executemany("DELETE FROM partidas WHERE lado = ? AND id = ?", retirar)
+                retiradas = self._con.total_changes - antes
+                # Una partida arrastrada que sigue abierta conserva el run_id en que aparecio.
+                self._con.executemany(
+                    "INSERT INTO partidas (lado, id, monto, fecha, run_id, datos) "
+                    "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (lado, id) DO NOTHING",
+                    [(lado, i, m, f.toordinal(), run_id, d) for lado, i, m, f, d in filas],
+                )
+        except sqlite3.DatabaseError as e:
+            raise ErrorOperacionIO(
+                "No se pudo actualizar el ledger.",
+                details={"archivo": str(self.path), "error": str(e)},
+                hint="Verifique permisos y espacio; el ledger no se modifico.",
+            ) from e
+        return {"retiradas": retiradas, **self.contar()}
+
+
+def huella_arrastre(
+    transacciones: list[TransaccionBancaria], esperados: list[MovimientoEsperado]
+) -> str:
+    return sha256_json_estable(
+        {"banco": sorted(t.id for t in transacciones), "esperado": sorted(e.id for e in esperados)}
+    )
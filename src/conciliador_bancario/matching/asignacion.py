@@ -0,0 +1,368 @@
+from __future__ import annotations
+
+import heapq
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from decimal import Decimal
+
+from conciliador_bancario.audit.audit_log import AuditEvent
+from conciliador_bancario.matching.engine import (
+    _emitir_match_sugerido,
+    _EstadoConciliacion,
+    _valor_fecha_exp,
+    _valor_fecha_tx,
+    _valor_monto_exp,
+    _valor_monto_tx,
+)
+from conciliador_bancario.models import MovimientoEsperado, TransaccionBancaria
+
+# Distancia de nodos no alcanzados. Entera (costos = dias de diferencia, muy lejos de este tope)
+# para que distancias y potenciales sean `int` y el costo total exacto.
+_INF = 1 << 62
+
+
+@dataclass
+class EstadisticasAsignacion:
+    componentes: int = 0
+    componentes_excedidos_tope: int = 0
+    componentes_excedidos_presupuesto: int = 0
+    operaciones: int = 0
+    pares_no_unicos: int = 0
+    sugeridos: int = 0
+
+
+@dataclass
+class ResultadoAsignacion:
+    # Pares (indice tx, indice esperado) presentes en TODA asignacion optima.
+    unicos: list[tuple[int, int]] = field(default_factory=list)
+    asignados: int = 0
+    costo: int = 0
+    operaciones: int = 0
+    agotado: bool = False
+
+
+class _Red:
+    """Red de flujo con aristas residuales pareadas (arista `e` y su reversa `e ^ 1`)."""
+
+    def __init__(self, n: int) -> None:
+        self.ady: list[list[int]] = [[] for _ in range(n)]
+        self.destino: list[int] = []
+        self.cap: list[int] = []
+        self.costo: list[int] = []
+
+    def agregar(self, u: int, v: int, cap: int, costo: int) -> int:
+        e = len(self.destino)
+        self.destino += [v, u]
+        self.cap += [cap, 0]
+        self.costo += [costo, -costo]
+        self.ady[u].append(e)
+        self.ady[v].append(e + 1)
+        return e
+
+
+def _componentes_fuertes(n: int, ady: list[list[int]]) -> list[int]:
+    """Tarjan iterativo: id de componente fuertemente conexa por nodo."""
+    indice = [-1] * n
+    bajo = [0] * n
+    comp = [-1] * n
+    en_pila = [False] * n
+    pila: list[int] = []
+    contador = n_comp = 0
+    for raiz in range(n):
+        if indice[raiz] != -1:
+            continue
+        trabajo = [(raiz, 0)]
+        indice[raiz] = bajo[raiz] = contador
+        contador += 1
+        pila.append(raiz)
+        en_pila[raiz] = True
+        while trabajo:
+            v, i = trabajo[-1]
+            if i < len(ady[v]):
+                trabajo[-1] = (v, i + 1)
+                w = ady[v][i]
+                if indice[w] == -1:
+                    indice[w] = bajo[w] = contador
+                    contador += 1
+                    pila.append(w)
+                    en_pila[w] = True
+                    trabajo.append((w, 0))
+                elif en_pila[w]:
+                    bajo[v] = min(bajo[v], indice[w])
+                continue
+            trabajo.pop()
+            if trabajo:
+                u = trabajo[-1][0]
+                bajo[u] = min(bajo[u], bajo[v])
+            if bajo[v] == indice[v]:
+                while True:
+                    w = pila.pop()
+                    en_pila[w] = False
+                    comp[w] = n_comp
+                    if w == v:
+                        break
+                n_comp += 1
+    return comp
+
+
+def _flujo_bloqueante(
+    red: _Red, h: list[int], fuente: int, sumidero: int, res: ResultadoAsignacion
+) -> int:
+    """Dinic restringido a arcos residuales de costo reducido cero; devuelve el flujo empujado."""
+    n = len(red.ady)
+
+    def admisible(u: int, e: int) -> bool:
+        return red.cap[e] > 0 and red.costo[e] + h[u] - h[red.destino[e]] == 0
+
+    total = 0
+    while True:
+        nivel = [-1] * n
+        nivel[fuente] = 0
+        cola = [fuente]
+        for u in cola:
+            for e in red.ady[u]:
+                res.operaciones += 1
+                v = red.destino[e]
+                if nivel[v] < 0 and admisible(u, e):
+                    nivel[v] = nivel[u] + 1
+                    cola.append(v)
+        if nivel[sumidero] < 0:
+            return total
+        it = [0] * n
+        while True:
+            # DFS iterativo por niveles (camino de aumento en la red de niveles).
+            camino: list[int] = []
+            u = fuente
+            while u != sumidero:
+                ady = red.ady[u]
+                while it[u] < len(ady):
+                    e = ady[it[u]]
+                    v = red.destino[e]
+                    res.operaciones += 1
+                    if nivel[v] == nivel[u] + 1 and admisible(u, e):
+                        break
+                    it[u] += 1
+                if it[u] == len(ady):
+                    if u == fuente:
+                        break
+                    nivel[u] = -1
+                    e = camino.pop()
+                    u = red.destino[e ^ 1]
+                    it[u] += 1
+                    continue
+                e = ady[it[u]]
+                camino.append(e)
+                u = red.destino[e]
+            if u != sumidero:
+                break
+            f = min(red.cap[e] for e in camino)
+            for e in camino:
+                red.cap[e] -= f
+                red.cap[e ^ 1] += f
+            total += f
+
+
+def asignacion_minima(
+    fechas_tx: list[int], fechas_exp: list[int], ventana: int, *, max_operaciones: int
+) -> ResultadoAsignacion:
+    """
+    Asignacion 1:1 de cardinalidad maxima y costo minimo (suma de |delta dias|) en un cluster.
+
+    - Nodos agrupados por (lado, fecha): las entidades de un mismo dia son intercambiables, asi
+      que el grafo (y el costo) depende de los dias distintos del cluster, no de su tamano.
+    - Flujo de costo minimo por caminos mas cortos sucesivos (Dijkstra con potenciales).
+    - Unicidad: con potenciales optimos, otra solucion optima difiere en ciclos de costo reducido
+      cero. Un par (tx, esperado) es unico si ambos grupos tienen una sola entidad y su arco
+      residual no esta en un ciclo de costo reducido cero (componentes fuertes).
+    - `max_operaciones`: presupuesto determinista (relajaciones); si se agota => `agotado`.
+    """
+    dias_tx = sorted(set(fechas_tx))
+    dias_exp = sorted(set(fechas_exp))
+    cnt_tx = Counter(fechas_tx)
+    cnt_exp = Counter(fechas_exp)
+    fuente, sumidero = 0, 1
+    base_exp = 2 + len(dias_tx)
+    red = _Red(base_exp + len(dias_exp))
+    for i, d in enumerate(dias_tx):
+        red.agregar(fuente, 2 + i, cnt_tx[d], 0)
+    for j, d in enumerate(dias_exp):
+        red.agregar(base_exp + j, sumidero, cnt_exp[d], 0)
+    pares: list[tuple[int, int, int]] = []  # (arista, grupo tx, grupo exp)
+    for i, d in enumerate(dias_tx):
+        for j in range(bisect_left(dias_exp, d - ventana), bisect_right(dias_exp, d + ventana)):
+            e = red.agregar(
+                2 + i, base_exp + j, min(cnt_tx[d], cnt_exp[dias_exp[j]]), abs(d - dias_exp[j])
+            )
+            pares.append((e, i, j))
+
+    res = ResultadoAsignacion()
+    n = len(red.ady)
+    h = [0] * n
+    while True:
+        dist = [_INF] * n
+        dist[fuente] = 0
+        heap = [(0, fuente)]
+        listo = [False] * n
+        while heap:
+            d, u = heapq.heappop(heap)
+            if listo[u]:
+                continue
+            listo[u] = True
+            if u == sumidero:
+                break
+            for e in red.ady[u]:
+                res.operaciones += 1
+                if red.cap[e] <= 0:
+                    continue
+                v = red.destino[e]
+                nd = d + red.costo[e] + h[u] - h[v]
+                if nd < dist[v]:
+                    dist[v] = nd
+                    heapq.heappush(heap, (nd, v))
+            if res.operaciones > max_operaciones:
+                res.agotado = True
+                return res
+        if dist[sumidero] == _INF:
+            break
+        tope = dist[sumidero]
+        for v in range(n):
+            h[v] += min(dist[v], tope) if listo[v] else tope
+        # Flujo bloqueante sobre los arcos admisibles (costo reducido cero): varios caminos de
+        # igual costo por cada Dijkstra.
+        empujado = _flujo_bloqueante(red, h, fuente, sumidero, res)
+        res.asignados += empujado
+        res.costo += empujado * (h[sumidero] - h[fuente])
+        if res.operaciones > max_operaciones:
+            res.agotado = True
+            return res
+
+    # Subgrafo residual de costo reducido cero.
+    cero: list[list[int]] = [[] for _ in range(n)]
+    for u in range(n):
+        for e in red.ady[u]:
+            v = red.destino[e]
+            if red.cap[e] > 0 and red.costo[e] + h[u] - h[v] == 0:
+                cero[u].append(v)
+    comp = _componentes_fuertes(n, cero)
+    idx_tx: dict[int, list[int]] = {}
+    for k, d in enumerate(fechas_tx):
+        idx_tx.setdefault(d, []).append(k)
+    idx_exp: dict[int, list[int]] = {}
+    for k, d in enumerate(fechas_exp):
+        idx_exp.setdefault(d, []).append(k)
+    for e, i, j in pares:
+        if red.cap[e ^ 1] <= 0:
+            continue
+        u, v = 2 + i, base_exp + j
+        alternativo = red.costo[e ^ 1] + h[v] - h[u] == 0 and comp[u] == comp[v]
+        if alternativo or cnt_tx[dias_tx[i]] != 1 or cnt_exp[dias_exp[j]] != 1:
+            continue
+        res.unicos.append((idx_tx[dias_tx[i]][0], idx_exp[dias_exp[j]][0]))
+    res.unicos.sort()
+    return res
+
+
+def _clusters(
+    txs: list[TransaccionBancaria], exps: list[MovimientoEsperado], ventana: int
+) -> list[tuple[list[TransaccionBancaria], list[MovimientoEsperado]]]:
+    """Componentes conexas (tx <-> esperado a <= ventana dias) de un mismo monto, con aristas."""
+    dias_tx = sorted({_valor_fecha_tx(t).toordinal() for t in txs})
+    dias_exp = sorted({_valor_fecha_exp(e).toordinal() for e in exps})
+    base = len(dias_tx)
+    padre = list(range(base + len(dias_exp)))
+
+    def raiz(x: int) -> int:
+        while padre[x] != x:
+            padre[x] = padre[padre[x]]
+            x = padre[x]
+        return x
+
+    for i, d in enumerate(dias_tx):
+        for j in range(bisect_left(dias_exp, d - ventana), bisect_right(dias_exp, d + ventana)):
+            a, b = raiz(i), raiz(base + j)
+            if a != b:
+                padre[a] = b
+    pos_tx = {d: i for i, d in enumerate(dias_tx)}
+    pos_exp = {d: base + j for j, d in enumerate(dias_exp)}
+    grupos: dict[int, tuple[list[TransaccionBancaria], list[MovimientoEsperado]]] = {}
+    for t in txs:
+        grupos.setdefault(raiz(pos_tx[_valor_fecha_tx(t).toordinal()]), ([], []))[0].append(t)
+    for e in exps:
+        grupos.setdefault(raiz(pos_exp[_valor_fecha_exp(e).toordinal()]), ([], []))[1].append(e)
+    out = [g for g in grupos.values() if g[0] and g[1]]
+    out.sort(key=lambda g: g[0][0].id)
+    return out
+
+
+def aplicar_asignacion_monto_fecha(
+    st: _EstadoConciliacion,
+    transacciones: list[TransaccionBancaria],
+    esperados: list[MovimientoEsperado],
+) -> None:
+    """
+    Regla opcional: asignacion de costo minimo para clusters ambiguos de `monto_fecha`.
+
+    - Sobre los remanentes, por monto exacto: componentes conexas del grafo tx <-> esperado con
+      arista si |delta dias| <= `ventana_dias_monto_fecha`.
+    - Cada componente (<= `max_nodos`) se resuelve con `asignacion_minima` bajo presupuesto de
+      operaciones; si se excede, no se sugiere nada (fail-closed).
+    - Solo los pares presentes en toda asignacion optima se emiten como `sugerido`.
+    """
+    p = st.cfg.regla_asignacion_monto_fecha
+    ventana = st.cfg.ventana_dias_monto_fecha
+    por_monto: dict[Decimal, tuple[list[TransaccionBancaria], list[MovimientoEsperado]]] = {}
+    for tx in transacciones:
+        if tx.id not in st.used_tx:
+            por_monto.setdefault(_valor_monto_tx(tx), ([], []))[0].append(tx)
+    for exp in esperados:
+        if exp.id not in st.used_exp:
+            por_monto.setdefault(_valor_monto_exp(exp), ([], []))[1].append(exp)
+
+    stats = EstadisticasAsignacion()
+    for monto in sorted(por_monto):
+        txs, exps = por_monto[monto]
+        if not txs or not exps:
+            continue
+        for c_txs, c_exps in _clusters(txs, exps, ventana):
+            stats.componentes += 1
+            n = len(c_txs) + len(c_exps)
+            st.candidatos_examinados += n
+            if n > p.max_nodos:
+                stats.componentes_excedidos_tope += 1
+                continue
+            fechas_tx = [_valor_fecha_tx(t).toordinal() for t in c_txs]
+            fechas_exp = [_valor_fecha_exp(e).toordinal() for e in c_exps]
+            res = asignacion_minima(
+                fechas_tx, fechas_exp, ventana, max_operaciones=p.max_operaciones
+            )
+            stats.operaciones += res.operaciones
+            if res.agotado:
+                stats.componentes_excedidos_presupuesto += 1
+                continue
+            stats.pares_no_unicos += res.asignados - len(res.unicos)
+            for i, j in sorted(res.unicos, key=lambda par: c_txs[par[0]].id):
+                tx, exp = c_txs[i], c_exps[j]
+                delta = abs(fechas_tx[i] - fechas_exp[j])
+                _emitir_match_sugerido(
+                    st,
+                    regla="monto_fecha_asignacion",
+                    txs=[tx],
+                    exps=[exp],
+                    score=0.75 if delta == 0 else 0.70,
+                    explicacion=(
+                        f"Monto exacto en cluster ambiguo de {n} movimientos; par unico en toda "
+                        f"asignacion de costo minimo (delta total {res.costo} dias). "
+                        f"Delta dias: {delta}. Requiere revision."
+                    ),
+                    detalles_audit={"delta_dias": delta, "componente": n},
+                )
+                stats.sugeridos += 1
+
+    st.audit.write(
+        AuditEvent(
+            "matching",
+            "Regla asignacion monto_fecha completada",
+            {"regla": "monto_fecha_asignacion", **asdict(stats)},
+        )
+    )
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+from typing import Any
+
+from conciliador_bancario.models import (
+    CampoConConfianza,
+    ConfiguracionCliente,
+    MovimientoEsperado,
+    TransaccionBancaria,
+)
+
+# Bits de la mascara de confianza por entidad (0 = no bloquea). El orden de evaluacion define
+# el motivo reportado: bloqueo explicito, fecha, monto, descripcion, referencia; banco antes
+# que esperado.
+BIT_BLOQUEA = 1
+BIT_FECHA = 2
+BIT_MONTO = 4
+BIT_DESCRIPCION = 8
+BIT_REFERENCIA = 16
+
+_MOTIVOS_TX: tuple[tuple[int, str], ...] = (
+    (BIT_FECHA, "Confianza insuficiente en fecha_operacion (banco)."),
+    (BIT_MONTO, "Confianza insuficiente en monto (banco)."),
+    (BIT_DESCRIPCION, "Confianza insuficiente en descripcion (banco)."),
+    (BIT_REFERENCIA, "Confianza insuficiente en referencia (banco)."),
+)
+_MOTIVOS_EXP: tuple[tuple[int, str], ...] = (
+    (BIT_FECHA, "Confianza insuficiente en fecha (esperado)."),
+    (BIT_MONTO, "Confianza insuficiente en monto (esperado)."),
+    (BIT_DESCRIPCION, "Confianza insuficiente en descripcion (esperado)."),
+    (BIT_REFERENCIA, "Confianza insuficiente en referencia (esperado)."),
+)
+
+
+def _bajo(c: CampoConConfianza, umbral: float) -> bool:
+    return float(c.confianza.score) < umbral
+
+
+def mascara_tx(tx: TransaccionBancaria, umbral: float) -> int:
+    m = 0
+    if tx.bloquea_autoconcilia:
+        m |= BIT_BLOQUEA
+    if _bajo(tx.fecha_operacion, umbral):
+        m |= BIT_FECHA
+    if _bajo(tx.monto, umbral):
+        m |= BIT_MONTO
+    if _bajo(tx.descripcion, umbral):
+        m |= BIT_DESCRIPCION
+    if tx.referencia is not None and _bajo(tx.referencia, umbral):
+        m |= BIT_REFERENCIA
+    return m
+
+
+def mascara_exp(exp: MovimientoEsperado, umbral: float) -> int:
+    m = 0
+    if _bajo(exp.fecha, umbral):
+        m |= BIT_FECHA
+    if _bajo(exp.monto, umbral):
+        m |= BIT_MONTO
+    if _bajo(exp.descripcion, umbral):
+        m |= BIT_DESCRIPCION
+    if exp.referencia is not None and _bajo(exp.referencia, umbral):
+        m |= BIT_REFERENCIA
+    return m
+
+
+def _motivo(m: int, motivos: tuple[tuple[int, str], ...]) -> str:
+    for bit, motivo in motivos:
+        if m & bit:
+            return motivo
+    raise ValueError(f"Mascara de confianza sin bits conocidos: {m}")
+
+
+class TablaConfianza:
+    """
+    Tabla lateral id -> mascara de confianza, calculada una vez por corrida.
+
+    Politica: OCR y/o baja confianza bloquea autoconciliacion. `bloqueo()` es O(1) por entidad
+    y solo resuelve el texto del motivo cuando hay bloqueo. IDs duplicados (o entidades fuera de
+    la tabla) se evaluan al vuelo, sin cache, para no mezclar mascaras de filas distintas.
+    """
+
+    __slots__ = ("_umbral", "_tx", "_exp")
+
+    def __init__(
+        self,
+        cfg: ConfiguracionCliente,
+        transacciones: Iterable[TransaccionBancaria],
+        esperados: Iterable[MovimientoEsperado],
+    ) -> None:
+        self._umbral = cfg.umbral_confianza_campos
+        self._tx = self._construir(transacciones, mascara_tx)
+        self._exp = self._construir(esperados, mascara_exp)
+
+    def _construir(
+        self, entidades: Iterable[Any], fn: Callable[[Any, float], int]
+    ) -> dict[str, int]:
+        tabla: dict[str, int] = {}
+        duplicados: set[str] = set()
+        for e in entidades:
+            if e.id in tabla:
+                duplicados.add(e.id)
+            tabla[e.id] = fn(e, self._umbral)
+        for i in duplicados:
+            del tabla[i]
+        return tabla
+
+    def mascara_tx(self, tx: TransaccionBancaria) -> int:
+        m = self._tx.get(tx.id)
+        return mascara_tx(tx, self._umbral) if m is None else m
+
+    def mascara_exp(self, exp: MovimientoEsperado) -> int:
+        m = self._exp.get(exp.id)
+        return mascara_exp(exp, self._umbral) if m is None else m
+
+    def bloqueo(
+        self, txs: Iterable[TransaccionBancaria], exps: Iterable[MovimientoEsperado]
+    ) -> tuple[bool, str | None]:
+        for tx in txs:
+            m = self.mascara_tx(tx)
+            if m & BIT_BLOQUEA:
+                return (
+                    True,
+                    tx.motivo_bloqueo_autoconcilia or "Bloqueado por politica de confianza.",
+                )
+            if m:
+                return True, _motivo(m, _MOTIVOS_TX)
+        for exp in exps:
+            m = self.mascara_exp(exp)
+            if m:
+                return True, _motivo(m, _MOTIVOS_EXP)
+        return False, None
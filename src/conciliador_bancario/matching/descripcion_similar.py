@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import re
+import unicodedata
+
+from conciliador_bancario.audit.audit_log import AuditEvent
+from conciliador_bancario.matching.engine import (
+    _dias_diff,
+    _emitir_hallazgo,
+    _emitir_match_sugerido,
+    _EstadoConciliacion,
+    _ref_exp,
+    _ref_tx,
+    _valor_fecha_exp,
+    _valor_fecha_tx,
+    _valor_monto_exp,
+    _valor_monto_tx,
+)
+from conciliador_bancario.matching.indices import IndiceMinHashLSH
+from conciliador_bancario.models import (
+    MovimientoEsperado,
+    SeveridadHallazgo,
+    TransaccionBancaria,
+)
+
+_TOKEN = re.compile(r"[A-Z0-9]+")
+# Conectores sin valor discriminante en glosas bancarias.
+_VACIAS = frozenset({"DE", "DEL", "LA", "LAS", "EL", "LOS", "Y", "EN", "POR", "PARA", "CON", "AL"})
+
+
+def tokens_descripcion(texto: str) -> frozenset[str]:
+    """
+    Conjunto de tokens normalizados de una descripcion (mayusculas, sin tildes).
+
+    Se descartan conectores y tokens de un caracter; los numeros se conservan.
+    """
+    plano = unicodedata.normalize("NFKD", texto or "").encode("ascii", "ignore").decode("ascii")
+    return frozenset(t for t in _TOKEN.findall(plano.upper()) if len(t) > 1 and t not in _VACIAS)
+
+
+def _tokens_tx(tx: TransaccionBancaria) -> frozenset[str]:
+    return tokens_descripcion(str(tx.descripcion.valor))
+
+
+def _tokens_exp(exp: MovimientoEsperado) -> frozenset[str]:
+    tokens = tokens_descripcion(str(exp.descripcion.valor))
+    if exp.tercero is not None and exp.tercero.valor:
+        tokens |= tokens_descripcion(str(exp.tercero.valor))
+    return tokens
+
+
+def aplicar_descripcion_similar(
+    st: _EstadoConciliacion,
+    transacciones: list[TransaccionBancaria],
+    esperados: list[MovimientoEsperado],
+) -> None:
+    """
+    Regla opcional: descripcion similar (Jaccard de tokens) + monto exacto + ventana de fecha.
+
+    - Bloqueo LSH sobre firmas MinHash de los esperados remanentes (una vez por corrida): solo
+      los pares que comparten bucket se puntuan; no hay comparacion de todos contra todos.
+    - Del lado esperado, los tokens de `tercero` se suman a los de la descripcion.
+    - Si ambos lados tienen referencia, decide la referencia (esta regla no aplica).
+    - Un unico candidato => `sugerido`; >1 => hallazgo (fail-closed).
+    """
+    p = st.cfg.regla_descripcion_similar
+    indice = IndiceMinHashLSH(
+        ((_tokens_exp(e), e) for e in esperados if e.id not in st.used_exp),
+        bandas=p.bandas,
+        filas=p.filas,
+    )
+    consultas = sugeridos = ambiguas = 0
+    for tx in transacciones:
+        if tx.id in st.used_tx:
+            continue
+        tokens = _tokens_tx(tx)
+        if len(tokens) < p.min_tokens:
+            continue
+        consultas += 1
+        monto = _valor_monto_tx(tx)
+        fecha = _valor_fecha_tx(tx)
+        con_ref = bool(_ref_tx(tx))
+        cands = [
+            (s, e)
+            for s, e in indice.buscar(tokens, p.umbral_similitud)
+            if e.id not in st.used_exp
+            and _valor_monto_exp(e) == monto
+            and _dias_diff(fecha, _valor_fecha_exp(e)) <= p.ventana_dias
+            and not (con_ref and _ref_exp(e))
+        ]
+        st.candidatos_examinados += len(cands)
+        if not cands:
+            continue
+        if len(cands) > 1:
+            ambiguas += 1
+            _emitir_hallazgo(
+                st,
+                tipo="ambiguedad_descripcion_similar",
+                severidad=SeveridadHallazgo.advertencia,
+                mensaje=(
+                    "Mas de un movimiento esperado con descripcion similar, mismo monto y fecha "
+                    "cercana. Fail-closed: pendiente."
+                ),
+                entidad="banco",
+                entidad_id=tx.id,
+                detalles={"tx_id": tx.id, "candidatos": [e.id for _, e in cands]},
+                mensaje_audit="Ambiguedad por descripcion similar",
+            )
+            continue
+        s, exp = cands[0]
+        _emitir_match_sugerido(
+            st,
+            regla="descripcion_similar",
+            txs=[tx],
+            exps=[exp],
+            score=round(0.50 + 0.20 * s, 4),
+            explicacion=(
+                f"Descripcion similar (Jaccard {s:.2f}), monto exacto y fecha dentro de "
+                f"{p.ventana_dias} dias. Requiere revision."
+            ),
+            detalles_audit={"similitud_descripcion": round(s, 4)},
+        )
+        sugeridos += 1
+
+    st.audit.write(
+        AuditEvent(
+            "matching",
+            "Regla descripcion similar completada",
+            {
+                "regla": "descripcion_similar",
+                "indexados": len(indice),
+                "consultas": consultas,
+                "pares_comparados": indice.comparados,
+                "ambiguas": ambiguas,
+                "sugeridos": sugeridos,
+            },
+        )
+    )
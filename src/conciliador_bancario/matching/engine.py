@@ -1,11 +1,20 @@
 from __future__ import annotations
 
+import importlib
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
 from datetime import date
 from decimal import Decimal
+from typing import Any, Literal, TypeVar
 
 from conciliador_bancario.audit.audit_log import AuditEvent, JsonlAuditWriter
+from conciliador_bancario.matching.confianza import TablaConfianza
+from conciliador_bancario.matching.indices import IndiceMontoFecha
 from conciliador_bancario.models import (
-    CampoConConfianza,
+    ORDEN_REGLAS_POR_DEFECTO,
     ConfiguracionCliente,
     EstadoMatch,
     Hallazgo,
@@ -18,6 +27,8 @@ from conciliador_bancario.models import (
 from conciliador_bancario.utils.hashing import sha256_json_estable
 from conciliador_bancario.utils.parsing import normalizar_referencia
 
+_T = TypeVar("_T")
+
 
 def _match_id(run_id: str, tx_ids: list[str], exp_ids: list[str], regla: str) -> str:
     return (
@@ -65,10 +76,6 @@ def _valor_monto_exp(exp: MovimientoEsperado) -> Decimal:
     return v
 
 
-def _conf_score(c: CampoConConfianza) -> float:
-    return float(c.confianza.score)
-
-
 def _ref_tx(tx: TransaccionBancaria) -> str:
     if tx.referencia is None:
         return ""
@@ -91,345 +98,692 @@ def _dias_diff(a: date, b: date) -> int:
     return abs((a - b).days)
 
 
-def _bloqueado_por_confianza(
-    cfg: ConfiguracionCliente, txs: list[TransaccionBancaria], exps: list[MovimientoEsperado]
-) -> tuple[bool, str | None]:
-    # Politica: OCR y/o baja confianza bloquea autoconciliacion.
-    umbral = cfg.umbral_confianza_campos
-
-    for tx in txs:
-        if tx.bloquea_autoconcilia:
-            return True, tx.motivo_bloqueo_autoconcilia or "Bloqueado por politica de confianza."
-        if _conf_score(tx.fecha_operacion) < umbral:
-            return True, "Confianza insuficiente en fecha_operacion (banco)."
-        if _conf_score(tx.monto) < umbral:
-            return True, "Confianza insuficiente en monto (banco)."
-        if _conf_score(tx.descripcion) < umbral:
-            return True, "Confianza insuficiente en descripcion (banco)."
-        if tx.referencia is not None and _conf_score(tx.referencia) < umbral:
-            return True, "Confianza insuficiente en referencia (banco)."
-
-    for exp in exps:
-        if _conf_score(exp.fecha) < umbral:
-            return True, "Confianza insuficiente en fecha (esperado)."
-        if _conf_score(exp.monto) < umbral:
-            return True, "Confianza insuficiente en monto (esperado)."
-        if _conf_score(exp.descripcion) < umbral:
-            return True, "Confianza insuficiente en descripcion (esperado)."
-        if exp.referencia is not None and _conf_score(exp.referencia) < umbral:
-            return True, "Confianza insuficiente en referencia (esperado)."
-
-    return False, None
-
+@dataclass
+class _EstadoConciliacion:
+    """Estado mutable compartido por las reglas de una corrida de matching."""
+
+    cfg: ConfiguracionCliente
+    audit: JsonlAuditWriter
+    run_id: str
+    confianza: TablaConfianza
+    used_tx: set[str] = field(default_factory=set)
+    used_exp: set[str] = field(default_factory=set)
+    matches: list[Match] = field(default_factory=list)
+    hallazgos: list[Hallazgo] = field(default_factory=list)
+    # Contador global que cada regla incrementa con los candidatos que evalua (`matching_stats`).
+    candidatos_examinados: int = 0
+    # Si es True, `matching_stats` incluye tiempos de pared (audit.jsonl deja de ser reproducible).
+    perfil: bool = False
+    estadisticas: dict[str, EstadisticasRegla] = field(default_factory=dict)
+
+
+@dataclass
+class EstadisticasRegla:
+    """Contadores de una regla del pipeline para el bloque `matching_stats` de audit.jsonl."""
+
+    regla: str
+    candidatos: int = 0
+    matches: int = 0
+    ambiguedades: int = 0
+    hallazgos: int = 0
+    tiempo_preparar_ms: float = 0.0
+    tiempo_emparejar_ms: float = 0.0
+
+    def como_detalle(self, *, perfil: bool) -> dict[str, Any]:
+        d = asdict(self)
+        if not perfil:
+            del d["tiempo_preparar_ms"], d["tiempo_emparejar_ms"]
+        return d
+
+
+@contextmanager
+def _medir_regla(st: _EstadoConciliacion, regla: str, fase: str = "emparejar") -> Iterator[None]:
+    """
+    Acumula en `st.estadisticas[regla]` lo emitido dentro del bloque.
 
-def conciliar(
-    *,
-    cfg: ConfiguracionCliente,
-    transacciones: list[TransaccionBancaria],
-    esperados: list[MovimientoEsperado],
-    audit: JsonlAuditWriter,
-    run_id: str,
-) -> ResultadoConciliacion:
+    Acumula (no reemplaza): el modo streaming mide `monto_fecha` cluster a cluster.
     """
-    Motor de matching core (conservador y explicable).
+    e = st.estadisticas.setdefault(regla, EstadisticasRegla(regla))
+    c0, m0, h0 = st.candidatos_examinados, len(st.matches), len(st.hallazgos)
+    t0 = time.perf_counter() if st.perfil else 0.0
+    yield
+    e.candidatos += st.candidatos_examinados - c0
+    e.matches += len(st.matches) - m0
+    nuevos = st.hallazgos[h0:]
+    e.hallazgos += len(nuevos)
+    e.ambiguedades += sum(1 for h in nuevos if h.tipo.startswith("ambiguedad_"))
+    if st.perfil:
+        ms = round((time.perf_counter() - t0) * 1000, 3)
+        if fase == "preparar":
+            e.tiempo_preparar_ms = round(e.tiempo_preparar_ms + ms, 3)
+        else:
+            e.tiempo_emparejar_ms = round(e.tiempo_emparejar_ms + ms, 3)
 
-    Reglas MVP:
-    - 1:1 por referencia exacta + monto exacto (cuando es unico).
-    - 1:1 por monto exacto + ventana de fecha (cuando es unico).
 
-    Politica:
-    - Fail-closed ante ambiguedad (si hay >1 candidato, no se concilia).
-    - OCR/baja confianza bloquea autoconciliacion.
+def _evento_matching_stats(st: _EstadoConciliacion) -> None:
+    st.audit.write(
+        AuditEvent(
+            "matching",
+            "matching_stats",
+            {
+                "reglas": [e.como_detalle(perfil=st.perfil) for e in st.estadisticas.values()],
+                "perfil": st.perfil,
+            },
+        )
+    )
+
+
+def _emitir_ambiguedad_referencia(
+    st: _EstadoConciliacion, tx_id: str, r: str, cand_ids: list[str]
+) -> None:
+    hid = _hallazgo_id(
+        st.run_id,
+        "ambiguedad_referencia",
+        "banco",
+        tx_id,
+        {"cands": cand_ids, "ref": r},
+    )
+    h = Hallazgo(
+        id=hid,
+        severidad=SeveridadHallazgo.advertencia,
+        tipo="ambiguedad_referencia",
+        mensaje="Mas de un movimiento esperado comparte la misma referencia. Fail-closed: pendiente.",
+        entidad="banco",
+        entidad_id=tx_id,
+        detalles={"tx_id": tx_id, "referencia": r, "candidatos": cand_ids},
+    )
+    st.hallazgos.append(h)
+    st.audit.write(
+        AuditEvent(
+            "hallazgo",
+            "Ambiguedad por referencia",
+            {"hallazgo_id": h.id, "tx_id": tx_id, "ref": r},
+        )
+    )
+
+
+def _emitir_referencia_monto_difiere(
+    st: _EstadoConciliacion,
+    tx_id: str,
+    exp_id: str,
+    r: str,
+    monto_tx: Decimal,
+    monto_exp: Decimal,
+) -> None:
+    hid = _hallazgo_id(
+        st.run_id,
+        "referencia_coincide_monto_difiere",
+        "banco",
+        tx_id,
+        {
+            "exp_id": exp_id,
+            "ref": r,
+            "m_tx": str(monto_tx),
+            "m_exp": str(monto_exp),
+        },
+    )
+    h = Hallazgo(
+        id=hid,
+        severidad=SeveridadHallazgo.critica,
+        tipo="referencia_coincide_monto_difiere",
+        mensaje="Referencia coincide pero el monto difiere. No se concilia (fail-closed).",
+        entidad="banco",
+        entidad_id=tx_id,
+        detalles={
+            "tx_id": tx_id,
+            "exp_id": exp_id,
+            "referencia": r,
+            "monto_tx": str(monto_tx),
+            "monto_exp": str(monto_exp),
+        },
+    )
+    st.hallazgos.append(h)
+    st.audit.write(
+        AuditEvent(
+            "hallazgo",
+            "Referencia coincide pero monto difiere",
+            {"hallazgo_id": h.id, "tx_id": tx_id, "exp_id": exp_id, "ref": r},
+        )
+    )
+
+
+def _emitir_match_ref_exacta(
+    st: _EstadoConciliacion,
+    tx: TransaccionBancaria,
+    exp: MovimientoEsperado,
+    r: str,
+    bloqueo: tuple[bool, str | None],
+) -> None:
+    cfg = st.cfg
+    bloqueado, motivo = bloqueo
+    score = 1.0
+    estado = (
+        EstadoMatch.conciliado
+        if (score >= cfg.umbral_autoconcilia and not bloqueado)
+        else EstadoMatch.pendiente
+    )
+    explicacion = f"Match por referencia exacta ({r}) y monto exacto."
+    if bloqueado and motivo:
+        explicacion += f" BLOQUEADO: {motivo}"
+
+    mid = _match_id(st.run_id, [tx.id], [exp.id], "ref_exacta")
+    st.matches.append(
+        Match(
+            id=mid,
+            estado=estado,
+            score=score,
+            regla="ref_exacta",
+            explicacion=explicacion,
+            transacciones_bancarias=[tx.id],
+            movimientos_esperados=[exp.id],
+            bloqueado_por_confianza=bloqueado,
+        )
+    )
+    st.audit.write(
+        AuditEvent(
+            "match",
+            "Match creado",
+            {
+                "match_id": mid,
+                "regla": "ref_exacta",
+                "estado": estado.value,
+                "score": score,
+                "tx_ids": [tx.id],
+                "exp_ids": [exp.id],
+                "bloqueado_por_confianza": bloqueado,
+            },
+        )
+    )
+    st.used_tx.add(tx.id)
+    st.used_exp.add(exp.id)
+
+
+def _recortar_candidatos(
+    cands: list[_T], k: int, clave: Callable[[_T], Any]
+) -> tuple[list[_T], bool]:
     """
-    transacciones = sorted(transacciones, key=lambda t: t.id)
-    esperados = sorted(esperados, key=lambda e: e.id)
+    `cands` en orden (fecha, id), con a lo sumo `k + 1` elementos (ver `max_candidatos_ambiguedad`).
 
-    used_tx: set[str] = set()
-    used_exp: set[str] = set()
-    matches: list[Match] = []
-    hallazgos: list[Hallazgo] = []
+    Retorna los primeros `k` ordenados por `clave` (id) y si habia mas de `k`. Todos los backends
+    recorren la ventana en el mismo orden, asi que el recorte es identico en cada uno.
+    """
+    if len(cands) > k:
+        return sorted(cands[:k], key=clave), True
+    return (sorted(cands, key=clave) if len(cands) > 1 else cands), False
+
+
+def _emitir_ambiguedad_monto_fecha(
+    st: _EstadoConciliacion,
+    tx: TransaccionBancaria,
+    cands: list[MovimientoEsperado],
+    truncado: bool = False,
+) -> None:
+    hid = _hallazgo_id(
+        st.run_id, "ambiguedad_monto_fecha", "banco", tx.id, {"cands": [e.id for e in cands]}
+    )
+    detalles: dict[str, Any] = {"tx_id": tx.id, "candidatos": [e.id for e in cands]}
+    mensaje = "Mas de un candidato por monto+fecha. Fail-closed: pendiente."
+    if truncado:
+        # Solo se listan los primeros K: con montos redondos repetidos la lista completa no
+        # aporta a la revision y hace crecer run.json cuadraticamente.
+        detalles["mas_de"] = st.cfg.max_candidatos_ambiguedad
+        mensaje = (
+            f"Mas de {st.cfg.max_candidatos_ambiguedad} candidatos por monto+fecha (se listan "
+            "los primeros). Fail-closed: pendiente."
+        )
+    st.hallazgos.append(
+        Hallazgo(
+            id=hid,
+            severidad=SeveridadHallazgo.advertencia,
+            tipo="ambiguedad_monto_fecha",
+            mensaje=mensaje,
+            entidad="banco",
+            entidad_id=tx.id,
+            detalles=detalles,
+        )
+    )
 
-    # Index esperados por referencia (si existe)
-    idx_exp_ref: dict[str, list[MovimientoEsperado]] = {}
-    for exp in esperados:
-        r = _ref_exp(exp)
-        if r:
-            idx_exp_ref.setdefault(r, []).append(exp)
 
-    # 1) ref + monto exacto (unico)
-    for tx in transacciones:
-        if tx.id in used_tx:
-            continue
-        r = _ref_tx(tx)
-        if not r:
-            continue
-        cands = [e for e in idx_exp_ref.get(r, []) if e.id not in used_exp]
-        if len(cands) > 1:
-            hid = _hallazgo_id(
-                run_id,
-                "ambiguedad_referencia",
-                "banco",
-                tx.id,
-                {"cands": [e.id for e in cands], "ref": r},
-            )
-            h = Hallazgo(
-                id=hid,
-                severidad=SeveridadHallazgo.advertencia,
-                tipo="ambiguedad_referencia",
-                mensaje="Mas de un movimiento esperado comparte la misma referencia. Fail-closed: pendiente.",
-                entidad="banco",
-                entidad_id=tx.id,
-                detalles={"tx_id": tx.id, "referencia": r, "candidatos": [e.id for e in cands]},
-            )
-            hallazgos.append(h)
-            audit.write(
-                AuditEvent(
-                    "hallazgo",
-                    "Ambiguedad por referencia",
-                    {"hallazgo_id": h.id, "tx_id": tx.id, "ref": r},
-                )
-            )
-            continue
-        if len(cands) != 1:
-            continue
-        exp = cands[0]
-        if _valor_monto_tx(tx) != _valor_monto_exp(exp):
-            hid = _hallazgo_id(
-                run_id,
-                "referencia_coincide_monto_difiere",
-                "banco",
-                tx.id,
-                {
-                    "exp_id": exp.id,
-                    "ref": r,
-                    "m_tx": str(_valor_monto_tx(tx)),
-                    "m_exp": str(_valor_monto_exp(exp)),
-                },
-            )
-            h = Hallazgo(
-                id=hid,
-                severidad=SeveridadHallazgo.critica,
-                tipo="referencia_coincide_monto_difiere",
-                mensaje="Referencia coincide pero el monto difiere. No se concilia (fail-closed).",
-                entidad="banco",
-                entidad_id=tx.id,
-                detalles={
-                    "tx_id": tx.id,
-                    "exp_id": exp.id,
-                    "referencia": r,
-                    "monto_tx": str(_valor_monto_tx(tx)),
-                    "monto_exp": str(_valor_monto_exp(exp)),
-                },
-            )
-            hallazgos.append(h)
-            audit.write(
-                AuditEvent(
-                    "hallazgo",
-                    "Referencia coincide pero monto difiere",
-                    {"hallazgo_id": h.id, "tx_id": tx.id, "exp_id": exp.id, "ref": r},
-                )
-            )
-            continue
-
-        bloqueado, motivo = _bloqueado_por_confianza(cfg, [tx], [exp])
-        score = 1.0
-        estado = (
-            EstadoMatch.conciliado
-            if (score >= cfg.umbral_autoconcilia and not bloqueado)
-            else EstadoMatch.pendiente
+def _emitir_match_monto_fecha(
+    st: _EstadoConciliacion,
+    tx: TransaccionBancaria,
+    exp: MovimientoEsperado,
+    bloqueo: tuple[bool, str | None],
+) -> None:
+    cfg = st.cfg
+    bloqueado, motivo = bloqueo
+    delta = _dias_diff(_valor_fecha_tx(tx), _valor_fecha_exp(exp))
+    score = 0.90 if delta == 0 else 0.80  # mas conservador: delta != 0 no autoconcilia por defecto
+    estado = (
+        EstadoMatch.conciliado
+        if (score >= cfg.umbral_autoconcilia and not bloqueado)
+        else EstadoMatch.sugerido
+    )
+    explicacion = (
+        f"Match por monto exacto y ventana temporal (+/-{cfg.ventana_dias_monto_fecha} dias). "
+        f"Delta dias: {delta}."
+    )
+    if bloqueado and motivo:
+        explicacion += f" BLOQUEADO: {motivo}"
+        estado = EstadoMatch.pendiente
+
+    mid = _match_id(st.run_id, [tx.id], [exp.id], "monto_fecha")
+    st.matches.append(
+        Match(
+            id=mid,
+            estado=estado,
+            score=score,
+            regla="monto_fecha",
+            explicacion=explicacion,
+            transacciones_bancarias=[tx.id],
+            movimientos_esperados=[exp.id],
+            bloqueado_por_confianza=bloqueado,
         )
-        explicacion = f"Match por referencia exacta ({r}) y monto exacto."
-        if bloqueado and motivo:
-            explicacion += f" BLOQUEADO: {motivo}"
-
-        mid = _match_id(run_id, [tx.id], [exp.id], "ref_exacta")
-        matches.append(
-            Match(
-                id=mid,
-                estado=estado,
-                score=score,
-                regla="ref_exacta",
-                explicacion=explicacion,
-                transacciones_bancarias=[tx.id],
-                movimientos_esperados=[exp.id],
-                bloqueado_por_confianza=bloqueado,
-            )
+    )
+    st.audit.write(
+        AuditEvent(
+            "match",
+            "Match creado",
+            {
+                "match_id": mid,
+                "regla": "monto_fecha",
+                "estado": estado.value,
+                "score": score,
+                "tx_ids": [tx.id],
+                "exp_ids": [exp.id],
+                "bloqueado_por_confianza": bloqueado,
+                "delta_dias": delta,
+            },
         )
-        audit.write(
-            AuditEvent(
-                "match",
-                "Match creado",
-                {
-                    "match_id": mid,
-                    "regla": "ref_exacta",
-                    "estado": estado.value,
-                    "score": score,
-                    "tx_ids": [tx.id],
-                    "exp_ids": [exp.id],
-                    "bloqueado_por_confianza": bloqueado,
-                },
-            )
+    )
+    st.used_tx.add(tx.id)
+    st.used_exp.add(exp.id)
+
+
+# Score de las reglas que emparejan por suma exacta de un grupo (`pagos_divididos`,
+# `netting_diario`): el monto calza al peso pero la agrupacion es inferida. Queda bajo
+# `umbral_autoconcilia` por defecto (0.85) solo como senal para el revisor; el estado no depende
+# del score, porque `_emitir_match_sugerido` nunca emite `conciliado`.
+SCORE_SUGERIDO_SUMA_EXACTA = 0.70
+
+
+def _emitir_match_sugerido(
+    st: _EstadoConciliacion,
+    *,
+    regla: str,
+    txs: list[TransaccionBancaria],
+    exps: list[MovimientoEsperado],
+    score: float,
+    explicacion: str,
+    detalles_audit: dict[str, Any] | None = None,
+) -> Match:
+    """
+    Emite un match de una regla de sugerencia (N:M): nunca `conciliado`.
+
+    Si alguna entidad esta bloqueada por confianza, el match queda `pendiente` con el motivo.
+    """
+    bloqueado, motivo = st.confianza.bloqueo(txs, exps)
+    estado = EstadoMatch.sugerido
+    if bloqueado and motivo:
+        explicacion += f" BLOQUEADO: {motivo}"
+        estado = EstadoMatch.pendiente
+    tx_ids = [t.id for t in txs]
+    exp_ids = [e.id for e in exps]
+    mid = _match_id(st.run_id, tx_ids, exp_ids, regla)
+    m = Match(
+        id=mid,
+        estado=estado,
+        score=score,
+        regla=regla,
+        explicacion=explicacion,
+        transacciones_bancarias=tx_ids,
+        movimientos_esperados=exp_ids,
+        bloqueado_por_confianza=bloqueado,
+    )
+    st.matches.append(m)
+    st.audit.write(
+        AuditEvent(
+            "match",
+            "Match creado",
+            {
+                "match_id": mid,
+                "regla": regla,
+                "estado": estado.value,
+                "score": score,
+                "tx_ids": tx_ids,
+                "exp_ids": exp_ids,
+                "bloqueado_por_confianza": bloqueado,
+                **(detalles_audit or {}),
+            },
         )
-        used_tx.add(tx.id)
-        used_exp.add(exp.id)
+    )
+    st.used_tx.update(tx_ids)
+    st.used_exp.update(exp_ids)
+    return m
 
-    # 2) monto exacto + ventana fecha (unico)
-    for tx in transacciones:
-        if tx.id in used_tx:
-            continue
-        tx_fecha = _valor_fecha_tx(tx)
-        tx_monto = _valor_monto_tx(tx)
-        cands: list[MovimientoEsperado] = []
+
+def _emitir_hallazgo(
+    st: _EstadoConciliacion,
+    *,
+    tipo: str,
+    severidad: SeveridadHallazgo,
+    mensaje: str,
+    entidad: Literal["banco", "esperado"],
+    entidad_id: str,
+    detalles: dict[str, Any],
+    mensaje_audit: str,
+) -> Hallazgo:
+    hid = _hallazgo_id(st.run_id, tipo, entidad, entidad_id, detalles)
+    h = Hallazgo(
+        id=hid,
+        severidad=severidad,
+        tipo=tipo,
+        mensaje=mensaje,
+        entidad=entidad,
+        entidad_id=entidad_id,
+        detalles=detalles,
+    )
+    st.hallazgos.append(h)
+    st.audit.write(AuditEvent("hallazgo", mensaje_audit, {"hallazgo_id": hid, "tipo": tipo}))
+    return h
+
+
+class ReglaMatching(ABC):
+    """
+    Etapa del pipeline de matching.
+
+    - `preparar`: construye indices sobre las entidades aun no usadas.
+    - `emparejar`: decide y emite matches/hallazgos; marca `used_tx`/`used_exp` en el estado
+      compartido y suma a `st.candidatos_examinados` los candidatos evaluados.
+
+    Las instancias guardan indices de una corrida: `construir_pipeline` crea instancias nuevas.
+    """
+
+    nombre: str = ""
+
+    def preparar(
+        self,
+        st: _EstadoConciliacion,
+        transacciones: list[TransaccionBancaria],
+        esperados: list[MovimientoEsperado],
+    ) -> None:
+        return None
+
+    @abstractmethod
+    def emparejar(
+        self,
+        st: _EstadoConciliacion,
+        transacciones: list[TransaccionBancaria],
+        esperados: list[MovimientoEsperado],
+    ) -> None: ...
+
+
+class ReglaRefExacta(ReglaMatching):
+    """Regla 1: referencia exacta + monto exacto (unico)."""
+
+    nombre = "ref_exacta"
+
+    def preparar(
+        self,
+        st: _EstadoConciliacion,
+        transacciones: list[TransaccionBancaria],
+        esperados: list[MovimientoEsperado],
+    ) -> None:
+        # Index esperados por referencia (si existe)
+        self._por_ref: dict[str, list[MovimientoEsperado]] = {}
         for exp in esperados:
-            if exp.id in used_exp:
+            r = _ref_exp(exp)
+            if r:
+                self._por_ref.setdefault(r, []).append(exp)
+
+    def emparejar(
+        self,
+        st: _EstadoConciliacion,
+        transacciones: list[TransaccionBancaria],
+        esperados: list[MovimientoEsperado],
+    ) -> None:
+        for tx in transacciones:
+            if tx.id in st.used_tx:
+                continue
+            r = _ref_tx(tx)
+            if not r:
+                continue
+            cands = [e for e in self._por_ref.get(r, []) if e.id not in st.used_exp]
+            st.candidatos_examinados += len(cands)
+            if len(cands) > 1:
+                _emitir_ambiguedad_referencia(st, tx.id, r, [e.id for e in cands])
                 continue
-            if _valor_monto_exp(exp) != tx_monto:
+            if len(cands) != 1:
                 continue
-            if _dias_diff(tx_fecha, _valor_fecha_exp(exp)) <= cfg.ventana_dias_monto_fecha:
-                cands.append(exp)
-
-        if not cands:
-            continue
-        if len(cands) > 1:
-            hid = _hallazgo_id(
-                run_id, "ambiguedad_monto_fecha", "banco", tx.id, {"cands": [e.id for e in cands]}
+            exp = cands[0]
+            monto_tx, monto_exp = _valor_monto_tx(tx), _valor_monto_exp(exp)
+            if monto_tx != monto_exp:
+                _emitir_referencia_monto_difiere(st, tx.id, exp.id, r, monto_tx, monto_exp)
+                continue
+            _emitir_match_ref_exacta(st, tx, exp, r, st.confianza.bloqueo([tx], [exp]))
+
+
+class ReglaMontoFecha(ReglaMatching):
+    """Regla 2: monto exacto + ventana de fecha (unico)."""
+
+    nombre = "monto_fecha"
+
+    def preparar(
+        self,
+        st: _EstadoConciliacion,
+        transacciones: list[TransaccionBancaria],
+        esperados: list[MovimientoEsperado],
+    ) -> None:
+        # Indice por monto exacto con buckets ordenados por fecha: la ventana es una consulta
+        # por rango.
+        self._indice = IndiceMontoFecha(e for e in esperados if e.id not in st.used_exp)
+
+    def emparejar(
+        self,
+        st: _EstadoConciliacion,
+        transacciones: list[TransaccionBancaria],
+        esperados: list[MovimientoEsperado],
+    ) -> None:
+        k = st.cfg.max_candidatos_ambiguedad
+        for tx in transacciones:
+            if tx.id in st.used_tx:
+                continue
+            # El indice solo contiene esperados no usados (se construye tras `ref_exacta` y
+            # `retirar` saca los conciliados): cortar en k + 1 basta para decidir.
+            vistos = self._indice.primeros(
+                _valor_monto_tx(tx), _valor_fecha_tx(tx), st.cfg.ventana_dias_monto_fecha, k + 1
             )
-            hallazgos.append(
-                Hallazgo(
-                    id=hid,
-                    severidad=SeveridadHallazgo.advertencia,
-                    tipo="ambiguedad_monto_fecha",
-                    mensaje="Mas de un candidato por monto+fecha. Fail-closed: pendiente.",
-                    entidad="banco",
-                    entidad_id=tx.id,
-                    detalles={"tx_id": tx.id, "candidatos": [e.id for e in cands]},
-                )
+            st.candidatos_examinados += len(vistos)
+            if not vistos:
+                continue
+            cands, truncado = _recortar_candidatos(vistos, k, lambda e: e.id)
+            # Ambiguo si hay mas de un candidato en la ventana, aunque el recorte deje uno
+            # (`max_candidatos_ambiguedad=1`): nunca se autoconcilia un candidato recortado.
+            if truncado or len(cands) > 1:
+                _emitir_ambiguedad_monto_fecha(st, tx, cands, truncado)
+                continue
+            exp = cands[0]
+            _emitir_match_monto_fecha(st, tx, exp, st.confianza.bloqueo([tx], [exp]))
+            self._indice.retirar(exp)
+
+
+# Reglas opt-in (solo sugieren; nunca autoconcilian): nombre -> (modulo, funcion `aplicar_*`).
+# El modulo se importa solo si la regla esta habilitada.
+_REGLAS_OPCIONALES: dict[str, tuple[str, str]] = {
+    "fecha_contable": ("conciliador_bancario.matching.fecha_contable", "aplicar_fecha_contable"),
+    "monto_tercero": ("conciliador_bancario.matching.monto_tercero", "aplicar_monto_tercero"),
+    "asignacion_monto_fecha": (
+        "conciliador_bancario.matching.asignacion",
+        "aplicar_asignacion_monto_fecha",
+    ),
+    "memoria": ("conciliador_bancario.matching.memoria", "aplicar_memoria"),
+    "referencia_aproximada": (
+        "conciliador_bancario.matching.referencia_aproximada",
+        "aplicar_referencia_aproximada",
+    ),
+    "descripcion_similar": (
+        "conciliador_bancario.matching.descripcion_similar",
+        "aplicar_descripcion_similar",
+    ),
+    "tolerancia_monto": (
+        "conciliador_bancario.matching.tolerancia_monto",
+        "aplicar_tolerancia_monto",
+    ),
+    "tipo_cambio": ("conciliador_bancario.matching.tipo_cambio", "aplicar_tipo_cambio"),
+    "netting_diario": ("conciliador_bancario.matching.netting_diario", "aplicar_netting_diario"),
+    "pagos_divididos": ("conciliador_bancario.matching.pagos_divididos", "aplicar_pagos_divididos"),
+}
+
+
+class _ReglaOpcional(ReglaMatching):
+    """Adaptador para las reglas opt-in: construyen sus indices dentro de `aplicar_*`."""
+
+    def __init__(self, nombre: str) -> None:
+        self.nombre = nombre
+
+    def emparejar(
+        self,
+        st: _EstadoConciliacion,
+        transacciones: list[TransaccionBancaria],
+        esperados: list[MovimientoEsperado],
+    ) -> None:
+        modulo, funcion = _REGLAS_OPCIONALES[self.nombre]
+        getattr(importlib.import_module(modulo), funcion)(st, transacciones, esperados)
+
+
+def orden_reglas(cfg: ConfiguracionCliente) -> tuple[str, ...]:
+    return tuple(cfg.orden_reglas) if cfg.orden_reglas is not None else ORDEN_REGLAS_POR_DEFECTO
+
+
+def construir_pipeline(cfg: ConfiguracionCliente) -> list[ReglaMatching]:
+    """Reglas a ejecutar, en orden (`orden_reglas`); las opcionales solo si estan habilitadas."""
+    reglas: list[ReglaMatching] = []
+    for nombre in orden_reglas(cfg):
+        if nombre == ReglaRefExacta.nombre:
+            reglas.append(ReglaRefExacta())
+        elif nombre == ReglaMontoFecha.nombre:
+            reglas.append(ReglaMontoFecha())
+        elif getattr(cfg, f"regla_{nombre}").habilitada:
+            reglas.append(_ReglaOpcional(nombre))
+    return reglas
+
+
+def _ejecutar_regla(
+    st: _EstadoConciliacion,
+    regla: ReglaMatching,
+    transacciones: list[TransaccionBancaria],
+    esperados: list[MovimientoEsperado],
+) -> None:
+    with _medir_regla(st, regla.nombre, "preparar"):
+        regla.preparar(st, transacciones, esperados)
+    with _medir_regla(st, regla.nombre):
+        regla.emparejar(st, transacciones, esperados)
+
+
+def _ejecutar_pipeline(
+    st: _EstadoConciliacion,
+    reglas: list[ReglaMatching],
+    transacciones: list[TransaccionBancaria],
+    esperados: list[MovimientoEsperado],
+) -> None:
+    for regla in reglas:
+        _ejecutar_regla(st, regla, transacciones, esperados)
+
+
+def _cerrar_tx(st: _EstadoConciliacion, tx: TransaccionBancaria) -> None:
+    """Hallazgo final de una tx: `tx_con_match` (info) o `pendiente_banco`."""
+    if tx.id in st.used_tx:
+        hid = _hallazgo_id(st.run_id, "tx_con_match", "banco", tx.id, {})
+        st.hallazgos.append(
+            Hallazgo(
+                id=hid,
+                severidad=SeveridadHallazgo.info,
+                tipo="tx_con_match",
+                mensaje="Transaccion bancaria con match (ver Matches).",
+                entidad="banco",
+                entidad_id=tx.id,
             )
-            continue
-
-        exp = cands[0]
-        bloqueado, motivo = _bloqueado_por_confianza(cfg, [tx], [exp])
-        delta = _dias_diff(tx_fecha, _valor_fecha_exp(exp))
-        score = (
-            0.90 if delta == 0 else 0.80
-        )  # mas conservador: delta != 0 no autoconcilia por defecto
-        estado = (
-            EstadoMatch.conciliado
-            if (score >= cfg.umbral_autoconcilia and not bloqueado)
-            else EstadoMatch.sugerido
-        )
-        explicacion = (
-            f"Match por monto exacto y ventana temporal (+/-{cfg.ventana_dias_monto_fecha} dias). "
-            f"Delta dias: {delta}."
         )
-        if bloqueado and motivo:
-            explicacion += f" BLOQUEADO: {motivo}"
-            estado = EstadoMatch.pendiente
-
-        mid = _match_id(run_id, [tx.id], [exp.id], "monto_fecha")
-        matches.append(
-            Match(
-                id=mid,
-                estado=estado,
-                score=score,
-                regla="monto_fecha",
-                explicacion=explicacion,
-                transacciones_bancarias=[tx.id],
-                movimientos_esperados=[exp.id],
-                bloqueado_por_confianza=bloqueado,
-            )
+        return
+    hid = _hallazgo_id(st.run_id, "pendiente_banco", "banco", tx.id, {})
+    st.hallazgos.append(
+        Hallazgo(
+            id=hid,
+            severidad=SeveridadHallazgo.advertencia,
+            tipo="pendiente_banco",
+            mensaje="Transaccion bancaria sin match (pendiente).",
+            entidad="banco",
+            entidad_id=tx.id,
         )
-        audit.write(
-            AuditEvent(
-                "match",
-                "Match creado",
-                {
-                    "match_id": mid,
-                    "regla": "monto_fecha",
-                    "estado": estado.value,
-                    "score": score,
-                    "tx_ids": [tx.id],
-                    "exp_ids": [exp.id],
-                    "bloqueado_por_confianza": bloqueado,
-                    "delta_dias": delta,
-                },
-            )
+    )
+    st.audit.write(
+        AuditEvent(
+            "hallazgo",
+            "Pendiente banco",
+            {"hallazgo_id": hid, "tx_id": tx.id},
         )
-        used_tx.add(tx.id)
-        used_exp.add(exp.id)
+    )
 
-    # 3) Pendientes -> hallazgos informativos
-    for tx in transacciones:
-        if tx.id in used_tx:
-            hid = _hallazgo_id(run_id, "tx_con_match", "banco", tx.id, {})
-            hallazgos.append(
-                Hallazgo(
-                    id=hid,
-                    severidad=SeveridadHallazgo.info,
-                    tipo="tx_con_match",
-                    mensaje="Transaccion bancaria con match (ver Matches).",
-                    entidad="banco",
-                    entidad_id=tx.id,
-                )
-            )
-        else:
-            hid = _hallazgo_id(run_id, "pendiente_banco", "banco", tx.id, {})
-            hallazgos.append(
-                Hallazgo(
-                    id=hid,
-                    severidad=SeveridadHallazgo.advertencia,
-                    tipo="pendiente_banco",
-                    mensaje="Transaccion bancaria sin match (pendiente).",
-                    entidad="banco",
-                    entidad_id=tx.id,
-                )
-            )
-            audit.write(
-                AuditEvent(
-                    "hallazgo",
-                    "Pendiente banco",
-                    {"hallazgo_id": hid, "tx_id": tx.id},
-                )
-            )
 
-    for exp in esperados:
-        if exp.id not in used_exp:
-            hid = _hallazgo_id(run_id, "pendiente_esperado", "esperado", exp.id, {})
-            hallazgos.append(
-                Hallazgo(
-                    id=hid,
-                    severidad=SeveridadHallazgo.advertencia,
-                    tipo="pendiente_esperado",
-                    mensaje="Movimiento esperado sin match (pendiente).",
-                    entidad="esperado",
-                    entidad_id=exp.id,
-                )
-            )
-            audit.write(
-                AuditEvent(
-                    "hallazgo",
-                    "Pendiente esperado",
-                    {"hallazgo_id": hid, "exp_id": exp.id},
-                )
-            )
+def _cerrar_exp(st: _EstadoConciliacion, exp: MovimientoEsperado) -> None:
+    """Hallazgo `pendiente_esperado` si el movimiento esperado quedo sin match."""
+    if exp.id in st.used_exp:
+        return
+    hid = _hallazgo_id(st.run_id, "pendiente_esperado", "esperado", exp.id, {})
+    st.hallazgos.append(
+        Hallazgo(
+            id=hid,
+            severidad=SeveridadHallazgo.advertencia,
+            tipo="pendiente_esperado",
+            mensaje="Movimiento esperado sin match (pendiente).",
+            entidad="esperado",
+            entidad_id=exp.id,
+        )
+    )
+    st.audit.write(
+        AuditEvent(
+            "hallazgo",
+            "Pendiente esperado",
+            {"hallazgo_id": hid, "exp_id": exp.id},
+        )
+    )
+
 
-    audit.write(
+def _evento_matching_completado(
+    st: _EstadoConciliacion, *, txs: int, exps: int, matches: int, hallazgos: int
+) -> None:
+    st.audit.write(
         AuditEvent(
             "matching",
             "Matching completado",
-            {
-                "txs": len(transacciones),
-                "exps": len(esperados),
-                "matches": len(matches),
-                "hallazgos": len(hallazgos),
-            },
+            {"txs": txs, "exps": exps, "matches": matches, "hallazgos": hallazgos},
         )
     )
 
+
+def _cerrar_conciliacion(
+    st: _EstadoConciliacion,
+    transacciones: list[TransaccionBancaria],
+    esperados: list[MovimientoEsperado],
+) -> ResultadoConciliacion:
+    """Pendientes -> hallazgos, evento de cierre, invariantes y orden canonico de salida."""
+    for tx in transacciones:
+        _cerrar_tx(st, tx)
+    for exp in esperados:
+        _cerrar_exp(st, exp)
+    _evento_matching_stats(st)
+    _evento_matching_completado(
+        st,
+        txs=len(transacciones),
+        exps=len(esperados),
+        matches=len(st.matches),
+        hallazgos=len(st.hallazgos),
+    )
+
     # Invariante: una entidad no puede aparecer en dos matches distintos (fail-closed).
     tx_in_matches: set[str] = set()
     exp_in_matches: set[str] = set()
-    for m in matches:
+    for m in st.matches:
         for tx_id in m.transacciones_bancarias:
             if tx_id in tx_in_matches:
                 raise ValueError(f"Invariante violada: tx_id repetido en matches: {tx_id}")
@@ -439,12 +793,86 @@ def conciliar(
                 raise ValueError(f"Invariante violada: exp_id repetido en matches: {exp_id}")
             exp_in_matches.add(exp_id)
 
-    matches = sorted(matches, key=lambda m: m.id)
-    hallazgos = sorted(hallazgos, key=lambda h: h.id)
     return ResultadoConciliacion(
         transacciones_bancarias=transacciones,
         movimientos_esperados=esperados,
-        matches=matches,
-        hallazgos=hallazgos,
+        matches=sorted(st.matches, key=lambda m: m.id),
+        hallazgos=sorted(st.hallazgos, key=lambda h: h.id),
+        run_id=st.run_id,
+    )
+
+
+def _aplicar_ref_exacta(
+    st: _EstadoConciliacion,
+    transacciones: list[TransaccionBancaria],
+    esperados: list[MovimientoEsperado],
+) -> None:
+    _ejecutar_regla(st, ReglaRefExacta(), transacciones, esperados)
+
+
+def _aplicar_monto_fecha(
+    st: _EstadoConciliacion,
+    transacciones: list[TransaccionBancaria],
+    esperados: list[MovimientoEsperado],
+) -> None:
+    _ejecutar_regla(st, ReglaMontoFecha(), transacciones, esperados)
+
+
+def conciliar(
+    *,
+    cfg: ConfiguracionCliente,
+    transacciones: list[TransaccionBancaria],
+    esperados: list[MovimientoEsperado],
+    audit: JsonlAuditWriter,
+    run_id: str,
+    perfil: bool = False,
+) -> ResultadoConciliacion:
+    """
+    Motor de matching core (conservador y explicable).
+
+    Pipeline ordenado de reglas (`construir_pipeline`; orden `ORDEN_REGLAS_POR_DEFECTO` o
+    `orden_reglas`), cada una con fase `preparar` (indices) y `emparejar`, sobre el estado
+    compartido (`used_tx`/`used_exp`): cada regla solo ve lo que las anteriores dejaron sin match.
+    Al cierre, las entidades sin match quedan como hallazgos pendientes y se escribe
+    `matching_stats` en audit.jsonl (candidatos, matches, ambiguedades y hallazgos por regla; con
+    `perfil=True` tambien tiempos).
+
+    Reglas core (siempre, salvo que `orden_reglas` las omita):
+    - `ref_exacta`: 1:1 por referencia exacta + monto exacto (cuando es unico).
+    - `monto_fecha`: 1:1 por monto exacto + ventana de fecha (cuando es unico), via
+      `IndiceMontoFecha`.
+
+    Reglas opcionales (`regla_<nombre>.habilitada`, deshabilitadas por defecto; solo `sugerido`),
+    despachadas por `_REGLAS_OPCIONALES` a `aplicar_<nombre>` de su modulo, en este orden:
+    - `fecha_contable`: 1:1 por monto exacto + intervalo fecha operacion/contable.
+    - `monto_tercero`: 1:1 por misma contraparte (RUT / tercero) + monto exacto; desempata
+      ambiguedades de `monto_fecha`.
+    - `asignacion_monto_fecha`: 1:1 por asignacion de costo minimo en clusters ambiguos de
+      `monto_fecha`.
+    - `memoria`: 1:1 por firmas aprendidas de corridas previas (`concilia memoria aprender`).
+    - `referencia_aproximada`: 1:1 por referencia a distancia de edicion acotada + monto exacto.
+    - `descripcion_similar`: 1:1 por descripcion similar (MinHash/LSH) + monto + fecha.
+    - `tolerancia_monto`: 1:1 por monto dentro de tolerancia + ventana de fecha.
+    - `tipo_cambio`: 1:1 entre monedas distintas, convirtiendo con la tabla de tasas por fecha.
+    - `netting_diario`: 1:N / M:N por suma neta de los esperados de un dia (ej: liquidaciones
+      de adquirente).
+    - `pagos_divididos`: N:1 / 1:N por suma exacta dentro de la ventana.
+
+    Politica:
+    - Fail-closed ante ambiguedad (si hay >1 candidato, no se concilia).
+    - OCR/baja confianza bloquea autoconciliacion.
+    """
+    transacciones = sorted(transacciones, key=lambda t: t.id)
+    esperados = sorted(esperados, key=lambda e: e.id)
+    st = _EstadoConciliacion(
+        cfg=cfg,
+        audit=audit,
         run_id=run_id,
+        confianza=TablaConfianza(cfg, transacciones, esperados),
+        perfil=perfil,
     )
+
+    # 1) reglas core y opcionales habilitadas, en orden
+    _ejecutar_pipeline(st, construir_pipeline(cfg), transacciones, esperados)
+    # 2) Pendientes -> hallazgos informativos
+    return _cerrar_conciliacion(st, transacciones, esperados)
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+from datetime import date
+
+from conciliador_bancario.audit.audit_log import AuditEvent
+from conciliador_bancario.matching.engine import (
+    _emitir_hallazgo,
+    _emitir_match_sugerido,
+    _EstadoConciliacion,
+    _valor_fecha_exp,
+    _valor_fecha_tx,
+    _valor_monto_tx,
+)
+from conciliador_bancario.matching.indices import IndiceMontoFecha
+from conciliador_bancario.models import (
+    MovimientoEsperado,
+    SeveridadHallazgo,
+    TransaccionBancaria,
+)
+
+
+def intervalo_tx(tx: TransaccionBancaria) -> tuple[int, int] | None:
+    """`[min, max]` ordinal de (fecha_operacion, fecha_contable); None si no hay fecha contable."""
+    if tx.fecha_contable is None or not isinstance(tx.fecha_contable.valor, date):
+        return None
+    a = _valor_fecha_tx(tx).toordinal()
+    b = tx.fecha_contable.valor.toordinal()
+    return (a, b) if a <= b else (b, a)
+
+
+def aplicar_fecha_contable(
+    st: _EstadoConciliacion,
+    transacciones: list[TransaccionBancaria],
+    esperados: list[MovimientoEsperado],
+) -> None:
+    """
+    Regla opcional: monto exacto + intervalo `[fecha_operacion, fecha_contable]` +/- ventana.
+
+    - Solo tx remanentes con fecha contable distinta de la de operacion (si son iguales, el
+      intervalo es la ventana de `monto_fecha`, que ya se evaluo).
+    - Los esperados son puntos: por monto se mantienen ordenados por fecha (`IndiceMontoFecha`) y
+      cada intervalo es una consulta con dos `bisect`.
+    - Tx con `ambiguedad_monto_fecha` se omiten: el intervalo solo agrega candidatos, seguiria
+      siendo ambiguo (el hallazgo ya existe).
+    - Desfases mayores a `max_desfase_dias` se ignoran (fecha contable poco confiable).
+    - Un unico candidato => `sugerido`; >1 => hallazgo (fail-closed).
+    """
+    p = st.cfg.regla_fecha_contable
+    ventana = st.cfg.ventana_dias_monto_fecha
+    ya_ambiguas = {
+        h.entidad_id for h in st.hallazgos if h.tipo == "ambiguedad_monto_fecha" and h.entidad_id
+    }
+    indice = IndiceMontoFecha(e for e in esperados if e.id not in st.used_exp)
+    indexados = len(indice)
+    consultas = omitidas_desfase = sugeridos = ambiguas = 0
+    for tx in transacciones:
+        if tx.id in st.used_tx or tx.id in ya_ambiguas:
+            continue
+        intervalo = intervalo_tx(tx)
+        if intervalo is None or intervalo[0] == intervalo[1]:
+            continue
+        desde, hasta = intervalo
+        if hasta - desde > p.max_desfase_dias:
+            omitidas_desfase += 1
+            continue
+        consultas += 1
+        cands = [
+            e
+            for e in indice.en_intervalo(_valor_monto_tx(tx), desde - ventana, hasta + ventana)
+            if e.id not in st.used_exp
+        ]
+        st.candidatos_examinados += len(cands)
+        if not cands:
+            continue
+        if len(cands) > 1:
+            ambiguas += 1
+            _emitir_hallazgo(
+                st,
+                tipo="ambiguedad_fecha_contable",
+                severidad=SeveridadHallazgo.advertencia,
+                mensaje=(
+                    "Mas de un movimiento esperado con monto exacto entre fecha de operacion y "
+                    "fecha contable. Fail-closed: pendiente."
+                ),
+                entidad="banco",
+                entidad_id=tx.id,
+                detalles={"tx_id": tx.id, "candidatos": [e.id for e in cands]},
+                mensaje_audit="Ambiguedad por fecha contable",
+            )
+            continue
+        exp = cands[0]
+        o = _valor_fecha_exp(exp).toordinal()
+        delta = max(desde - o, o - hasta, 0)
+        _emitir_match_sugerido(
+            st,
+            regla="fecha_contable",
+            txs=[tx],
+            exps=[exp],
+            score=0.80 if delta == 0 else 0.75,
+            explicacion=(
+                f"Monto exacto; fecha esperada dentro del intervalo operacion-contable "
+                f"({date.fromordinal(desde)} a {date.fromordinal(hasta)}, +/-{ventana} dias). "
+                f"Delta dias al intervalo: {delta}. Requiere revision."
+            ),
+            detalles_audit={"delta_dias": delta, "desfase_contable_dias": hasta - desde},
+        )
+        indice.retirar(exp)
+        sugeridos += 1
+
+    st.audit.write(
+        AuditEvent(
+            "matching",
+            "Regla fecha contable completada",
+            {
+                "regla": "fecha_contable",
+                "indexados": indexados,
+                "consultas": consultas,
+                "omitidas_desfase": omitidas_desfase,
+                "ambiguas": ambiguas,
+                "sugeridos": sugeridos,
+            },
+        )
+    )
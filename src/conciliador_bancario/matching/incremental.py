@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+import re
+from collections.abc import Callable, Iterator
+from decimal import Decimal
+from typing import Any
+
+from conciliador_bancario.audit.audit_log import AuditEvent, JsonlAuditWriter
+from conciliador_bancario.matching.engine import (
+    _hallazgo_id,
+    _match_id,
+    _ref_exp,
+    _ref_tx,
+    _valor_monto_exp,
+    _valor_monto_tx,
+    conciliar,
+)
+from conciliador_bancario.models import (
+    ConfiguracionCliente,
+    Hallazgo,
+    Match,
+    MovimientoEsperado,
+    ResultadoConciliacion,
+    TransaccionBancaria,
+)
+
+# Campos del fingerprint que, si cambian, invalidan cualquier resultado previo.
+_FINGERPRINT_MATCHING = ("config_sha256", "permitir_ocr", "modelo_interno_version", "version")
+
+# IDs derivados del contenido (archivo + fila + datos normalizados). Un `id` externo de esperados
+# no garantiza que el contenido sea el mismo entre corridas.
+_ID_EXP_CONTENIDO = re.compile(r"^EXP-[0-9a-f]{12}$")
+
+# Hallazgos del motor: tipo -> "extra" usado en `_hallazgo_id`, reconstruido desde `detalles`.
+# Debe mantenerse alineado con los emisores de `matching/engine.py`.
+_EXTRA_HALLAZGO: dict[str, Callable[[dict[str, Any]], dict[str, Any]]] = {
+    "tx_con_match": lambda d: {},
+    "pendiente_banco": lambda d: {},
+    "pendiente_esperado": lambda d: {},
+    "ambiguedad_referencia": lambda d: {"cands": d["candidatos"], "ref": d["referencia"]},
+    "ambiguedad_monto_fecha": lambda d: {"cands": d["candidatos"]},
+    "referencia_coincide_monto_difiere": lambda d: {
+        "exp_id": d["exp_id"],
+        "ref": d["referencia"],
+        "m_tx": d["monto_tx"],
+        "m_exp": d["monto_exp"],
+    },
+    # Emitido via `_emitir_hallazgo` (extra == detalles).
+    "ambiguedad_referencia_aproximada": lambda d: d,
+    "ambiguedad_descripcion_similar": lambda d: d,
+    "ambiguedad_monto_tolerancia": lambda d: d,
+    "ambiguedad_fecha_contable": lambda d: d,
+    "ambiguedad_monto_tercero": lambda d: d,
+    "ambiguedad_memoria": lambda d: d,
+    "ambiguedad_tipo_cambio": lambda d: d,
+    "ambiguedad_netting_diario": lambda d: d,
+}
+
+Motor = Callable[..., ResultadoConciliacion]
+
+
+class _UnionFind:
+    def __init__(self) -> None:
+        self._padre: dict[str, str] = {}
+
+    def raiz(self, x: str) -> str:
+        padre = self._padre.setdefault(x, x)
+        while padre != x:
+            abuelo = self._padre[padre]
+            self._padre[x] = abuelo
+            x, padre = padre, abuelo
+        return x
+
+    def unir(self, a: str, b: str) -> None:
+        ra, rb = self.raiz(a), self.raiz(b)
+        if ra != rb:
+            self._padre[max(ra, rb)] = min(ra, rb)
+
+
+def _componentes(
+    transacciones: list[TransaccionBancaria], esperados: list[MovimientoEsperado]
+) -> _UnionFind:
+    """
+    Particion de entidades que pueden influirse entre si en `conciliar()`.
+
+    `ref_exacta` solo compara entidades con la misma referencia y `monto_fecha` solo con el
+    mismo monto exacto: dos entidades sin referencia ni monto compartido (transitivamente) nunca
+    compiten por un candidato, asi que el resultado de una corrida completa es la union de los
+    resultados por componente.
+    """
+    uf = _UnionFind()
+    primero: dict[tuple[str, str | Decimal], str] = {}
+
+    def enlazar(eid: str, claves: list[tuple[str, str | Decimal]]) -> None:
+        uf.raiz(eid)
+        for clave in claves:
+            otro = primero.setdefault(clave, eid)
+            uf.unir(eid, otro)
+
+    for tx in transacciones:
+        r = _ref_tx(tx)
+        enlazar(tx.id, [("monto", _valor_monto_tx(tx))] + ([("ref", r)] if r else []))
+    for exp in esperados:
+        r = _ref_exp(exp)
+        enlazar(exp.id, [("monto", _valor_monto_exp(exp))] + ([("ref", r)] if r else []))
+    return uf
+
+
+def _strings(v: Any) -> Iterator[str]:
+    if isinstance(v, str):
+        yield v
+    elif isinstance(v, dict):
+        for x in v.values():
+            yield from _strings(x)
+    elif isinstance(v, list):
+        for x in v:
+            yield from _strings(x)
+
+
+def _ids_match(m: dict[str, Any]) -> set[str]:
+    return set(m["transacciones_bancarias"]) | set(m["movimientos_esperados"])
+
+
+def _ids_hallazgo(h: dict[str, Any], conocidos: set[str]) -> set[str]:
+    ids = {h["entidad_id"]} if h.get("entidad_id") else set()
+    return ids | {s for s in _strings(h.get("detalles") or {}) if s in conocidos}
+
+
+def _motivo_recalculo_total(
+    cfg: ConfiguracionCliente,
+    transacciones: list[TransaccionBancaria],
+    esperados: list[MovimientoEsperado],
+    previo: dict[str, Any],
+    fingerprint: dict[str, Any],
+) -> str | None:
+    for campo in _FINGERPRINT_MATCHING:
+        if previo["fingerprint"][campo] != fingerprint[campo]:
+            return f"fingerprint.{campo} distinto al run previo"
+    if cfg.regla_pagos_divididos.habilitada:
+        return "regla_pagos_divididos habilitada (sus candidatos cruzan montos)"
+    if cfg.regla_tipo_cambio.habilitada:
+        return "regla_tipo_cambio habilitada (sus candidatos cruzan montos y monedas)"
+    if cfg.regla_netting_diario.habilitada:
+        return "regla_netting_diario habilitada (sus candidatos cruzan montos)"
+    if cfg.regla_tolerancia_monto.habilitada:
+        return "regla_tolerancia_monto habilitada (sus candidatos cruzan montos)"
+    if cfg.regla_memoria.habilitada:
+        return "regla_memoria habilitada (pareos aprendidos cruzan montos y la memoria cambia)"
+    if len({t.id for t in transacciones}) != len(transacciones) or len(
+        {e.id for e in esperados}
+    ) != len(esperados):
+        return "IDs duplicados en la entrada"
+    for h in previo["hallazgos"]:
+        if h["tipo"] not in _EXTRA_HALLAZGO or not h.get("entidad_id"):
+            return f"hallazgo previo no reutilizable: {h['tipo']}"
+    return None
+
+
+def conciliar_incremental(
+    *,
+    cfg: ConfiguracionCliente,
+    transacciones: list[TransaccionBancaria],
+    esperados: list[MovimientoEsperado],
+    audit: JsonlAuditWriter,
+    run_id: str,
+    previo: dict[str, Any],
+    fingerprint: dict[str, Any],
+    motor: Motor = conciliar,
+) -> ResultadoConciliacion:
+    """
+    Re-matching incremental contra un `run.json` previo (`concilia run --since-run`).
+
+    - Las entidades se agrupan en componentes (ver `_componentes`). Un componente se recalcula
+      con `motor` si contiene una entidad nueva, un esperado con `id` externo cuyo archivo cambio,
+      o una entidad que compartia un match/hallazgo previo con una entidad que ya no existe.
+    - El resto hereda matches/hallazgos del run previo, re-identificados con el `run_id` actual.
+
+    Resultado equivalente a una corrida completa (mismo `run.json`). Si el run previo no es
+    comparable (config/version distinta, reglas que cruzan componentes), corre completo.
+    """
+    motivo = _motivo_recalculo_total(cfg, transacciones, esperados, previo, fingerprint)
+    if motivo is not None:
+        audit.write(
+            AuditEvent(
+                "matching",
+                "Matching incremental descartado: corrida completa",
+                {"run_previo": previo["run_id"], "motivo": motivo},
+            )
+        )
+        return motor(
+            cfg=cfg, transacciones=transacciones, esperados=esperados, audit=audit, run_id=run_id
+        )
+
+    transacciones = sorted(transacciones, key=lambda t: t.id)
+    esperados = sorted(esperados, key=lambda e: e.id)
+    previos_tx = {
+        h["entidad_id"]
+        for h in previo["hallazgos"]
+        if h["tipo"] in ("tx_con_match", "pendiente_banco")
+    }
+    previos_exp = {
+        h["entidad_id"] for h in previo["hallazgos"] if h["tipo"] == "pendiente_esperado"
+    }
+    for m in previo["matches"]:
+        previos_exp.update(m["movimientos_esperados"])
+    actuales = {t.id for t in transacciones} | {e.id for e in esperados}
+    conocidos = previos_tx | previos_exp
+    retirados = conocidos - actuales
+
+    sucias = {t.id for t in transacciones if t.id not in previos_tx}
+    cambio_esperados = previo["fingerprint"]["expected_sha256"] != fingerprint["expected_sha256"]
+    for e in esperados:
+        if e.id not in previos_exp or (cambio_esperados and not _ID_EXP_CONTENIDO.match(e.id)):
+            sucias.add(e.id)
+    ids_m = [_ids_match(m) for m in previo["matches"]]
+    ids_h = [_ids_hallazgo(h, conocidos) for h in previo["hallazgos"]]
+    uf = _componentes(transacciones, esperados)
+    for ids in ids_m + ids_h:
+        presentes = sorted(ids & actuales)
+        # Un registro previo queda entero en un componente: se hereda o se recalcula completo.
+        for i in presentes[1:]:
+            uf.unir(presentes[0], i)
+        if ids & retirados:
+            sucias.update(presentes)
+    raices_sucias = {uf.raiz(i) for i in sucias}
+
+    def limpio(ids: set[str]) -> bool:
+        return all(i in actuales and uf.raiz(i) not in raices_sucias for i in ids)
+
+    heredados_m = [
+        Match.model_validate(
+            {
+                **m,
+                "id": _match_id(
+                    run_id, m["transacciones_bancarias"], m["movimientos_esperados"], m["regla"]
+                ),
+            }
+        )
+        for m, ids in zip(previo["matches"], ids_m, strict=True)
+        if limpio(ids)
+    ]
+    heredados_h = [
+        Hallazgo.model_validate(
+            {
+                **h,
+                "id": _hallazgo_id(
+                    run_id,
+                    h["tipo"],
+                    h["entidad"],
+                    h["entidad_id"],
+                    _EXTRA_HALLAZGO[h["tipo"]](h["detalles"]),
+                ),
+            }
+        )
+        for h, ids in zip(previo["hallazgos"], ids_h, strict=True)
+        if limpio(ids)
+    ]
+
+    sub_txs = [t for t in transacciones if uf.raiz(t.id) in raices_sucias]
+    sub_exps = [e for e in esperados if uf.raiz(e.id) in raices_sucias]
+    audit.write(
+        AuditEvent(
+            "matching",
+            "Matching incremental",
+            {
+                "run_previo": previo["run_id"],
+                "componentes_recalculados": len(raices_sucias),
+                "txs_recalculadas": len(sub_txs),
+                "exps_recalculados": len(sub_exps),
+                "matches_heredados": len(heredados_m),
+                "hallazgos_heredados": len(heredados_h),
+            },
+        )
+    )
+    parcial = motor(cfg=cfg, transacciones=sub_txs, esperados=sub_exps, audit=audit, run_id=run_id)
+
+    return ResultadoConciliacion(
+        transacciones_bancarias=transacciones,
+        movimientos_esperados=esperados,
+        matches=sorted(heredados_m + parcial.matches, key=lambda m: m.id),
+        hallazgos=sorted(heredados_h + parcial.hallazgos, key=lambda h: h.id),
+        run_id=run_id,
+    )
@@ -0,0 +1,362 @@
+from __future__ import annotations
+
+import hashlib
+import random
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable
+from datetime import date
+from decimal import Decimal
+
+from conciliador_bancario.models import MovimientoEsperado
+from conciliador_bancario.normalization.terceros import ClavesTercero
+
+
+def _fecha_exp(exp: MovimientoEsperado) -> date:
+    v = exp.fecha.valor
+    if not isinstance(v, date):
+        raise ValueError("fecha.valor debe ser date")
+    return v
+
+
+def _monto_exp(exp: MovimientoEsperado) -> Decimal:
+    v = exp.monto.valor
+    if not isinstance(v, Decimal):
+        raise ValueError("monto.valor debe ser Decimal")
+    return v
+
+
+class IndiceMontoFecha:
+    """
+    Indice de candidatos para la regla `monto_fecha`.
+
+    - Buckets por monto exacto (Decimal).
+    - Cada bucket ordenado por (fecha ordinal, id), de modo que la ventana +/-N dias
+      es una consulta por rango con `bisect` en vez de un recorrido completo.
+    - Los movimientos ya usados se retiran del indice (`retirar`) y no vuelven a aparecer.
+
+    Los candidatos se entregan ordenados por id, igual que el recorrido lineal sobre
+    `esperados` ordenados; asi los hallazgos (y sus IDs) no dependen del indice.
+    """
+
+    def __init__(self, esperados: Iterable[MovimientoEsperado]) -> None:
+        pares: dict[Decimal, list[tuple[int, str, MovimientoEsperado]]] = {}
+        for exp in esperados:
+            pares.setdefault(_monto_exp(exp), []).append((_fecha_exp(exp).toordinal(), exp.id, exp))
+        self._ords: dict[Decimal, list[int]] = {}
+        self._exps: dict[Decimal, list[MovimientoEsperado]] = {}
+        for monto, bucket in pares.items():
+            bucket.sort(key=lambda p: (p[0], p[1]))
+            self._ords[monto] = [p[0] for p in bucket]
+            self._exps[monto] = [p[2] for p in bucket]
+
+    def __len__(self) -> int:
+        return sum(len(b) for b in self._exps.values())
+
+    def candidatos(
+        self, monto: Decimal, fecha: date, ventana_dias: int
+    ) -> list[MovimientoEsperado]:
+        o = fecha.toordinal()
+        return self.en_intervalo(monto, o - ventana_dias, o + ventana_dias)
+
+    def en_intervalo(self, monto: Decimal, desde: int, hasta: int) -> list[MovimientoEsperado]:
+        """Esperados del monto con fecha ordinal en `[desde, hasta]` (dos `bisect`), por id."""
+        ords = self._ords.get(monto)
+        if not ords:
+            return []
+        lo = bisect_left(ords, desde)
+        hi = bisect_right(ords, hasta)
+        if hi - lo <= 1:
+            return self._exps[monto][lo:hi]
+        return sorted(self._exps[monto][lo:hi], key=lambda e: e.id)
+
+    def primeros(
+        self, monto: Decimal, fecha: date, ventana_dias: int, limite: int
+    ) -> list[MovimientoEsperado]:
+        """
+        Como `candidatos`, pero corta al llegar a `limite` y entrega en orden (fecha, id).
+
+        Para clusters degenerados (miles de esperados del mismo monto y fecha) no materializa ni
+        ordena el rango completo: basta saber si hay 0, 1 o mas candidatos.
+        """
+        ords = self._ords.get(monto)
+        if not ords:
+            return []
+        o = fecha.toordinal()
+        lo = bisect_left(ords, o - ventana_dias)
+        hi = bisect_right(ords, o + ventana_dias)
+        return self._exps[monto][lo : min(hi, lo + limite)]
+
+    def retirar(self, exp: MovimientoEsperado) -> None:
+        monto = _monto_exp(exp)
+        ords = self._ords.get(monto)
+        if not ords:
+            return
+        exps = self._exps[monto]
+        o = _fecha_exp(exp).toordinal()
+        i = bisect_left(ords, o)
+        while i < len(ords) and ords[i] == o:
+            if exps[i].id == exp.id:
+                del ords[i]
+                del exps[i]
+                return
+            i += 1
+
+
+class IndiceRangoMonto:
+    """
+    Arreglo de esperados ordenado por (monto, fecha ordinal, id) para consultas por rango de monto.
+
+    `candidatos(lo, hi, ...)` ubica el rango `[lo, hi]` con `bisect` y, dentro de cada monto
+    distinto del rango (tramo ordenado por fecha), la ventana de fecha con otros dos `bisect`:
+    O(montos distintos en el rango * log n + candidatos), sin recorrer los esperados del mismo
+    monto fuera de la ventana. Los candidatos se entregan ordenados por id.
+    """
+
+    def __init__(self, esperados: Iterable[MovimientoEsperado]) -> None:
+        filas = sorted(
+            ((_monto_exp(e), _fecha_exp(e).toordinal(), e.id, e) for e in esperados),
+            key=lambda f: (f[0], f[1], f[2]),
+        )
+        self._montos: list[Decimal] = [f[0] for f in filas]
+        self._ords: list[int] = [f[1] for f in filas]
+        self._exps: list[MovimientoEsperado] = [f[3] for f in filas]
+
+    def __len__(self) -> int:
+        return len(self._exps)
+
+    def candidatos(
+        self, lo: Decimal, hi: Decimal, fecha: date, ventana_dias: int
+    ) -> list[MovimientoEsperado]:
+        montos, ords = self._montos, self._ords
+        i = bisect_left(montos, lo)
+        j = bisect_right(montos, hi)
+        o = fecha.toordinal()
+        out: list[MovimientoEsperado] = []
+        while i < j:
+            # Tramo [i, fin) de un mismo monto, ordenado por fecha ordinal.
+            fin = bisect_right(montos, montos[i], i, j)
+            a = bisect_left(ords, o - ventana_dias, i, fin)
+            b = bisect_right(ords, o + ventana_dias, a, fin)
+            out.extend(self._exps[a:b])
+            i = fin
+        return sorted(out, key=lambda e: e.id)
+
+
+class IndiceTercero:
+    """
+    Indice de esperados por clave de contraparte (`ClavesTercero`, extraidas una vez por entidad).
+
+    - RUT: bucket por RUT normalizado (`CUERPO-DV`).
+    - Nombre del `tercero`: cada esperado se indexa bajo su token de nombre menos frecuente
+      (ancla); una consulta revisa solo los buckets de los tokens de la descripcion bancaria y
+      exige que todos los tokens del nombre esten en ella.
+
+    `candidatos()` entrega `(motivo, esperado)` ordenados por id, con motivo `"rut"` o `"nombre"`
+    (RUT tiene precedencia si ambos coinciden).
+    """
+
+    def __init__(self, entradas: Iterable[tuple[ClavesTercero, MovimientoEsperado]]) -> None:
+        entradas = sorted(entradas, key=lambda p: p[1].id)
+        frecuencia: dict[str, int] = {}
+        for claves, _ in entradas:
+            for t in claves.nombre:
+                frecuencia[t] = frecuencia.get(t, 0) + 1
+        self._por_rut: dict[str, list[MovimientoEsperado]] = {}
+        self._por_ancla: dict[str, list[tuple[frozenset[str], MovimientoEsperado]]] = {}
+        self._n = 0
+        for claves, exp in entradas:
+            if not claves.ruts and not claves.nombre:
+                continue
+            self._n += 1
+            for rut in claves.ruts:
+                self._por_rut.setdefault(rut, []).append(exp)
+            if claves.nombre:
+                ancla = min(claves.nombre, key=lambda t: (frecuencia[t], t))
+                self._por_ancla.setdefault(ancla, []).append((claves.nombre, exp))
+
+    def __len__(self) -> int:
+        return self._n
+
+    def candidatos(self, claves: ClavesTercero) -> list[tuple[str, MovimientoEsperado]]:
+        out: dict[str, tuple[str, MovimientoEsperado]] = {}
+        for t in claves.tokens:
+            for nombre, exp in self._por_ancla.get(t, ()):
+                if nombre <= claves.tokens:
+                    out[exp.id] = ("nombre", exp)
+        for rut in claves.ruts:
+            for exp in self._por_rut.get(rut, ()):
+                out[exp.id] = ("rut", exp)
+        return [out[i] for i in sorted(out)]
+
+
+def distancia_edicion_acotada(a: str, b: str, tope: int) -> int | None:
+    """Levenshtein entre `a` y `b` si es <= `tope`; `None` si lo excede (corte temprano)."""
+    if abs(len(a) - len(b)) > tope:
+        return None
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, start=1):
+        cur = [i] + [0] * len(b)
+        for j, cb in enumerate(b, start=1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb))
+        if min(cur) > tope:
+            return None
+        prev = cur
+    return prev[-1] if prev[-1] <= tope else None
+
+
+def _trigramas(s: str) -> set[str]:
+    t = f"\x02\x02{s}\x03\x03"
+    return {t[i : i + 3] for i in range(len(t) - 2)}
+
+
+class IndiceTrigramas:
+    """
+    Indice invertido de trigramas de caracteres para busqueda aproximada de claves.
+
+    - Se construye una vez por corrida; cada consulta toca solo las listas de postings de
+      `3k + 1` trigramas de la consulta (los menos frecuentes): un texto a distancia de edicion
+      <= k comparte al menos `|trigramas| - 3k` trigramas con la consulta, asi que contiene al
+      menos uno de esos (filtro de prefijo). No recorre todo el indice.
+    - Filtros baratos antes de verificar: largo (`|len(a) - len(b)| <= k`) y conteo de trigramas
+      compartidos (la cota anterior vale en ambos sentidos).
+    - Los candidatos se verifican con Levenshtein acotado y se entregan ordenados por id.
+    """
+
+    def __init__(self, entradas: Iterable[tuple[str, MovimientoEsperado]]) -> None:
+        self._claves: list[str] = []
+        self._grams: list[frozenset[str]] = []
+        self._exps: list[MovimientoEsperado] = []
+        self._postings: dict[str, list[int]] = {}
+        for clave, exp in sorted(entradas, key=lambda p: p[1].id):
+            pos = len(self._claves)
+            grams = frozenset(_trigramas(clave))
+            self._claves.append(clave)
+            self._grams.append(grams)
+            self._exps.append(exp)
+            for g in grams:
+                self._postings.setdefault(g, []).append(pos)
+        self.verificados = 0
+
+    def __len__(self) -> int:
+        return len(self._claves)
+
+    def buscar(self, consulta: str, max_distancia: int) -> list[tuple[int, MovimientoEsperado]]:
+        grams = _trigramas(consulta)
+        n_sonda = 3 * max_distancia + 1
+        if len(grams) < n_sonda:
+            # Consulta demasiado corta: el filtro no puede descartar nada (fail-closed).
+            return []
+        sonda = sorted(grams, key=lambda g: (len(self._postings.get(g, ())), g))[:n_sonda]
+        posiciones: set[int] = set()
+        for g in sonda:
+            posiciones.update(self._postings.get(g, ()))
+        holgura = 3 * max_distancia
+        out: list[tuple[int, MovimientoEsperado]] = []
+        for pos in sorted(posiciones):
+            clave = self._claves[pos]
+            if abs(len(clave) - len(consulta)) > max_distancia:
+                continue
+            otros = self._grams[pos]
+            if len(grams & otros) < max(len(grams), len(otros)) - holgura:
+                continue
+            self.verificados += 1
+            d = distancia_edicion_acotada(consulta, clave, max_distancia)
+            if d is not None:
+                out.append((d, self._exps[pos]))
+        return out
+
+
+_PRIMO_MINHASH = (1 << 61) - 1
+
+
+def _hash_token(token: str) -> int:
+    # Hash estable entre procesos (no depende de PYTHONHASHSEED).
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def jaccard(a: frozenset[str], b: frozenset[str]) -> float:
+    if not a and not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class IndiceMinHashLSH:
+    """
+    Bloqueo LSH sobre firmas MinHash de conjuntos de tokens (similitud de Jaccard).
+
+    - Firma de `bandas * filas` valores: `min((a*h(t) + b) mod p)` por permutacion, con
+      coeficientes derivados de `semilla` (deterministas entre corridas y procesos).
+    - Cada banda de `filas` valores es una clave de bucket; dos conjuntos son candidatos si
+      comparten al menos un bucket. La probabilidad de colision para similitud `s` es
+      `1 - (1 - s^filas)^bandas` (umbral aproximado `(1/bandas)^(1/filas)`).
+    - Solo los candidatos se puntuan con Jaccard exacto; se entregan ordenados por id.
+    """
+
+    def __init__(
+        self,
+        entradas: Iterable[tuple[frozenset[str], MovimientoEsperado]],
+        *,
+        bandas: int,
+        filas: int,
+        semilla: int = 0,
+    ) -> None:
+        rng = random.Random(semilla)
+        self._filas = filas
+        self._perms = [
+            (rng.randrange(1, _PRIMO_MINHASH), rng.randrange(0, _PRIMO_MINHASH))
+            for _ in range(bandas * filas)
+        ]
+        self._cache: dict[str, tuple[int, ...]] = {}
+        self._tokens: list[frozenset[str]] = []
+        self._exps: list[MovimientoEsperado] = []
+        self._buckets: dict[tuple[int, tuple[int, ...]], list[int]] = {}
+        for tokens, exp in sorted(entradas, key=lambda p: p[1].id):
+            if not tokens:
+                continue
+            pos = len(self._tokens)
+            self._tokens.append(tokens)
+            self._exps.append(exp)
+            for clave in self._bandas(tokens):
+                self._buckets.setdefault(clave, []).append(pos)
+        self.comparados = 0
+
+    def __len__(self) -> int:
+        return len(self._tokens)
+
+    def _valores(self, token: str) -> tuple[int, ...]:
+        v = self._cache.get(token)
+        if v is None:
+            h = _hash_token(token)
+            p = _PRIMO_MINHASH
+            v = self._cache[token] = tuple((a * h + b) % p for a, b in self._perms)
+        return v
+
+    def firma(self, tokens: frozenset[str]) -> tuple[int, ...]:
+        # Vector de permutaciones por token (cacheado: el vocabulario se repite mucho) y minimo
+        # componente a componente.
+        vectores = [self._valores(t) for t in sorted(tokens)]
+        if len(vectores) == 1:
+            return vectores[0]
+        return tuple(map(min, *vectores))
+
+    def _bandas(self, tokens: frozenset[str]) -> list[tuple[int, tuple[int, ...]]]:
+        f = self.firma(tokens)
+        r = self._filas
+        return [(i, f[i * r : (i + 1) * r]) for i in range(len(f) // r)]
+
+    def buscar(
+        self, tokens: frozenset[str], umbral: float
+    ) -> list[tuple[float, MovimientoEsperado]]:
+        """Candidatos que comparten bucket y cuya similitud de Jaccard exacta es >= `umbral`."""
+        if not tokens:
+            return []
+        posiciones: set[int] = set()
+        for clave in self._bandas(tokens):
+            posiciones.update(self._buckets.get(clave, ()))
+        out: list[tuple[float, MovimientoEsperado]] = []
+        for pos in sorted(posiciones):
+            self.comparados += 1
+            s = jaccard(tokens, self._tokens[pos])
+            if s >= umbral:
+                out.append((s, self._exps[pos]))
+        return out
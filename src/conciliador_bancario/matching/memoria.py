@@ -0,0 +1,383 @@
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass, field
+from decimal import Decimal
+from json import JSONDecodeError
+from pathlib import Path
+from typing import Any
+
+from conciliador_bancario.audit.audit_log import AuditEvent
+from conciliador_bancario.errors import ErrorConfiguracion, ErrorContrato, ErrorOperacionIO
+from conciliador_bancario.matching.engine import (
+    _dias_diff,
+    _emitir_hallazgo,
+    _emitir_match_sugerido,
+    _EstadoConciliacion,
+    _ref_exp,
+    _ref_tx,
+    _valor_fecha_exp,
+    _valor_fecha_tx,
+    _valor_monto_exp,
+    _valor_monto_tx,
+)
+from conciliador_bancario.models import (
+    EstadoMatch,
+    MovimientoEsperado,
+    SeveridadHallazgo,
+    TransaccionBancaria,
+)
+from conciliador_bancario.normalization.terceros import ruts_en_texto, tokens_nombre
+from conciliador_bancario.utils.hashing import sha256_archivo, sha256_json_estable
+from conciliador_bancario.utils.parsing import monto_canonico
+
+MEMORIA_VERSION = 1
+
+_PREFIJO_REF = re.compile(r"^[A-Z]+")
+
+
+def _contraparte(*textos: str) -> str:
+    ruts: set[str] = set()
+    for t in textos:
+        ruts |= ruts_en_texto(t)
+    if ruts:
+        return "rut:" + ",".join(sorted(ruts))
+    for t in textos:
+        # Solo tokens alfabeticos: numeros de operacion/folio cambian mes a mes.
+        tokens = sorted(x for x in tokens_nombre(t) if x.isalpha())
+        if tokens:
+            return "nombre:" + " ".join(tokens)
+    return ""
+
+
+def _firma(
+    lado: str, contraparte: str, ref: str, monto: Decimal, moneda: str, dia: int | None
+) -> str:
+    m = _PREFIJO_REF.match(ref)
+    prefijo = m.group(0) if m else ""
+    if not contraparte and not prefijo:
+        # Solo monto (+ dia del mes): demasiado generico para recordar un pareo.
+        return ""
+    partes = [lado, contraparte, prefijo, monto_canonico(monto), moneda, dia]
+    return sha256_json_estable(partes)[:16]
+
+
+def firma_transaccion(tx: TransaccionBancaria) -> str:
+    """
+    Firma compacta (contraparte, prefijo de referencia, monto); "" si no aplica.
+
+    Sin dia del mes: la fecha de abono varia (fines de semana, feriados); la ventana la acota.
+    """
+    return _firma(
+        "tx",
+        _contraparte(str(tx.descripcion.valor)),
+        _ref_tx(tx),
+        _valor_monto_tx(tx),
+        tx.moneda,
+        None,
+    )
+
+
+def firma_movimiento(exp: MovimientoEsperado) -> str:
+    """
+    Firma compacta (contraparte, prefijo de referencia, monto, dia del mes); "" si no aplica.
+
+    La contraparte sale del `tercero` antes que de la descripcion. El dia del mes distingue
+    cobros recurrentes del mismo monto a la misma contraparte (ej: dia 1 y dia 15).
+    """
+    terc = str(exp.tercero.valor) if exp.tercero is not None and exp.tercero.valor else ""
+    return _firma(
+        "exp",
+        _contraparte(terc, str(exp.descripcion.valor)),
+        _ref_exp(exp),
+        _valor_monto_exp(exp),
+        exp.moneda,
+        _valor_fecha_exp(exp).day,
+    )
+
+
+@dataclass
+class ParAprendido:
+    ocurrencias: int
+    # Indice en `MemoriaMatches.runs` de la ultima corrida que lo confirmo.
+    ultimo_run: int
+
+
+@dataclass
+class MemoriaMatches:
+    """
+    Memoria local de pareos de corridas previas: firma tx -> firma esperado -> `ParAprendido`.
+
+    Solo guarda firmas (hashes), nunca glosas, RUTs ni montos en claro. `runs` lista los
+    `run_id` aprendidos en orden: aprender dos veces la misma corrida no cuenta doble.
+    """
+
+    runs: list[str] = field(default_factory=list)
+    pares: dict[str, dict[str, ParAprendido]] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return sum(len(v) for v in self.pares.values())
+
+    def buscar(self, firma_tx: str) -> dict[str, ParAprendido]:
+        return self.pares.get(firma_tx, {})
+
+    def a_json(self) -> dict[str, Any]:
+        return {
+            "version": MEMORIA_VERSION,
+            "runs": list(self.runs),
+            "pares": {
+                ft: {fe: [p.ocurrencias, p.ultimo_run] for fe, p in sorted(d.items())}
+                for ft, d in sorted(self.pares.items())
+            },
+        }
+
+    @classmethod
+    def desde_json(cls, data: Any) -> MemoriaMatches:
+        if not isinstance(data, dict) or data.get("version") != MEMORIA_VERSION:
+            raise ValueError(f"version de memoria no soportada (esperado {MEMORIA_VERSION})")
+        runs = data.get("runs")
+        pares = data.get("pares")
+        if not isinstance(runs, list) or not all(isinstance(r, str) for r in runs):
+            raise ValueError("runs debe ser lista de run_id")
+        if not isinstance(pares, dict):
+            raise ValueError("pares debe ser objeto")
+        mem = cls(runs=runs)
+        for ft, d in pares.items():
+            if not isinstance(d, dict):
+                raise ValueError(f"pares[{ft!r}] debe ser objeto")
+            for fe, v in d.items():
+                if (
+                    not isinstance(v, list)
+                    or len(v) != 2
+                    or not all(isinstance(x, int) for x in v)
+                    or v[0] < 1
+                    or not 0 <= v[1] < len(runs)
+                ):
+                    raise ValueError(f"par invalido: {ft}/{fe}")
+                mem.pares.setdefault(ft, {})[fe] = ParAprendido(v[0], v[1])
+        return mem
+
+
+def cargar_memoria(path: Path) -> MemoriaMatches:
+    if not path.exists():
+        raise ErrorConfiguracion(
+            "No existe el archivo de memoria de matches.",
+            details={"archivo": str(path)},
+            hint="Generelo con `concilia memoria aprender` o revise `regla_memoria.archivo`.",
+        )
+    try:
+        raw = json.loads(path.read_text(encoding="utf-8"))
+    except JSONDecodeError as e:
+        raise ErrorContrato(
+            "Memoria de matches no es JSON valido (fail-closed).",
+            details={"archivo": str(path), "linea": e.lineno, "columna": e.colno},
+            hint="Regenerela con `concilia memoria reconstruir`.",
+        ) from e
+    except (OSError, UnicodeDecodeError) as e:
+        raise ErrorOperacionIO(
+            "No se pudo leer la memoria de matches.",
+            details={"archivo": str(path)},
+            hint="Verifique permisos y encoding UTF-8 del archivo.",
+        ) from e
+    try:
+        return MemoriaMatches.desde_json(raw)
+    except ValueError as e:
+        raise ErrorContrato(
+            "Memoria de matches invalida o incompatible (fail-closed).",
+            details={"archivo": str(path), "error": str(e)},
+            hint="Regenerela con `concilia memoria reconstruir`.",
+        ) from e
+
+
+def guardar_memoria(mem: MemoriaMatches, path: Path) -> None:
+    from conciliador_bancario.core.contracts.run_json_codec import canonical_json_dumps
+
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(canonical_json_dumps(mem.a_json()), encoding="utf-8")
+        tmp.replace(path)
+    except OSError as e:
+        raise ErrorOperacionIO(
+            "No se pudo escribir la memoria de matches.",
+            details={"archivo": str(path)},
+            hint="Verifique permisos, ruta y espacio disponible.",
+        ) from e
+
+
+def aprender(
+    mem: MemoriaMatches,
+    *,
+    run: dict[str, Any],
+    transacciones: list[TransaccionBancaria],
+    esperados: list[MovimientoEsperado],
+    incluir_sugeridos: bool = False,
+) -> int:
+    """
+    Agrega a `mem` los pareos 1:1 de un `run.json` (ya validado) con sus filas de entrada.
+
+    - Solo matches `conciliado` (y `sugerido` si `incluir_sugeridos`); nunca los bloqueados.
+    - Idempotente por `run_id`. Retorna la cantidad de pareos aprendidos.
+    - Si el run referencia IDs que no estan en las filas dadas, falla (entradas distintas).
+    """
+    if run["run_id"] in mem.runs:
+        return 0
+    estados = {EstadoMatch.conciliado.value}
+    if incluir_sugeridos:
+        estados.add(EstadoMatch.sugerido.value)
+    txs = {t.id: t for t in transacciones}
+    exps = {e.id: e for e in esperados}
+    elegidos = [
+        m
+        for m in run["matches"]
+        if m["estado"] in estados
+        and not m.get("bloqueado_por_confianza")
+        and len(m["transacciones_bancarias"]) == 1
+        and len(m["movimientos_esperados"]) == 1
+    ]
+    faltantes = sorted(
+        {m["transacciones_bancarias"][0] for m in elegidos} - txs.keys()
+        | {m["movimientos_esperados"][0] for m in elegidos} - exps.keys()
+    )
+    if faltantes:
+        raise ErrorContrato(
+            "run.json referencia filas que no estan en las entradas indicadas (fail-closed).",
+            details={"run_id": run["run_id"], "ids_faltantes": faltantes[:10]},
+            hint="Use los mismos archivos --bank/--expected de esa corrida.",
+        )
+    idx = len(mem.runs)
+    mem.runs.append(run["run_id"])
+    aprendidos = 0
+    for m in elegidos:
+        ft = firma_transaccion(txs[m["transacciones_bancarias"][0]])
+        fe = firma_movimiento(exps[m["movimientos_esperados"][0]])
+        if not ft or not fe:
+            continue
+        par = mem.pares.setdefault(ft, {}).get(fe)
+        if par is None:
+            mem.pares[ft][fe] = ParAprendido(1, idx)
+        else:
+            par.ocurrencias += 1
+            par.ultimo_run = idx
+        aprendidos += 1
+    return aprendidos
+
+
+def compactar(
+    mem: MemoriaMatches, *, min_ocurrencias: int = 1, max_runs: int | None = None
+) -> MemoriaMatches:
+    """
+    Memoria sin pareos poco frecuentes ni obsoletos.
+
+    - Descarta pares con menos de `min_ocurrencias`.
+    - Con `max_runs`, descarta pares no confirmados en las ultimas `max_runs` corridas.
+    - `runs` se conserva (idempotencia de `aprender`).
+    """
+    desde = len(mem.runs) - max_runs if max_runs is not None else 0
+    out = MemoriaMatches(runs=list(mem.runs))
+    for ft, d in mem.pares.items():
+        vivos = {
+            fe: ParAprendido(p.ocurrencias, p.ultimo_run)
+            for fe, p in d.items()
+            if p.ocurrencias >= min_ocurrencias and p.ultimo_run >= desde
+        }
+        if vivos:
+            out.pares[ft] = vivos
+    return out
+
+
+def aplicar_memoria(
+    st: _EstadoConciliacion,
+    transacciones: list[TransaccionBancaria],
+    esperados: list[MovimientoEsperado],
+) -> None:
+    """
+    Regla opcional: pareos recurrentes aprendidos de corridas previas (`regla_memoria.archivo`).
+
+    - Los esperados remanentes se indexan por firma; cada tx remanente es un lookup en la memoria
+      y otro en el indice (O(1)), sin comparar pares.
+    - Solo pares vistos al menos `min_ocurrencias` veces, con fecha dentro de `ventana_dias`.
+    - Un unico candidato => `sugerido`; >1 => hallazgo (fail-closed).
+    """
+    p = st.cfg.regla_memoria
+    ruta = Path(str(p.archivo))
+    mem = cargar_memoria(ruta)
+    indice: dict[str, list[MovimientoEsperado]] = {}
+    for e in esperados:
+        if e.id not in st.used_exp:
+            f = firma_movimiento(e)
+            if f:
+                indice.setdefault(f, []).append(e)
+    consultas = aciertos = sugeridos = ambiguas = 0
+    for tx in transacciones:
+        if tx.id in st.used_tx:
+            continue
+        ft = firma_transaccion(tx)
+        if not ft:
+            continue
+        consultas += 1
+        aprendidos = mem.buscar(ft)
+        if not aprendidos:
+            continue
+        aciertos += 1
+        fecha = _valor_fecha_tx(tx)
+        cands: list[tuple[MovimientoEsperado, int]] = [
+            (e, par.ocurrencias)
+            for fe, par in sorted(aprendidos.items())
+            if par.ocurrencias >= p.min_ocurrencias
+            for e in indice.get(fe, ())
+            if e.id not in st.used_exp and _dias_diff(fecha, _valor_fecha_exp(e)) <= p.ventana_dias
+        ]
+        cands.sort(key=lambda c: c[0].id)
+        st.candidatos_examinados += len(cands)
+        if not cands:
+            continue
+        if len(cands) > 1:
+            ambiguas += 1
+            _emitir_hallazgo(
+                st,
+                tipo="ambiguedad_memoria",
+                severidad=SeveridadHallazgo.advertencia,
+                mensaje=(
+                    "Mas de un movimiento esperado coincide con un pareo recurrente aprendido. "
+                    "Fail-closed: pendiente."
+                ),
+                entidad="banco",
+                entidad_id=tx.id,
+                detalles={"tx_id": tx.id, "candidatos": [e.id for e, _ in cands]},
+                mensaje_audit="Ambiguedad por memoria de matches",
+            )
+            continue
+        exp, ocurrencias = cands[0]
+        delta = _dias_diff(fecha, _valor_fecha_exp(exp))
+        _emitir_match_sugerido(
+            st,
+            regla="memoria",
+            txs=[tx],
+            exps=[exp],
+            score=0.80 if ocurrencias >= 3 else 0.75,
+            explicacion=(
+                f"Pareo recurrente aprendido de corridas previas ({ocurrencias} veces: misma "
+                f"contraparte/prefijo de referencia, monto y dia del mes). Delta dias: {delta}. "
+                "Requiere revision."
+            ),
+            detalles_audit={"ocurrencias": ocurrencias, "delta_dias": delta},
+        )
+        sugeridos += 1
+
+    st.audit.write(
+        AuditEvent(
+            "matching",
+            "Regla memoria completada",
+            {
+                "regla": "memoria",
+                "memoria_sha256": sha256_archivo(ruta),
+                "pares_memoria": len(mem),
+                "consultas": consultas,
+                "aciertos_memoria": aciertos,
+                "ambiguas": ambiguas,
+                "sugeridos": sugeridos,
+            },
+        )
+    )
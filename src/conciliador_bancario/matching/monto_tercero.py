@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from conciliador_bancario.audit.audit_log import AuditEvent
+from conciliador_bancario.matching.engine import (
+    _dias_diff,
+    _emitir_hallazgo,
+    _emitir_match_sugerido,
+    _EstadoConciliacion,
+    _valor_fecha_exp,
+    _valor_fecha_tx,
+    _valor_monto_exp,
+    _valor_monto_tx,
+)
+from conciliador_bancario.matching.indices import IndiceTercero
+from conciliador_bancario.models import (
+    MovimientoEsperado,
+    SeveridadHallazgo,
+    TransaccionBancaria,
+)
+from conciliador_bancario.normalization.terceros import claves_movimiento, claves_transaccion
+
+
+def aplicar_monto_tercero(
+    st: _EstadoConciliacion,
+    transacciones: list[TransaccionBancaria],
+    esperados: list[MovimientoEsperado],
+) -> None:
+    """
+    Regla opcional: misma contraparte (RUT o nombre del `tercero`) + monto exacto + ventana.
+
+    - Claves de contraparte extraidas una vez por entidad remanente (`normalization.terceros`);
+      los candidatos salen solo del `IndiceTercero` (filas que comparten una clave), luego se
+      filtran por monto exacto y `ventana_dias`.
+    - Desempata clusters ambiguos de `monto_fecha`: si de varios candidatos por monto/fecha solo
+      uno comparte contraparte, ese es el sugerido.
+    - Un unico candidato => `sugerido`; >1 => hallazgo (fail-closed).
+    """
+    p = st.cfg.regla_monto_tercero
+    indice = IndiceTercero((claves_movimiento(e), e) for e in esperados if e.id not in st.used_exp)
+    ambiguas_monto_fecha = {
+        h.entidad_id for h in st.hallazgos if h.tipo == "ambiguedad_monto_fecha" and h.entidad_id
+    }
+    consultas = desempates = sugeridos = ambiguas = 0
+    for tx in transacciones:
+        if tx.id in st.used_tx or not len(indice):
+            continue
+        claves = claves_transaccion(tx)
+        if not claves.ruts and not claves.tokens:
+            continue
+        consultas += 1
+        monto = _valor_monto_tx(tx)
+        fecha = _valor_fecha_tx(tx)
+        cands = [
+            (motivo, e)
+            for motivo, e in indice.candidatos(claves)
+            if e.id not in st.used_exp
+            and _valor_monto_exp(e) == monto
+            and _dias_diff(fecha, _valor_fecha_exp(e)) <= p.ventana_dias
+        ]
+        st.candidatos_examinados += len(cands)
+        if not cands:
+            continue
+        if len(cands) > 1:
+            ambiguas += 1
+            _emitir_hallazgo(
+                st,
+                tipo="ambiguedad_monto_tercero",
+                severidad=SeveridadHallazgo.advertencia,
+                mensaje=(
+                    "Mas de un movimiento esperado de la misma contraparte con monto exacto y "
+                    "fecha cercana. Fail-closed: pendiente."
+                ),
+                entidad="banco",
+                entidad_id=tx.id,
+                detalles={"tx_id": tx.id, "candidatos": [e.id for _, e in cands]},
+                mensaje_audit="Ambiguedad por contraparte",
+            )
+            continue
+        motivo, exp = cands[0]
+        delta = _dias_diff(fecha, _valor_fecha_exp(exp))
+        desempate = tx.id in ambiguas_monto_fecha
+        desempates += desempate
+        _emitir_match_sugerido(
+            st,
+            regla="monto_tercero",
+            txs=[tx],
+            exps=[exp],
+            score=0.80 if motivo == "rut" else 0.75,
+            explicacion=(
+                f"Monto exacto y misma contraparte ({'RUT' if motivo == 'rut' else 'nombre'} "
+                f"en la glosa bancaria). Delta dias: {delta}."
+                + (" Desempata ambiguedad por monto/fecha." if desempate else "")
+                + " Requiere revision."
+            ),
+            detalles_audit={"clave_tercero": motivo, "delta_dias": delta, "desempate": desempate},
+        )
+        sugeridos += 1
+
+    st.audit.write(
+        AuditEvent(
+            "matching",
+            "Regla monto_tercero completada",
+            {
+                "regla": "monto_tercero",
+                "indexados": len(indice),
+                "consultas": consultas,
+                "ambiguas": ambiguas,
+                "desempates": desempates,
+                "sugeridos": sugeridos,
+            },
+        )
+    )
@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from datetime import date
+from decimal import Decimal
+
+from conciliador_bancario.audit.audit_log import AuditEvent
+from conciliador_bancario.matching.engine import (
+    SCORE_SUGERIDO_SUMA_EXACTA,
+    _emitir_hallazgo,
+    _emitir_match_sugerido,
+    _EstadoConciliacion,
+    _valor_fecha_exp,
+    _valor_fecha_tx,
+    _valor_monto_exp,
+    _valor_monto_tx,
+)
+from conciliador_bancario.models import (
+    MovimientoEsperado,
+    SeveridadHallazgo,
+    TransaccionBancaria,
+)
+from conciliador_bancario.normalization.terceros import tokens_nombre
+
+
+@dataclass
+class EstadisticasNettingDiario:
+    grupos_esperados: int = 0
+    grupos_banco: int = 0
+    omitidos_por_tamano: int = 0
+    sugeridos: int = 0
+    ambiguas: int = 0
+
+
+@dataclass(frozen=True)
+class _Grupo:
+    """Esperados remanentes de un dia (y moneda y, opcionalmente, contraparte); `suma` con signo."""
+
+    fecha: date
+    moneda: str
+    suma: Decimal
+    miembros: tuple[MovimientoEsperado, ...]
+    tercero: str = ""
+
+
+def _tercero(exp: MovimientoEsperado) -> str:
+    if exp.tercero is None or not exp.tercero.valor:
+        return ""
+    return " ".join(sorted(tokens_nombre(str(exp.tercero.valor))))
+
+
+def _grupos_esperados(
+    esperados: list[MovimientoEsperado], usados: set[str], por_tercero: bool
+) -> list[_Grupo]:
+    por_dia: dict[tuple[date, str], list[MovimientoEsperado]] = {}
+    for e in esperados:
+        if e.id in usados or _valor_monto_exp(e) == 0:
+            continue
+        por_dia.setdefault((_valor_fecha_exp(e), e.moneda), []).append(e)
+    grupos: list[_Grupo] = []
+    for (fecha, moneda), miembros in sorted(por_dia.items()):
+        grupos.append(
+            _Grupo(fecha, moneda, sum(map(_valor_monto_exp, miembros), Decimal(0)), tuple(miembros))
+        )
+        if not por_tercero:
+            continue
+        por_terc: dict[str, list[MovimientoEsperado]] = {}
+        for e in miembros:
+            t = _tercero(e)
+            if t:
+                por_terc.setdefault(t, []).append(e)
+        for t, sub in sorted(por_terc.items()):
+            # Un subgrupo igual al grupo del dia seria el mismo candidato dos veces.
+            if len(sub) < len(miembros):
+                grupos.append(
+                    _Grupo(
+                        fecha, moneda, sum(map(_valor_monto_exp, sub), Decimal(0)), tuple(sub), t
+                    )
+                )
+    return grupos
+
+
+def aplicar_netting_diario(
+    st: _EstadoConciliacion,
+    transacciones: list[TransaccionBancaria],
+    esperados: list[MovimientoEsperado],
+) -> EstadisticasNettingDiario:
+    """
+    Regla opcional: depositos netos diarios (procesadores de tarjetas, lotes de remuneraciones).
+
+    - Agrupa los esperados remanentes por (dia, moneda) y, con `por_tercero`, tambien por
+      contraparte dentro del dia. La suma es con signo: ventas menos comisiones o devoluciones
+      del dia (deposito neto del procesador), o un lote de remuneraciones con un reverso. Cada
+      grupo se indexa por (moneda, suma): la busqueda es un lookup por monto, O(n) en total, sin
+      enumerar combinaciones. Un grupo que netea a cero no es un deposito y se omite.
+    - Pasada N:1: una transaccion cuyo monto es la suma de un grupo, depositada entre 0 y
+      `ventana_dias` dias despues del dia del grupo.
+    - Pasada M:N: lo mismo con la suma (con signo) de las transacciones remanentes de un dia.
+    - Un unico grupo => `sugerido` (regla `netting_diario`) con todos los IDs miembro;
+      >1 => hallazgo (fail-closed).
+    """
+    p = st.cfg.regla_netting_diario
+    stats = EstadisticasNettingDiario()
+
+    indice: dict[tuple[str, Decimal], list[_Grupo]] = {}
+    for g in _grupos_esperados(esperados, st.used_exp, p.por_tercero):
+        if len(g.miembros) < 2 or g.suma == 0:
+            continue
+        if len(g.miembros) > p.max_items:
+            stats.omitidos_por_tamano += 1
+            continue
+        stats.grupos_esperados += 1
+        indice.setdefault((g.moneda, g.suma), []).append(g)
+
+    def resolver(
+        txs: tuple[TransaccionBancaria, ...], fecha: date, moneda: str, suma: Decimal
+    ) -> None:
+        cands = [
+            g
+            for g in indice.get((moneda, suma), ())
+            if 0 <= (fecha - g.fecha).days <= p.ventana_dias
+            and not any(e.id in st.used_exp for e in g.miembros)
+        ]
+        st.candidatos_examinados += len(cands)
+        if not cands:
+            return
+        if len(cands) > 1:
+            stats.ambiguas += 1
+            _emitir_hallazgo(
+                st,
+                tipo="ambiguedad_netting_diario",
+                severidad=SeveridadHallazgo.advertencia,
+                mensaje=(
+                    "Mas de un grupo diario de movimientos esperados suma el monto depositado. "
+                    "Fail-closed: pendiente."
+                ),
+                entidad="banco",
+                entidad_id=txs[0].id,
+                detalles={
+                    "tx_ids": [t.id for t in txs],
+                    "grupos": [
+                        {"fecha": g.fecha.isoformat(), "exp_ids": [e.id for e in g.miembros]}
+                        for g in cands
+                    ],
+                },
+                mensaje_audit="Ambiguedad en netting diario",
+            )
+            return
+        g = cands[0]
+        lado_banco = "la transaccion" if len(txs) == 1 else f"{len(txs)} transacciones del {fecha}"
+        _emitir_match_sugerido(
+            st,
+            regla="netting_diario",
+            txs=list(txs),
+            exps=list(g.miembros),
+            score=SCORE_SUGERIDO_SUMA_EXACTA,
+            explicacion=(
+                f"Deposito neto diario: la suma de {len(g.miembros)} movimientos esperados del "
+                f"{g.fecha}{' (' + g.tercero + ')' if g.tercero else ''} es igual al monto de "
+                f"{lado_banco} ({suma}), {(fecha - g.fecha).days} dias despues. Unico grupo "
+                "encontrado; requiere revision."
+            ),
+            detalles_audit={
+                "n_tx": len(txs),
+                "n_exp": len(g.miembros),
+                "por_tercero": bool(g.tercero),
+            },
+        )
+        stats.sugeridos += 1
+
+    # 1) N esperados -> 1 transaccion
+    for tx in transacciones:
+        if tx.id not in st.used_tx and indice:
+            resolver((tx,), _valor_fecha_tx(tx), tx.moneda, _valor_monto_tx(tx))
+
+    # 2) N esperados -> M transacciones del mismo dia
+    por_dia: dict[tuple[date, str], list[TransaccionBancaria]] = {}
+    for tx in transacciones:
+        if tx.id not in st.used_tx and _valor_monto_tx(tx) != 0:
+            por_dia.setdefault((_valor_fecha_tx(tx), tx.moneda), []).append(tx)
+    for (fecha, moneda), txs in sorted(por_dia.items()):
+        if 2 <= len(txs) <= p.max_items:
+            stats.grupos_banco += 1
+            resolver(tuple(txs), fecha, moneda, sum(map(_valor_monto_tx, txs), Decimal(0)))
+
+    st.audit.write(
+        AuditEvent(
+            "matching",
+            "Regla netting diario completada",
+            {"regla": "netting_diario", **asdict(stats)},
+        )
+    )
+    return stats
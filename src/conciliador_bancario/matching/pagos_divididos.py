@@ -0,0 +1,303 @@
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from collections.abc import Callable, Iterator, Sequence
+from dataclasses import asdict, dataclass
+from datetime import date
+from decimal import Decimal
+from typing import Any, Literal
+
+from conciliador_bancario.audit.audit_log import AuditEvent
+from conciliador_bancario.matching.engine import (
+    SCORE_SUGERIDO_SUMA_EXACTA,
+    _emitir_hallazgo,
+    _emitir_match_sugerido,
+    _EstadoConciliacion,
+    _valor_fecha_exp,
+    _valor_fecha_tx,
+    _valor_monto_exp,
+    _valor_monto_tx,
+)
+from conciliador_bancario.models import (
+    MovimientoEsperado,
+    SeveridadHallazgo,
+    TransaccionBancaria,
+)
+
+
+@dataclass
+class EstadisticasPagosDivididos:
+    busquedas: int = 0
+    sugeridos: int = 0
+    ambiguas: int = 0
+    sin_solucion: int = 0
+    podadas_por_candidatos: int = 0
+    podadas_por_presupuesto: int = 0
+    omitidas_por_presupuesto_total: int = 0
+    estados: int = 0
+
+
+@dataclass(frozen=True)
+class ResultadoBusqueda:
+    soluciones: list[tuple[int, ...]]  # a lo sumo 2 (2 = ambiguo)
+    estados: int
+    agotado: bool
+
+
+def _subconjuntos(
+    valores: Sequence[int], offset: int, tope: int, max_items: int
+) -> Iterator[tuple[int, tuple[int, ...]]]:
+    """
+    Enumera (suma, indices) de subconjuntos con suma <= tope y a lo sumo `max_items` elementos.
+
+    `valores` debe venir ordenado ascendente (todos > 0): al exceder el tope, el resto de la rama
+    tambien excede y se poda.
+    """
+    pila: list[tuple[int, int, tuple[int, ...]]] = [(0, 0, ())]
+    while pila:
+        inicio, suma, idxs = pila.pop()
+        yield suma, idxs
+        if len(idxs) >= max_items:
+            continue
+        for k in range(inicio, len(valores)):
+            s = suma + valores[k]
+            if s > tope:
+                break
+            pila.append((k + 1, s, idxs + (offset + k,)))
+
+
+def buscar_suma_exacta(
+    montos: Sequence[int], objetivo: int, *, max_items: int, max_estados: int
+) -> ResultadoBusqueda:
+    """
+    Meet-in-the-middle acotado: subconjuntos de `montos` (>0) cuya suma es `objetivo`.
+
+    - Solo cuenta soluciones con 2..max_items elementos.
+    - Se detiene al encontrar 2 soluciones (ambiguedad) o al agotar `max_estados` (fail-closed).
+    - Determinista: el orden de exploracion depende solo de los datos.
+    """
+    orden = sorted(range(len(montos)), key=lambda i: (montos[i], i))
+    vals = [montos[i] for i in orden]
+    mitad = len(vals) // 2
+    estados = 0
+    tabla: dict[int, list[tuple[int, ...]]] = {}
+    for suma, idxs in _subconjuntos(vals[:mitad], 0, objetivo, max_items):
+        estados += 1
+        if estados > max_estados:
+            return ResultadoBusqueda([], estados, True)
+        tabla.setdefault(suma, []).append(idxs)
+
+    soluciones: list[tuple[int, ...]] = []
+    for suma, idxs in _subconjuntos(vals[mitad:], mitad, objetivo, max_items):
+        estados += 1
+        if estados > max_estados:
+            return ResultadoBusqueda([], estados, True)
+        for otros in tabla.get(objetivo - suma, ()):
+            n = len(otros) + len(idxs)
+            if 2 <= n <= max_items:
+                soluciones.append(tuple(sorted(orden[i] for i in otros + idxs)))
+                if len(soluciones) > 1:
+                    return ResultadoBusqueda(soluciones, estados, False)
+    return ResultadoBusqueda(soluciones, estados, False)
+
+
+class _IndicePorFecha:
+    """Entidades ordenadas por fecha para consultar la ventana con `bisect`."""
+
+    def __init__(self, items: list[tuple[int, str, Any]]) -> None:
+        items.sort(key=lambda p: (p[0], p[1]))
+        self.ords = [p[0] for p in items]
+        self.items = [p[2] for p in items]
+
+    def rango(self, fecha: date, ventana: int) -> list[Any]:
+        o = fecha.toordinal()
+        return self.items[
+            bisect_left(self.ords, o - ventana) : bisect_right(self.ords, o + ventana)
+        ]
+
+
+def _candidatos(
+    objetivo: Decimal,
+    moneda: str,
+    en_ventana: list[Any],
+    monto: Callable[[Any], Decimal],
+    usados: set[str],
+) -> list[Any]:
+    out = []
+    for c in en_ventana:
+        if c.id in usados or c.moneda != moneda:
+            continue
+        m = monto(c)
+        # Mismo signo y estrictamente menor en valor absoluto (las partes suman el total).
+        if m == 0 or (m > 0) != (objetivo > 0) or abs(m) >= abs(objetivo):
+            continue
+        out.append(c)
+    return sorted(out, key=lambda c: c.id)
+
+
+def aplicar_pagos_divididos(
+    st: _EstadoConciliacion,
+    transacciones: list[TransaccionBancaria],
+    esperados: list[MovimientoEsperado],
+) -> EstadisticasPagosDivididos:
+    """
+    Regla opcional N:1 / 1:N por suma exacta, sobre lo que quedo sin match.
+
+    1) `pago_agrupado`: N esperados cuya suma = 1 transaccion bancaria.
+    2) `pago_parcial`: N transacciones cuya suma = 1 esperado.
+
+    Solo sugiere (nunca concilia). Si hay mas de un grupo posible, o la busqueda excede los topes
+    de candidatos/estados, no sugiere nada (fail-closed). Las estadisticas quedan en audit.jsonl.
+    """
+    p = st.cfg.regla_pagos_divididos
+    stats = EstadisticasPagosDivididos()
+
+    def presupuesto_restante() -> int:
+        return min(p.max_estados_por_busqueda, p.max_estados_total - stats.estados)
+
+    def buscar(
+        objetivo: Decimal, cands: list[Any], monto: Callable[[Any], Decimal]
+    ) -> ResultadoBusqueda | None:
+        if len(cands) < 2:
+            return None
+        if len(cands) > p.max_candidatos:
+            stats.podadas_por_candidatos += 1
+            return None
+        if presupuesto_restante() <= 0:
+            stats.omitidas_por_presupuesto_total += 1
+            return None
+        stats.busquedas += 1
+        montos = [abs(monto(c)) for c in cands]
+        # Exponente comun de la busqueda: USD/EUR con centavos se comparan en unidades minimas
+        # (10.50 -> 1050), exacto en Decimal. CLP entero queda con escala 0.
+        escala = _escala_comun([abs(objetivo), *montos])
+        res = buscar_suma_exacta(
+            [int(m.scaleb(escala)) for m in montos],
+            int(abs(objetivo).scaleb(escala)),
+            max_items=p.max_items,
+            max_estados=presupuesto_restante(),
+        )
+        stats.estados += res.estados
+        if res.agotado:
+            stats.podadas_por_presupuesto += 1
+            return None
+        if not res.soluciones:
+            stats.sin_solucion += 1
+            return None
+        return res
+
+    # 1) N esperados -> 1 transaccion (pago agrupado)
+    idx_exp = _IndicePorFecha(
+        [(_valor_fecha_exp(e).toordinal(), e.id, e) for e in esperados if e.id not in st.used_exp]
+    )
+    for tx in transacciones:
+        if tx.id in st.used_tx:
+            continue
+        objetivo = _valor_monto_tx(tx)
+        cands = _candidatos(
+            objetivo,
+            tx.moneda,
+            idx_exp.rango(_valor_fecha_tx(tx), p.ventana_dias),
+            _valor_monto_exp,
+            st.used_exp,
+        )
+        st.candidatos_examinados += len(cands)
+        res = buscar(objetivo, cands, _valor_monto_exp)
+        if res is None:
+            continue
+        if len(res.soluciones) > 1:
+            stats.ambiguas += 1
+            _emitir_ambiguedad(
+                st, "banco", tx.id, [[cands[i].id for i in s] for s in res.soluciones]
+            )
+            continue
+        grupo = [cands[i] for i in res.soluciones[0]]
+        _emitir_match_sugerido(
+            st,
+            regla="pago_agrupado",
+            txs=[tx],
+            exps=grupo,
+            score=SCORE_SUGERIDO_SUMA_EXACTA,
+            explicacion=(
+                f"Pago agrupado: la suma de {len(grupo)} movimientos esperados "
+                f"({', '.join(e.id for e in grupo)}) es igual al monto de la transaccion "
+                f"({objetivo}), ventana +/-{p.ventana_dias} dias. Unica combinacion encontrada; "
+                "requiere revision."
+            ),
+            detalles_audit={"n_items": len(grupo)},
+        )
+        stats.sugeridos += 1
+
+    # 2) N transacciones -> 1 esperado (pago parcial)
+    idx_tx = _IndicePorFecha(
+        [(_valor_fecha_tx(t).toordinal(), t.id, t) for t in transacciones if t.id not in st.used_tx]
+    )
+    for exp in esperados:
+        if exp.id in st.used_exp:
+            continue
+        objetivo = _valor_monto_exp(exp)
+        cands = _candidatos(
+            objetivo,
+            exp.moneda,
+            idx_tx.rango(_valor_fecha_exp(exp), p.ventana_dias),
+            _valor_monto_tx,
+            st.used_tx,
+        )
+        st.candidatos_examinados += len(cands)
+        res = buscar(objetivo, cands, _valor_monto_tx)
+        if res is None:
+            continue
+        if len(res.soluciones) > 1:
+            stats.ambiguas += 1
+            _emitir_ambiguedad(
+                st, "esperado", exp.id, [[cands[i].id for i in s] for s in res.soluciones]
+            )
+            continue
+        grupo_tx = [cands[i] for i in res.soluciones[0]]
+        _emitir_match_sugerido(
+            st,
+            regla="pago_parcial",
+            txs=grupo_tx,
+            exps=[exp],
+            score=SCORE_SUGERIDO_SUMA_EXACTA,
+            explicacion=(
+                f"Pago parcial: la suma de {len(grupo_tx)} transacciones bancarias "
+                f"({', '.join(t.id for t in grupo_tx)}) es igual al monto esperado "
+                f"({objetivo}), ventana +/-{p.ventana_dias} dias. Unica combinacion encontrada; "
+                "requiere revision."
+            ),
+            detalles_audit={"n_items": len(grupo_tx)},
+        )
+        stats.sugeridos += 1
+
+    st.audit.write(
+        AuditEvent(
+            "matching",
+            "Regla pagos divididos completada",
+            {"regla": "pagos_divididos", **asdict(stats)},
+        )
+    )
+    return stats
+
+
+def _escala_comun(montos: list[Decimal]) -> int:
+    """Potencia de 10 que vuelve enteros a todos los `montos` (0 si ya lo son)."""
+    return max(0, *(-int(m.normalize().as_tuple().exponent) for m in montos))
+
+
+def _emitir_ambiguedad(
+    st: _EstadoConciliacion,
+    entidad: Literal["banco", "esperado"],
+    entidad_id: str,
+    grupos: list[list[str]],
+) -> None:
+    _emitir_hallazgo(
+        st,
+        tipo="ambiguedad_pago_dividido",
+        severidad=SeveridadHallazgo.advertencia,
+        mensaje="Mas de una combinacion de movimientos suma el monto. Fail-closed: pendiente.",
+        entidad=entidad,
+        entidad_id=entidad_id,
+        detalles={"grupos": grupos},
+        mensaje_audit="Ambiguedad en pago dividido",
+    )
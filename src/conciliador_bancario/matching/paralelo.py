@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import heapq
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+
+from conciliador_bancario.audit.audit_log import JsonlAuditWriter
+from conciliador_bancario.matching.confianza import TablaConfianza
+from conciliador_bancario.matching.engine import (
+    _aplicar_ref_exacta,
+    _cerrar_conciliacion,
+    _ejecutar_pipeline,
+    _emitir_ambiguedad_monto_fecha,
+    _emitir_match_monto_fecha,
+    _EstadoConciliacion,
+    _medir_regla,
+    _recortar_candidatos,
+    _valor_fecha_exp,
+    _valor_fecha_tx,
+    _valor_monto_exp,
+    _valor_monto_tx,
+    conciliar,
+    construir_pipeline,
+    orden_reglas,
+)
+from conciliador_bancario.models import (
+    ConfiguracionCliente,
+    MovimientoEsperado,
+    ResultadoConciliacion,
+    TransaccionBancaria,
+)
+
+# Un grupo = todas las tx/esperados de un mismo monto exacto (los candidatos de `monto_fecha`
+# nunca cruzan montos). tx: (posicion, ordinal) en orden de id; exp: (ordinal, posicion) ordenado.
+Grupo = tuple[list[tuple[int, int]], list[tuple[int, int]]]
+# Decision por tx: (posicion tx, posiciones de candidatos en orden (fecha, id), a lo sumo K + 1).
+# 1 candidato = match.
+Decision = tuple[int, list[int]]
+
+# Shards por worker: mas shards que workers para balancear grupos de tamano desigual.
+_SHARDS_POR_WORKER = 4
+
+
+def _resolver_shard(args: tuple[list[Grupo], int, int]) -> list[Decision]:
+    """
+    Resuelve `monto_fecha` para un shard (ejecuta en un proceso del pool).
+
+    Misma semantica greedy que `_aplicar_monto_fecha`: tx en orden de id, un esperado
+    usado sale del rango apenas se concilia y la ventana se corta en `limite` candidatos.
+    """
+    grupos, ventana, limite = args
+    out: list[Decision] = []
+    for txs, exps in grupos:
+        ords = [o for o, _ in exps]
+        poss = [p for _, p in exps]
+        for tx_pos, o in txs:
+            lo = bisect_left(ords, o - ventana)
+            hi = bisect_right(ords, o + ventana)
+            if lo == hi:
+                continue
+            out.append((tx_pos, poss[lo : min(hi, lo + limite)]))
+            if hi - lo == 1:
+                del ords[lo]
+                del poss[lo]
+    return out
+
+
+def _armar_shards(grupos: list[Grupo], n_shards: int, orden_shards: int = 0) -> list[list[Grupo]]:
+    """
+    Reparte grupos en shards balanceados por tamano (determinista).
+
+    `orden_shards` rota el orden de los shards; no altera resultados (solo se usa para verificar
+    que el merge es independiente del orden de ejecucion).
+    """
+    n_shards = max(1, min(n_shards, len(grupos)))
+    shards: list[list[Grupo]] = [[] for _ in range(n_shards)]
+    carga = [(0, i) for i in range(n_shards)]
+    orden = sorted(range(len(grupos)), key=lambda g: -(len(grupos[g][0]) + len(grupos[g][1])))
+    for g in orden:
+        peso, i = heapq.heappop(carga)
+        shards[i].append(grupos[g])
+        heapq.heappush(carga, (peso + len(grupos[g][0]) + len(grupos[g][1]), i))
+    k = orden_shards % n_shards
+    return shards[k:] + shards[:k]
+
+
+def conciliar_paralelo(
+    *,
+    cfg: ConfiguracionCliente,
+    transacciones: list[TransaccionBancaria],
+    esperados: list[MovimientoEsperado],
+    audit: JsonlAuditWriter,
+    run_id: str,
+    workers: int,
+    orden_shards: int = 0,
+    perfil: bool = False,
+) -> ResultadoConciliacion:
+    """
+    Matching con `monto_fecha` particionado por monto exacto y resuelto en un `ProcessPoolExecutor`.
+
+    - `ref_exacta` corre en serie (un lookup por referencia; sus candidatos si cruzan montos).
+    - `monto_fecha`: cada shard devuelve decisiones compactas (posiciones); el proceso principal
+      las aplica en orden de id de tx con los mismos emisores que `conciliar()`. Asi `run.json`
+      y `audit.jsonl` son identicos byte a byte a una corrida serial, con cualquier `workers`.
+
+    Nota: la regla `monto_fecha` compara montos sin mirar `moneda`, por eso la particion es solo
+    por monto (particionar tambien por moneda cambiaria resultados respecto del modo serial).
+    Con un `orden_reglas` que no empiece por `ref_exacta`, `monto_fecha` se delega en `conciliar()`.
+    """
+    ids_unicos = len({t.id for t in transacciones}) == len(transacciones) and len(
+        {e.id for e in esperados}
+    ) == len(esperados)
+    if workers <= 1 or not ids_unicos or orden_reglas(cfg)[:2] != ("ref_exacta", "monto_fecha"):
+        return conciliar(
+            cfg=cfg,
+            transacciones=transacciones,
+            esperados=esperados,
+            audit=audit,
+            run_id=run_id,
+            perfil=perfil,
+        )
+
+    transacciones = sorted(transacciones, key=lambda t: t.id)
+    esperados = sorted(esperados, key=lambda e: e.id)
+    st = _EstadoConciliacion(
+        cfg=cfg,
+        audit=audit,
+        run_id=run_id,
+        confianza=TablaConfianza(cfg, transacciones, esperados),
+        perfil=perfil,
+    )
+
+    # 1) ref + monto exacto (serial)
+    _aplicar_ref_exacta(st, transacciones, esperados)
+
+    # 2) monto exacto + ventana fecha (shards por monto)
+    with _medir_regla(st, "monto_fecha", "preparar"):
+        por_monto: dict[Decimal, Grupo] = {}
+        for pos, exp in enumerate(esperados):
+            if exp.id in st.used_exp:
+                continue
+            grupo = por_monto.setdefault(_valor_monto_exp(exp), ([], []))
+            grupo[1].append((_valor_fecha_exp(exp).toordinal(), pos))
+        for pos, tx in enumerate(transacciones):
+            if tx.id in st.used_tx:
+                continue
+            grupo_tx = por_monto.get(_valor_monto_tx(tx))
+            if grupo_tx is not None:
+                grupo_tx[0].append((pos, _valor_fecha_tx(tx).toordinal()))
+        grupos = [g for _, g in sorted(por_monto.items()) if g[0]]
+        for _, exps in grupos:
+            exps.sort()
+
+    with _medir_regla(st, "monto_fecha"):
+        k = st.cfg.max_candidatos_ambiguedad
+        decisiones: dict[int, list[int]] = {}
+        if grupos:
+            shards = _armar_shards(grupos, workers * _SHARDS_POR_WORKER, orden_shards)
+            args = (st.cfg.ventana_dias_monto_fecha, k + 1)
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for parcial in pool.map(_resolver_shard, [(s, *args) for s in shards]):
+                    decisiones.update(parcial)
+
+        for pos, tx in enumerate(transacciones):
+            vistos = decisiones.get(pos)
+            if not vistos:
+                continue
+            st.candidatos_examinados += len(vistos)
+            # Posiciones en la lista ordenada por id: ordenar por posicion = ordenar por id.
+            cands, truncado = _recortar_candidatos(vistos, k, lambda j: j)
+            if truncado or len(cands) > 1:
+                _emitir_ambiguedad_monto_fecha(st, tx, [esperados[j] for j in cands], truncado)
+                continue
+            exp = esperados[cands[0]]
+            _emitir_match_monto_fecha(st, tx, exp, st.confianza.bloqueo([tx], [exp]))
+
+    # Reglas opcionales (deshabilitadas por defecto; solo sugieren)
+    _ejecutar_pipeline(st, construir_pipeline(cfg)[2:], transacciones, esperados)
+    # 3) Pendientes -> hallazgos informativos
+    return _cerrar_conciliacion(st, transacciones, esperados)
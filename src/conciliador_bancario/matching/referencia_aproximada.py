@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import re
+
+from conciliador_bancario.audit.audit_log import AuditEvent
+from conciliador_bancario.matching.engine import (
+    _emitir_hallazgo,
+    _emitir_match_sugerido,
+    _EstadoConciliacion,
+    _ref_exp,
+    _ref_tx,
+    _valor_monto_exp,
+    _valor_monto_tx,
+)
+from conciliador_bancario.matching.indices import IndiceTrigramas
+from conciliador_bancario.models import (
+    MovimientoEsperado,
+    SeveridadHallazgo,
+    TransaccionBancaria,
+)
+
+_NO_ALFANUM = re.compile(r"[^A-Z0-9]")
+_CEROS_IZQ = re.compile(r"(?<![0-9])0+(?=[0-9])")
+
+
+def clave_referencia(ref: str) -> str:
+    """
+    Clave para comparar referencias casi iguales (sobre `normalizar_referencia`).
+
+    Quita separadores y ceros a la izquierda de cada numero: "FAC-1001", "FAC1001" y
+    "FAC 0001001" comparten clave.
+    """
+    return _CEROS_IZQ.sub("", _NO_ALFANUM.sub("", ref))
+
+
+def aplicar_referencia_aproximada(
+    st: _EstadoConciliacion,
+    transacciones: list[TransaccionBancaria],
+    esperados: list[MovimientoEsperado],
+) -> None:
+    """
+    Regla opcional: referencia aproximada (distancia de edicion acotada) + monto exacto.
+
+    - Indice de trigramas sobre las referencias de esperados remanentes (una vez por corrida).
+    - Solo aplica cuando la referencia normalizada NO es identica (eso ya lo resolvio
+      `ref_exacta`, incluyendo ambiguedades y montos distintos).
+    - Un unico candidato => `sugerido` con score segun la distancia; >1 => hallazgo (fail-closed).
+    """
+    p = st.cfg.regla_referencia_aproximada
+    indice = IndiceTrigramas(
+        (clave_referencia(r), e)
+        for e in esperados
+        if e.id not in st.used_exp and (r := _ref_exp(e))
+    )
+    consultas = sugeridos = ambiguas = 0
+    for tx in transacciones:
+        if tx.id in st.used_tx:
+            continue
+        r = _ref_tx(tx)
+        q = clave_referencia(r)
+        if len(q) < p.min_largo:
+            continue
+        consultas += 1
+        monto = _valor_monto_tx(tx)
+        cands = [
+            (d, e)
+            for d, e in indice.buscar(q, p.max_distancia)
+            if e.id not in st.used_exp and _valor_monto_exp(e) == monto and _ref_exp(e) != r
+        ]
+        st.candidatos_examinados += len(cands)
+        if not cands:
+            continue
+        if len(cands) > 1:
+            ambiguas += 1
+            _emitir_hallazgo(
+                st,
+                tipo="ambiguedad_referencia_aproximada",
+                severidad=SeveridadHallazgo.advertencia,
+                mensaje=(
+                    "Mas de un movimiento esperado con referencia parecida y mismo monto. "
+                    "Fail-closed: pendiente."
+                ),
+                entidad="banco",
+                entidad_id=tx.id,
+                detalles={"tx_id": tx.id, "referencia": r, "candidatos": [e.id for _, e in cands]},
+                mensaje_audit="Ambiguedad por referencia aproximada",
+            )
+            continue
+        d, exp = cands[0]
+        r_exp = _ref_exp(exp)
+        similitud = 1 - d / max(len(q), len(clave_referencia(r_exp)))
+        _emitir_match_sugerido(
+            st,
+            regla="ref_aproximada",
+            txs=[tx],
+            exps=[exp],
+            score=round(0.60 + 0.20 * similitud, 4),
+            explicacion=(
+                f"Referencia aproximada ({r} ~ {r_exp}, distancia de edicion {d}) y monto exacto. "
+                "Requiere revision."
+            ),
+            detalles_audit={"distancia_edicion": d},
+        )
+        sugeridos += 1
+
+    st.audit.write(
+        AuditEvent(
+            "matching",
+            "Regla referencia aproximada completada",
+            {
+                "regla": "ref_aproximada",
+                "indexados": len(indice),
+                "consultas": consultas,
+                "candidatos_verificados": indice.verificados,
+                "ambiguas": ambiguas,
+                "sugeridos": sugeridos,
+            },
+        )
+    )
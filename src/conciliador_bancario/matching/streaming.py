@@ -0,0 +1,329 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import asdict, dataclass, field
+from datetime import date
+from decimal import Decimal
+from typing import Any
+
+from conciliador_bancario.audit.audit_log import AuditEvent, JsonlAuditWriter
+from conciliador_bancario.errors import ErrorConfiguracion, ErrorEntradaUsuario
+from conciliador_bancario.matching.confianza import TablaConfianza
+from conciliador_bancario.matching.engine import (
+    _aplicar_monto_fecha,
+    _cerrar_exp,
+    _cerrar_tx,
+    _emitir_ambiguedad_referencia,
+    _emitir_match_ref_exacta,
+    _emitir_referencia_monto_difiere,
+    _EstadoConciliacion,
+    _evento_matching_completado,
+    _evento_matching_stats,
+    _medir_regla,
+    _ref_exp,
+    _ref_tx,
+    _valor_fecha_exp,
+    _valor_fecha_tx,
+    _valor_monto_exp,
+    _valor_monto_tx,
+    orden_reglas,
+)
+from conciliador_bancario.models import (
+    ORDEN_REGLAS_POR_DEFECTO,
+    ConfiguracionCliente,
+    Hallazgo,
+    Match,
+    MovimientoEsperado,
+    TransaccionBancaria,
+)
+
+FuenteTransacciones = Callable[[], Iterable[TransaccionBancaria]]
+FuenteEsperados = Callable[[], Iterable[MovimientoEsperado]]
+
+_REGLAS_OPCIONALES = (
+    "regla_fecha_contable",
+    "regla_monto_tercero",
+    "regla_asignacion_monto_fecha",
+    "regla_memoria",
+    "regla_referencia_aproximada",
+    "regla_descripcion_similar",
+    "regla_tolerancia_monto",
+    "regla_tipo_cambio",
+    "regla_netting_diario",
+    "regla_pagos_divididos",
+)
+
+
+@dataclass
+class EstadisticasStreaming:
+    referencias_indexadas: int = 0
+    clusters_resueltos: int = 0
+    max_entidades_en_memoria: int = 0
+
+
+@dataclass(eq=False)
+class _Cluster:
+    """Entidades de un mismo monto enlazadas por la ventana (componente tx<->esperado)."""
+
+    txs: list[TransaccionBancaria] = field(default_factory=list)
+    exps: list[MovimientoEsperado] = field(default_factory=list)
+    ult_tx: int | None = None
+    ult_exp: int | None = None
+    vivo: bool = True
+
+    def horizonte(self, ventana: int) -> int:
+        return max(o for o in (self.ult_tx, self.ult_exp) if o is not None) + ventana
+
+
+@dataclass
+class _DecisionesReferencia:
+    # tx_id -> exp_id y exp_id -> tx_id para los matches `ref_exacta`.
+    tx: dict[str, str] = field(default_factory=dict)
+    exp: dict[str, str] = field(default_factory=dict)
+
+
+def _validar_config(cfg: ConfiguracionCliente) -> None:
+    activas = [n for n in _REGLAS_OPCIONALES if getattr(cfg, n).habilitada]
+    if activas:
+        raise ErrorConfiguracion(
+            "El modo streaming solo soporta las reglas ref_exacta y monto_fecha.",
+            details={"reglas_habilitadas": activas},
+            hint="Deshabilite las reglas opcionales o use el motor en memoria.",
+        )
+    if orden_reglas(cfg) != ORDEN_REGLAS_POR_DEFECTO:
+        raise ErrorConfiguracion(
+            "El modo streaming no soporta un orden_reglas personalizado.",
+            details={"orden_reglas": cfg.orden_reglas},
+            hint="Quite orden_reglas de la configuracion o use el motor en memoria.",
+        )
+
+
+def _decidir_referencias(
+    st: _EstadoConciliacion,
+    transacciones: Iterable[TransaccionBancaria],
+    esperados: Iterable[MovimientoEsperado],
+    stats: EstadisticasStreaming,
+) -> _DecisionesReferencia:
+    """
+    Pasada 1 (`ref_exacta`): solo retiene (id, monto) de las entidades con referencia.
+
+    Las decisiones de `ref_exacta` son independientes por referencia (un esperado solo puede
+    ser consumido por tx de su misma referencia), asi que cada grupo se resuelve en orden de id
+    igual que `_aplicar_ref_exacta`. Los hallazgos se emiten aqui; los matches quedan
+    pendientes hasta que la pasada 2 entregue ambas entidades (bloqueo por confianza).
+    """
+    grupos: dict[str, tuple[list[tuple[str, Decimal]], list[tuple[str, Decimal]]]] = {}
+    for exp in esperados:
+        if r := _ref_exp(exp):
+            grupos.setdefault(r, ([], []))[1].append((exp.id, _valor_monto_exp(exp)))
+    for tx in transacciones:
+        if r := _ref_tx(tx):
+            g = grupos.get(r)
+            if g is not None:
+                g[0].append((tx.id, _valor_monto_tx(tx)))
+    out = _DecisionesReferencia()
+    for r, (txs, exps) in grupos.items():
+        stats.referencias_indexadas += len(txs) + len(exps)
+        if not txs:
+            continue
+        exps.sort()
+        usados: set[str] = set()
+        for tx_id, monto_tx in sorted(txs):
+            cands = [(i, m) for i, m in exps if i not in usados]
+            st.candidatos_examinados += len(cands)
+            if len(cands) > 1:
+                _emitir_ambiguedad_referencia(st, tx_id, r, [i for i, _ in cands])
+                continue
+            if not cands:
+                continue
+            exp_id, monto_exp = cands[0]
+            if monto_tx != monto_exp:
+                _emitir_referencia_monto_difiere(st, tx_id, exp_id, r, monto_tx, monto_exp)
+                continue
+            usados.add(exp_id)
+            out.tx[tx_id] = exp_id
+            out.exp[exp_id] = tx_id
+    return out
+
+
+def _ordenados(
+    entidades: Iterable[Any], fecha: Callable[[Any], date], lado: str
+) -> Iterator[tuple[int, Any]]:
+    previo = None
+    for e in entidades:
+        o = fecha(e).toordinal()
+        if previo is not None and o < previo:
+            raise ErrorEntradaUsuario(
+                "El modo streaming requiere entradas ordenadas por fecha.",
+                details={"lado": lado, "id": e.id, "fecha": fecha(e).isoformat()},
+                hint="Ordene el archivo por fecha (p. ej. sort externo) antes de conciliar.",
+            )
+        previo = o
+        yield o, e
+
+
+def conciliar_streaming(
+    *,
+    cfg: ConfiguracionCliente,
+    transacciones: FuenteTransacciones,
+    esperados: FuenteEsperados,
+    audit: JsonlAuditWriter,
+    run_id: str,
+    perfil: bool = False,
+) -> Iterator[Match | Hallazgo]:
+    """
+    Matching en streaming para entradas ordenadas por fecha (backfills historicos).
+
+    Mismas decisiones que `conciliar()` para `ref_exacta` + `monto_fecha` (los matches y
+    hallazgos son identicos; se entregan a medida que avanza la ventana, no ordenados por id):
+
+    - Pasada 1: `ref_exacta` sobre (id, referencia, monto) de las entidades con referencia.
+    - Pasada 2: recorrido por fecha. Cada entidad no consumida por referencia entra en un cluster
+      de su monto; tx y esperado se enlazan si estan a <= `ventana_dias_monto_fecha`. Cuando la
+      fecha actual supera el horizonte del cluster (ninguna entidad futura puede enlazarse), se
+      resuelve con `_aplicar_monto_fecha` en orden de id y se emiten sus pendientes.
+
+    Memoria: la pasada 1 retiene (id, monto) de cada entidad con referencia (esperados con
+    referencia y tx cuya referencia coincide con alguno; `referencias_indexadas`) y deja un par de
+    ids por match de `ref_exacta`, es decir O(filas con referencia). La pasada 2 agrega solo lo
+    acotado por la densidad de la ventana (clusters abiertos y matches por referencia con una sola
+    parte vista; `max_entidades_en_memoria`). Con pocas referencias domina la ventana; un archivo
+    donde casi todo trae referencia cuesta memoria proporcional a su tamano.
+    `transacciones`/`esperados` son fuentes re-iterables (se recorren dos veces). Se asume
+    unicidad de IDs.
+    """
+    _validar_config(cfg)
+    st = _EstadoConciliacion(
+        cfg=cfg,
+        audit=audit,
+        run_id=run_id,
+        confianza=TablaConfianza(cfg, [], []),
+        perfil=perfil,
+    )
+    stats = EstadisticasStreaming()
+    ventana = cfg.ventana_dias_monto_fecha
+    n_tx = n_exp = n_matches = n_hallazgos = 0
+
+    def drenar() -> Iterator[Match | Hallazgo]:
+        nonlocal n_matches, n_hallazgos
+        n_matches += len(st.matches)
+        n_hallazgos += len(st.hallazgos)
+        yield from st.matches
+        yield from st.hallazgos
+        st.matches.clear()
+        st.hallazgos.clear()
+
+    with _medir_regla(st, "ref_exacta"):
+        ref = _decidir_referencias(st, transacciones(), esperados(), stats)
+    yield from drenar()
+
+    abiertos: dict[Decimal, list[_Cluster]] = {}
+    horizontes: list[tuple[int, int, Decimal, _Cluster]] = []
+    secuencia = itertools.count()
+    espera_tx: dict[str, TransaccionBancaria] = {}
+    espera_exp: dict[str, MovimientoEsperado] = {}
+    en_memoria = 0
+
+    def resolver(monto: Decimal, c: _Cluster) -> None:
+        nonlocal en_memoria
+        abiertos[monto].remove(c)
+        if not abiertos[monto]:
+            del abiertos[monto]
+        txs = sorted(c.txs, key=lambda t: t.id)
+        exps = sorted(c.exps, key=lambda e: e.id)
+        _aplicar_monto_fecha(st, txs, exps)
+        for tx in txs:
+            _cerrar_tx(st, tx)
+            st.used_tx.discard(tx.id)
+        for exp in exps:
+            _cerrar_exp(st, exp)
+            st.used_exp.discard(exp.id)
+        en_memoria -= len(txs) + len(exps)
+        stats.clusters_resueltos += 1
+
+    def cerrar_hasta(o: int | None) -> None:
+        while horizontes and (o is None or horizontes[0][0] < o):
+            h, _, monto, c = heapq.heappop(horizontes)
+            if c.vivo and c.horizonte(ventana) == h:
+                c.vivo = False
+                resolver(monto, c)
+
+    def agregar(o: int, monto: Decimal, tx: TransaccionBancaria | None, exp: Any) -> None:
+        nonlocal en_memoria
+        grupo = abiertos.setdefault(monto, [])
+        enlazados = [
+            c
+            for c in grupo
+            if (u := c.ult_exp if tx is not None else c.ult_tx) is not None and u >= o - ventana
+        ]
+        if enlazados:
+            c = enlazados[0]
+            for otro in enlazados[1:]:
+                c.txs.extend(otro.txs)
+                c.exps.extend(otro.exps)
+                c.ult_tx = max((x for x in (c.ult_tx, otro.ult_tx) if x is not None), default=None)
+                c.ult_exp = max(
+                    (x for x in (c.ult_exp, otro.ult_exp) if x is not None), default=None
+                )
+                otro.vivo = False
+                grupo.remove(otro)
+        else:
+            c = _Cluster()
+            grupo.append(c)
+        if tx is not None:
+            c.txs.append(tx)
+            c.ult_tx = o
+        else:
+            c.exps.append(exp)
+            c.ult_exp = o
+        heapq.heappush(horizontes, (c.horizonte(ventana), next(secuencia), monto, c))
+        en_memoria += 1
+
+    flujo = heapq.merge(
+        ((o, 0, tx) for o, tx in _ordenados(transacciones(), _valor_fecha_tx, "banco")),
+        ((o, 1, exp) for o, exp in _ordenados(esperados(), _valor_fecha_exp, "esperado")),
+        key=lambda x: (x[0], x[1]),
+    )
+
+    def match_referencia(tx: TransaccionBancaria, exp: MovimientoEsperado) -> None:
+        with _medir_regla(st, "ref_exacta"):
+            _emitir_match_ref_exacta(st, tx, exp, _ref_tx(tx), st.confianza.bloqueo([tx], [exp]))
+        _cerrar_tx(st, tx)
+        st.used_tx.discard(tx.id)
+        st.used_exp.discard(exp.id)
+
+    for o, lado, ent in flujo:
+        cerrar_hasta(o)
+        if lado == 0:
+            tx: TransaccionBancaria = ent
+            n_tx += 1
+            exp_id = ref.tx.pop(tx.id, None)
+            if exp_id is None:
+                agregar(o, _valor_monto_tx(tx), tx, None)
+            elif (exp_visto := espera_exp.pop(exp_id, None)) is not None:
+                match_referencia(tx, exp_visto)
+            else:
+                espera_tx[exp_id] = tx
+        else:
+            exp: MovimientoEsperado = ent
+            n_exp += 1
+            if ref.exp.pop(exp.id, None) is None:
+                agregar(o, _valor_monto_exp(exp), None, exp)
+            elif (tx_visto := espera_tx.pop(exp.id, None)) is not None:
+                match_referencia(tx_visto, exp)
+            else:
+                espera_exp[exp.id] = exp
+        stats.max_entidades_en_memoria = max(
+            stats.max_entidades_en_memoria, en_memoria + len(espera_tx) + len(espera_exp)
+        )
+        yield from drenar()
+    cerrar_hasta(None)
+    yield from drenar()
+
+    audit.write(
+        AuditEvent("matching", "Matching streaming", {"modo": "streaming", **asdict(stats)})
+    )
+    _evento_matching_stats(st)
+    _evento_matching_completado(st, txs=n_tx, exps=n_exp, matches=n_matches, hallazgos=n_hallazgos)
@@ -0,0 +1,281 @@
+from __future__ import annotations
+
+import csv
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+
+from conciliador_bancario.audit.audit_log import AuditEvent
+from conciliador_bancario.errors import ErrorConfiguracion, ErrorContrato, ErrorOperacionIO
+from conciliador_bancario.matching.engine import (
+    _emitir_hallazgo,
+    _emitir_match_sugerido,
+    _EstadoConciliacion,
+    _valor_fecha_tx,
+    _valor_monto_exp,
+    _valor_monto_tx,
+)
+from conciliador_bancario.matching.indices import IndiceRangoMonto
+from conciliador_bancario.models import (
+    MovimientoEsperado,
+    SeveridadHallazgo,
+    TransaccionBancaria,
+)
+from conciliador_bancario.normalization.normalizer import normalizar_moneda
+from conciliador_bancario.utils.hashing import sha256_archivo
+from conciliador_bancario.utils.parsing import ErrorParseo, normalizar_texto, parse_fecha_chile
+
+
+class TablaTipoCambio:
+    """
+    Tipos de cambio por (dia, moneda) en arreglos indexados por fecha ordinal.
+
+    - `tasa` = unidades de `moneda_base` por 1 unidad de `moneda`; la base vale 1.
+    - Un arreglo por moneda, desde la primera fecha de la tabla: cada lookup es O(1). Los dias
+      sin tasa (fines de semana, feriados) heredan la ultima tasa publicada hasta
+      `max_antiguedad_dias` dias despues; mas alla no hay tasa (`None`).
+    - `factor(origen, destino, fecha)` se cachea por (monedas, dia): cada dia bancario se
+      convierte una vez por par de monedas, no una vez por transaccion.
+    """
+
+    def __init__(
+        self,
+        moneda_base: str,
+        tasas: dict[str, dict[date, Decimal]],
+        *,
+        max_antiguedad_dias: int,
+    ) -> None:
+        self.moneda_base = moneda_base
+        fechas = [f.toordinal() for por_fecha in tasas.values() for f in por_fecha]
+        self._ord0 = min(fechas, default=0)
+        largo = (max(fechas) - self._ord0 + 1 + max_antiguedad_dias) if fechas else 0
+        self._arreglos: dict[str, list[Decimal | None]] = {}
+        for moneda, por_fecha in sorted(tasas.items()):
+            arr: list[Decimal | None] = [None] * largo
+            for f, t in por_fecha.items():
+                arr[f.toordinal() - self._ord0] = t
+            ultima: Decimal | None = None
+            desde = 0
+            for i in range(largo):
+                if arr[i] is not None:
+                    ultima, desde = arr[i], i
+                elif ultima is not None and i - desde <= max_antiguedad_dias:
+                    arr[i] = ultima
+            self._arreglos[moneda] = arr
+        self._cache: dict[tuple[str, str, int], Decimal | None] = {}
+
+    @property
+    def monedas(self) -> list[str]:
+        return sorted(self._arreglos)
+
+    @property
+    def conversiones_cacheadas(self) -> int:
+        return len(self._cache)
+
+    def tasa(self, moneda: str, fecha: date) -> Decimal | None:
+        if moneda == self.moneda_base:
+            return Decimal(1)
+        arr = self._arreglos.get(moneda)
+        i = fecha.toordinal() - self._ord0
+        if arr is None or not 0 <= i < len(arr):
+            return None
+        return arr[i]
+
+    def factor(self, origen: str, destino: str, fecha: date) -> Decimal | None:
+        """Multiplicador para pasar un monto de `origen` a `destino` en `fecha` (None sin tasa)."""
+        clave = (origen, destino, fecha.toordinal())
+        if clave not in self._cache:
+            to = self.tasa(origen, fecha)
+            td = self.tasa(destino, fecha)
+            self._cache[clave] = None if to is None or td is None else to / td
+        return self._cache[clave]
+
+
+def _parse_tasa(texto: str) -> Decimal:
+    t = texto.strip().replace(" ", "")
+    # Acepta "950,25", "950.25" y "1.050,25" (la tasa puede tener decimales).
+    if "," in t and "." in t:
+        t = t.replace(".", "").replace(",", ".")
+    else:
+        t = t.replace(",", ".")
+    try:
+        d = Decimal(t)
+    except InvalidOperation as e:
+        raise ErrorParseo(f"Tasa invalida: {texto!r}") from e
+    if not d.is_finite() or d <= 0:
+        raise ErrorParseo(f"Tasa debe ser positiva: {texto!r}")
+    return d
+
+
+def cargar_tabla_tipo_cambio(
+    path: Path, *, moneda_base: str, max_antiguedad_dias: int
+) -> TablaTipoCambio:
+    """Lee un CSV `fecha,moneda,tasa` (fail-closed ante filas invalidas o duplicadas)."""
+    from conciliador_bancario.ingestion.csv_adapter import detectar_perfil_csv
+
+    if not path.exists():
+        raise ErrorConfiguracion(
+            "No existe la tabla de tipos de cambio.",
+            details={"archivo": str(path)},
+            hint="Revise `regla_tipo_cambio.archivo` (ruta relativa al directorio de trabajo).",
+        )
+    base = normalizar_moneda(moneda_base)
+    tasas: dict[str, dict[date, Decimal]] = {}
+    try:
+        perfil = detectar_perfil_csv(path)
+        with path.open("r", encoding=perfil.encoding, newline="") as f:
+            reader = csv.DictReader(f, delimiter=perfil.delimiter)
+            headers = {normalizar_texto(h).lower(): h for h in reader.fieldnames or []}
+            c_fecha = headers.get("fecha")
+            c_moneda = headers.get("moneda")
+            c_tasa = headers.get("tasa") or headers.get("tipo_cambio") or headers.get("valor")
+            if c_fecha is None or c_moneda is None or c_tasa is None:
+                raise ErrorContrato(
+                    "Tabla de tipos de cambio sin columnas requeridas (fecha, moneda, tasa).",
+                    details={"archivo": str(path), "columnas": sorted(headers)},
+                    hint="Use encabezados `fecha,moneda,tasa`.",
+                )
+            for fila, row in enumerate(reader, start=2):
+                if not any((v or "").strip() for v in row.values()):
+                    continue
+                try:
+                    fecha = parse_fecha_chile(row[c_fecha] or "")
+                    moneda = normalizar_moneda(row[c_moneda] or "")
+                    tasa = _parse_tasa(row[c_tasa] or "")
+                except ValueError as e:
+                    raise ErrorContrato(
+                        "Fila invalida en la tabla de tipos de cambio (fail-closed).",
+                        details={"archivo": str(path), "fila": fila, "error": str(e)},
+                        hint="Corrija la fila; `tasa` = unidades de la moneda base por 1 unidad.",
+                    ) from e
+                if moneda == base:
+                    continue
+                if fecha in tasas.setdefault(moneda, {}):
+                    raise ErrorContrato(
+                        "Tasa duplicada en la tabla de tipos de cambio (fail-closed).",
+                        details={"archivo": str(path), "fila": fila, "moneda": moneda},
+                        hint="Deje una sola tasa por fecha y moneda.",
+                    )
+                tasas[moneda][fecha] = tasa
+    except (OSError, UnicodeDecodeError) as e:
+        raise ErrorOperacionIO(
+            "No se pudo leer la tabla de tipos de cambio.",
+            details={"archivo": str(path)},
+            hint="Verifique permisos y encoding del archivo (UTF-8 o CP1252).",
+        ) from e
+    return TablaTipoCambio(base, tasas, max_antiguedad_dias=max_antiguedad_dias)
+
+
+def aplicar_tipo_cambio(
+    st: _EstadoConciliacion,
+    transacciones: list[TransaccionBancaria],
+    esperados: list[MovimientoEsperado],
+) -> None:
+    """
+    Regla opcional: monto convertido con tabla local de tipos de cambio (`regla_tipo_cambio`).
+
+    - Solo pares con moneda distinta (los de igual moneda son de las demas reglas).
+    - Un `IndiceRangoMonto` por moneda de los esperados remanentes: cada tx convierte su monto a
+      cada moneda con la tasa de su fecha bancaria (factor cacheado por dia) y consulta el rango
+      `[convertido - tol, convertido + tol]` con la ventana de fecha.
+    - Sin tasa para la fecha (ni dentro de `max_antiguedad_dias`) => no hay candidatos.
+    - Un unico candidato => `sugerido`; >1 => hallazgo (fail-closed).
+    """
+    p = st.cfg.regla_tipo_cambio
+    ruta = Path(str(p.archivo))
+    tabla = cargar_tabla_tipo_cambio(
+        ruta, moneda_base=st.cfg.moneda_default, max_antiguedad_dias=p.max_antiguedad_dias
+    )
+    por_moneda: dict[str, list[MovimientoEsperado]] = {}
+    for e in esperados:
+        if e.id not in st.used_exp:
+            por_moneda.setdefault(e.moneda, []).append(e)
+    indices = {m: IndiceRangoMonto(es) for m, es in sorted(por_moneda.items())}
+    pct = Decimal(str(p.tolerancia_porcentual)) / 100
+    consultas = sin_tasa = sugeridos = ambiguas = 0
+    for tx in transacciones:
+        if tx.id in st.used_tx:
+            continue
+        monto = _valor_monto_tx(tx)
+        destinos = [m for m in indices if m != tx.moneda]
+        if monto == 0 or not destinos:
+            continue
+        consultas += 1
+        fecha = _valor_fecha_tx(tx)
+        cands: list[tuple[MovimientoEsperado, Decimal, Decimal]] = []
+        con_tasa = False
+        for moneda in destinos:
+            factor = tabla.factor(tx.moneda, moneda, fecha)
+            if factor is None:
+                continue
+            con_tasa = True
+            conv = monto * factor
+            tol = abs(conv) * pct
+            cands.extend(
+                (e, factor, tol)
+                for e in indices[moneda].candidatos(conv - tol, conv + tol, fecha, p.ventana_dias)
+                if e.id not in st.used_exp
+            )
+        sin_tasa += not con_tasa
+        cands.sort(key=lambda c: c[0].id)
+        st.candidatos_examinados += len(cands)
+        if not cands:
+            continue
+        if len(cands) > 1:
+            ambiguas += 1
+            _emitir_hallazgo(
+                st,
+                tipo="ambiguedad_tipo_cambio",
+                severidad=SeveridadHallazgo.advertencia,
+                mensaje=(
+                    "Mas de un movimiento esperado en otra moneda con monto convertido dentro de "
+                    "tolerancia y fecha cercana. Fail-closed: pendiente."
+                ),
+                entidad="banco",
+                entidad_id=tx.id,
+                detalles={"tx_id": tx.id, "candidatos": [e.id for e, _, _ in cands]},
+                mensaje_audit="Ambiguedad por tipo de cambio",
+            )
+            continue
+        exp, factor, tol = cands[0]
+        conv = monto * factor
+        diferencia = _valor_monto_exp(exp) - conv
+        rel = float(abs(diferencia) / tol) if tol else 0.0
+        _emitir_match_sugerido(
+            st,
+            regla="monto_tipo_cambio",
+            txs=[tx],
+            exps=[exp],
+            score=round(0.75 - 0.10 * rel, 4),
+            explicacion=(
+                f"Monto convertido {tx.moneda}->{exp.moneda} al tipo de cambio del {fecha} "
+                f"({monto} x {factor:.6f} = {conv:.2f}); diferencia {diferencia:.2f} dentro de "
+                f"{p.tolerancia_porcentual}% y fecha dentro de {p.ventana_dias} dias. "
+                "Requiere revision."
+            ),
+            detalles_audit={
+                "moneda_banco": tx.moneda,
+                "moneda_esperado": exp.moneda,
+                "factor": f"{factor:.10f}",
+                "diferencia_monto": f"{diferencia:.2f}",
+            },
+        )
+        sugeridos += 1
+
+    st.audit.write(
+        AuditEvent(
+            "matching",
+            "Regla tipo de cambio completada",
+            {
+                "regla": "monto_tipo_cambio",
+                "tabla_sha256": sha256_archivo(ruta),
+                "monedas_tabla": tabla.monedas,
+                "indexados": sum(len(i) for i in indices.values()),
+                "consultas": consultas,
+                "sin_tasa": sin_tasa,
+                "conversiones_cacheadas": tabla.conversiones_cacheadas,
+                "ambiguas": ambiguas,
+                "sugeridos": sugeridos,
+            },
+        )
+    )
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from decimal import Decimal
+
+from conciliador_bancario.audit.audit_log import AuditEvent
+from conciliador_bancario.matching.engine import (
+    _emitir_hallazgo,
+    _emitir_match_sugerido,
+    _EstadoConciliacion,
+    _valor_fecha_tx,
+    _valor_monto_exp,
+    _valor_monto_tx,
+)
+from conciliador_bancario.matching.indices import IndiceRangoMonto
+from conciliador_bancario.models import (
+    MovimientoEsperado,
+    SeveridadHallazgo,
+    TransaccionBancaria,
+)
+
+
+def tolerancia_para(monto: Decimal, absoluta: Decimal, porcentual: float) -> Decimal:
+    """Tolerancia efectiva para un monto bancario: max(absoluta, porcentual% de |monto|)."""
+    return max(absoluta, abs(monto) * Decimal(str(porcentual)) / 100)
+
+
+def aplicar_tolerancia_monto(
+    st: _EstadoConciliacion,
+    transacciones: list[TransaccionBancaria],
+    esperados: list[MovimientoEsperado],
+) -> None:
+    """
+    Regla opcional: monto dentro de tolerancia + ventana de fecha (comisiones, retenciones).
+
+    - Arreglo de esperados remanentes ordenado por monto (una vez por corrida): cada tx es una
+      consulta por rango `[monto - tol, monto + tol]` combinada con la ventana de fecha.
+    - Excluye montos exactos (los resuelve o deja ambiguos `monto_fecha`) y signos distintos.
+    - Un unico candidato => `sugerido`; >1 => hallazgo (fail-closed).
+    """
+    p = st.cfg.regla_tolerancia_monto
+    indice = IndiceRangoMonto(e for e in esperados if e.id not in st.used_exp)
+    consultas = sugeridos = ambiguas = 0
+    for tx in transacciones:
+        if tx.id in st.used_tx:
+            continue
+        monto = _valor_monto_tx(tx)
+        if monto == 0:
+            continue
+        consultas += 1
+        tol = tolerancia_para(monto, p.tolerancia_absoluta, p.tolerancia_porcentual)
+        cands = [
+            e
+            for e in indice.candidatos(
+                monto - tol, monto + tol, _valor_fecha_tx(tx), p.ventana_dias
+            )
+            if e.id not in st.used_exp
+            and (m := _valor_monto_exp(e)) != monto
+            and (m > 0) == (monto > 0)
+        ]
+        st.candidatos_examinados += len(cands)
+        if not cands:
+            continue
+        if len(cands) > 1:
+            ambiguas += 1
+            _emitir_hallazgo(
+                st,
+                tipo="ambiguedad_monto_tolerancia",
+                severidad=SeveridadHallazgo.advertencia,
+                mensaje=(
+                    "Mas de un movimiento esperado con monto dentro de tolerancia y fecha cercana. "
+                    "Fail-closed: pendiente."
+                ),
+                entidad="banco",
+                entidad_id=tx.id,
+                detalles={
+                    "tx_id": tx.id,
+                    "tolerancia": str(tol),
+                    "candidatos": [e.id for e in cands],
+                },
+                mensaje_audit="Ambiguedad por monto con tolerancia",
+            )
+            continue
+        exp = cands[0]
+        diferencia = _valor_monto_exp(exp) - monto
+        _emitir_match_sugerido(
+            st,
+            regla="monto_tolerancia",
+            txs=[tx],
+            exps=[exp],
+            score=round(0.70 - 0.10 * float(abs(diferencia) / tol), 4),
+            explicacion=(
+                f"Monto dentro de tolerancia (diferencia {diferencia}, tolerancia {tol}) y fecha "
+                f"dentro de {p.ventana_dias} dias. Requiere revision."
+            ),
+            detalles_audit={"diferencia_monto": str(diferencia), "tolerancia": str(tol)},
+        )
+        sugeridos += 1
+
+    st.audit.write(
+        AuditEvent(
+            "matching",
+            "Regla tolerancia de monto completada",
+            {
+                "regla": "monto_tolerancia",
+                "indexados": len(indice),
+                "consultas": consultas,
+                "ambiguas": ambiguas,
+                "sugeridos": sugeridos,
+            },
+        )
+    )
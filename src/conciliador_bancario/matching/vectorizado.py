@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+from decimal import Decimal
+from itertools import islice
+from typing import Any
+
+from conciliador_bancario.audit.audit_log import JsonlAuditWriter
+from conciliador_bancario.errors import ErrorConfiguracion
+from conciliador_bancario.matching.confianza import TablaConfianza
+from conciliador_bancario.matching.engine import (
+    _cerrar_conciliacion,
+    _ejecutar_pipeline,
+    _emitir_ambiguedad_monto_fecha,
+    _emitir_ambiguedad_referencia,
+    _emitir_match_monto_fecha,
+    _emitir_match_ref_exacta,
+    _emitir_referencia_monto_difiere,
+    _EstadoConciliacion,
+    _medir_regla,
+    _recortar_candidatos,
+    _ref_exp,
+    _ref_tx,
+    _valor_fecha_exp,
+    _valor_fecha_tx,
+    _valor_monto_exp,
+    _valor_monto_tx,
+    conciliar,
+    construir_pipeline,
+    orden_reglas,
+)
+from conciliador_bancario.models import (
+    ConfiguracionCliente,
+    MovimientoEsperado,
+    ResultadoConciliacion,
+    TransaccionBancaria,
+)
+
+# Clave compuesta monto/fecha: rango denso del monto << 22 | ordinal (date.max.toordinal() < 2**22).
+_BITS_FECHA = 22
+_MAX_ORDINAL = (1 << _BITS_FECHA) - 1
+_INT64_MAX = (1 << 63) - 1
+
+
+def _importar_numpy() -> Any:
+    try:
+        import numpy as np
+    except ImportError as e:
+        raise ErrorConfiguracion(
+            "Backend de matching 'numpy' no disponible (falta numpy).",
+            details={"backend": "numpy"},
+            hint="Instale el extra: pip install 'bankrecon[perf]' o use --matching-backend python.",
+        ) from e
+    return np
+
+
+def _monto_entero(d: Decimal) -> int | None:
+    if d != d.to_integral_value():
+        return None
+    v = int(d)
+    if abs(v) > _INT64_MAX:
+        return None
+    return v
+
+
+class ArraysConciliacion:
+    """
+    Representacion columnar de una corrida (indices = posicion en la lista ordenada por id).
+
+    - `*_monto`: int64 (CLP en unidades enteras).
+    - `*_fecha`: int32 (ordinal de la fecha de operacion / documento).
+    - `*_ref`: int64 con codigo denso de la referencia normalizada (-1 = sin referencia).
+
+    `vectorizable` es False si el input no es representable sin perder paridad
+    (IDs duplicados o montos no enteros / fuera de int64).
+    """
+
+    def __init__(
+        self,
+        np: Any,
+        cfg: ConfiguracionCliente,
+        transacciones: list[TransaccionBancaria],
+        esperados: list[MovimientoEsperado],
+    ) -> None:
+        codigos: dict[str, int] = {}
+
+        def codigo(r: str) -> int:
+            if not r:
+                return -1
+            return codigos.setdefault(r, len(codigos))
+
+        self.tx_refs = [_ref_tx(t) for t in transacciones]
+        tx_montos = [_monto_entero(_valor_monto_tx(t)) for t in transacciones]
+        exp_montos = [_monto_entero(_valor_monto_exp(e)) for e in esperados]
+        self.vectorizable = (
+            None not in tx_montos
+            and None not in exp_montos
+            and len({t.id for t in transacciones}) == len(transacciones)
+            and len({e.id for e in esperados}) == len(esperados)
+        )
+        if not self.vectorizable:
+            return
+
+        self.tx_ref = np.array([codigo(r) for r in self.tx_refs], dtype=np.int64)
+        self.exp_ref = np.array([codigo(_ref_exp(e)) for e in esperados], dtype=np.int64)
+        self.tx_monto = np.array(tx_montos, dtype=np.int64)
+        self.exp_monto = np.array(exp_montos, dtype=np.int64)
+        self.tx_fecha = np.array(
+            [_valor_fecha_tx(t).toordinal() for t in transacciones], dtype=np.int32
+        )
+        self.exp_fecha = np.array(
+            [_valor_fecha_exp(e).toordinal() for e in esperados], dtype=np.int32
+        )
+
+
+def conciliar_vectorizado(
+    *,
+    cfg: ConfiguracionCliente,
+    transacciones: list[TransaccionBancaria],
+    esperados: list[MovimientoEsperado],
+    audit: JsonlAuditWriter,
+    run_id: str,
+    perfil: bool = False,
+) -> ResultadoConciliacion:
+    """
+    Backend opcional (NumPy) con la misma semantica que `conciliar()`.
+
+    Los conjuntos de candidatos de `ref_exacta` y `monto_fecha` se calculan en bloque con
+    sort/searchsorted sobre arrays; solo la resolucion greedy (que depende del orden por id
+    y de lo ya usado) recorre las transacciones con candidatos. La emision de matches,
+    hallazgos y eventos de auditoria es la misma del motor de referencia.
+
+    Si el input no es representable en el kernel (IDs duplicados, montos no enteros) o
+    `orden_reglas` no empieza por `ref_exacta`, `monto_fecha`, se delega en `conciliar()`.
+    """
+    np = _importar_numpy()
+    transacciones = sorted(transacciones, key=lambda t: t.id)
+    esperados = sorted(esperados, key=lambda e: e.id)
+    a = ArraysConciliacion(np, cfg, transacciones, esperados)
+    if not a.vectorizable or orden_reglas(cfg)[:2] != ("ref_exacta", "monto_fecha"):
+        return conciliar(
+            cfg=cfg,
+            transacciones=transacciones,
+            esperados=esperados,
+            audit=audit,
+            run_id=run_id,
+            perfil=perfil,
+        )
+
+    st = _EstadoConciliacion(
+        cfg=cfg,
+        audit=audit,
+        run_id=run_id,
+        confianza=TablaConfianza(cfg, transacciones, esperados),
+        perfil=perfil,
+    )
+    n_tx = len(transacciones)
+    n_exp = len(esperados)
+    # La resolucion greedy trabaja sobre listas Python de enteros (indexar arrays elemento a
+    # elemento es mas lento que iterar listas); los arrays se usan para los calculos en bloque.
+    used_tx = bytearray(n_tx)
+    used_exp = bytearray(n_exp)
+    tx_monto = a.tx_monto.tolist()
+    exp_monto = a.exp_monto.tolist()
+    exp_idx = np.arange(n_exp, dtype=np.int64)
+
+    # 1) ref + monto exacto: grupos de esperados por codigo de referencia.
+    with _medir_regla(st, "ref_exacta", "preparar"):
+        con_ref = exp_idx[a.exp_ref >= 0]
+        orden_ref = con_ref[np.lexsort((con_ref, a.exp_ref[con_ref]))]
+        refs_ordenadas = a.exp_ref[orden_ref]
+        lo_arr = np.searchsorted(refs_ordenadas, a.tx_ref, side="left")
+        hi_arr = np.searchsorted(refs_ordenadas, a.tx_ref, side="right")
+        activos = np.flatnonzero((a.tx_ref >= 0) & (hi_arr > lo_arr))
+
+    with _medir_regla(st, "ref_exacta"):
+        orden_l = orden_ref.tolist()
+        for i, lo, hi in zip(
+            activos.tolist(), lo_arr[activos].tolist(), hi_arr[activos].tolist(), strict=True
+        ):
+            cands = [j for j in orden_l[lo:hi] if not used_exp[j]]
+            st.candidatos_examinados += len(cands)
+            if not cands:
+                continue
+            tx = transacciones[i]
+            r = a.tx_refs[i]
+            if len(cands) > 1:
+                _emitir_ambiguedad_referencia(st, tx.id, r, [esperados[j].id for j in cands])
+                continue
+            j = cands[0]
+            exp = esperados[j]
+            if tx_monto[i] != exp_monto[j]:
+                _emitir_referencia_monto_difiere(
+                    st, tx.id, exp.id, r, _valor_monto_tx(tx), _valor_monto_exp(exp)
+                )
+                continue
+            _emitir_match_ref_exacta(st, tx, exp, r, st.confianza.bloqueo([tx], [exp]))
+            used_tx[i] = 1
+            used_exp[j] = 1
+
+    # 2) monto exacto + ventana fecha: clave compuesta (rango de monto, ordinal) ordenada.
+    with _medir_regla(st, "monto_fecha", "preparar"):
+        _, rango = np.unique(np.concatenate([a.tx_monto, a.exp_monto]), return_inverse=True)
+        rango = rango.astype(np.int64).reshape(-1)
+        tx_base = rango[:n_tx] << _BITS_FECHA
+        exp_clave = (rango[n_tx:] << _BITS_FECHA) | a.exp_fecha.astype(np.int64)
+        orden = np.lexsort((exp_idx, exp_clave))
+        claves = exp_clave[orden]
+        ventana = cfg.ventana_dias_monto_fecha
+        f_tx = a.tx_fecha.astype(np.int64)
+        lo_arr = np.searchsorted(
+            claves, tx_base | np.clip(f_tx - ventana, 0, _MAX_ORDINAL), side="left"
+        )
+        hi_arr = np.searchsorted(
+            claves, tx_base | np.clip(f_tx + ventana, 0, _MAX_ORDINAL), side="right"
+        )
+
+    with _medir_regla(st, "monto_fecha"):
+        k = cfg.max_candidatos_ambiguedad
+        usados = np.frombuffer(bytes(used_tx), dtype=np.uint8).astype(bool)
+        activos = np.flatnonzero(~usados & (hi_arr > lo_arr))
+        orden_l = orden.tolist()
+        for i, lo, hi in zip(
+            activos.tolist(), lo_arr[activos].tolist(), hi_arr[activos].tolist(), strict=True
+        ):
+            if hi - lo == 1:
+                j = orden_l[lo]
+                vistos = [] if used_exp[j] else [j]
+            else:
+                # `orden` recorre la ventana en orden (fecha, id), como el indice del motor de
+                # referencia; se corta en k + 1 no usados.
+                pendientes = (orden_l[x] for x in range(lo, hi) if not used_exp[orden_l[x]])
+                vistos = list(islice(pendientes, k + 1))
+            st.candidatos_examinados += len(vistos)
+            if not vistos:
+                continue
+            cands, truncado = _recortar_candidatos(vistos, k, lambda j: j)
+            tx = transacciones[i]
+            if truncado or len(cands) > 1:
+                _emitir_ambiguedad_monto_fecha(st, tx, [esperados[j] for j in cands], truncado)
+                continue
+            j = cands[0]
+            exp = esperados[j]
+            _emitir_match_monto_fecha(st, tx, exp, st.confianza.bloqueo([tx], [exp]))
+            used_tx[i] = 1
+            used_exp[j] = 1
+
+    # Reglas opcionales (mismo codigo que el motor de referencia)
+    _ejecutar_pipeline(st, construir_pipeline(cfg)[2:], transacciones, esperados)
+    return _cerrar_conciliacion(st, transacciones, esperados)
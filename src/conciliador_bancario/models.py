@@ -170,16 +170,265 @@ class LimitesIngesta(CBModel):
     max_xml_movimientos: int = Field(default=200_000, ge=1)
 
 
+class ReglaFechaContable(CBModel):
+    """
+    Regla opcional: monto exacto + fecha esperada dentro de `[fecha_operacion, fecha_contable]`
+    ampliado por `ventana_dias_monto_fecha` (abonos que el banco contabiliza dias despues).
+
+    Politica:
+    - Deshabilitada por defecto; solo sugiere (nunca autoconcilia).
+    - `max_desfase_dias`: si operacion y contable difieren mas que esto, la tx se ignora.
+    """
+
+    habilitada: bool = False
+    max_desfase_dias: int = Field(default=10, ge=1)
+
+
+class ReglaMontoTercero(CBModel):
+    """
+    Regla opcional: misma contraparte + monto exacto + ventana de fecha.
+
+    La contraparte se reconoce por RUT valido (digito verificador) en la glosa/tercero, o por los
+    tokens del `tercero` del esperado contenidos en la glosa bancaria.
+
+    Politica:
+    - Deshabilitada por defecto; solo sugiere (nunca autoconcilia).
+    - Tambien desempata clusters ambiguos de `monto_fecha` (>1 candidato => hallazgo).
+    """
+
+    habilitada: bool = False
+    ventana_dias: int = Field(default=7, ge=0)
+
+
+class ReglaAsignacionMontoFecha(CBModel):
+    """
+    Regla opcional: asignacion de costo minimo (suma de delta dias) en clusters ambiguos de
+    `monto_fecha` (arriendos, remuneraciones y otros pagos recurrentes del mismo monto).
+
+    Politica:
+    - Deshabilitada por defecto; solo sugiere los pares presentes en TODA asignacion optima.
+    - `max_nodos`: clusters mas grandes no se resuelven (quedan como hallazgos).
+    - `max_operaciones`: presupuesto determinista por cluster (no depende de la maquina); si se
+      agota, el cluster no sugiere nada (fail-closed).
+    """
+
+    habilitada: bool = False
+    max_nodos: int = Field(default=5_000, ge=2)
+    max_operaciones: int = Field(default=5_000_000, ge=1)
+
+
+class ReglaMemoria(CBModel):
+    """
+    Regla opcional: pareos recurrentes aprendidos de corridas previas (`concilia memoria`).
+
+    Politica:
+    - Deshabilitada por defecto; un candidato unico solo se sugiere (nunca concilia).
+    - `archivo`: memoria generada con `concilia memoria aprender` (ruta relativa al directorio
+      de trabajo).
+    - `min_ocurrencias`: veces que un pareo debe haberse visto para proponerlo.
+    - `ventana_dias`: distancia maxima entre fecha bancaria y fecha esperada.
+    """
+
+    habilitada: bool = False
+    archivo: str | None = None
+    min_ocurrencias: int = Field(default=2, ge=1)
+    ventana_dias: int = Field(default=10, ge=0)
+
+    @model_validator(mode="after")
+    def _validar_archivo(self) -> ReglaMemoria:
+        if self.habilitada and not (self.archivo or "").strip():
+            raise ValueError("regla_memoria habilitada requiere archivo")
+        return self
+
+
+class ReglaReferenciaAproximada(CBModel):
+    """
+    Regla opcional: referencia casi igual (p. ej. "FAC-1001" vs "FAC1001") + monto exacto.
+
+    Politica:
+    - Deshabilitada por defecto; un candidato unico solo se sugiere (nunca concilia).
+    - `max_distancia`: distancia de edicion maxima sobre la clave sin separadores.
+    - `min_largo`: referencias mas cortas no se comparan (demasiado ambiguas).
+    """
+
+    habilitada: bool = False
+    max_distancia: int = Field(default=2, ge=1, le=3)
+    min_largo: int = Field(default=5, ge=3)
+
+
+class ReglaDescripcionSimilar(CBModel):
+    """
+    Regla opcional: descripcion similar (Jaccard de tokens) + monto exacto + ventana de fecha.
+
+    Politica:
+    - Deshabilitada por defecto; un candidato unico solo se sugiere (nunca concilia).
+    - `bandas` x `filas`: parametros del bloqueo LSH (MinHash). El umbral aproximado de
+      colision es `(1/bandas)^(1/filas)`; mas bandas => mas recall y mas pares comparados.
+    - `umbral_similitud`: Jaccard minimo sobre los tokens normalizados.
+    - `min_tokens`: descripciones con menos tokens no se comparan (demasiado genericas).
+    """
+
+    habilitada: bool = False
+    bandas: int = Field(default=20, ge=1, le=128)
+    filas: int = Field(default=3, ge=1, le=16)
+    umbral_similitud: float = Field(default=0.5, gt=0.0, le=1.0)
+    ventana_dias: int = Field(default=7, ge=0)
+    min_tokens: int = Field(default=2, ge=1)
+
+
+class ReglaToleranciaMonto(CBModel):
+    """
+    Regla opcional: monto dentro de tolerancia (comisiones/retenciones) + ventana de fecha.
+
+    Politica:
+    - Deshabilitada por defecto; un candidato unico solo se sugiere (nunca concilia).
+    - Tolerancia = max(`tolerancia_absoluta`, `tolerancia_porcentual`% del monto bancario).
+    - Los montos exactos no aplican (son de `monto_fecha`); el signo debe coincidir.
+    """
+
+    habilitada: bool = False
+    tolerancia_absoluta: Decimal = Field(default=Decimal("0"), ge=0)
+    tolerancia_porcentual: float = Field(default=0.0, ge=0.0, le=10.0)
+    ventana_dias: int = Field(default=3, ge=0)
+
+    @model_validator(mode="after")
+    def _validar_tolerancia(self) -> ReglaToleranciaMonto:
+        if self.habilitada and self.tolerancia_absoluta == 0 and self.tolerancia_porcentual == 0:
+            raise ValueError(
+                "regla_tolerancia_monto habilitada requiere tolerancia_absoluta o "
+                "tolerancia_porcentual > 0"
+            )
+        return self
+
+
+class ReglaTipoCambio(CBModel):
+    """
+    Regla opcional: monto convertido con una tabla local de tipos de cambio (p. ej. una cuenta en
+    USD que paga facturas en CLP).
+
+    Politica:
+    - Deshabilitada por defecto; un candidato unico solo se sugiere (nunca concilia).
+    - `archivo`: CSV `fecha,moneda,tasa` (ruta relativa al directorio de trabajo); `tasa` son
+      unidades de `moneda_default` por 1 unidad de `moneda`.
+    - Se usa la tasa de la fecha bancaria o, si ese dia no hay, la ultima publicada hasta
+      `max_antiguedad_dias` antes.
+    - Solo pares con moneda distinta; tolerancia = `tolerancia_porcentual`% del monto convertido.
+    """
+
+    habilitada: bool = False
+    archivo: str | None = None
+    tolerancia_porcentual: float = Field(default=1.0, ge=0.0, le=10.0)
+    ventana_dias: int = Field(default=3, ge=0)
+    max_antiguedad_dias: int = Field(default=4, ge=0)
+
+    @model_validator(mode="after")
+    def _validar_archivo(self) -> ReglaTipoCambio:
+        if self.habilitada and not (self.archivo or "").strip():
+            raise ValueError("regla_tipo_cambio habilitada requiere archivo")
+        return self
+
+
+class ReglaNettingDiario(CBModel):
+    """
+    Regla opcional M:N: deposito neto diario (procesador de tarjetas, lote de remuneraciones) =
+    suma de los esperados remanentes de un dia (y, con `por_tercero`, de una contraparte).
+
+    Politica:
+    - Deshabilitada por defecto; un grupo unico solo se sugiere (nunca concilia).
+    - `ventana_dias`: el deposito llega entre 0 y N dias despues del dia del grupo.
+    - `max_items`: grupos mas grandes se omiten (el match lista todos los IDs miembro).
+    """
+
+    habilitada: bool = False
+    ventana_dias: int = Field(default=3, ge=0)
+    por_tercero: bool = True
+    max_items: int = Field(default=500, ge=2)
+
+
+class ReglaPagosDivididos(CBModel):
+    """
+    Regla opcional N:1 / 1:N (pago agrupado / pago parcial) por suma exacta de montos.
+
+    Politica:
+    - Deshabilitada por defecto; cuando encuentra un grupo unico, solo sugiere (nunca concilia).
+    - Busqueda acotada y determinista: tope de candidatos por busqueda y presupuesto de estados
+      explorados (por busqueda y total). Si se excede, no se sugiere nada (fail-closed).
+    """
+
+    habilitada: bool = False
+    ventana_dias: int = Field(default=5, ge=0)
+    max_candidatos: int = Field(default=16, ge=2, le=30)
+    max_items: int = Field(default=5, ge=2)
+    max_estados_por_busqueda: int = Field(default=50_000, ge=1)
+    max_estados_total: int = Field(default=2_000_000, ge=1)
+
+
+# Orden por defecto del pipeline de matching. Las reglas opcionales (todas salvo las dos primeras)
+# corren solo si su `regla_<nombre>.habilitada` es true.
+ORDEN_REGLAS_POR_DEFECTO: tuple[str, ...] = (
+    "ref_exacta",
+    "monto_fecha",
+    "fecha_contable",
+    "monto_tercero",
+    "asignacion_monto_fecha",
+    "memoria",
+    "referencia_aproximada",
+    "descripcion_similar",
+    "tolerancia_monto",
+    "tipo_cambio",
+    "netting_diario",
+    "pagos_divididos",
+)
+
+
 class ConfiguracionCliente(CBModel):
     cliente: str = Field(min_length=1)
     rut_mask: str | None = None
     ventana_dias_monto_fecha: int = Field(default=3, ge=0)
+    # `monto_fecha` deja de buscar al encontrar mas de K candidatos; el hallazgo lista solo K.
+    max_candidatos_ambiguedad: int = Field(default=50, ge=1)
+    # `--ledger`: partidas abiertas con fecha anterior a (fecha minima de la corrida - N) no se
+    # arrastran (siguen en el ledger).
+    ledger_max_antiguedad_dias: int = Field(default=180, ge=0)
     umbral_autoconcilia: float = Field(default=0.85, ge=0.0, le=1.0)
     umbral_confianza_campos: float = Field(default=0.80, ge=0.0, le=1.0)
     permitir_ocr: bool = False
     mask_por_defecto: bool = True
     moneda_default: Moneda = "CLP"
     limites_ingesta: LimitesIngesta = Field(default_factory=LimitesIngesta)
+    regla_fecha_contable: ReglaFechaContable = Field(default_factory=ReglaFechaContable)
+    regla_monto_tercero: ReglaMontoTercero = Field(default_factory=ReglaMontoTercero)
+    regla_asignacion_monto_fecha: ReglaAsignacionMontoFecha = Field(
+        default_factory=ReglaAsignacionMontoFecha
+    )
+    regla_memoria: ReglaMemoria = Field(default_factory=ReglaMemoria)
+    regla_referencia_aproximada: ReglaReferenciaAproximada = Field(
+        default_factory=ReglaReferenciaAproximada
+    )
+    regla_descripcion_similar: ReglaDescripcionSimilar = Field(
+        default_factory=ReglaDescripcionSimilar
+    )
+    regla_tolerancia_monto: ReglaToleranciaMonto = Field(default_factory=ReglaToleranciaMonto)
+    regla_tipo_cambio: ReglaTipoCambio = Field(default_factory=ReglaTipoCambio)
+    regla_netting_diario: ReglaNettingDiario = Field(default_factory=ReglaNettingDiario)
+    regla_pagos_divididos: ReglaPagosDivididos = Field(default_factory=ReglaPagosDivididos)
+    # Orden explicito del pipeline (subconjunto de `ORDEN_REGLAS_POR_DEFECTO`); None = por defecto.
+    # Omitir `ref_exacta` o `monto_fecha` las deshabilita.
+    orden_reglas: list[str] | None = None
+
+    @model_validator(mode="after")
+    def _validar_orden_reglas(self) -> ConfiguracionCliente:
+        if self.orden_reglas is None:
+            return self
+        desconocidas = [r for r in self.orden_reglas if r not in ORDEN_REGLAS_POR_DEFECTO]
+        if desconocidas:
+            raise ValueError(
+                f"orden_reglas contiene reglas desconocidas: {desconocidas} "
+                f"(validas: {list(ORDEN_REGLAS_POR_DEFECTO)})"
+            )
+        if len(set(self.orden_reglas)) != len(self.orden_reglas):
+            raise ValueError("orden_reglas no puede repetir reglas")
+        return self
 
 
 @dataclass(frozen=True)
@@ -6,8 +6,16 @@ from conciliador_bancario.normalization.normalizer import (
     normalizar_movimiento,
     normalizar_transaccion,
 )
+from conciliador_bancario.normalization.terceros import (
+    ClavesTercero,
+    claves_movimiento,
+    claves_transaccion,
+)
 
 __all__ = [
+    "ClavesTercero",
+    "claves_movimiento",
+    "claves_transaccion",
     "normalizar_lote",
     "normalizar_moneda",
     "normalizar_movimiento",
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import re
+import unicodedata
+from dataclasses import dataclass
+
+from conciliador_bancario.models import MovimientoEsperado, TransaccionBancaria
+
+# RUT con puntos (12.345.678-5) o con guion (12345678-5). Sin guion ni puntos es indistinguible
+# de un numero de cuenta u operacion, asi que no se considera.
+_RUT_RE = re.compile(r"(?<![\d.])(\d{1,2}\.\d{3}\.\d{3}-?[\dkK]|\d{7,8}-[\dkK])(?![\dA-Za-z])")
+_TOKEN = re.compile(r"[A-Z0-9]+")
+# Formas societarias y conectores: no identifican a la contraparte.
+_NO_NOMBRE = frozenset(
+    {
+        "SPA",
+        "LTDA",
+        "LIMITADA",
+        "EIRL",
+        "SA",
+        "CIA",
+        "DE",
+        "DEL",
+        "LA",
+        "LAS",
+        "EL",
+        "LOS",
+        "Y",
+    }
+)
+
+
+def digito_verificador(cuerpo: int) -> str:
+    """Digito verificador modulo 11 de un RUT chileno."""
+    s, factor = 0, 2
+    while cuerpo:
+        s += (cuerpo % 10) * factor
+        cuerpo //= 10
+        factor = 2 if factor == 7 else factor + 1
+    dv = 11 - s % 11
+    return "0" if dv == 11 else "K" if dv == 10 else str(dv)
+
+
+def ruts_en_texto(texto: str) -> frozenset[str]:
+    """RUTs validos (digito verificador correcto) del texto, como `CUERPO-DV` sin puntos."""
+    out = set()
+    for m in _RUT_RE.finditer(texto or ""):
+        plano = m.group(1).replace(".", "").replace("-", "").upper()
+        cuerpo, dv = plano[:-1], plano[-1]
+        if digito_verificador(int(cuerpo)) == dv:
+            out.add(f"{int(cuerpo)}-{dv}")
+    return frozenset(out)
+
+
+def tokens_nombre(texto: str) -> frozenset[str]:
+    """Tokens de nombre (mayusculas, sin tildes, >= 3 caracteres, sin formas societarias)."""
+    plano = unicodedata.normalize("NFKD", texto or "").encode("ascii", "ignore").decode("ascii")
+    return frozenset(
+        t
+        for t in _TOKEN.findall(plano.upper())
+        if len(t) >= 3 and not t.isdigit() and t not in _NO_NOMBRE
+    )
+
+
+@dataclass(frozen=True)
+class ClavesTercero:
+    """
+    Claves de contraparte de una entidad, extraidas una vez por corrida.
+
+    - `ruts`: RUTs validos presentes en el texto.
+    - `nombre`: tokens del `tercero` (solo esperados); vacio si no identifica (1 token corto).
+    - `tokens`: tokens de nombre de la descripcion (donde se busca `nombre` del lado banco).
+    """
+
+    ruts: frozenset[str]
+    nombre: frozenset[str]
+    tokens: frozenset[str]
+
+
+def _nombre_identificable(tokens: frozenset[str]) -> frozenset[str]:
+    # Un unico token corto ("LUZ", "SUR") coincide por azar con demasiadas glosas.
+    if len(tokens) >= 2 or any(len(t) >= 5 for t in tokens):
+        return tokens
+    return frozenset()
+
+
+def claves_transaccion(tx: TransaccionBancaria) -> ClavesTercero:
+    desc = str(tx.descripcion.valor)
+    return ClavesTercero(ruts=ruts_en_texto(desc), nombre=frozenset(), tokens=tokens_nombre(desc))
+
+
+def claves_movimiento(exp: MovimientoEsperado) -> ClavesTercero:
+    desc = str(exp.descripcion.valor)
+    terc = str(exp.tercero.valor) if exp.tercero is not None and exp.tercero.valor else ""
+    return ClavesTercero(
+        ruts=ruts_en_texto(desc) | ruts_en_texto(terc),
+        nombre=_nombre_identificable(tokens_nombre(terc)),
+        tokens=tokens_nombre(desc),
+    )
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
 import json
+from contextlib import ExitStack
+from datetime import date
+from functools import partial
 from json import JSONDecodeError
 from pathlib import Path
 from typing import Any
@@ -9,10 +12,17 @@ import yaml
 from pydantic import ValidationError
 from yaml import YAMLError
 
-from conciliador_bancario.errors import ErrorConfiguracion, ErrorContrato, ErrorOperacionIO
+from conciliador_bancario.errors import (
+    ErrorConfiguracion,
+    ErrorContrato,
+    ErrorEntradaUsuario,
+    ErrorOperacionIO,
+)
 from conciliador_bancario.ingestion.base import ErrorIngestion
 from conciliador_bancario.models import ConfiguracionCliente, ResultadoConciliacion
 
+MATCHING_BACKENDS: tuple[str, ...] = ("python", "numpy")
+
 
 def generar_plantillas_init(out_dir: Path) -> None:
     out_dir.mkdir(parents=True, exist_ok=True)
@@ -70,6 +80,45 @@ def _cargar_config(path: Path) -> ConfiguracionCliente:
         ) from e
 
 
+def _cargar_run_previo(
+    run_dir: Path,
+    *,
+    flag: str = "--since-run",
+    hint_invalido: str = "Ejecute una corrida completa (sin --since-run).",
+) -> dict[str, Any]:
+    from conciliador_bancario.core.contracts.run_schema import validate_run_payload
+
+    run_json = run_dir / "run.json"
+    if not run_json.exists():
+        raise ErrorEntradaUsuario(
+            f"Falta run.json en {flag}.",
+            details={"archivo": str(run_json)},
+            hint="Indique el directorio --out de una corrida previa de `concilia run`.",
+        )
+    try:
+        raw = json.loads(run_json.read_text(encoding="utf-8"))
+    except JSONDecodeError as e:
+        raise ErrorContrato(
+            "run.json previo no es JSON valido (fail-closed).",
+            details={"archivo": str(run_json), "linea": e.lineno, "columna": e.colno},
+            hint=hint_invalido,
+        ) from e
+    except (OSError, UnicodeDecodeError) as e:
+        raise ErrorOperacionIO(
+            "No se pudo leer run.json previo.",
+            details={"archivo": str(run_json)},
+            hint="Verifique permisos y encoding UTF-8 del archivo.",
+        ) from e
+    try:
+        return validate_run_payload(raw)
+    except ValueError as e:
+        raise ErrorContrato(
+            "run.json previo invalido o incompatible (fail-closed).",
+            details={"archivo": str(run_json), "error": str(e)},
+            hint=hint_invalido,
+        ) from e
+
+
 def _apply_limit_overrides(
     cfg: ConfiguracionCliente,
     *,
@@ -205,11 +254,26 @@ def ejecutar_run(
     max_pdf_pages: int | None = None,
     max_pdf_text_chars: int | None = None,
     max_xml_movimientos: int | None = None,
+    matching_backend: str = "python",
+    workers: int = 1,
+    since_run: Path | None = None,
+    perfil_matching: bool = False,
+    orden_shards: int = 0,
+    ledger: Path | None = None,
+    workers_ingesta: int = 1,
 ) -> ResultadoConciliacion:
     """
     Ejecuta pipeline end-to-end hasta matching + artefactos tecnicos (run.json + audit.jsonl).
 
     Reporting XLSX es fase posterior; en esta etapa, `--dry-run` es el modo recomendado.
+    `matching_backend` y `workers` no alteran resultados (misma salida); solo cambian la
+    implementacion del matching. `since_run` reutiliza los resultados de un run previo y solo
+    re-concilia lo que cambio (mismo `run.json` que una corrida completa). `perfil_matching`
+    agrega tiempos por regla al evento `matching_stats` (solo audit.jsonl; `run.json` no cambia).
+    `orden_shards` rota el orden de los shards de `--workers` (solo para `concilia selfcheck`).
+    `ledger` agrega al matching las partidas abiertas de periodos anteriores con monto presente en
+    la corrida y, salvo en `dry_run`, retira las conciliadas y registra las nuevas pendientes.
+    `workers_ingesta` parsea los CSV por chunks en procesos (mismas filas, IDs y limites).
     """
     from conciliador_bancario import __version__
     from conciliador_bancario.audit.audit_log import JsonlAuditWriter, configurar_logging
@@ -227,6 +291,47 @@ def ejecutar_run(
     from conciliador_bancario.normalization.normalizer import normalizar_lote
     from conciliador_bancario.utils.hashing import sha256_archivo, sha256_json_estable
 
+    if matching_backend not in MATCHING_BACKENDS:
+        raise ErrorEntradaUsuario(
+            f"Backend de matching no soportado: {matching_backend}.",
+            details={"matching_backend": matching_backend},
+            hint=f"Use uno de: {', '.join(MATCHING_BACKENDS)}.",
+        )
+    if workers < 1:
+        raise ErrorEntradaUsuario(
+            f"--workers debe ser >= 1 (recibido: {workers}).",
+            details={"workers": workers},
+            hint="Use --workers 1 para matching serial.",
+        )
+    if workers_ingesta < 1:
+        raise ErrorEntradaUsuario(
+            f"--workers-ingesta debe ser >= 1 (recibido: {workers_ingesta}).",
+            details={"workers_ingesta": workers_ingesta},
+            hint="Use --workers-ingesta 1 para ingesta serial.",
+        )
+    if workers > 1 and matching_backend != "python":
+        raise ErrorEntradaUsuario(
+            "Flags incompatibles: --workers > 1 y --matching-backend distinto de python.",
+            details={"workers": workers, "matching_backend": matching_backend},
+            hint="Use solo una de las dos opciones.",
+        )
+    if ledger is not None and since_run is not None:
+        raise ErrorEntradaUsuario(
+            "Flags incompatibles: --ledger y --since-run.",
+            details={"flag_1": "--ledger", "flag_2": "--since-run"},
+            hint="El arrastre del ledger cambia las entradas del run previo; use solo una opcion.",
+        )
+    if matching_backend == "numpy":
+        from conciliador_bancario.matching.vectorizado import conciliar_vectorizado as motor
+    elif workers > 1:
+        from conciliador_bancario.matching.paralelo import conciliar_paralelo
+
+        motor = partial(conciliar_paralelo, workers=workers, orden_shards=orden_shards)
+    else:
+        motor = conciliar
+    if perfil_matching:
+        motor = partial(motor, perfil=True)
+
     configurar_logging(log_level)
     cfg = _cargar_config(config)
     if enable_ocr:
@@ -240,6 +345,8 @@ def ejecutar_run(
         max_pdf_text_chars=max_pdf_text_chars,
         max_xml_movimientos=max_xml_movimientos,
     )
+    # Se lee antes de abrir audit.jsonl: --since-run puede apuntar al mismo --out.
+    previo = _cargar_run_previo(since_run) if since_run is not None else None
 
     run_fingerprint = {
         "config_sha256": sha256_archivo(config),
@@ -253,7 +360,9 @@ def ejecutar_run(
     run_id = sha256_json_estable(run_fingerprint)[:16]
 
     try:
-        audit = JsonlAuditWriter(out_dir / "audit.jsonl", run_id=run_id)
+        audit = JsonlAuditWriter(
+            out_dir / "audit.jsonl", run_id=run_id, diferido=ledger is not None
+        )
     except OSError as e:
         raise ErrorOperacionIO(
             "No se pudo preparar audit.jsonl.",
@@ -261,41 +370,104 @@ def ejecutar_run(
             hint="Verifique permisos de escritura en --out.",
         ) from e
 
-    txs = cargar_transacciones_bancarias(bank, cfg=cfg, audit=audit)
-    exps = cargar_movimientos_esperados(expected, cfg=cfg, audit=audit)
-    txs, exps = normalizar_lote(cfg=cfg, transacciones=txs, esperados=exps)
+    libro = None
+    with ExitStack() as recursos:
+        try:
+            txs = cargar_transacciones_bancarias(
+                bank, cfg=cfg, audit=audit, workers=workers_ingesta
+            )
+            exps = cargar_movimientos_esperados(
+                expected, cfg=cfg, audit=audit, workers=workers_ingesta
+            )
+            txs, exps = normalizar_lote(cfg=cfg, transacciones=txs, esperados=exps)
+
+            if ledger is not None:
+                from datetime import timedelta
+
+                from conciliador_bancario.audit.audit_log import AuditEvent
+                from conciliador_bancario.ledger import LedgerPartidas, huella_arrastre
+
+                libro = recursos.enter_context(LedgerPartidas(ledger))
+                fechas = [t.fecha_operacion.valor for t in txs] + [e.fecha.valor for e in exps]
+                desde = min(fechas, default=date.max) - timedelta(
+                    days=cfg.ledger_max_antiguedad_dias
+                )
+                arr_txs, arr_exps = libro.arrastre(transacciones=txs, esperados=exps, desde=desde)
+                huella = huella_arrastre(arr_txs, arr_exps)
+                # El arrastre es entrada del matching: mismos archivos con otro ledger no pueden
+                # compartir run_id. El `fingerprint` de run.json no cambia (esquema cerrado).
+                run_id = sha256_json_estable({**run_fingerprint, "arrastre_sha256": huella})[:16]
+                audit.write(
+                    AuditEvent(
+                        "ledger",
+                        "Partidas abiertas arrastradas",
+                        {
+                            "ledger": ledger.name,
+                            "banco": len(arr_txs),
+                            "esperados": len(arr_exps),
+                            "arrastre_sha256": huella,
+                        },
+                    )
+                )
+                txs, exps = txs + arr_txs, exps + arr_exps
+        finally:
+            # Si la ingesta o el ledger fallan, los eventos retenidos salen con el run_id base.
+            audit.fijar_run_id(run_id)
+
+        if previo is not None:
+            from conciliador_bancario.matching.incremental import conciliar_incremental
+
+            resultado = conciliar_incremental(
+                cfg=cfg,
+                transacciones=txs,
+                esperados=exps,
+                audit=audit,
+                run_id=run_id,
+                previo=previo,
+                fingerprint=run_fingerprint,
+                motor=motor,
+            )
+        else:
+            resultado = motor(
+                cfg=cfg, transacciones=txs, esperados=exps, audit=audit, run_id=run_id
+            )
 
-    resultado = conciliar(cfg=cfg, transacciones=txs, esperados=exps, audit=audit, run_id=run_id)
+        run_json = out_dir / "run.json"
+        try:
+            payload = validate_run_payload(
+                {
+                    "schema_version": RUN_JSON_SCHEMA_VERSION,
+                    "run_id": resultado.run_id,
+                    "fingerprint": run_fingerprint,
+                    "matches": [m.model_dump() for m in resultado.matches],
+                    "hallazgos": [h.model_dump() for h in resultado.hallazgos],
+                }
+            )
+        except ValueError as e:
+            raise ErrorContrato(
+                "Contrato run.json invalido al generar salida.",
+                details={"schema_version": RUN_JSON_SCHEMA_VERSION},
+                hint="No continue con este run_dir; reporte el problema.",
+            ) from e
 
-    run_json = out_dir / "run.json"
-    try:
-        payload = validate_run_payload(
-            {
-                "schema_version": RUN_JSON_SCHEMA_VERSION,
-                "run_id": resultado.run_id,
-                "fingerprint": run_fingerprint,
-                "matches": [m.model_dump() for m in resultado.matches],
-                "hallazgos": [h.model_dump() for h in resultado.hallazgos],
-            }
-        )
-    except ValueError as e:
-        raise ErrorContrato(
-            "Contrato run.json invalido al generar salida.",
-            details={"schema_version": RUN_JSON_SCHEMA_VERSION},
-            hint="No continue con este run_dir; reporte el problema.",
-        ) from e
+        try:
+            run_json.write_text(
+                canonical_json_dumps(payload),
+                encoding="utf-8",
+            )
+        except OSError as e:
+            raise ErrorOperacionIO(
+                "No se pudo escribir run.json.",
+                details={"archivo": str(run_json)},
+                hint="Verifique permisos, ruta de salida y espacio disponible.",
+            ) from e
 
-    try:
-        run_json.write_text(
-            canonical_json_dumps(payload),
-            encoding="utf-8",
-        )
-    except OSError as e:
-        raise ErrorOperacionIO(
-            "No se pudo escribir run.json.",
-            details={"archivo": str(run_json)},
-            hint="Verifique permisos, ruta de salida y espacio disponible.",
-        ) from e
+        if libro is not None:
+            if dry_run:
+                cambios: dict[str, Any] = {"dry_run": True, **libro.contar()}
+            else:
+                cambios = libro.actualizar(resultado=resultado, run_id=run_id)
+            audit.write(AuditEvent("ledger", "Ledger de partidas abiertas", cambios))
 
     if not dry_run:
         from conciliador_bancario.reporting.excel_report import generar_reporte_excel
@@ -311,3 +483,192 @@ def ejecutar_run(
             ) from e
 
     return resultado
+
+
+def ejecutar_memoria_aprender(
+    *,
+    memoria: Path,
+    config: Path,
+    run_dirs: list[Path],
+    banks: list[Path],
+    expecteds: list[Path],
+    incluir_sugeridos: bool = False,
+    reconstruir: bool = False,
+) -> dict[str, Any]:
+    """
+    Aprende pareos de corridas previas (`run.json` + sus archivos de entrada) en la memoria.
+
+    Cada `run_dirs[i]` se empareja con `banks[i]` y `expecteds[i]`; los hashes de esos archivos
+    deben coincidir con el `fingerprint` del run (fail-closed). `reconstruir` parte de una
+    memoria vacia en vez de agregar a la existente.
+    """
+    from conciliador_bancario.audit.audit_log import NullAuditWriter
+    from conciliador_bancario.ingestion.detector import (
+        cargar_movimientos_esperados,
+        cargar_transacciones_bancarias,
+    )
+    from conciliador_bancario.matching.memoria import (
+        MemoriaMatches,
+        aprender,
+        cargar_memoria,
+        guardar_memoria,
+    )
+    from conciliador_bancario.normalization.normalizer import normalizar_lote
+    from conciliador_bancario.utils.hashing import sha256_archivo
+
+    if not run_dirs or not len(run_dirs) == len(banks) == len(expecteds):
+        raise ErrorEntradaUsuario(
+            "Se requiere el mismo numero de --run-dir, --bank y --expected.",
+            details={"run_dir": len(run_dirs), "bank": len(banks), "expected": len(expecteds)},
+            hint="Indique --bank y --expected de cada corrida, en el mismo orden que --run-dir.",
+        )
+    cfg = _cargar_config(config)
+    mem = MemoriaMatches() if reconstruir or not memoria.exists() else cargar_memoria(memoria)
+    runs_previos = len(mem.runs)
+    aprendidos = 0
+    for run_dir, bank, expected in zip(run_dirs, banks, expecteds, strict=True):
+        run = _cargar_run_previo(
+            run_dir, flag="--run-dir", hint_invalido="Indique el --out de una corrida valida."
+        )
+        for campo, archivo in (("bank_sha256", bank), ("expected_sha256", expected)):
+            if run["fingerprint"][campo] != sha256_archivo(archivo):
+                raise ErrorEntradaUsuario(
+                    "El archivo no corresponde a la corrida indicada (hash distinto).",
+                    details={"run_dir": str(run_dir), "archivo": str(archivo), "campo": campo},
+                    hint="Use exactamente los archivos --bank/--expected de esa corrida.",
+                )
+        audit = NullAuditWriter()
+        txs = cargar_transacciones_bancarias(bank, cfg=cfg, audit=audit)  # type: ignore[arg-type]
+        exps = cargar_movimientos_esperados(expected, cfg=cfg, audit=audit)  # type: ignore[arg-type]
+        txs, exps = normalizar_lote(cfg=cfg, transacciones=txs, esperados=exps)
+        aprendidos += aprender(
+            mem, run=run, transacciones=txs, esperados=exps, incluir_sugeridos=incluir_sugeridos
+        )
+    guardar_memoria(mem, memoria)
+    return {"runs_nuevos": len(mem.runs) - runs_previos, "pareos": aprendidos, "pares": len(mem)}
+
+
+def ejecutar_memoria_compactar(
+    *, memoria: Path, min_ocurrencias: int = 1, max_runs: int | None = None
+) -> dict[str, Any]:
+    from conciliador_bancario.matching.memoria import cargar_memoria, compactar, guardar_memoria
+
+    if min_ocurrencias < 1 or (max_runs is not None and max_runs < 1):
+        raise ErrorEntradaUsuario(
+            "--min-ocurrencias y --max-runs deben ser >= 1.",
+            details={"min_ocurrencias": min_ocurrencias, "max_runs": max_runs},
+        )
+    mem = cargar_memoria(memoria)
+    compacta = compactar(mem, min_ocurrencias=min_ocurrencias, max_runs=max_runs)
+    guardar_memoria(compacta, memoria)
+    return {"pares_antes": len(mem), "pares": len(compacta)}
+
+
+def ejecutar_selfcheck(
+    *,
+    config: Path,
+    bank: Path,
+    expected: Path,
+    out_dir: Path,
+    workers: list[int],
+    ordenes: int = 2,
+    log_level: str = "INFO",
+    enable_ocr: bool = False,
+) -> dict[str, Any]:
+    """
+    Verifica determinismo: corre las mismas entradas en serie y con cada `workers` (rotando el
+    orden de los shards `ordenes` veces) y con el backend `numpy` si esta instalado.
+
+    Cada variante escribe sus artefactos en `out_dir/<variante>/`. `run.json` se compara campo a
+    campo y `audit.jsonl` como multiconjunto de hashes de eventos contra la corrida serial; se
+    reporta la primera divergencia con contexto. El informe queda en `out_dir/selfcheck.json`.
+    """
+    import importlib.util
+
+    from conciliador_bancario.core.contracts.run_json_codec import canonical_json_dumps
+    from conciliador_bancario.selfcheck import (
+        comparar_audit,
+        comparar_run_json,
+        huella_multiconjunto,
+        leer_artefactos,
+        variantes_selfcheck,
+    )
+    from conciliador_bancario.utils.hashing import sha256_json_estable
+
+    if not workers or min(workers) < 2 or ordenes < 1:
+        raise ErrorEntradaUsuario(
+            "--workers debe ser >= 2 (se compara contra la corrida serial) y --ordenes >= 1.",
+            details={"workers": workers, "ordenes": ordenes},
+            hint="Ejemplo: --workers 2 --workers 4 --ordenes 2.",
+        )
+    if out_dir.exists() and any(out_dir.iterdir()):
+        raise ErrorEntradaUsuario(
+            "El directorio de salida del selfcheck debe estar vacio.",
+            details={"out": str(out_dir)},
+            hint="audit.jsonl se escribe en modo append; use un --out nuevo.",
+        )
+    omitidas: dict[str, str] = {}
+    incluir_numpy = importlib.util.find_spec("numpy") is not None
+    if not incluir_numpy:
+        omitidas["numpy"] = "numpy no instalado (extra perf)"
+
+    variantes: list[dict[str, Any]] = []
+    divergencia = None
+    referencia: tuple[dict[str, Any], list[dict[str, Any]]] | None = None
+    for v in variantes_selfcheck(workers, ordenes, incluir_numpy=incluir_numpy):
+        run_dir = out_dir / v.nombre
+        ejecutar_run(
+            config=config,
+            bank=bank,
+            expected=expected,
+            out_dir=run_dir,
+            mask=True,
+            dry_run=True,
+            log_level=log_level,
+            enable_ocr=enable_ocr,
+            matching_backend=v.matching_backend,
+            workers=v.workers,
+            orden_shards=v.orden_shards,
+            workers_ingesta=v.workers_ingesta,
+        )
+        run, eventos = leer_artefactos(run_dir)
+        div = None
+        if referencia is None:
+            referencia = (run, eventos)
+        else:
+            div = comparar_run_json(v.nombre, referencia[0], run) or comparar_audit(
+                v.nombre, referencia[1], eventos
+            )
+        variantes.append(
+            {
+                "variante": v.nombre,
+                "matching_backend": v.matching_backend,
+                "workers": v.workers,
+                "orden_shards": v.orden_shards,
+                "workers_ingesta": v.workers_ingesta,
+                "run_json_sha256": sha256_json_estable(run),
+                "audit_multiconjunto_sha256": huella_multiconjunto(eventos),
+                "eventos": len(eventos),
+                "ok": div is None,
+            }
+        )
+        if div is not None and divergencia is None:
+            divergencia = div.a_json()
+
+    informe = {
+        "ok": divergencia is None,
+        "run_id": referencia[0].get("run_id") if referencia else None,
+        "variantes": variantes,
+        "omitidas": omitidas,
+        "primera_divergencia": divergencia,
+    }
+    destino = out_dir / "selfcheck.json"
+    try:
+        destino.write_text(canonical_json_dumps(informe), encoding="utf-8")
+    except OSError as e:
+        raise ErrorOperacionIO(
+            "No se pudo escribir selfcheck.json.",
+            details={"archivo": str(destino)},
+            hint="Verifique permisos, ruta de salida y espacio disponible.",
+        ) from e
+    return informe
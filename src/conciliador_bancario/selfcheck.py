@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import json
+import re
+from collections import Counter
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from conciliador_bancario.errors import ErrorContrato
+from conciliador_bancario.utils.hashing import sha256_json_estable
+
+AUSENTE = "<ausente>"
+
+_REGISTRO_RE = re.compile(r"^\$\.(matches|hallazgos)\[(\d+)\]")
+
+
+@dataclass(frozen=True)
+class VarianteSelfcheck:
+    """Una forma de ejecutar el mismo run; todas deben producir los mismos artefactos."""
+
+    nombre: str
+    matching_backend: str = "python"
+    workers: int = 1
+    orden_shards: int = 0
+    workers_ingesta: int = 1
+
+
+@dataclass(frozen=True)
+class Divergencia:
+    variante: str
+    artefacto: str
+    ruta: str
+    referencia: Any
+    obtenido: Any
+    contexto: dict[str, Any] = field(default_factory=dict)
+
+    def a_json(self) -> dict[str, Any]:
+        return {
+            "variante": self.variante,
+            "artefacto": self.artefacto,
+            "ruta": self.ruta,
+            "referencia": self.referencia,
+            "obtenido": self.obtenido,
+            "contexto": self.contexto,
+        }
+
+
+def variantes_selfcheck(
+    workers: Sequence[int], ordenes: int, *, incluir_numpy: bool
+) -> list[VarianteSelfcheck]:
+    """
+    `serial` (referencia), cada `workers` con `ordenes` rotaciones de shards, ingesta CSV por
+    chunks con el mayor `workers` y `numpy`.
+    """
+    out = [VarianteSelfcheck("serial")]
+    for w in sorted(set(workers)):
+        for o in range(ordenes):
+            nombre = f"workers-{w}" + (f"-orden-{o}" if o else "")
+            out.append(VarianteSelfcheck(nombre, workers=w, orden_shards=o))
+    w = max(workers)
+    out.append(VarianteSelfcheck(f"ingesta-workers-{w}", workers_ingesta=w))
+    if incluir_numpy:
+        out.append(VarianteSelfcheck("numpy", matching_backend="numpy"))
+    return out
+
+
+def primera_divergencia_json(ref: Any, obt: Any, ruta: str = "$") -> tuple[str, Any, Any] | None:
+    """Primera ruta (claves en orden, listas por indice) donde dos documentos JSON difieren."""
+    if type(ref) is not type(obt):
+        return ruta, ref, obt
+    if isinstance(ref, dict):
+        for k in sorted(set(ref) | set(obt)):
+            if k not in ref or k not in obt:
+                return f"{ruta}.{k}", ref.get(k, AUSENTE), obt.get(k, AUSENTE)
+            d = primera_divergencia_json(ref[k], obt[k], f"{ruta}.{k}")
+            if d is not None:
+                return d
+        return None
+    if isinstance(ref, list):
+        for i, (a, b) in enumerate(zip(ref, obt, strict=False)):
+            d = primera_divergencia_json(a, b, f"{ruta}[{i}]")
+            if d is not None:
+                return d
+        if len(ref) != len(obt):
+            n = min(len(ref), len(obt))
+            return (
+                f"{ruta}[{n}]",
+                ref[n] if n < len(ref) else AUSENTE,
+                obt[n] if n < len(obt) else AUSENTE,
+            )
+        return None
+    return None if ref == obt else (ruta, ref, obt)
+
+
+def _id_registro(payload: dict[str, Any], lista: str, i: int) -> Any:
+    registros = payload.get(lista) or []
+    return registros[i].get("id") if i < len(registros) else AUSENTE
+
+
+def comparar_run_json(
+    variante: str, ref: dict[str, Any], obt: dict[str, Any]
+) -> Divergencia | None:
+    d = primera_divergencia_json(ref, obt)
+    if d is None:
+        return None
+    ruta, a, b = d
+    contexto: dict[str, Any] = {}
+    m = _REGISTRO_RE.match(ruta)
+    if m:
+        lista, i = m.group(1), int(m.group(2))
+        contexto = {
+            "id_referencia": _id_registro(ref, lista, i),
+            "id_obtenido": _id_registro(obt, lista, i),
+        }
+    return Divergencia(variante, "run.json", ruta, a, b, contexto)
+
+
+def huella_evento(evento: dict[str, Any]) -> str:
+    """Hash de un evento de auditoria sin `seq` (el orden se compara aparte, como multiconjunto)."""
+    return sha256_json_estable({k: v for k, v in evento.items() if k != "seq"})
+
+
+def huella_multiconjunto(eventos: list[dict[str, Any]]) -> str:
+    return sha256_json_estable(sorted(huella_evento(e) for e in eventos))
+
+
+def comparar_audit(
+    variante: str, ref: list[dict[str, Any]], obt: list[dict[str, Any]]
+) -> Divergencia | None:
+    """
+    Compara los eventos como multiconjunto de hashes.
+
+    Reporta el evento con menor `seq` cuya cantidad difiere (primero en la referencia), con las
+    posiciones en ambas corridas y el evento anterior como contexto.
+    """
+    h_ref = [huella_evento(e) for e in ref]
+    h_obt = [huella_evento(e) for e in obt]
+    c_ref, c_obt = Counter(h_ref), Counter(h_obt)
+    if c_ref == c_obt:
+        return None
+    distintos = {h for h in c_ref | c_obt if c_ref[h] != c_obt[h]}
+    en_ref = [i for i, h in enumerate(h_ref) if h in distintos]
+    if en_ref:
+        eventos, hashes, i = ref, h_ref, en_ref[0]
+    else:
+        eventos, hashes, i = obt, h_obt, next(i for i, h in enumerate(h_obt) if h in distintos)
+    h = hashes[i]
+    evento = {k: v for k, v in eventos[i].items() if k != "seq"}
+    return Divergencia(
+        variante,
+        "audit.jsonl",
+        f"evento {h[:16]}",
+        c_ref[h],
+        c_obt[h],
+        {
+            "evento": evento,
+            "seq_referencia": [j for j, x in enumerate(h_ref) if x == h],
+            "seq_obtenido": [j for j, x in enumerate(h_obt) if x == h],
+            "evento_anterior": eventos[i - 1].get("mensaje") if i else None,
+        },
+    )
+
+
+def leer_artefactos(run_dir: Path) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+    try:
+        run = json.loads((run_dir / "run.json").read_text(encoding="utf-8"))
+        lineas = (run_dir / "audit.jsonl").read_text(encoding="utf-8").splitlines()
+        eventos = [json.loads(x) for x in lineas if x.strip()]
+    except (OSError, ValueError) as e:
+        raise ErrorContrato(
+            "No se pudieron leer los artefactos de una variante del selfcheck.",
+            details={"run_dir": str(run_dir), "error": str(e)},
+            hint="Revise permisos y espacio en --out.",
+        ) from e
+    return run, eventos
@@ -1,15 +1,38 @@
 from __future__ import annotations
 
 import re
+from array import array
+from collections import Counter
+from collections.abc import Sequence
 from datetime import date, datetime
 from decimal import Decimal, InvalidOperation
+from functools import lru_cache
 
 
 class ErrorParseo(ValueError):
     pass
 
 
+# Cascada de `parse_fecha_chile`, en orden. Los formatos son mutuamente excluyentes: un texto
+# calza con a lo mas uno (separador, posicion del ano de 4 digitos y largo del ano difieren).
+FORMATOS_FECHA = ("%d-%m-%Y", "%d/%m/%Y", "%Y-%m-%d", "%d-%m-%y", "%d/%m/%y")
+
+# Mismos patrones que `_strptime` usa para %d, %m, %Y y %y (incluye dia con espacio, " 5").
+_DIA = r"(?P<d>3[01]|[12]\d|0[1-9]|[1-9]| [1-9])"
+_MES = r"(?P<m>1[0-2]|0[1-9]|[1-9])"
+_PATRONES_FECHA = {
+    "%d-%m-%Y": re.compile(rf"{_DIA}-{_MES}-(?P<Y>\d\d\d\d)", re.IGNORECASE),
+    "%d/%m/%Y": re.compile(rf"{_DIA}/{_MES}/(?P<Y>\d\d\d\d)", re.IGNORECASE),
+    "%Y-%m-%d": re.compile(rf"(?P<Y>\d\d\d\d)-{_MES}-{_DIA}", re.IGNORECASE),
+    "%d-%m-%y": re.compile(rf"{_DIA}-{_MES}-(?P<y>\d\d)", re.IGNORECASE),
+    "%d/%m/%y": re.compile(rf"{_DIA}/{_MES}/(?P<y>\d\d)", re.IGNORECASE),
+}
+
+
 _MONEDA_RE = re.compile(r"[^0-9,\\.\\-]")
+# Enteros ASCII de hasta 18 caracteres: caben en int64 y `Decimal(t)` ya es el valor cuantizado.
+_MAX_DIGITOS_RAPIDO = 18
+_UNIDAD = Decimal("1")
 
 
 def parse_monto_clp(texto: str) -> Decimal:
@@ -21,7 +44,30 @@ def parse_monto_clp(texto: str) -> Decimal:
     - -1.234,00
     - $ 1.234.567
     Regla MVP: CLP sin decimales en la salida (si vienen, se redondea a entero).
+
+    Por niveles: enteros planos ("150000", "-150000") van directo a `Decimal` sin regex ni
+    `quantize`; el resto pasa por `_parse_monto_memo` (memo LRU por texto). El `Decimal`
+    resultante es identico al del camino completo (mismo signo, digitos y exponente).
     """
+    t = texto.strip()
+    if _es_entero_plano(t):
+        # Exponente 0 y digitos exactos: lo mismo que `quantize(Decimal("1"))` (incluye "-0").
+        return Decimal(t)
+    return _parse_monto_memo(texto)
+
+
+def _es_entero_plano(t: str) -> bool:
+    return (
+        t.isascii()
+        and len(t) <= _MAX_DIGITOS_RAPIDO
+        and (t.isdigit() or (t[:1] == "-" and t[1:].isdigit()))
+    )
+
+
+# Memo chico a proposito: cubre montos repetidos (comisiones, cuotas) y con miles de entradas el
+# costo de cada fallo (texto unico) supera al parseo completo.
+@lru_cache(maxsize=256)
+def _parse_monto_memo(texto: str) -> Decimal:
     t = texto.strip()
     if not t:
         raise ErrorParseo("Monto vacio")
@@ -42,7 +88,28 @@ def parse_monto_clp(texto: str) -> Decimal:
     except InvalidOperation as e:
         raise ErrorParseo(f"Monto invalido: {texto!r}") from e
     # CLP: sin decimales
-    return d.quantize(Decimal("1"))
+    return d.quantize(_UNIDAD)
+
+
+def parse_montos(textos: Sequence[str]) -> tuple[array, list[int]]:
+    """
+    Parseo en bloque: montos en unidades minimas (CLP: pesos) en un `array("q")` y los indices
+    de las celdas invalidas (vacias, no numericas o fuera de int64), que quedan en 0.
+
+    Cada valor valido es `int(parse_monto_clp(texto))`.
+    """
+    montos = array("q", bytes(8 * len(textos)))
+    errores: list[int] = []
+    for i, texto in enumerate(textos):
+        t = texto.strip()
+        if _es_entero_plano(t):
+            montos[i] = int(t)
+            continue
+        try:
+            montos[i] = int(_parse_monto_memo(texto))
+        except (ErrorParseo, InvalidOperation, OverflowError):
+            errores.append(i)
+    return montos, errores
 
 
 def parse_fecha_chile(texto: str) -> date:
@@ -55,7 +122,7 @@ def parse_fecha_chile(texto: str) -> date:
     t = texto.strip()
     if not t:
         raise ErrorParseo("Fecha vacia")
-    for fmt in ("%d-%m-%Y", "%d/%m/%Y", "%Y-%m-%d", "%d-%m-%y", "%d/%m/%y"):
+    for fmt in FORMATOS_FECHA:
         try:
             dt = datetime.strptime(t, fmt)
             y = dt.year
@@ -67,9 +134,75 @@ def parse_fecha_chile(texto: str) -> date:
     raise ErrorParseo(f"Fecha invalida: {texto!r}")
 
 
+def _fecha_con_formato(t: str, fmt: str) -> date | None:
+    """
+    `parse_fecha_chile` restringido a un formato, sin `strptime`: regex precompilada + `int`.
+
+    Replica `strptime`: %y mapea 69-99 a 19xx y 00-68 a 20xx; %Y con ano < 100 se valida con
+    el ano literal (el ano 0 no existe) y luego se corre a 20xx. None si no calza.
+    """
+    m = _PATRONES_FECHA[fmt].fullmatch(t)
+    if m is None:
+        return None
+    g = m.groupdict()
+    dia, mes = int(g["d"]), int(g["m"])
+    try:
+        if g.get("y") is not None:
+            y = int(g["y"])
+            return date(y + (2000 if y <= 68 else 1900), mes, dia)
+        y = int(g["Y"])
+        if y < 100:
+            date(y, mes, dia)
+            y += 2000
+        return date(y, mes, dia)
+    except ValueError:
+        return None
+
+
+class ParserFechaColumna:
+    """
+    Parser de fechas para una columna completa (CSV/XLSX), equivalente celda a celda a
+    `parse_fecha_chile`.
+
+    Las primeras `muestra` celdas se parsean con la cascada completa, contando que formato
+    gana; luego se fija el mas frecuente (empate: el primero de la cascada) y cada celda se
+    intenta solo con ese formato. Las celdas atipicas que no calzan vuelven a la cascada, asi
+    que el resultado (y el error) es siempre el mismo que el de `parse_fecha_chile`.
+    """
+
+    def __init__(self, *, muestra: int = 32) -> None:
+        self._muestra = muestra
+        self._votos: Counter[str] = Counter()
+        self.formato: str | None = None
+
+    def _votar(self, t: str) -> None:
+        fmt = next((f for f in FORMATOS_FECHA if _PATRONES_FECHA[f].fullmatch(t)), None)
+        if fmt is None:
+            return
+        self._votos[fmt] += 1
+        if self._votos.total() >= self._muestra:
+            mayor = max(self._votos.values())
+            self.formato = next(f for f in FORMATOS_FECHA if self._votos[f] == mayor)
+
+    def __call__(self, texto: str) -> date:
+        if self.formato is not None:
+            d = _fecha_con_formato(texto.strip(), self.formato)
+            if d is not None:
+                return d
+            return parse_fecha_chile(texto)
+        d = parse_fecha_chile(texto)
+        self._votar(texto.strip())
+        return d
+
+
 def normalizar_texto(texto: str) -> str:
     return re.sub(r"\s+", " ", (texto or "").strip())
 
 
 def normalizar_referencia(texto: str) -> str:
     return re.sub(r"\s+", "", (texto or "").strip()).upper()
+
+
+def monto_canonico(monto: Decimal) -> str:
+    # Forma textual estable para claves (firma de memoria, indice del ledger): 1000 == 1000.00.
+    return format(monto.normalize(), "f")
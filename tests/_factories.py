@@ -0,0 +1,109 @@
+"""
+Constructores compartidos por los tests de matching: entidades con confianza, auditoria en memoria
+y una corrida de `conciliar` con configuracion minima.
+
+Las fechas aceptan un `int` como atajo para un dia de enero de 2026.
+"""
+
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal
+from typing import Any
+
+from conciliador_bancario.audit.audit_log import AuditEvent
+from conciliador_bancario.matching.engine import conciliar
+from conciliador_bancario.models import (
+    CampoConConfianza,
+    ConfiguracionCliente,
+    MetadataConfianza,
+    MovimientoEsperado,
+    NivelConfianza,
+    OrigenDato,
+    ResultadoConciliacion,
+    TransaccionBancaria,
+)
+
+
+class AuditMemoria:
+    def __init__(self) -> None:
+        self.eventos: list[AuditEvent] = []
+
+    def write(self, event: AuditEvent) -> None:
+        self.eventos.append(event)
+
+    def detalles(self, mensaje: str) -> list[dict[str, Any]]:
+        return [e.detalles for e in self.eventos if e.mensaje == mensaje]
+
+
+def campo(valor: Any, score: float = 0.9) -> CampoConConfianza:
+    nivel = NivelConfianza.alta if score >= 0.85 else NivelConfianza.baja
+    return CampoConConfianza(
+        valor=valor, confianza=MetadataConfianza(score=score, nivel=nivel, origen=OrigenDato.csv)
+    )
+
+
+def _fecha(fecha: date | int) -> date:
+    return fecha if isinstance(fecha, date) else date(2026, 1, fecha)
+
+
+def transaccion(
+    id_: str,
+    monto: int | str | Decimal,
+    fecha: date | int = 10,
+    *,
+    descripcion: str = "Abono",
+    referencia: str | None = None,
+    fecha_contable: date | int | None = None,
+    moneda: str = "CLP",
+    score_monto: float = 0.9,
+    score_descripcion: float = 0.9,
+) -> TransaccionBancaria:
+    return TransaccionBancaria(
+        id=id_,
+        fecha_operacion=campo(_fecha(fecha)),
+        fecha_contable=campo(_fecha(fecha_contable)) if fecha_contable else None,
+        monto=campo(Decimal(monto), score_monto),
+        moneda=moneda,
+        descripcion=campo(descripcion, score_descripcion),
+        referencia=campo(referencia) if referencia else None,
+        archivo_origen="x.csv",
+        origen=OrigenDato.csv,
+    )
+
+
+def esperado(
+    id_: str,
+    monto: int | str | Decimal,
+    fecha: date | int = 10,
+    *,
+    descripcion: str = "F",
+    referencia: str | None = None,
+    tercero: str | None = None,
+    moneda: str = "CLP",
+) -> MovimientoEsperado:
+    return MovimientoEsperado(
+        id=id_,
+        fecha=campo(_fecha(fecha)),
+        monto=campo(Decimal(monto)),
+        moneda=moneda,
+        descripcion=campo(descripcion),
+        referencia=campo(referencia) if referencia else None,
+        tercero=campo(tercero) if tercero else None,
+    )
+
+
+def conciliar_con(
+    cfg: ConfiguracionCliente,
+    txs: list[TransaccionBancaria],
+    exps: list[MovimientoEsperado],
+    audit: AuditMemoria | None = None,
+    run_id: str = "r",
+) -> ResultadoConciliacion:
+    return conciliar(
+        cfg=cfg,
+        transacciones=txs,
+        esperados=exps,
+        audit=audit if audit is not None else AuditMemoria(),  # type: ignore[arg-type]
+        run_id=run_id,
+    )
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import random
+from pathlib import Path
+
+import pytest
+from conciliador_bancario.audit.audit_log import JsonlAuditWriter, NullAuditWriter
+from conciliador_bancario.errors import ErrorEntradaUsuario
+from conciliador_bancario.ingestion.base import ErrorIngestion
+from conciliador_bancario.ingestion.csv_adapter import (
+    cargar_movimientos_esperados_csv,
+    cargar_transacciones_csv,
+)
+from conciliador_bancario.ingestion.csv_paralelo import (
+    cargar_movimientos_esperados_csv_paralelo,
+    cargar_transacciones_csv_paralelo,
+    rangos_de_registros,
+)
+from conciliador_bancario.models import ConfiguracionCliente, LimitesIngesta
+from conciliador_bancario.pipeline import ejecutar_run
+
+_CHUNK = 2048
+
+
+def _cfg(**limites: int) -> ConfiguracionCliente:
+    return ConfiguracionCliente(
+        cliente="X", moneda_default="CLP", limites_ingesta=LimitesIngesta(**limites)
+    )
+
+
+def _banco(tmp_path: Path, n: int = 1500, *, seed: int = 0, extra: str = "") -> Path:
+    """CSV con glosas multilinea entre comillas, comillas escapadas y filas en blanco."""
+    rng = random.Random(seed)
+    filas = ["fecha_operacion;monto;descripcion;referencia"]
+    for i in range(n):
+        desc = rng.choice(
+            [f"Pago {i}", f'"Pago\n{i}\nmultilinea"', f'"Pago ""{i}"" con; separador"']
+        )
+        filas.append(f"{1 + i % 28:02d}/01/2026;{1000 + i};{desc};FAC-{i}")
+        if rng.random() < 0.02:
+            filas.append(rng.choice(["", ";;;"]))
+    p = tmp_path / "banco.csv"
+    p.write_text("\r\n".join(filas) + "\r\n" + extra, encoding="utf-8")
+    return p
+
+
+def _paralelo(p: Path, cfg: ConfiguracionCliente, audit=None, workers: int = 3):
+    return cargar_transacciones_csv_paralelo(
+        p, cfg=cfg, audit=audit or NullAuditWriter(), workers=workers, min_bytes_chunk=_CHUNK
+    )
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_paralelo_equivale_a_serial(tmp_path: Path, seed: int) -> None:
+    p = _banco(tmp_path, seed=seed)
+    serial = cargar_transacciones_csv(p, cfg=_cfg(), audit=NullAuditWriter())
+    paralelo = _paralelo(p, _cfg())
+    assert len(serial) == 1500
+    assert [t.fila_origen for t in paralelo] == [t.fila_origen for t in serial]
+    assert paralelo == serial
+
+
+def test_esperados_paralelo_equivale_a_serial(tmp_path: Path) -> None:
+    p = tmp_path / "esperados.csv"
+    filas = ["id,fecha,monto,descripcion"] + [
+        f'E{i},{1 + i % 28:02d}/01/2026,{500 + i},"Factura\n{i}"' for i in range(800)
+    ]
+    p.write_text("\n".join(filas), encoding="utf-8")
+    serial = cargar_movimientos_esperados_csv(p, cfg=_cfg(), audit=NullAuditWriter())
+    paralelo = cargar_movimientos_esperados_csv_paralelo(
+        p, cfg=_cfg(), audit=NullAuditWriter(), workers=2, min_bytes_chunk=_CHUNK
+    )
+    assert paralelo == serial and len(serial) == 800
+
+
+def test_cortes_en_limites_de_registro(tmp_path: Path) -> None:
+    data = _banco(tmp_path).read_bytes()
+    fin_encabezado, rangos = rangos_de_registros(data, 12)
+    assert data[:fin_encabezado].endswith(b"\r\n") and data.count(b'"', 0, fin_encabezado) == 0
+    assert len(rangos) == 12
+    assert rangos[0][0] == fin_encabezado and rangos[-1][1] == len(data)
+    for (_, fin), (inicio, _) in zip(rangos, rangos[1:], strict=False):
+        assert fin == inicio
+        assert data[fin - 1 : fin] == b"\n"
+        assert data.count(b'"', 0, fin) % 2 == 0
+
+
+@pytest.mark.parametrize("limite", [{"max_tabular_rows": 1234}, {"max_tabular_cells": 4 * 999 + 2}])
+def test_limites_exactos_entre_chunks(tmp_path: Path, limite: dict[str, int]) -> None:
+    p = _banco(tmp_path)
+    errores = []
+    for nombre, cargar in (
+        ("serial", lambda a: cargar_transacciones_csv(p, cfg=_cfg(**limite), audit=a)),
+        ("paralelo", lambda a: _paralelo(p, _cfg(**limite), a)),
+    ):
+        audit_path = tmp_path / f"{nombre}.jsonl"
+        with pytest.raises(ErrorIngestion) as e:
+            cargar(JsonlAuditWriter(audit_path))
+        errores.append((str(e.value), audit_path.read_text(encoding="utf-8")))
+    assert errores[0] == errores[1]
+    assert '"tipo":"ingestion_limit"' in errores[1][1]
+
+
+def test_error_de_parseo_reporta_la_primera_fila(tmp_path: Path) -> None:
+    p = _banco(tmp_path, 400, extra="99/99/2026;1;Mala;X\r\n")
+    texto = p.read_text(encoding="utf-8").replace(";1300;", ";monto-malo;", 1)
+    p.write_text(texto, encoding="utf-8")
+    with pytest.raises(ErrorIngestion) as serial:
+        cargar_transacciones_csv(p, cfg=_cfg(), audit=NullAuditWriter())
+    with pytest.raises(ErrorIngestion) as paralelo:
+        _paralelo(p, _cfg())
+    assert "monto invalido" in str(serial.value)
+    assert str(paralelo.value) == str(serial.value)
+
+
+def test_comillas_sueltas_no_cambian_el_resultado(tmp_path: Path) -> None:
+    # Una comilla a mitad de campo es literal para `csv` pero invierte la paridad de los cortes:
+    # el chunk que queda dentro de una glosa multilinea no es CSV estricto y se parsea en serie.
+    p = _banco(tmp_path, 600, seed=1)
+    lineas = p.read_bytes().decode("utf-8").split("\r\n")
+    lineas.insert(1, '05/01/2026;1;Pago 5" pulgadas;R-1')
+    lineas.insert(2, '05/01/2026;2;"abc"def;R-2')
+    p.write_bytes("\r\n".join(lineas).encode())
+    serial = cargar_transacciones_csv(p, cfg=_cfg(), audit=NullAuditWriter())
+    assert serial[0].descripcion.valor == 'Pago 5" pulgadas'
+    assert _paralelo(p, _cfg()) == serial
+
+
+def test_comilla_suelta_en_encabezado_no_pierde_filas(tmp_path: Path) -> None:
+    # La paridad impar del encabezado correria su corte hasta la siguiente comilla suelta,
+    # tragandose filas de datos: debe detectarse y parsear en serie.
+    p = _banco(tmp_path, 600, seed=1)
+    lineas = p.read_bytes().decode("utf-8").split("\r\n")
+    lineas[0] += ';nota"x'
+    lineas.insert(3, '05/01/2026;1;Pago 5" pulgadas;R-1')
+    p.write_bytes("\r\n".join(lineas).encode())
+    serial = cargar_transacciones_csv(p, cfg=_cfg(), audit=NullAuditWriter())
+    assert len(serial) == 601
+    paralelo = _paralelo(p, _cfg())
+    assert [t.id for t in paralelo] == [t.id for t in serial]
+    assert paralelo == serial
+
+
+def test_run_valida_workers_ingesta(tmp_path: Path) -> None:
+    ejemplos = Path(__file__).resolve().parents[1] / "examples"
+    with pytest.raises(ErrorEntradaUsuario, match="--workers-ingesta"):
+        ejecutar_run(
+            config=ejemplos / "config_cliente.yaml",
+            bank=ejemplos / "banco_ejemplo.csv",
+            expected=ejemplos / "movimientos_esperados.csv",
+            out_dir=tmp_path,
+            mask=True,
+            dry_run=True,
+            log_level="INFO",
+            enable_ocr=False,
+            workers_ingesta=0,
+        )
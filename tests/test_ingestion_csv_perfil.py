@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import csv
+from pathlib import Path
+
+import pytest
+from conciliador_bancario.audit.audit_log import NullAuditWriter
+from conciliador_bancario.ingestion import csv_adapter
+from conciliador_bancario.ingestion.csv_adapter import (
+    PerfilCSV,
+    cargar_transacciones_csv,
+    detectar_perfil_csv,
+)
+from conciliador_bancario.models import ConfiguracionCliente
+
+_ENCABEZADO = "fecha_operacion;monto;descripcion\n"
+
+
+@pytest.fixture(autouse=True)
+def _cache_limpio() -> None:
+    csv_adapter._delimitador_por_encabezado.clear()
+
+
+def _cfg() -> ConfiguracionCliente:
+    return ConfiguracionCliente(cliente="X", moneda_default="CLP")
+
+
+def test_cp1252_no_se_corrompe(tmp_path: Path) -> None:
+    p = tmp_path / "banco.csv"
+    p.write_bytes((_ENCABEZADO + "05/01/2026;1000;Depósito Peñalolén\n").encode("cp1252"))
+    assert detectar_perfil_csv(p) == PerfilCSV(encoding="cp1252", delimiter=";")
+    (tx,) = cargar_transacciones_csv(p, cfg=_cfg(), audit=NullAuditWriter())
+    assert tx.descripcion.valor == "Depósito Peñalolén"
+
+
+def test_bom_utf8_no_contamina_el_primer_encabezado(tmp_path: Path) -> None:
+    p = tmp_path / "banco.csv"
+    p.write_bytes(("﻿" + _ENCABEZADO + "05/01/2026;1000;Pago\n").encode("utf-8"))
+    assert detectar_perfil_csv(p).encoding == "utf-8-sig"
+    (tx,) = cargar_transacciones_csv(p, cfg=_cfg(), audit=NullAuditWriter())
+    assert str(tx.fecha_operacion.valor) == "2026-01-05"
+
+
+def test_perfil_lee_solo_un_prefijo_acotado(tmp_path: Path) -> None:
+    # Byte invalido en UTF-8 mas alla del prefijo: no se lee, el perfil sigue siendo UTF-8.
+    p = tmp_path / "banco.csv"
+    relleno = "05/01/2026;1000;Pago ñandú\n" * (2 * csv_adapter._BYTES_PERFIL // 25)
+    p.write_bytes((_ENCABEZADO + relleno).encode("utf-8") + b"05/01/2026;1;\xe9\n")
+    assert detectar_perfil_csv(p) == PerfilCSV(encoding="utf-8", delimiter=";")
+
+
+def test_caracter_multibyte_cortado_en_el_borde_del_prefijo(tmp_path: Path) -> None:
+    p = tmp_path / "banco.csv"
+    cuerpo = _ENCABEZADO.encode("utf-8")
+    cuerpo += b"x" * (csv_adapter._BYTES_PERFIL - len(cuerpo) - 1) + "ñ\n".encode()
+    p.write_bytes(cuerpo)
+    assert detectar_perfil_csv(p).encoding == "utf-8"
+
+
+def test_delimitador_cacheado_por_encabezado(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    llamadas = 0
+    sniff_original = csv.Sniffer.sniff
+
+    def sniff(self: csv.Sniffer, *args: object, **kwargs: object) -> object:
+        nonlocal llamadas
+        llamadas += 1
+        return sniff_original(self, *args, **kwargs)
+
+    monkeypatch.setattr(csv.Sniffer, "sniff", sniff)
+    for i in range(3):
+        p = tmp_path / f"banco_{i}.csv"
+        p.write_text(_ENCABEZADO + f"0{i + 1}/01/2026;{1000 + i};Pago {i}\n", encoding="utf-8")
+        assert detectar_perfil_csv(p).delimiter == ";"
+    assert llamadas == 1
+
+    otro = tmp_path / "esperados.csv"
+    otro.write_text("fecha,monto,descripcion\n05/01/2026,1000,Factura\n", encoding="utf-8")
+    assert detectar_perfil_csv(otro).delimiter == ","
+    assert llamadas == 2
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from conciliador_bancario.audit.audit_log import JsonlAuditWriter, NullAuditWriter
+from conciliador_bancario.ingestion.base import ErrorIngestion
+from conciliador_bancario.ingestion.detector import (
+    cargar_movimientos_esperados,
+    cargar_transacciones_bancarias,
+    iter_movimientos_esperados,
+    iter_transacciones_bancarias,
+)
+from conciliador_bancario.matching.engine import conciliar
+from conciliador_bancario.matching.streaming import conciliar_streaming
+from conciliador_bancario.models import ConfiguracionCliente, LimitesIngesta, Match
+
+EXAMPLES = Path(__file__).resolve().parents[1] / "examples"
+
+
+def _cfg(**limites: int) -> ConfiguracionCliente:
+    return ConfiguracionCliente(
+        cliente="X", moneda_default="CLP", limites_ingesta=LimitesIngesta(**limites)
+    )
+
+
+def _banco_csv(tmp_path: Path, n: int) -> Path:
+    p = tmp_path / "banco.csv"
+    filas = ["fecha_operacion,monto,descripcion,referencia"]
+    filas += [f"{1 + i * 28 // n:02d}/01/2026,{1000 + i},Pago {i},FAC-{i}" for i in range(n)]
+    p.write_text("\n".join(filas) + "\n", encoding="utf-8")
+    return p
+
+
+def _esperados_csv(tmp_path: Path, n: int) -> Path:
+    p = tmp_path / "esperados.csv"
+    filas = ["id,fecha,monto,descripcion,referencia"]
+    filas += [
+        f"E{i},{1 + i * 28 // n:02d}/01/2026,{1000 + i},Factura {i},FAC-{i}" for i in range(n)
+    ]
+    p.write_text("\n".join(filas) + "\n", encoding="utf-8")
+    return p
+
+
+@pytest.mark.parametrize("archivo", ["banco_ejemplo.csv", "banco_ejemplo.xml"])
+def test_iter_transacciones_equivale_a_cargar(archivo: str) -> None:
+    cfg = _cfg()
+    path = EXAMPLES / archivo
+    lista = cargar_transacciones_bancarias(path, cfg=cfg, audit=NullAuditWriter())
+    gen = list(iter_transacciones_bancarias(path, cfg=cfg, audit=NullAuditWriter()))
+    assert lista and gen == lista
+
+
+def test_iter_esperados_xlsx_equivale_a_cargar(tmp_path: Path) -> None:
+    from openpyxl import Workbook
+
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["id", "fecha", "monto", "descripcion"])
+    for i in range(5):
+        ws.append([f"E{i}", f"0{i + 1}/01/2026", 1000 + i, f"Factura {i}"])
+    path = tmp_path / "esperados.xlsx"
+    wb.save(path)
+    cfg = _cfg()
+    lista = cargar_movimientos_esperados(path, cfg=cfg, audit=NullAuditWriter())
+    gen = list(iter_movimientos_esperados(path, cfg=cfg, audit=NullAuditWriter()))
+    assert [e.id for e in gen] == ["E0", "E1", "E2", "E3", "E4"]
+    assert gen == lista
+
+
+def test_iter_entrega_filas_antes_de_cruzar_limite(tmp_path: Path) -> None:
+    path = _banco_csv(tmp_path, 5)
+    audit_path = tmp_path / "audit.jsonl"
+    gen = iter_transacciones_bancarias(
+        path, cfg=_cfg(max_tabular_rows=2), audit=JsonlAuditWriter(audit_path)
+    )
+    assert [t.fila_origen for t in (next(gen), next(gen))] == [2, 3]
+    with pytest.raises(ErrorIngestion, match="max_tabular_rows"):
+        next(gen)
+    assert '"tipo":"ingestion_limit"' in audit_path.read_text(encoding="utf-8")
+
+
+def test_iter_es_perezoso_y_valida_al_consumir(tmp_path: Path) -> None:
+    path = tmp_path / "esperados.json"
+    path.write_text("{}", encoding="utf-8")
+    gen = iter_movimientos_esperados(path, cfg=_cfg(), audit=NullAuditWriter())
+    with pytest.raises(ErrorIngestion, match="no soportado"):
+        next(gen)
+
+
+def test_iter_alimenta_conciliar_streaming(tmp_path: Path) -> None:
+    # Archivos ya ordenados por fecha: `conciliar_streaming` los recorre sin materializarlos.
+    cfg = _cfg()
+    bank, expected = _banco_csv(tmp_path, 40), _esperados_csv(tmp_path, 40)
+    audit = NullAuditWriter()
+    txs = cargar_transacciones_bancarias(bank, cfg=cfg, audit=audit)
+    exps = cargar_movimientos_esperados(expected, cfg=cfg, audit=audit)
+    ref = conciliar(cfg=cfg, transacciones=txs, esperados=exps, audit=audit, run_id="r")
+
+    salida = conciliar_streaming(
+        cfg=cfg,
+        transacciones=lambda: iter_transacciones_bancarias(bank, cfg=cfg, audit=audit),
+        esperados=lambda: iter_movimientos_esperados(expected, cfg=cfg, audit=audit),
+        audit=audit,
+        run_id="r",
+    )
+    matches = sorted((m for m in salida if isinstance(m, Match)), key=lambda m: m.id)
+    assert [m.id for m in matches] == [m.id for m in ref.matches]
+    assert len(matches) == 40
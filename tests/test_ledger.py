@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+from datetime import date
+from pathlib import Path
+
+from _factories import esperado, transaccion
+from conciliador_bancario.cli import app
+from conciliador_bancario.ledger import _SQL_ARRASTRE, LedgerPartidas
+from conciliador_bancario.models import ResultadoConciliacion
+from typer.testing import CliRunner
+
+
+def _write(path: Path, *lineas: str) -> Path:
+    path.write_text("\n".join(lineas) + "\n", encoding="utf-8")
+    return path
+
+
+def _run(tmp_path: Path, nombre: str, bank: Path, exp: Path, *extra: str):
+    cfg = _write(tmp_path / "config.yaml", "cliente: 'X'")
+    out = tmp_path / nombre
+    args = ["run", "--config", str(cfg), "--bank", str(bank), "--expected", str(exp)]
+    res = CliRunner().invoke(app, [*args, "--out", str(out), *extra])
+    return res, out
+
+
+def _eventos_ledger(out: Path) -> list[dict]:
+    lineas = (out / "audit.jsonl").read_text(encoding="utf-8").splitlines()
+    return [e["detalles"] for e in map(json.loads, lineas) if e["tipo"] == "ledger"]
+
+
+def test_arrastre_entre_periodos(tmp_path: Path) -> None:
+    ledger = tmp_path / "ledger.db"
+    b1 = _write(
+        tmp_path / "banco_01.csv",
+        "fecha_operacion,monto,moneda,descripcion,referencia",
+        "05/01/2026,150000,CLP,Transferencia ACME,FAC-1001",
+    )
+    e1 = _write(
+        tmp_path / "esperados_01.csv",
+        "id,fecha,monto,moneda,descripcion,referencia",
+        "EXP-001,2026-01-05,150000,CLP,ACME,FAC-1001",
+        "EXP-002,2026-01-30,80000,CLP,Beta,FAC-1002",
+        "EXP-003,2026-01-31,45000,CLP,Gamma,",
+    )
+    b2 = _write(
+        tmp_path / "banco_02.csv",
+        "fecha_operacion,monto,moneda,descripcion,referencia",
+        "02/02/2026,80000,CLP,Pago Beta,FAC-1002",
+        "01/02/2026,45000,CLP,Pago Gamma,",
+    )
+    e2 = _write(tmp_path / "esperados_02.csv", "id,fecha,monto,moneda,descripcion,referencia")
+
+    # --dry-run lee el ledger pero no lo modifica.
+    res, out = _run(tmp_path, "dry", b1, e1, "--dry-run", "--ledger", str(ledger))
+    assert res.exit_code == 0, res.stdout
+    assert _eventos_ledger(out)[-1] == {"dry_run": True, "banco": 0, "esperados": 0}
+
+    res, out = _run(tmp_path, "enero", b1, e1, "--ledger", str(ledger))
+    assert res.exit_code == 0, res.stdout
+    assert _eventos_ledger(out)[-1] == {"retiradas": 0, "banco": 0, "esperados": 2}
+
+    res, out = _run(tmp_path, "febrero", b2, e2, "--ledger", str(ledger))
+    assert res.exit_code == 0, res.stdout
+    arrastre, cambios = _eventos_ledger(out)
+    assert (arrastre["banco"], arrastre["esperados"]) == (0, 2)
+    matches = json.loads((out / "run.json").read_text(encoding="utf-8"))["matches"]
+    por_exp = {m["movimientos_esperados"][0]: m["estado"] for m in matches}
+    assert por_exp == {"EXP-002": "conciliado", "EXP-003": "sugerido"}
+    # Solo lo conciliado se retira; el sugerido queda abierto en ambos lados.
+    assert cambios == {"retiradas": 1, "banco": 1, "esperados": 1}
+
+    # Sin --ledger, febrero no ve los pendientes de enero.
+    res, out = _run(tmp_path, "sin_ledger", b2, e2)
+    assert json.loads((out / "run.json").read_text(encoding="utf-8"))["matches"] == []
+
+    # El arrastre entra al run_id (el fingerprint no cambia); toda la auditoria lleva el final.
+    res, vacio = _run(tmp_path, "febrero_vacio", b2, e2, "--ledger", str(tmp_path / "otro.db"))
+    run_ids = {d: _run_ids(tmp_path / d) for d in ("febrero", "febrero_vacio", "sin_ledger")}
+    assert all(len(ids) == 1 for ids in run_ids.values())
+    assert len(set.union(*run_ids.values())) == 3
+    fingerprints = {
+        json.dumps(
+            json.loads((tmp_path / d / "run.json").read_text(encoding="utf-8"))["fingerprint"]
+        )
+        for d in run_ids
+    }
+    assert len(fingerprints) == 1
+
+
+def _run_ids(out: Path) -> set[str]:
+    lineas = (out / "audit.jsonl").read_text(encoding="utf-8").splitlines()
+    ids = {json.loads(linea)["run_id"] for linea in lineas}
+    ids.add(json.loads((out / "run.json").read_text(encoding="utf-8"))["run_id"])
+    return ids
+
+
+def test_ledger_se_cierra_si_la_corrida_falla(tmp_path: Path, monkeypatch) -> None:
+    b = _write(tmp_path / "b.csv", "fecha_operacion,monto,descripcion", "05/01/2026,1000,X")
+    e = _write(tmp_path / "e.csv", "id,fecha,monto,descripcion", "EXP-1,2026-01-05,1000,X")
+    cerrados = []
+    monkeypatch.setattr(LedgerPartidas, "close", lambda self: cerrados.append(self._con.close()))
+
+    def _falla(self, **kwargs):
+        raise RuntimeError("arrastre")
+
+    monkeypatch.setattr(LedgerPartidas, "arrastre", _falla)
+    res, out = _run(tmp_path, "a", b, e, "--ledger", str(tmp_path / "l.db"))
+    assert res.exit_code == 10
+    assert len(cerrados) == 1
+    # Los eventos de ingesta retenidos se escriben igual, con el run_id base.
+    eventos = [
+        json.loads(x) for x in (out / "audit.jsonl").read_text(encoding="utf-8").splitlines()
+    ]
+    ingesta = [ev for ev in eventos if ev["tipo"] == "ingestion"]
+    assert len(ingesta) == 2 and len({ev["run_id"] for ev in ingesta}) == 1
+
+
+def test_consulta_indexada_por_monto_y_fecha(tmp_path: Path) -> None:
+    exps = [esperado(f"EXP-{i:05d}", 1000 + i % 50, date(2020 + i % 6, 1, 1)) for i in range(3000)]
+    with LedgerPartidas(tmp_path / "l.db") as libro:
+        res = ResultadoConciliacion(
+            transacciones_bancarias=[],
+            movimientos_esperados=exps,
+            matches=[],
+            hallazgos=[],
+            run_id="r",
+        )
+        libro.actualizar(resultado=res, run_id="r")
+        plan = " ".join(
+            str(f[-1]) for f in libro._con.execute("EXPLAIN QUERY PLAN " + _SQL_ARRASTRE, ("x", 0))
+        )
+        assert "ix_partidas_monto_fecha" in plan and "SCAN p" not in plan
+
+        tx = transaccion("TX-1", "1007.00", 2)
+        _, arr = libro.arrastre(transacciones=[tx], esperados=[], desde=date(2025, 1, 1))
+    # Monto 1007 (1000 + i % 50 == 7) y solo el ano 2025 (i % 6 == 5).
+    assert [e.id for e in arr] == [f"EXP-{i:05d}" for i in range(3000) if i % 150 == 107]
+    assert arr[0] == exps[107]
+
+
+def test_ledger_invalido_o_incompatible(tmp_path: Path) -> None:
+    b = _write(tmp_path / "b.csv", "fecha_operacion,monto,descripcion", "05/01/2026,1000,X")
+    e = _write(tmp_path / "e.csv", "id,fecha,monto,descripcion", "EXP-1,2026-01-05,1000,X")
+    corrupto = _write(tmp_path / "corrupto.db", "no es sqlite")
+    res, _ = _run(tmp_path, "a", b, e, "--ledger", str(corrupto))
+    assert res.exit_code == 5
+
+    viejo = tmp_path / "viejo.db"
+    LedgerPartidas(viejo).close()
+    with sqlite3.connect(viejo) as con:
+        con.execute("UPDATE meta SET valor = '99' WHERE clave = 'version'")
+    res, _ = _run(tmp_path, "b", b, e, "--ledger", str(viejo))
+    assert res.exit_code == 5
+
+    res, out = _run(tmp_path, "c", b, e, "--dry-run")
+    res, _ = _run(tmp_path, "d", b, e, "--ledger", str(tmp_path / "l.db"), "--since-run", str(out))
+    assert res.exit_code == 2
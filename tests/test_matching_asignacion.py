@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+from _factories import AuditMemoria, conciliar_con, esperado, transaccion
+from conciliador_bancario.matching.asignacion import asignacion_minima
+from conciliador_bancario.models import ConfiguracionCliente, EstadoMatch, ReglaAsignacionMontoFecha
+
+
+def _conciliar(txs, exps, audit=None, **regla):
+    cfg = ConfiguracionCliente(
+        cliente="X",
+        umbral_autoconcilia=0.0,
+        regla_asignacion_monto_fecha=ReglaAsignacionMontoFecha(habilitada=True, **regla),
+    )
+    return conciliar_con(cfg, txs, exps, audit)
+
+
+def _fuerza_bruta(ft: list[int], fe: list[int], w: int) -> tuple[list[tuple[int, int]], int, int]:
+    """Interseccion de todas las asignaciones de cardinalidad maxima y costo minimo."""
+    mejor: tuple[int, int] | None = None
+    soluciones: list[frozenset[tuple[int, int]]] = []
+
+    def rec(i: int, usados: frozenset[int], actual: list[tuple[int, int]]) -> None:
+        nonlocal mejor, soluciones
+        if i == len(ft):
+            clave = (-len(actual), sum(abs(ft[a] - fe[b]) for a, b in actual))
+            if mejor is None or clave < mejor:
+                mejor, soluciones = clave, [frozenset(actual)]
+            elif clave == mejor:
+                soluciones.append(frozenset(actual))
+            return
+        rec(i + 1, usados, actual)
+        for j in range(len(fe)):
+            if j not in usados and abs(ft[i] - fe[j]) <= w:
+                rec(i + 1, usados | {j}, actual + [(i, j)])
+
+    rec(0, frozenset(), [])
+    assert mejor is not None
+    return sorted(frozenset.intersection(*soluciones)), -mejor[0], mejor[1]
+
+
+def test_asignacion_minima_equivale_a_fuerza_bruta() -> None:
+    rng = random.Random(0)
+    for _ in range(400):
+        ft = [rng.randint(0, 8) for _ in range(rng.randint(0, 5))]
+        fe = [rng.randint(0, 8) for _ in range(rng.randint(0, 5))]
+        w = rng.randint(0, 3)
+        r = asignacion_minima(ft, fe, w, max_operaciones=10**9)
+        assert (r.unicos, r.asignados, r.costo) == _fuerza_bruta(ft, fe, w)
+
+
+def test_cluster_ambiguo_sugiere_par_unico() -> None:
+    # TX-1 tiene dos candidatos (monto_fecha es ambiguo); el optimo global es unico.
+    txs = [transaccion("TX-1", 450_000, 10), transaccion("TX-2", 450_000, 12)]
+    exps = [esperado("EXP-1", 450_000, 10), esperado("EXP-2", 450_000, 13)]
+    matches = sorted(_conciliar(txs, exps).matches, key=lambda m: m.transacciones_bancarias)
+    assert [
+        (m.transacciones_bancarias, m.movimientos_esperados, m.regla, m.estado) for m in matches
+    ] == [
+        (["TX-1"], ["EXP-1"], "monto_fecha_asignacion", EstadoMatch.sugerido),
+        (["TX-2"], ["EXP-2"], "monto_fecha_asignacion", EstadoMatch.sugerido),
+    ]
+    assert [m.score for m in matches] == [0.75, 0.70]
+    assert "delta total 1 dias" in matches[0].explicacion
+
+
+def test_empate_no_sugiere() -> None:
+    # Dos tx el mismo dia: ambas asignaciones cuestan lo mismo.
+    res = _conciliar(
+        [transaccion("TX-1", 450_000, 10), transaccion("TX-2", 450_000, 10)],
+        [esperado("EXP-1", 450_000, 11), esperado("EXP-2", 450_000, 12)],
+    )
+    assert res.matches == []
+
+
+@pytest.mark.parametrize("regla", [{"max_nodos": 3}, {"max_operaciones": 1}])
+def test_topes_excedidos_no_sugieren(regla: dict) -> None:
+    audit = AuditMemoria()
+    txs = [transaccion("TX-1", 450_000, 10), transaccion("TX-2", 450_000, 12)]
+    exps = [esperado("EXP-1", 450_000, 10), esperado("EXP-2", 450_000, 13)]
+    assert _conciliar(txs, exps, audit, **regla).matches == []
+    (stats,) = (
+        e.detalles for e in audit.eventos if e.detalles.get("regla") == "monto_fecha_asignacion"
+    )
+    assert stats["componentes_excedidos_tope"] + stats["componentes_excedidos_presupuesto"] == 1
+
+
+def test_deshabilitada_por_defecto() -> None:
+    cfg = ConfiguracionCliente(cliente="X", umbral_autoconcilia=0.0)
+    assert not cfg.regla_asignacion_monto_fecha.habilitada
+    res = conciliar_con(
+        cfg,
+        [transaccion("TX-1", 450_000, 10), transaccion("TX-2", 450_000, 12)],
+        [esperado("EXP-1", 450_000, 10), esperado("EXP-2", 450_000, 13)],
+    )
+    assert res.matches == []
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import itertools
+from datetime import date
+from decimal import Decimal
+
+from conciliador_bancario.matching.confianza import (
+    BIT_BLOQUEA,
+    BIT_MONTO,
+    BIT_REFERENCIA,
+    TablaConfianza,
+)
+from conciliador_bancario.models import (
+    CampoConConfianza,
+    ConfiguracionCliente,
+    MetadataConfianza,
+    MovimientoEsperado,
+    NivelConfianza,
+    OrigenDato,
+    TransaccionBancaria,
+)
+
+CFG = ConfiguracionCliente(cliente="X", umbral_confianza_campos=0.8)
+
+
+def _campo(valor, score: float) -> CampoConConfianza:
+    nivel = NivelConfianza.alta if score >= 0.85 else NivelConfianza.baja
+    return CampoConConfianza(
+        valor=valor, confianza=MetadataConfianza(score=score, nivel=nivel, origen=OrigenDato.csv)
+    )
+
+
+def _tx(id_: str, scores: tuple[float, float, float, float], bloquea: bool = False):
+    f, m, d, r = scores
+    return TransaccionBancaria(
+        id=id_,
+        bloquea_autoconcilia=bloquea,
+        motivo_bloqueo_autoconcilia="OCR" if bloquea else None,
+        fecha_operacion=_campo(date(2026, 1, 1), f),
+        monto=_campo(Decimal(1), m),
+        descripcion=_campo("x", d),
+        referencia=_campo("R", r),
+        archivo_origen="x.csv",
+        origen=OrigenDato.csv,
+    )
+
+
+def _exp(id_: str, scores: tuple[float, float, float, float]):
+    f, m, d, r = scores
+    return MovimientoEsperado(
+        id=id_,
+        fecha=_campo(date(2026, 1, 1), f),
+        monto=_campo(Decimal(1), m),
+        descripcion=_campo("x", d),
+        referencia=_campo("R", r),
+    )
+
+
+def _referencia(txs, exps) -> tuple[bool, str | None]:
+    # Evaluacion campo a campo (politica documentada), usada como oraculo.
+    u = CFG.umbral_confianza_campos
+    for tx in txs:
+        if tx.bloquea_autoconcilia:
+            return True, tx.motivo_bloqueo_autoconcilia
+        for campo, nombre in (
+            (tx.fecha_operacion, "fecha_operacion"),
+            (tx.monto, "monto"),
+            (tx.descripcion, "descripcion"),
+            (tx.referencia, "referencia"),
+        ):
+            if campo.confianza.score < u:
+                return True, f"Confianza insuficiente en {nombre} (banco)."
+    for exp in exps:
+        for campo, nombre in (
+            (exp.fecha, "fecha"),
+            (exp.monto, "monto"),
+            (exp.descripcion, "descripcion"),
+            (exp.referencia, "referencia"),
+        ):
+            if campo.confianza.score < u:
+                return True, f"Confianza insuficiente en {nombre} (esperado)."
+    return False, None
+
+
+def test_bloqueo_replica_orden_de_motivos() -> None:
+    combos = list(itertools.product((0.5, 0.9), repeat=4))
+    txs = [_tx(f"TX-{i}", s, bloquea=(i % 7 == 0)) for i, s in enumerate(combos)]
+    exps = [_exp(f"EXP-{i}", s) for i, s in enumerate(combos)]
+    tabla = TablaConfianza(CFG, txs, exps)
+    for tx in txs:
+        for exp in exps:
+            assert tabla.bloqueo([tx], [exp]) == _referencia([tx], [exp])
+    assert tabla.bloqueo(txs[1:3], exps) == _referencia(txs[1:3], exps)
+    assert tabla.bloqueo([], []) == (False, None)
+
+
+def test_mascaras_compactas() -> None:
+    tx = _tx("TX-1", (0.9, 0.5, 0.9, 0.5), bloquea=True)
+    tabla = TablaConfianza(CFG, [tx], [])
+    assert tabla.mascara_tx(tx) == BIT_BLOQUEA | BIT_MONTO | BIT_REFERENCIA
+
+
+def test_ids_duplicados_no_comparten_mascara() -> None:
+    ok = _tx("TX-1", (0.9, 0.9, 0.9, 0.9))
+    malo = _tx("TX-1", (0.5, 0.9, 0.9, 0.9))
+    tabla = TablaConfianza(CFG, [ok, malo], [])
+    assert tabla.bloqueo([ok], []) == (False, None)
+    assert tabla.bloqueo([malo], [])[0] is True
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import random
+
+from _factories import conciliar_con, esperado, transaccion
+from conciliador_bancario.matching.descripcion_similar import tokens_descripcion
+from conciliador_bancario.matching.indices import IndiceMinHashLSH, jaccard
+from conciliador_bancario.models import ConfiguracionCliente, EstadoMatch, ReglaDescripcionSimilar
+
+
+def _conciliar(txs, exps, **regla):
+    cfg = ConfiguracionCliente(
+        cliente="X",
+        umbral_autoconcilia=0.0,
+        regla_descripcion_similar=ReglaDescripcionSimilar(habilitada=True, **regla),
+    )
+    return conciliar_con(cfg, txs, exps)
+
+
+def test_tokens_descripcion() -> None:
+    assert tokens_descripcion("Transferencia de Compañía  Ñuñoa-Ltda 123") == frozenset(
+        {"TRANSFERENCIA", "COMPANIA", "NUNOA", "LTDA", "123"}
+    )
+
+
+def test_lsh_no_pierde_pares_muy_similares_y_es_determinista() -> None:
+    rng = random.Random(3)
+    vocab = [f"W{i}" for i in range(300)]
+    docs = [frozenset(rng.sample(vocab, 8)) for _ in range(300)]
+    exps = [
+        esperado(f"EXP-{i:04d}", 1000, 12, descripcion=" ".join(sorted(d)))
+        for i, d in enumerate(docs)
+    ]
+    indice = IndiceMinHashLSH(zip(docs, exps, strict=True), bandas=16, filas=4)
+    otro = IndiceMinHashLSH(zip(docs, exps, strict=True), bandas=16, filas=4)
+    for d in docs[:50]:
+        consulta = frozenset(list(sorted(d))[:7] + ["EXTRA"])
+        got = [(s, e.id) for s, e in indice.buscar(consulta, 0.5)]
+        assert got == [(s, e.id) for s, e in otro.buscar(consulta, 0.5)]
+        # Jaccard 0.75 => probabilidad de colision > 0.99 con 16x4.
+        oraculo = [
+            (s, e.id)
+            for doc, e in zip(docs, exps, strict=True)
+            if (s := jaccard(consulta, doc)) >= 0.5
+        ]
+        assert set(oraculo) >= set(got)
+        assert [x for x in oraculo if x[0] >= 0.75] == [x for x in got if x[0] >= 0.75]
+
+
+def test_descripcion_similar_es_sugerido() -> None:
+    res = _conciliar(
+        [transaccion("TX-1", 1000, descripcion="TRANSF COMERCIAL ANDES SPA PAGO FACTURA")],
+        [
+            esperado("EXP-1", 1000, 12, descripcion="Comercial Andes SpA factura enero"),
+            esperado("EXP-2", 1000, 12, descripcion="Servicios Pacifico Ltda"),
+        ],
+        umbral_similitud=0.4,
+    )
+    assert [(m.regla, m.estado) for m in res.matches] == [
+        ("descripcion_similar", EstadoMatch.sugerido)
+    ]
+    assert res.matches[0].movimientos_esperados == ["EXP-1"]
+    assert 0.5 < res.matches[0].score <= 0.7
+
+
+def test_tercero_suma_tokens_del_lado_esperado() -> None:
+    exp = esperado("EXP-1", 1000, 12, descripcion="Factura enero", tercero="Comercial Andes SpA")
+    otro = esperado("EXP-2", 1000, 11, descripcion="Arriendo oficina centro")
+    res = _conciliar(
+        [transaccion("TX-1", 1000, descripcion="COMERCIAL ANDES SPA FACTURA")], [exp, otro]
+    )
+    assert [m.regla for m in res.matches] == ["descripcion_similar"]
+
+
+def test_sin_coincidencia_de_monto_fecha_o_con_referencias_no_sugiere() -> None:
+    desc = "Pago Comercial Andes SpA"
+    assert (
+        _conciliar(
+            [transaccion("TX-1", 1000, descripcion=desc)],
+            [esperado("EXP-1", 999, 12, descripcion=desc)],
+        ).matches
+        == []
+    )
+    assert (
+        _conciliar(
+            [transaccion("TX-1", 1000, descripcion=desc)],
+            [esperado("EXP-1", 1000, 30, descripcion=desc)],
+        ).matches
+        == []
+    )
+    otro = esperado("EXP-2", 1000, 11, descripcion="Arriendo oficina centro")
+    res = _conciliar(
+        [transaccion("TX-1", 1000, descripcion=desc, referencia="A1")],
+        [esperado("EXP-1", 1000, 12, descripcion=desc, referencia="B2"), otro],
+    )
+    assert res.matches == []
+
+
+def test_varios_candidatos_es_hallazgo() -> None:
+    desc = "Pago Comercial Andes SpA"
+    # Dos esperados iguales en monto/fecha: `monto_fecha` ya deja ambiguedad y esta regla tampoco
+    # puede desempatar (ambos con la misma descripcion).
+    res = _conciliar(
+        [transaccion("TX-1", 1000, descripcion=desc)],
+        [
+            esperado("EXP-1", 1000, 12, descripcion=desc),
+            esperado("EXP-2", 1000, 11, descripcion=desc),
+        ],
+    )
+    assert res.matches == []
+    assert any(h.tipo == "ambiguedad_descripcion_similar" for h in res.hallazgos)
+
+
+def test_desempata_ambiguedad_de_monto_fecha() -> None:
+    res = _conciliar(
+        [transaccion("TX-1", 1000, descripcion="Pago Comercial Andes SpA")],
+        [
+            esperado("EXP-1", 1000, 12, descripcion="Comercial Andes SpA"),
+            esperado("EXP-2", 1000, 11, descripcion="Arriendo oficina centro"),
+        ],
+    )
+    assert [(m.regla, m.movimientos_esperados) for m in res.matches] == [
+        ("descripcion_similar", ["EXP-1"])
+    ]
+    assert any(h.tipo == "ambiguedad_monto_fecha" for h in res.hallazgos)
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+from _factories import conciliar_con, esperado, transaccion
+from conciliador_bancario.matching.indices import IndiceMontoFecha
+from conciliador_bancario.models import ConfiguracionCliente, EstadoMatch, ReglaFechaContable
+
+
+def _conciliar(txs, exps, habilitada: bool = True, **regla):
+    cfg = ConfiguracionCliente(
+        cliente="X",
+        umbral_autoconcilia=0.0,
+        ventana_dias_monto_fecha=1,
+        regla_fecha_contable=ReglaFechaContable(habilitada=habilitada, **regla),
+    )
+    return conciliar_con(cfg, txs, exps)
+
+
+def test_en_intervalo_equivale_a_filtro_lineal() -> None:
+    rng = random.Random(3)
+    base = date(2026, 1, 1)
+    exps = [
+        esperado(
+            f"EXP-{i:04d}",
+            rng.randint(1, 5) * 100,
+            base + timedelta(days=rng.randint(0, 60)),
+        )
+        for i in range(500)
+    ]
+    indice = IndiceMontoFecha(exps)
+    for _ in range(100):
+        monto = Decimal(rng.randint(1, 5) * 100)
+        desde = base.toordinal() + rng.randint(0, 60)
+        hasta = desde + rng.randint(0, 10)
+        oraculo = [
+            e
+            for e in exps
+            if e.monto.valor == monto and desde <= e.fecha.valor.toordinal() <= hasta
+        ]
+        assert indice.en_intervalo(monto, desde, hasta) == oraculo
+
+
+def test_fecha_contable_dentro_del_intervalo_es_sugerido() -> None:
+    # Operacion el dia 2, contabilizado el 8; el esperado (dia 6) queda fuera de +/-1 de la operacion.
+    res = _conciliar(
+        [transaccion("TX-1", 10_000, 2, fecha_contable=8)], [esperado("EXP-1", 10_000, 6)]
+    )
+    assert [(m.regla, m.estado, m.score) for m in res.matches] == [
+        ("fecha_contable", EstadoMatch.sugerido, 0.80)
+    ]
+    assert (
+        _conciliar(
+            [transaccion("TX-1", 10_000, 2, fecha_contable=8)],
+            [esperado("EXP-1", 10_000, 6)],
+            habilitada=False,
+        ).matches
+        == []
+    )
+
+
+def test_sin_fecha_contable_o_desfase_excesivo_no_sugiere() -> None:
+    assert (
+        _conciliar([transaccion("TX-1", 10_000, 2)], [esperado("EXP-1", 10_000, 6)]).matches == []
+    )
+    assert (
+        _conciliar(
+            [transaccion("TX-1", 10_000, 2, fecha_contable=8)],
+            [esperado("EXP-1", 10_000, 6)],
+            max_desfase_dias=3,
+        ).matches
+        == []
+    )
+
+
+def test_varios_candidatos_en_el_intervalo_es_hallazgo() -> None:
+    res = _conciliar(
+        [transaccion("TX-1", 10_000, 2, fecha_contable=8)],
+        [esperado("EXP-1", 10_000, 5), esperado("EXP-2", 10_000, 7)],
+    )
+    assert res.matches == []
+    (h,) = (h for h in res.hallazgos if h.tipo == "ambiguedad_fecha_contable")
+    assert h.detalles["candidatos"] == ["EXP-1", "EXP-2"]
+
+
+def test_ambiguedad_monto_fecha_no_se_duplica() -> None:
+    res = _conciliar(
+        [transaccion("TX-1", 10_000, 5, fecha_contable=8)],
+        [esperado("EXP-1", 10_000, 4), esperado("EXP-2", 10_000, 6)],
+    )
+    assert res.matches == []
+    assert [h.tipo for h in res.hallazgos if h.tipo.startswith("ambiguedad")] == [
+        "ambiguedad_monto_fecha"
+    ]
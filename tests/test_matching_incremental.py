@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+from _factories import AuditMemoria, conciliar_con, esperado, transaccion
+from conciliador_bancario.cli import app
+from conciliador_bancario.core.contracts.run_schema import (
+    RUN_JSON_SCHEMA_VERSION,
+    validate_run_payload,
+)
+from conciliador_bancario.matching.incremental import conciliar_incremental
+from conciliador_bancario.models import (
+    ConfiguracionCliente,
+    MovimientoEsperado,
+    ReglaPagosDivididos,
+    ReglaToleranciaMonto,
+    ResultadoConciliacion,
+    TransaccionBancaria,
+)
+from typer.testing import CliRunner
+
+
+def _dataset(seed: int) -> tuple[list[TransaccionBancaria], list[MovimientoEsperado]]:
+    rng = random.Random(seed)
+    base = date(2026, 1, 1)
+    # Muchos montos/referencias distintos: varios componentes independientes.
+    montos = [rng.randint(1, 60) * 1000 for _ in range(30)]
+    refs = [None] * 40 + [f"FAC-{k}" for k in range(20)]
+    txs = [
+        transaccion(
+            f"TX-{rng.randrange(16**12):012x}",
+            fecha=base + timedelta(days=rng.randint(0, 20)),
+            monto=rng.choice(montos),
+            descripcion=f"Abono {i}",
+            score_descripcion=0.5 if rng.random() < 0.1 else 0.9,
+            referencia=rng.choice(refs),
+        )
+        for i in range(rng.randint(10, 60))
+    ]
+    exps = [
+        esperado(
+            f"EXP-{rng.randrange(16**12):012x}",
+            fecha=base + timedelta(days=rng.randint(0, 20)),
+            monto=rng.choice(montos),
+            descripcion=f"Factura {i}",
+            referencia=rng.choice(refs),
+        )
+        for i in range(rng.randint(10, 60))
+    ]
+    return txs, exps
+
+
+def _fingerprint(bank: str, expected: str = "e") -> dict:
+    return {
+        "config_sha256": "c",
+        "bank_sha256": bank,
+        "expected_sha256": expected,
+        "mask": True,
+        "permitir_ocr": False,
+        "modelo_interno_version": "1",
+        "version": "0",
+    }
+
+
+def _payload(res: ResultadoConciliacion, fingerprint: dict) -> dict:
+    return validate_run_payload(
+        {
+            "schema_version": RUN_JSON_SCHEMA_VERSION,
+            "run_id": res.run_id,
+            "fingerprint": fingerprint,
+            "matches": [m.model_dump() for m in res.matches],
+            "hallazgos": [h.model_dump() for h in res.hallazgos],
+        }
+    )
+
+
+def _comparar(cfg, previo_txs, previo_exps, txs, exps, *, expected_sha: str = "e"):
+    previo = conciliar_con(cfg, previo_txs, previo_exps, run_id="r0")
+    completo = conciliar_con(cfg, txs, exps, run_id="r1")
+    audit = AuditMemoria()
+    inc = conciliar_incremental(
+        cfg=cfg,
+        transacciones=txs,
+        esperados=exps,
+        audit=audit,  # type: ignore[arg-type]
+        run_id="r1",
+        previo=_payload(previo, _fingerprint("b0")),
+        fingerprint=_fingerprint("b1", expected_sha),
+    )
+    assert _payload(inc, _fingerprint("b1")) == _payload(completo, _fingerprint("b1"))
+    return audit
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_incremental_equivale_a_corrida_completa(seed: int) -> None:
+    txs, exps = _dataset(seed)
+    rng = random.Random(1000 + seed)
+    cfg = ConfiguracionCliente(cliente="X", ventana_dias_monto_fecha=seed % 4)
+    # Run previo: parte de la cartola y algunos esperados que luego se retiran.
+    previo_txs = [t for t in txs if rng.random() < 0.7]
+    retirados = _dataset(seed + 500)[1][:3]
+    previo_exps = [e for e in exps if rng.random() < 0.9] + retirados
+    _comparar(cfg, previo_txs, previo_exps, txs, exps)
+
+
+def test_sin_cambios_hereda_todo() -> None:
+    txs, exps = _dataset(3)
+    audit = _comparar(ConfiguracionCliente(cliente="X"), txs, exps, txs, exps)
+    resumen = next(e for e in audit.eventos if e.mensaje == "Matching incremental")
+    assert resumen.detalles["txs_recalculadas"] == 0
+    assert resumen.detalles["exps_recalculados"] == 0
+
+
+def test_esperado_con_id_externo_modificado_se_recalcula() -> None:
+    tx = transaccion("TX-1", 1000, 5)
+    antes = esperado("F-1", 1000, 5)
+    despues = esperado("F-1", 2000, 5)
+    _comparar(ConfiguracionCliente(cliente="X"), [tx], [antes], [tx], [despues], expected_sha="e2")
+
+
+@pytest.mark.parametrize(
+    "cfg",
+    [
+        ConfiguracionCliente(
+            cliente="X", regla_pagos_divididos=ReglaPagosDivididos(habilitada=True)
+        ),
+        ConfiguracionCliente(
+            cliente="X",
+            regla_tolerancia_monto=ReglaToleranciaMonto(
+                habilitada=True, tolerancia_absoluta=Decimal(500)
+            ),
+        ),
+    ],
+)
+def test_config_distinta_o_regla_que_cruza_montos_corre_completo(
+    cfg: ConfiguracionCliente,
+) -> None:
+    txs, exps = _dataset(4)
+    audit = _comparar(cfg, txs[:5], exps, txs, exps)
+    assert any(e.mensaje.startswith("Matching incremental descartado") for e in audit.eventos)
+
+
+def _escribir_csv(src: Path, dst: Path, n_filas: int | None) -> None:
+    lineas = src.read_text(encoding="utf-8").splitlines(keepends=True)
+    dst.write_text("".join(lineas if n_filas is None else lineas[: n_filas + 1]), encoding="utf-8")
+
+
+def _run(out: Path, bank: Path, *extra: str):
+    return CliRunner().invoke(
+        app,
+        [
+            "run",
+            "--config",
+            str(Path("examples") / "config_cliente.yaml"),
+            "--bank",
+            str(bank),
+            "--expected",
+            str(Path("examples") / "movimientos_esperados.csv"),
+            "--out",
+            str(out),
+            "--dry-run",
+            *extra,
+        ],
+    )
+
+
+def test_cli_since_run_genera_run_json_identico(tmp_path: Path) -> None:
+    src = Path("examples") / "banco_ejemplo.csv"
+    parcial, completo = tmp_path / "in1" / src.name, tmp_path / "in2" / src.name
+    parcial.parent.mkdir()
+    completo.parent.mkdir()
+    _escribir_csv(src, parcial, 1)
+    _escribir_csv(src, completo, None)
+
+    assert _run(tmp_path / "r1", parcial).exit_code == 0
+    res = _run(tmp_path / "r2", completo, "--since-run", str(tmp_path / "r1"))
+    assert res.exit_code == 0, res.stdout
+    assert _run(tmp_path / "full", completo).exit_code == 0
+    assert (tmp_path / "r2" / "run.json").read_bytes() == (
+        tmp_path / "full" / "run.json"
+    ).read_bytes()
+    assert "Matching incremental" in (tmp_path / "r2" / "audit.jsonl").read_text(encoding="utf-8")
+
+
+def test_cli_since_run_sin_run_json_es_error_de_entrada(tmp_path: Path) -> None:
+    vacio = tmp_path / "vacio"
+    vacio.mkdir()
+    res = _run(tmp_path / "out", Path("examples/banco_ejemplo.csv"), "--since-run", str(vacio))
+    assert res.exit_code == 2
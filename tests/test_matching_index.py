@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from _factories import AuditMemoria, conciliar_con, esperado, transaccion
+from conciliador_bancario.audit.audit_log import NullAuditWriter
+from conciliador_bancario.matching.engine import conciliar
+from conciliador_bancario.matching.indices import IndiceMontoFecha
+from conciliador_bancario.models import (
+    ConfiguracionCliente,
+    MovimientoEsperado,
+    TransaccionBancaria,
+)
+
+
+def _dataset(seed: int, n: int) -> tuple[list[TransaccionBancaria], list[MovimientoEsperado]]:
+    rng = random.Random(seed)
+    base = date(2026, 1, 1)
+    montos = [1000 * rng.randint(1, 15) for _ in range(8)]
+    txs = [
+        transaccion(f"TX-{i:05d}", rng.choice(montos), base + timedelta(days=rng.randint(0, 20)))
+        for i in range(n)
+    ]
+    exps = [
+        esperado(f"EXP-{i:05d}", rng.choice(montos), base + timedelta(days=rng.randint(0, 20)))
+        for i in range(n)
+    ]
+    return txs, exps
+
+
+def test_indice_candidatos_por_rango_y_orden_por_id() -> None:
+    d = date(2026, 1, 10)
+    exps = [
+        esperado("EXP-00003", 1000, d),
+        esperado("EXP-00001", 1000, d + timedelta(days=2)),
+        esperado("EXP-00002", 1000, d + timedelta(days=4)),
+        esperado("EXP-00004", 2000, d),
+    ]
+    idx = IndiceMontoFecha(exps)
+    assert len(idx) == 4
+    got = idx.candidatos(Decimal("1000"), d + timedelta(days=1), 3)
+    assert [e.id for e in got] == ["EXP-00001", "EXP-00002", "EXP-00003"]
+    assert idx.candidatos(Decimal("1000"), d + timedelta(days=10), 3) == []
+    assert idx.candidatos(Decimal("999"), d, 3) == []
+
+    idx.retirar(exps[1])
+    got = idx.candidatos(Decimal("1000"), d + timedelta(days=1), 3)
+    assert [e.id for e in got] == ["EXP-00002", "EXP-00003"]
+    assert len(idx) == 3
+
+
+def test_indice_equivale_a_recorrido_lineal() -> None:
+    _, exps = _dataset(seed=7, n=300)
+    idx = IndiceMontoFecha(exps)
+    rng = random.Random(11)
+    vivos = sorted(exps, key=lambda e: e.id)
+    for _ in range(200):
+        monto = rng.choice(exps).monto.valor
+        fecha = date(2026, 1, 1) + timedelta(days=rng.randint(-3, 25))
+        ventana = rng.randint(0, 4)
+        oraculo = [
+            e
+            for e in vivos
+            if e.monto.valor == monto and abs((e.fecha.valor - fecha).days) <= ventana
+        ]
+        assert idx.candidatos(monto, fecha, ventana) == oraculo
+        if oraculo:
+            quitado = rng.choice(oraculo)
+            idx.retirar(quitado)
+            vivos.remove(quitado)
+
+
+def test_conciliar_monto_fecha_igual_a_oraculo_cuadratico() -> None:
+    cfg = ConfiguracionCliente(cliente="X", ventana_dias_monto_fecha=2)
+    txs, exps = _dataset(seed=3, n=400)
+    res = conciliar(cfg=cfg, transacciones=txs, esperados=exps, audit=NullAuditWriter(), run_id="r")
+
+    # Oraculo: recorrido O(n*m) equivalente a la implementacion original de la regla 2.
+    used: set[str] = set()
+    pares: set[tuple[str, str]] = set()
+    ambiguos: dict[str, list[str]] = {}
+    exps_ord = sorted(exps, key=lambda e: e.id)
+    for tx in sorted(txs, key=lambda t: t.id):
+        cands = [
+            e.id
+            for e in exps_ord
+            if e.id not in used
+            and e.monto.valor == tx.monto.valor
+            and abs((e.fecha.valor - tx.fecha_operacion.valor).days) <= 2
+        ]
+        if len(cands) == 1:
+            used.add(cands[0])
+            pares.add((tx.id, cands[0]))
+        elif cands:
+            ambiguos[tx.id] = cands
+
+    got = {(m.transacciones_bancarias[0], m.movimientos_esperados[0]) for m in res.matches}
+    assert got == pares
+    got_amb = {
+        h.entidad_id: h.detalles["candidatos"]
+        for h in res.hallazgos
+        if h.tipo == "ambiguedad_monto_fecha"
+    }
+    assert got_amb == ambiguos
+
+
+def test_corte_temprano_de_candidatos_igual_a_oraculo() -> None:
+    k = 3
+    cfg = ConfiguracionCliente(cliente="X", ventana_dias_monto_fecha=4, max_candidatos_ambiguedad=k)
+    txs, exps = _dataset(seed=5, n=300)
+    res = conciliar(cfg=cfg, transacciones=txs, esperados=exps, audit=NullAuditWriter(), run_id="r")
+
+    # Oraculo: los primeros k + 1 no usados en orden (fecha, id); se listan k, por id.
+    used: set[str] = set()
+    ambiguos: dict[str, tuple[list[str], bool]] = {}
+    exps_ord = sorted(exps, key=lambda e: (e.fecha.valor, e.id))
+    for tx in sorted(txs, key=lambda t: t.id):
+        cands = [
+            e.id
+            for e in exps_ord
+            if e.id not in used
+            and e.monto.valor == tx.monto.valor
+            and abs((e.fecha.valor - tx.fecha_operacion.valor).days) <= 4
+        ]
+        if len(cands) == 1:
+            used.add(cands[0])
+        elif cands:
+            ambiguos[tx.id] = (sorted(cands[:k]), len(cands) > k)
+
+    got = {
+        h.entidad_id: (h.detalles["candidatos"], "mas_de" in h.detalles)
+        for h in res.hallazgos
+        if h.tipo == "ambiguedad_monto_fecha"
+    }
+    assert got == ambiguos
+    assert any(truncado for _, truncado in got.values())
+
+
+def test_cluster_degenerado_no_materializa_candidatos() -> None:
+    d = date(2026, 1, 31)
+    n = 2_000
+    txs = [transaccion(f"TX-{i:05d}", 100_000, d) for i in range(n)]
+    exps = [esperado(f"EXP-{i:05d}", 100_000, d) for i in range(n)]
+    cfg = ConfiguracionCliente(cliente="X", max_candidatos_ambiguedad=5)
+    audit = AuditMemoria()
+    res = conciliar_con(cfg, txs, exps, audit)
+
+    ambiguos = [h for h in res.hallazgos if h.tipo == "ambiguedad_monto_fecha"]
+    assert len(ambiguos) == n
+    assert all(len(h.detalles["candidatos"]) == 5 and h.detalles["mas_de"] == 5 for h in ambiguos)
+    (stats,) = audit.detalles("matching_stats")
+    (mf,) = (r for r in stats["reglas"] if r["regla"] == "monto_fecha")
+    assert mf["candidatos"] == n * 6
+
+
+@pytest.mark.parametrize("backend", ["serial", "numpy", "paralelo"])
+def test_k_uno_con_varios_candidatos_no_autoconcilia(backend: str) -> None:
+    # K=1 recorta la ventana a un candidato, pero sigue siendo ambigua (fail-closed).
+    d = date(2026, 1, 15)
+    txs = [transaccion("TX-00000", 100_000, d)]
+    exps = [esperado(f"EXP-{i:05d}", 100_000, d) for i in range(3)]
+    cfg = ConfiguracionCliente(cliente="X", max_candidatos_ambiguedad=1)
+    kwargs = dict(cfg=cfg, transacciones=txs, esperados=exps, audit=NullAuditWriter(), run_id="r")
+    if backend == "numpy":
+        pytest.importorskip("numpy")
+        from conciliador_bancario.matching.vectorizado import conciliar_vectorizado
+
+        res = conciliar_vectorizado(**kwargs)
+    elif backend == "paralelo":
+        from conciliador_bancario.matching.paralelo import conciliar_paralelo
+
+        res = conciliar_paralelo(**kwargs, workers=2)
+    else:
+        res = conciliar(**kwargs)
+
+    assert res.matches == []
+    (h,) = (h for h in res.hallazgos if h.tipo == "ambiguedad_monto_fecha")
+    assert h.entidad_id == txs[0].id
+    assert h.detalles["candidatos"] == [exps[0].id] and h.detalles["mas_de"] == 1
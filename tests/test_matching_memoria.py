@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import json
+from datetime import date
+from pathlib import Path
+
+import pytest
+from _factories import conciliar_con, esperado, transaccion
+from conciliador_bancario.cli import app
+from conciliador_bancario.errors import ErrorConfiguracion, ErrorContrato
+from conciliador_bancario.matching.memoria import (
+    MemoriaMatches,
+    aprender,
+    cargar_memoria,
+    compactar,
+    firma_movimiento,
+    firma_transaccion,
+    guardar_memoria,
+)
+from conciliador_bancario.models import ConfiguracionCliente, EstadoMatch, ReglaMemoria
+from pydantic import ValidationError
+from typer.testing import CliRunner
+
+
+def _run(run_id: str, pares: list[tuple[str, str]], estado: str = "conciliado") -> dict:
+    return {
+        "run_id": run_id,
+        "matches": [
+            {
+                "estado": estado,
+                "transacciones_bancarias": [t],
+                "movimientos_esperados": [e],
+                "bloqueado_por_confianza": False,
+            }
+            for t, e in pares
+        ],
+    }
+
+
+def _memoria_enero(ocurrencias: int = 1) -> MemoriaMatches:
+    mem = MemoriaMatches()
+    for i in range(ocurrencias):
+        aprender(
+            mem,
+            run=_run(f"run-{i}", [("TX-E", "EXP-E")]),
+            transacciones=[
+                transaccion("TX-E", 150_000, date(2026, 1, 3), descripcion="Transferencia ACME")
+            ],
+            esperados=[esperado("EXP-E", 150_000, date(2026, 1, 3), tercero="ACME Ltda")],
+        )
+    return mem
+
+
+def _cfg(tmp_path: Path, mem: MemoriaMatches, **kw) -> ConfiguracionCliente:
+    ruta = tmp_path / "memoria.json"
+    guardar_memoria(mem, ruta)
+    regla = ReglaMemoria(habilitada=True, archivo=str(ruta), **{"min_ocurrencias": 1, **kw})
+    return ConfiguracionCliente(cliente="X", regla_memoria=regla)
+
+
+def test_firmas_ignoran_folios_y_escala_del_monto() -> None:
+    a = transaccion("A", 150_000, date(2026, 1, 3), descripcion="Transferencia ACME op 99812")
+    b = transaccion("B", 150_000, date(2026, 2, 7), descripcion="TRANSFERENCIA  acme OP 10023")
+    assert firma_transaccion(a) == firma_transaccion(b) != ""
+    assert firma_movimiento(
+        esperado("E", 150_000, date(2026, 1, 3), tercero="ACME Ltda")
+    ) == firma_movimiento(esperado("F", "150000.00", date(2026, 3, 3), tercero="ACME Ltda"))
+    # Dia del mes distinto => otro cobro recurrente.
+    assert firma_movimiento(
+        esperado("E", 150_000, date(2026, 1, 3), tercero="ACME Ltda")
+    ) != firma_movimiento(esperado("G", 150_000, date(2026, 1, 15), tercero="ACME Ltda"))
+    # Sin contraparte ni referencia no hay firma (solo monto es demasiado generico).
+    assert (
+        firma_transaccion(transaccion("C", 150_000, date(2026, 1, 3), descripcion="Op 12345")) == ""
+    )
+
+
+def test_regla_memoria_sugiere_pareo_recurrente_fuera_de_ventana(tmp_path: Path) -> None:
+    cfg = _cfg(tmp_path, _memoria_enero())
+    # Febrero: el abono llega 5 dias despues (fuera de ventana_dias_monto_fecha=3).
+    res = conciliar_con(
+        cfg,
+        [transaccion("TX-F", 150_000, date(2026, 2, 8), descripcion="Transferencia ACME")],
+        [esperado("EXP-F", 150_000, date(2026, 2, 3), tercero="ACME Ltda")],
+    )
+    (m,) = res.matches
+    assert (m.regla, m.estado, m.score) == ("memoria", EstadoMatch.sugerido, 0.75)
+    assert m.transacciones_bancarias == ["TX-F"] and m.movimientos_esperados == ["EXP-F"]
+
+
+def test_regla_memoria_ambigua_y_min_ocurrencias(tmp_path: Path) -> None:
+    txs = [transaccion("TX-F", 150_000, date(2026, 2, 8), descripcion="Transferencia ACME")]
+    exps = [
+        esperado("EXP-F1", 150_000, date(2026, 2, 3), tercero="ACME Ltda"),
+        esperado("EXP-F2", 150_000, date(2026, 3, 3), tercero="ACME Ltda"),
+    ]
+    cfg = _cfg(tmp_path, _memoria_enero(), ventana_dias=40)
+    res = conciliar_con(cfg, txs, exps)
+    assert not res.matches
+    (h,) = (h for h in res.hallazgos if h.tipo == "ambiguedad_memoria")
+    assert h.detalles["candidatos"] == ["EXP-F1", "EXP-F2"]
+
+    cfg = _cfg(tmp_path, _memoria_enero(), ventana_dias=40, min_ocurrencias=2)
+    res = conciliar_con(cfg, txs, exps)
+    assert not res.matches and not [h for h in res.hallazgos if h.tipo == "ambiguedad_memoria"]
+
+
+def test_aprender_idempotente_y_compactar() -> None:
+    mem = _memoria_enero(ocurrencias=3)
+    assert len(mem.runs) == 3 and len(mem) == 1
+    (par,) = next(iter(mem.pares.values())).values()
+    assert (par.ocurrencias, par.ultimo_run) == (3, 2)
+    assert (
+        aprender(
+            mem,
+            run=_run("run-0", [("TX-E", "EXP-E")]),
+            transacciones=[
+                transaccion("TX-E", 150_000, date(2026, 1, 3), descripcion="Transferencia ACME")
+            ],
+            esperados=[esperado("EXP-E", 150_000, date(2026, 1, 3), tercero="ACME Ltda")],
+        )
+        == 0
+    )
+    # Sugeridos solo con incluir_sugeridos.
+    args = dict(
+        run=_run("run-s", [("TX-S", "EXP-S")], estado="sugerido"),
+        transacciones=[
+            transaccion("TX-S", 150_000, date(2026, 1, 9), descripcion="Pago BETA SERVICIOS")
+        ],
+        esperados=[esperado("EXP-S", 150_000, date(2026, 1, 9), tercero="Beta Servicios")],
+    )
+    assert aprender(MemoriaMatches(), **args) == 0
+    assert aprender(mem, incluir_sugeridos=True, **args) == 1
+    assert len(compactar(mem, min_ocurrencias=2)) == 1
+    assert len(compactar(mem, max_runs=1)) == 1  # solo el par de run-s es reciente
+    assert len(compactar(mem, min_ocurrencias=2, max_runs=1)) == 0
+    assert compactar(mem, max_runs=1).runs == mem.runs
+
+
+def test_aprender_falla_si_las_filas_no_son_las_del_run() -> None:
+    with pytest.raises(ErrorContrato):
+        aprender(
+            MemoriaMatches(),
+            run=_run("r", [("TX-X", "EXP-E")]),
+            transacciones=[
+                transaccion("TX-E", 150_000, date(2026, 1, 3), descripcion="Transferencia ACME")
+            ],
+            esperados=[esperado("EXP-E", 150_000, date(2026, 1, 3), tercero="ACME Ltda")],
+        )
+
+
+def test_memoria_inexistente_o_invalida(tmp_path: Path) -> None:
+    with pytest.raises(ValidationError):
+        ReglaMemoria(habilitada=True)
+    with pytest.raises(ErrorConfiguracion):
+        cargar_memoria(tmp_path / "no.json")
+    (tmp_path / "mala.json").write_text(
+        json.dumps({"version": 1, "runs": [], "pares": {"a": {"b": [1, 0]}}})
+    )
+    with pytest.raises(ErrorContrato):
+        cargar_memoria(tmp_path / "mala.json")
+
+
+def _csvs(d: Path, mes: int, dia_banco: int) -> tuple[Path, Path]:
+    d.mkdir()
+    bank, exp = d / "banco.csv", d / "esperados.csv"
+    bank.write_text(
+        "fecha_operacion,monto,moneda,descripcion\n"
+        f"{dia_banco:02d}/{mes:02d}/2026,150000,CLP,Transferencia ACME\n",
+        encoding="utf-8",
+    )
+    exp.write_text(
+        "fecha,monto,moneda,descripcion,tercero\n"
+        f"2026-{mes:02d}-03,150000,CLP,Arriendo,ACME Ltda\n",
+        encoding="utf-8",
+    )
+    return bank, exp
+
+
+def test_cli_memoria_end_to_end(tmp_path: Path) -> None:
+    runner = CliRunner()
+    cfg = tmp_path / "config.yaml"
+    cfg.write_text('cliente: "Demo"\n', encoding="utf-8")
+    bank1, exp1 = _csvs(tmp_path / "ene", 1, 3)
+    out1 = tmp_path / "out_ene"
+    args = ["--config", str(cfg), "--bank", str(bank1), "--expected", str(exp1), "--dry-run"]
+    res = runner.invoke(app, ["run", *args, "--out", str(out1)])
+    assert res.exit_code == 0, res.stdout
+
+    memoria = tmp_path / "memoria.json"
+    aprender_args = ["--memoria", str(memoria), "--config", str(cfg), "--run-dir", str(out1)]
+    res = runner.invoke(
+        app, ["memoria", "aprender", *aprender_args, "--bank", str(bank1), "--expected", str(exp1)]
+    )
+    assert res.exit_code == 0, res.stdout
+    assert len(cargar_memoria(memoria)) == 1
+    # Archivos que no son los de la corrida: fail-closed (exit 2).
+    bank2, exp2 = _csvs(tmp_path / "feb", 2, 8)
+    res = runner.invoke(
+        app, ["memoria", "aprender", *aprender_args, "--bank", str(bank2), "--expected", str(exp1)]
+    )
+    assert res.exit_code == 2
+
+    cfg.write_text(
+        f'cliente: "Demo"\nregla_memoria:\n  habilitada: true\n  archivo: "{memoria.as_posix()}"\n'
+        "  min_ocurrencias: 1\n",
+        encoding="utf-8",
+    )
+    out2 = tmp_path / "out_feb"
+    res = runner.invoke(
+        app,
+        ["run", "--config", str(cfg), "--bank", str(bank2), "--expected", str(exp2), "--dry-run"]
+        + ["--out", str(out2)],
+    )
+    assert res.exit_code == 0, res.stdout
+    (m,) = json.loads((out2 / "run.json").read_text(encoding="utf-8"))["matches"]
+    assert m["regla"] == "memoria"
+
+    res = runner.invoke(
+        app, ["memoria", "compactar", "--memoria", str(memoria), "--min-ocurrencias", "2"]
+    )
+    assert res.exit_code == 0, res.stdout
+    assert len(cargar_memoria(memoria)) == 0
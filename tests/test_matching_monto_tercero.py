@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import random
+
+from _factories import conciliar_con, esperado, transaccion
+from conciliador_bancario.matching.indices import IndiceTercero
+from conciliador_bancario.models import ConfiguracionCliente, EstadoMatch, ReglaMontoTercero
+from conciliador_bancario.normalization.terceros import (
+    claves_movimiento,
+    claves_transaccion,
+    ruts_en_texto,
+)
+
+
+def _conciliar(txs, exps, habilitada: bool = True):
+    cfg = ConfiguracionCliente(
+        cliente="X",
+        umbral_autoconcilia=0.0,
+        regla_monto_tercero=ReglaMontoTercero(habilitada=habilitada),
+    )
+    return conciliar_con(cfg, txs, exps)
+
+
+def test_ruts_validos_con_y_sin_puntos() -> None:
+    assert ruts_en_texto("TRANSF 12.345.678-5 / 76123456-0") == {"12345678-5", "76123456-0"}
+    # Digito verificador incorrecto o sin guion/puntos: no es RUT.
+    assert ruts_en_texto("TRANSF 12.345.678-4 OP 123456785") == frozenset()
+
+
+def test_indice_equivale_a_comparacion_lineal() -> None:
+    rng = random.Random(7)
+    nombres = ["Juan Perez", "Comercial Andes SpA", "Maria Soto", "Ferreteria Sur Ltda", "Luz"]
+    ruts = ["12.345.678-5", "76123456-0", "11111111-1"]
+    exps = [
+        esperado(f"EXP-{i:03d}", 250_000, tercero=rng.choice(nombres + ruts + [None]), descripcion="Factura") for i in range(200)  # type: ignore[list-item]
+    ]
+    indice = IndiceTercero((claves_movimiento(e), e) for e in exps)
+    for k in range(100):
+        glosa = f"TRANSF DE {rng.choice(nombres).upper()} {rng.choice(ruts + [''])} {k}"
+        c_tx = claves_transaccion(transaccion("TX", 250_000, descripcion=glosa))
+        lineal = []
+        for e in exps:
+            c = claves_movimiento(e)
+            if c.ruts & c_tx.ruts:
+                lineal.append(("rut", e))
+            elif c.nombre and c.nombre <= c_tx.tokens:
+                lineal.append(("nombre", e))
+        assert indice.candidatos(c_tx) == lineal
+
+
+def test_rut_en_glosa_sugiere() -> None:
+    res = _conciliar(
+        [transaccion("TX-1", 250_000, 3, descripcion="TRANSF 76.123.456-0 PAGO")],
+        [
+            esperado("EXP-1", 250_000, 8, tercero="76123456-0", descripcion="Factura"),
+            esperado("EXP-2", 250_000, 20, descripcion="Factura"),
+        ],
+    )
+    assert [(m.regla, m.estado, m.score) for m in res.matches] == [
+        ("monto_tercero", EstadoMatch.sugerido, 0.80)
+    ]
+
+
+def test_desempata_ambiguedad_monto_fecha() -> None:
+    res = _conciliar(
+        [transaccion("TX-1", 250_000, descripcion="TRANSF DE COMERCIAL ANDES SPA")],
+        [
+            esperado("EXP-1", 250_000, 11, tercero="Maria Soto", descripcion="Factura"),
+            esperado("EXP-2", 250_000, 12, tercero="Comercial Andes SpA", descripcion="Factura"),
+        ],
+    )
+    assert [(m.regla, m.movimientos_esperados) for m in res.matches] == [
+        ("monto_tercero", ["EXP-2"])
+    ]
+    assert "Desempata" in res.matches[0].explicacion
+    assert any(h.tipo == "ambiguedad_monto_fecha" for h in res.hallazgos)
+
+
+def test_misma_contraparte_varios_candidatos_es_hallazgo() -> None:
+    res = _conciliar(
+        [transaccion("TX-1", 250_000, descripcion="TRANSF DE JUAN PEREZ")],
+        [
+            esperado("EXP-1", 250_000, 11, tercero="Juan Pérez", descripcion="Factura"),
+            esperado("EXP-2", 250_000, 12, tercero="Juan Perez", descripcion="Factura"),
+        ],
+    )
+    assert res.matches == []
+    (h,) = (h for h in res.hallazgos if h.tipo == "ambiguedad_monto_tercero")
+    assert h.detalles["candidatos"] == ["EXP-1", "EXP-2"]
+
+
+def test_nombre_corto_no_es_clave_y_regla_deshabilitada_por_defecto() -> None:
+    txs = [transaccion("TX-1", 250_000, descripcion="TRANSF LUZ")]
+    exps = [
+        esperado("EXP-1", 250_000, 11, tercero="Luz", descripcion="Factura"),
+        esperado("EXP-2", 250_000, 12, tercero="Otro Nombre", descripcion="Factura"),
+    ]
+    assert _conciliar(txs, exps).matches == []
+    txs = [transaccion("TX-1", 250_000, descripcion="TRANSF 76.123.456-0")]
+    exps = [
+        esperado("EXP-1", 250_000, 11, tercero="76123456-0", descripcion="Factura"),
+        esperado("EXP-2", 250_000, 12, descripcion="Factura"),
+    ]
+    assert _conciliar(txs, exps, habilitada=False).matches == []
+    assert not ConfiguracionCliente(cliente="X").regla_monto_tercero.habilitada
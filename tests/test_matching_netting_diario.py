@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import random
+
+from _factories import AuditMemoria, conciliar_con, esperado, transaccion
+from conciliador_bancario.models import ConfiguracionCliente, EstadoMatch, ReglaNettingDiario
+
+
+def _conciliar(txs, exps, **regla):
+    cfg = ConfiguracionCliente(
+        cliente="X", regla_netting_diario=ReglaNettingDiario(habilitada=True, **regla)
+    )
+    audit = AuditMemoria()
+    res = conciliar_con(cfg, txs, exps, audit)
+    (stats,) = audit.detalles("Regla netting diario completada")
+    return res, stats
+
+
+def test_deposito_neto_de_un_dia_lista_todos_los_miembros() -> None:
+    rng = random.Random(7)
+    ventas = [esperado(f"EXP-{i:03d}", rng.randint(1, 90) * 990, 5) for i in range(40)]
+    total = sum(int(e.monto.valor) for e in ventas)
+    res, stats = _conciliar([transaccion("TX-1", total, 6)], ventas)
+    (m,) = res.matches
+    assert (m.regla, m.estado, m.score) == ("netting_diario", EstadoMatch.sugerido, 0.70)
+    assert m.transacciones_bancarias == ["TX-1"]
+    assert m.movimientos_esperados == [e.id for e in ventas]
+    assert stats["sugeridos"] == 1
+
+
+def test_deposito_por_tercero_dentro_del_dia() -> None:
+    exps = [
+        esperado("EXP-1", 1000, 5, tercero="Transbank"),
+        esperado("EXP-2", 2000, 5, tercero="Transbank"),
+        esperado("EXP-3", 7000, 5, tercero="Getnet SpA"),
+        esperado("EXP-4", 1500, 5, tercero="Getnet SpA"),
+    ]
+    res, _ = _conciliar([transaccion("TX-T", 3000, 6), transaccion("TX-G", 8500, 7)], exps)
+    got = sorted((m.transacciones_bancarias, m.movimientos_esperados) for m in res.matches)
+    assert got == [(["TX-G"], ["EXP-3", "EXP-4"]), (["TX-T"], ["EXP-1", "EXP-2"])]
+
+    res, _ = _conciliar([transaccion("TX-T", 3000, 6)], exps, por_tercero=False)
+    assert not res.matches
+
+
+def test_m_a_n_suma_de_depositos_del_dia() -> None:
+    exps = [esperado("EXP-1", 1200, 5), esperado("EXP-2", 2300, 5), esperado("EXP-3", 500, 5)]
+    res, stats = _conciliar([transaccion("TX-1", 3000, 6), transaccion("TX-2", 1000, 6)], exps)
+    (m,) = res.matches
+    assert m.transacciones_bancarias == ["TX-1", "TX-2"]
+    assert m.movimientos_esperados == ["EXP-1", "EXP-2", "EXP-3"]
+    assert stats["grupos_banco"] == 1
+
+
+def test_comision_del_dia_se_netea_con_las_ventas() -> None:
+    # Deposito neto del procesador: ventas del dia menos la linea de comision.
+    exps = [esperado("EXP-1", 1000, 5), esperado("EXP-2", 2000, 5), esperado("EXP-C", -500, 5)]
+    res, _ = _conciliar([transaccion("TX-1", 2500, 6)], exps)
+    (m,) = res.matches
+    assert m.movimientos_esperados == ["EXP-1", "EXP-2", "EXP-C"]
+    # Sin la comision la suma bruta ya no calza.
+    assert not _conciliar([transaccion("TX-1", 3000, 6)], exps)[0].matches
+    # M:N: un abono y un contracargo del mismo dia se netean igual.
+    res, _ = _conciliar([transaccion("TX-1", 2800, 6), transaccion("TX-R", -300, 6)], exps)
+    (m,) = res.matches
+    assert m.transacciones_bancarias == ["TX-1", "TX-R"]
+
+
+def test_grupo_que_netea_a_cero_no_es_deposito() -> None:
+    exps = [esperado("EXP-1", 1000, 5), esperado("EXP-R", -1000, 5)]
+    res, stats = _conciliar([transaccion("TX-0", 0, 6)], exps)
+    assert not res.matches and stats["grupos_esperados"] == 0
+
+
+def test_ventana_y_ambiguedad() -> None:
+    exps = [esperado("EXP-1", 1000, 5), esperado("EXP-2", 2000, 5)]
+    # El deposito no puede ser anterior al dia de las ventas ni fuera de la ventana.
+    assert not _conciliar([transaccion("TX-1", 3000, 4)], exps)[0].matches
+    assert not _conciliar([transaccion("TX-1", 3000, 9)], exps)[0].matches
+
+    # Dos dias con la misma suma dentro de la ventana => hallazgo, sin match.
+    exps += [esperado("EXP-3", 500, 6), esperado("EXP-4", 2500, 6)]
+    res, stats = _conciliar([transaccion("TX-1", 3000, 7)], exps)
+    assert not res.matches and stats["ambiguas"] == 1
+    (h,) = (h for h in res.hallazgos if h.tipo == "ambiguedad_netting_diario")
+    assert [g["exp_ids"] for g in h.detalles["grupos"]] == [["EXP-1", "EXP-2"], ["EXP-3", "EXP-4"]]
+
+
+def test_max_items_y_deshabilitada_por_defecto() -> None:
+    exps = [esperado(f"EXP-{i}", 100, 5) for i in range(10)]
+    res, stats = _conciliar([transaccion("TX-1", 1000, 5)], exps, max_items=5)
+    assert not res.matches and stats["omitidos_por_tamano"] == 1
+
+    res = conciliar_con(ConfiguracionCliente(cliente="X"), [transaccion("TX-1", 1000, 5)], exps)
+    assert not res.matches
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+from _factories import AuditMemoria, conciliar_con, esperado, transaccion
+from conciliador_bancario.matching.pagos_divididos import buscar_suma_exacta
+from conciliador_bancario.models import ConfiguracionCliente, EstadoMatch, ReglaPagosDivididos
+
+
+def _cfg(**regla) -> ConfiguracionCliente:
+    return ConfiguracionCliente(
+        cliente="X",
+        umbral_autoconcilia=0.0,
+        regla_pagos_divididos=ReglaPagosDivididos(habilitada=True, **regla),
+    )
+
+
+def _conciliar(cfg, txs, exps):
+    audit = AuditMemoria()
+    res = conciliar_con(cfg, txs, exps, audit)
+    stats = [e.detalles for e in audit.eventos if e.detalles.get("regla") == "pagos_divididos"]
+    return res, stats
+
+
+def test_buscar_suma_exacta_unica_y_ambigua() -> None:
+    r = buscar_suma_exacta([300, 500, 1200], 800, max_items=5, max_estados=1000)
+    assert r.soluciones == [(0, 1)] and not r.agotado
+    r = buscar_suma_exacta([100, 200, 150, 150], 300, max_items=5, max_estados=1000)
+    assert len(r.soluciones) == 2
+    # Un solo elemento igual al objetivo no es un pago dividido.
+    r = buscar_suma_exacta([300, 5], 300, max_items=5, max_estados=1000)
+    assert r.soluciones == []
+    r = buscar_suma_exacta([1] * 20, 10, max_items=10, max_estados=50)
+    assert r.agotado and r.soluciones == []
+
+
+def test_pago_agrupado_n_a_1_es_sugerido() -> None:
+    txs = [transaccion("TX-1", 1000)]
+    exps = [esperado("EXP-1", 300, 8), esperado("EXP-2", 700, 12), esperado("EXP-3", 450)]
+    res, stats = _conciliar(_cfg(), txs, exps)
+    assert len(res.matches) == 1
+    m = res.matches[0]
+    assert m.regla == "pago_agrupado"
+    assert m.estado == EstadoMatch.sugerido
+    assert m.transacciones_bancarias == ["TX-1"]
+    assert m.movimientos_esperados == ["EXP-1", "EXP-2"]
+    assert "EXP-1, EXP-2" in m.explicacion
+    assert stats[0]["sugeridos"] == 1
+
+
+def test_pago_parcial_1_a_n_es_sugerido() -> None:
+    txs = [transaccion("TX-1", 400, 9), transaccion("TX-2", 600, 11)]
+    exps = [esperado("EXP-1", 1000)]
+    res, _ = _conciliar(_cfg(), txs, exps)
+    assert [(m.regla, m.estado) for m in res.matches] == [("pago_parcial", EstadoMatch.sugerido)]
+    assert res.matches[0].transacciones_bancarias == ["TX-1", "TX-2"]
+
+
+def test_montos_con_centavos_se_buscan_en_unidades_minimas() -> None:
+    # 300.25 + 700.25 == 1000.5; 700.24 solo calzaria truncando los centavos.
+    txs = [transaccion("TX-1", "1000.5", moneda="USD")]
+    exps = [
+        esperado("EXP-1", "300.25", moneda="USD"),
+        esperado("EXP-2", "700.25", moneda="USD"),
+        esperado("EXP-3", "700.24", moneda="USD"),
+    ]
+    res, stats = _conciliar(_cfg(), txs, exps)
+    assert [(m.regla, m.movimientos_esperados) for m in res.matches] == [
+        ("pago_agrupado", ["EXP-1", "EXP-2"])
+    ]
+    assert stats[0]["ambiguas"] == 0
+
+
+def test_fuera_de_ventana_y_otra_moneda_no_son_candidatos() -> None:
+    txs = [transaccion("TX-1", 1000, 10)]
+    exps = [esperado("EXP-1", 300, 1), esperado("EXP-2", 700, 10)]
+    res, _ = _conciliar(_cfg(ventana_dias=3), txs, exps)
+    assert res.matches == []
+    exps = [esperado("EXP-1", 300).model_copy(update={"moneda": "USD"}), esperado("EXP-2", 700)]
+    res, _ = _conciliar(_cfg(), txs, exps)
+    assert res.matches == []
+
+
+def test_combinaciones_multiples_son_hallazgo_y_no_match() -> None:
+    txs = [transaccion("TX-1", 1000)]
+    exps = [
+        esperado("EXP-1", 400),
+        esperado("EXP-2", 600),
+        esperado("EXP-3", 100),
+        esperado("EXP-4", 500),
+    ]
+    res, stats = _conciliar(_cfg(), txs, exps)
+    assert res.matches == []
+    assert [h.tipo for h in res.hallazgos].count("ambiguedad_pago_dividido") == 1
+    assert stats[0]["ambiguas"] == 1
+
+
+def test_topes_de_candidatos_y_presupuesto_podan_sin_sugerir() -> None:
+    txs = [transaccion("TX-1", 1000)]
+    exps = [esperado(f"EXP-{i:02d}", 10 + i) for i in range(20)] + [
+        esperado("EXP-A", 300),
+        esperado("EXP-B", 700),
+    ]
+    res, stats = _conciliar(_cfg(max_candidatos=8), txs, exps)
+    assert res.matches == []
+    assert stats[0]["podadas_por_candidatos"] == 1
+
+    res, stats = _conciliar(_cfg(max_candidatos=30, max_estados_por_busqueda=10), txs, exps)
+    assert res.matches == []
+    assert stats[0]["podadas_por_presupuesto"] == 1
+
+
+def test_baja_confianza_deja_pendiente_bloqueado() -> None:
+    txs = [transaccion("TX-1", 1000, score_monto=0.5)]
+    exps = [esperado("EXP-1", 300), esperado("EXP-2", 700)]
+    res, _ = _conciliar(_cfg(), txs, exps)
+    assert res.matches[0].estado == EstadoMatch.pendiente
+    assert res.matches[0].bloqueado_por_confianza
+
+
+def test_regla_deshabilitada_por_defecto() -> None:
+    txs = [transaccion("TX-1", 1000)]
+    exps = [esperado("EXP-1", 300), esperado("EXP-2", 700)]
+    res, stats = _conciliar(ConfiguracionCliente(cliente="X"), txs, exps)
+    assert res.matches == [] and stats == []
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import random
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+from _factories import AuditMemoria, conciliar_con, esperado, transaccion
+from conciliador_bancario.cli import app
+from conciliador_bancario.matching.paralelo import conciliar_paralelo
+from conciliador_bancario.models import (
+    ConfiguracionCliente,
+    MovimientoEsperado,
+    TransaccionBancaria,
+)
+from typer.testing import CliRunner
+
+
+def _dataset(seed: int) -> tuple[list[TransaccionBancaria], list[MovimientoEsperado]]:
+    rng = random.Random(seed)
+    base = date(2026, 1, 1)
+    montos = [rng.randint(1, 40) * 1000 for _ in range(25)]
+    refs = [None, None, None, None, "FAC-1", "FAC-2", "FAC-3"]
+    txs = [
+        transaccion(
+            f"TX-{rng.randrange(16**8):08x}",
+            fecha=base + timedelta(days=rng.randint(0, 25)),
+            monto=rng.choice(montos),
+            moneda=rng.choice(["CLP", "CLP", "USD"]),
+            descripcion=f"Abono {i}",
+            score_descripcion=0.5 if rng.random() < 0.1 else 0.9,
+            referencia=rng.choice(refs),
+        )
+        for i in range(rng.randint(20, 150))
+    ]
+    exps = [
+        esperado(
+            f"EXP-{rng.randrange(16**8):08x}",
+            fecha=base + timedelta(days=rng.randint(0, 25)),
+            monto=rng.choice(montos),
+            descripcion=f"Factura {i}",
+            referencia=rng.choice(refs),
+        )
+        for i in range(rng.randint(20, 150))
+    ]
+    return txs, exps
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_paralelo_identico_a_serial(seed: int) -> None:
+    txs, exps = _dataset(seed)
+    # Semillas impares: corte temprano de candidatos (hallazgos con "mas_de").
+    cfg = ConfiguracionCliente(
+        cliente="X",
+        ventana_dias_monto_fecha=seed % 4,
+        max_candidatos_ambiguedad=50 - 48 * (seed % 2),
+    )
+    a_serial = AuditMemoria()
+    serial = conciliar_con(cfg, txs, exps, a_serial)
+    for workers, orden in ((2, 0), (3, 1), (4, 5)):
+        a_par = AuditMemoria()
+        par = conciliar_paralelo(
+            cfg=cfg,
+            transacciones=list(reversed(txs)),
+            esperados=exps,
+            audit=a_par,  # type: ignore[arg-type]
+            run_id="r",
+            workers=workers,
+            orden_shards=orden,
+        )
+        assert par == serial
+        assert a_par.eventos == a_serial.eventos
+
+
+def _run_cli(tmp_path: Path, nombre: str, *extra: str):
+    out = tmp_path / nombre
+    res = CliRunner().invoke(
+        app,
+        [
+            "run",
+            "--config",
+            str(Path("examples") / "config_cliente.yaml"),
+            "--bank",
+            "tests/golden/datasets/csv/banco_sucio.csv",
+            "--expected",
+            "tests/golden/datasets/csv/esperados_sucio.csv",
+            "--out",
+            str(out),
+            "--dry-run",
+            *extra,
+        ],
+    )
+    return res, out
+
+
+def test_cli_workers_run_json_y_audit_identicos(tmp_path: Path) -> None:
+    res_s, out_s = _run_cli(tmp_path, "serial")
+    res_p, out_p = _run_cli(tmp_path, "par", "--workers", "2")
+    assert res_s.exit_code == 0, res_s.stdout
+    assert res_p.exit_code == 0, res_p.stdout
+    assert (out_p / "run.json").read_bytes() == (out_s / "run.json").read_bytes()
+    assert (out_p / "audit.jsonl").read_bytes() == (out_s / "audit.jsonl").read_bytes()
+
+
+def test_cli_workers_invalido_es_error_de_entrada(tmp_path: Path) -> None:
+    res, _ = _run_cli(tmp_path, "cero", "--workers", "0")
+    assert res.exit_code == 2
+
+
+def test_cli_workers_con_backend_numpy_es_incompatible(tmp_path: Path) -> None:
+    res, _ = _run_cli(tmp_path, "mix", "--workers", "2", "--matching-backend", "numpy")
+    assert res.exit_code == 2
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import json
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+from _factories import AuditMemoria, conciliar_con, esperado, transaccion
+from conciliador_bancario.cli import app
+from conciliador_bancario.errors import ErrorConfiguracion
+from conciliador_bancario.matching.engine import (
+    ReglaMatching,
+    ReglaMontoFecha,
+    ReglaRefExacta,
+    conciliar,
+    construir_pipeline,
+)
+from conciliador_bancario.matching.streaming import conciliar_streaming
+from conciliador_bancario.models import (
+    ConfiguracionCliente,
+    MovimientoEsperado,
+    ReglaToleranciaMonto,
+    TransaccionBancaria,
+)
+from pydantic import ValidationError
+from typer.testing import CliRunner
+
+
+def _datos() -> tuple[list[TransaccionBancaria], list[MovimientoEsperado]]:
+    txs = [
+        transaccion("TX-1", 1000, 10, referencia="FAC-1"),
+        transaccion("TX-2", 2000, 10),
+        transaccion("TX-3", 3000, 10),
+    ]
+    exps = [
+        esperado("EXP-1", 1000, 10, referencia="FAC-1"),
+        esperado("EXP-2", 2000, 11),
+        esperado("EXP-3", 3000, 9),
+        esperado("EXP-4", 3000, 11),
+    ]
+    return txs, exps
+
+
+def _stats(audit: AuditMemoria) -> dict:
+    (stats,) = audit.detalles("matching_stats")
+    return stats
+
+
+def test_matching_stats_por_regla() -> None:
+    txs, exps = _datos()
+    audit = AuditMemoria()
+    conciliar_con(ConfiguracionCliente(cliente="X"), txs, exps, audit)  # type: ignore[arg-type]
+    assert _stats(audit) == {
+        "perfil": False,
+        "reglas": [
+            {
+                "regla": "ref_exacta",
+                "candidatos": 1,
+                "matches": 1,
+                "ambiguedades": 0,
+                "hallazgos": 0,
+            },
+            {
+                "regla": "monto_fecha",
+                "candidatos": 3,
+                "matches": 1,
+                "ambiguedades": 1,
+                "hallazgos": 1,
+            },
+        ],
+    }
+
+
+def test_perfil_agrega_tiempos() -> None:
+    txs, exps = _datos()
+    audit = AuditMemoria()
+    conciliar(cfg=ConfiguracionCliente(cliente="X"), transacciones=txs, esperados=exps, audit=audit, run_id="r", perfil=True)  # type: ignore[arg-type]
+    stats = _stats(audit)
+    assert stats["perfil"] is True
+    assert all(
+        r["tiempo_preparar_ms"] >= 0 and r["tiempo_emparejar_ms"] >= 0 for r in stats["reglas"]
+    )
+
+
+def test_orden_reglas_reordena_y_deshabilita() -> None:
+    txs, exps = _datos()
+    cfg = ConfiguracionCliente(cliente="X", orden_reglas=["monto_fecha"])
+    assert [type(r) for r in construir_pipeline(cfg)] == [ReglaMontoFecha]
+    res = conciliar_con(cfg, txs, exps)
+    assert sorted(m.regla for m in res.matches) == ["monto_fecha", "monto_fecha"]
+
+    # Una regla opcional listada pero no habilitada no corre; habilitada corre en su posicion.
+    tol = ReglaToleranciaMonto(habilitada=True, tolerancia_absoluta=Decimal(10))
+    cfg = ConfiguracionCliente(
+        cliente="X", orden_reglas=["tolerancia_monto", "ref_exacta"], regla_tolerancia_monto=tol
+    )
+    assert [r.nombre for r in construir_pipeline(cfg)] == ["tolerancia_monto", "ref_exacta"]
+    assert isinstance(construir_pipeline(cfg)[1], ReglaRefExacta)
+
+
+def test_regla_sin_emparejar_no_se_instancia() -> None:
+    class _SoloPreparar(ReglaMatching):
+        nombre = "solo_preparar"
+
+    with pytest.raises(TypeError):
+        _SoloPreparar()  # type: ignore[abstract]
+
+
+@pytest.mark.parametrize("orden", [["monto_fecha", "monto_fecha"], ["no_existe"]])
+def test_orden_reglas_invalido_es_error_de_config(orden: list[str]) -> None:
+    with pytest.raises(ValidationError):
+        ConfiguracionCliente(cliente="X", orden_reglas=orden)
+
+
+def test_streaming_rechaza_orden_personalizado() -> None:
+    cfg = ConfiguracionCliente(cliente="X", orden_reglas=["monto_fecha", "ref_exacta"])
+    with pytest.raises(ErrorConfiguracion):
+        list(
+            conciliar_streaming(
+                cfg=cfg,
+                transacciones=lambda: [],
+                esperados=lambda: [],
+                audit=AuditMemoria(),  # type: ignore[arg-type]
+                run_id="r",
+            )
+        )
+
+
+def test_cli_perfil_matching_no_cambia_run_json(tmp_path: Path) -> None:
+    def run(nombre: str, *extra: str) -> Path:
+        out = tmp_path / nombre
+        res = CliRunner().invoke(
+            app,
+            [
+                "run",
+                "--config",
+                str(Path("examples") / "config_cliente.yaml"),
+                "--bank",
+                "tests/golden/datasets/csv/banco_sucio.csv",
+                "--expected",
+                "tests/golden/datasets/csv/esperados_sucio.csv",
+                "--out",
+                str(out),
+                "--dry-run",
+                *extra,
+            ],
+        )
+        assert res.exit_code == 0, res.stdout
+        return out
+
+    base, perfil = run("base"), run("perfil", "--perfil-matching")
+    assert (base / "run.json").read_bytes() == (perfil / "run.json").read_bytes()
+    eventos = [json.loads(x) for x in (perfil / "audit.jsonl").read_text().splitlines()]
+    (stats,) = (e["detalles"] for e in eventos if e["mensaje"] == "matching_stats")
+    assert [r["regla"] for r in stats["reglas"]] == ["ref_exacta", "monto_fecha"]
+    assert all("tiempo_emparejar_ms" in r for r in stats["reglas"])
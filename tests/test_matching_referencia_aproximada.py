@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import random
+
+from _factories import conciliar_con, esperado, transaccion
+from conciliador_bancario.matching.indices import IndiceTrigramas, distancia_edicion_acotada
+from conciliador_bancario.matching.referencia_aproximada import clave_referencia
+from conciliador_bancario.models import ConfiguracionCliente, EstadoMatch, ReglaReferenciaAproximada
+
+
+# Transacciones el dia 10 y esperados el 25: `monto_fecha` no interviene con la ventana por defecto.
+def _conciliar(txs, exps, **regla):
+    cfg = ConfiguracionCliente(
+        cliente="X",
+        umbral_autoconcilia=0.0,
+        regla_referencia_aproximada=ReglaReferenciaAproximada(habilitada=True, **regla),
+    )
+    return conciliar_con(cfg, txs, exps)
+
+
+def _levenshtein(a: str, b: str) -> int:
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i]
+        for j, cb in enumerate(b, 1):
+            cur.append(min(prev[j] + 1, cur[-1] + 1, prev[j - 1] + (ca != cb)))
+        prev = cur
+    return prev[-1]
+
+
+def test_clave_referencia() -> None:
+    assert clave_referencia("FAC-1001") == clave_referencia("FAC1001") == "FAC1001"
+    assert clave_referencia("F-0001001") == "F1001"
+    assert clave_referencia("NC-0") == "NC0"
+
+
+def test_indice_equivale_a_recorrido_lineal() -> None:
+    rng = random.Random(7)
+    alfabeto = "FACNB0123456789"
+    claves = ["".join(rng.choice(alfabeto) for _ in range(rng.randint(3, 10))) for _ in range(400)]
+    exps = [esperado(f"EXP-{i:04d}", 1000, 25, referencia=c) for i, c in enumerate(claves)]
+    indice = IndiceTrigramas(zip(claves, exps, strict=True))
+    for q in rng.sample(claves, 60) + ["FAC1001", "NB12"]:
+        for k in (1, 2):
+            oraculo = [
+                (d, e.id)
+                for c, e in zip(claves, exps, strict=True)
+                if (d := _levenshtein(q, c)) <= k
+            ]
+            got = [(d, e.id) for d, e in indice.buscar(q, k)]
+            if len(q) + 2 < 3 * k + 1:
+                assert got == []
+            else:
+                assert got == oraculo
+        assert distancia_edicion_acotada(q, q + "XYZ", 2) is None
+
+
+def test_referencia_casi_igual_y_mismo_monto_es_sugerido() -> None:
+    res = _conciliar(
+        [transaccion("TX-1", 1000, referencia="FAC1001")],
+        [
+            esperado("EXP-1", 1000, 25, referencia="FAC-1002"),
+            esperado("EXP-2", 1000, 25, referencia="NC-77"),
+        ],
+    )
+    assert [(m.regla, m.estado) for m in res.matches] == [("ref_aproximada", EstadoMatch.sugerido)]
+    m = res.matches[0]
+    assert m.movimientos_esperados == ["EXP-1"]
+    assert 0.6 <= m.score < 0.8
+    assert "distancia de edicion 1" in m.explicacion
+
+
+def test_separadores_y_ceros_dan_distancia_cero() -> None:
+    res = _conciliar(
+        [transaccion("TX-1", 1000, referencia="FAC-0001001")],
+        [esperado("EXP-1", 1000, 25, referencia="FAC 1001")],
+    )
+    assert res.matches[0].score == 0.8
+
+
+def test_monto_distinto_o_referencia_corta_no_sugiere() -> None:
+    assert (
+        _conciliar(
+            [transaccion("TX-1", 1000, referencia="FAC1001")],
+            [esperado("EXP-1", 999, 25, referencia="FAC1002")],
+        ).matches
+        == []
+    )
+    assert (
+        _conciliar(
+            [transaccion("TX-1", 1000, referencia="AB12")],
+            [esperado("EXP-1", 1000, 25, referencia="AB13")],
+        ).matches
+        == []
+    )
+
+
+def test_varios_candidatos_es_hallazgo() -> None:
+    res = _conciliar(
+        [transaccion("TX-1", 1000, referencia="FAC1001")],
+        [
+            esperado("EXP-1", 1000, 25, referencia="FAC1002"),
+            esperado("EXP-2", 1000, 25, referencia="FAC1003"),
+        ],
+    )
+    assert res.matches == []
+    assert any(h.tipo == "ambiguedad_referencia_aproximada" for h in res.hallazgos)
+
+
+def test_regla_deshabilitada_por_defecto() -> None:
+    cfg = ConfiguracionCliente(cliente="X")
+    res = conciliar_con(
+        cfg,
+        [transaccion("TX-1", 1000, referencia="FAC1001")],
+        [esperado("EXP-1", 1000, 25, referencia="FAC-1002")],
+    )
+    assert res.matches == []
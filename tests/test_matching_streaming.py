@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import random
+from collections import Counter
+from datetime import date, timedelta
+
+import pytest
+from _factories import AuditMemoria, conciliar_con, esperado, transaccion
+from conciliador_bancario.errors import ErrorConfiguracion, ErrorEntradaUsuario
+from conciliador_bancario.matching.streaming import conciliar_streaming
+from conciliador_bancario.models import (
+    ConfiguracionCliente,
+    Hallazgo,
+    MovimientoEsperado,
+    ReglaPagosDivididos,
+    TransaccionBancaria,
+)
+
+
+def _dataset(
+    seed: int, *, dias: int = 60, n: int = 200
+) -> tuple[list[TransaccionBancaria], list[MovimientoEsperado]]:
+    rng = random.Random(seed)
+    base = date(2026, 1, 1)
+    # Pocos montos y referencias: cadenas de candidatos, ambiguedades y referencias repetidas.
+    montos = [rng.randint(1, 25) * 1000 for _ in range(20)]
+    refs = [None] * 30 + [f"FAC-{k}" for k in range(15)]
+    txs = [
+        transaccion(
+            f"TX-{rng.randrange(16**12):012x}",
+            fecha=base + timedelta(days=rng.randint(0, dias)),
+            monto=rng.choice(montos),
+            descripcion=f"Abono {i}",
+            score_descripcion=0.5 if rng.random() < 0.1 else 0.9,
+            referencia=rng.choice(refs),
+        )
+        for i in range(n)
+    ]
+    exps = [
+        esperado(
+            f"EXP-{rng.randrange(16**12):012x}",
+            fecha=base + timedelta(days=rng.randint(0, dias)),
+            monto=rng.choice(montos),
+            descripcion=f"Factura {i}",
+            referencia=rng.choice(refs),
+        )
+        for i in range(n)
+    ]
+    txs.sort(key=lambda t: t.fecha_operacion.valor)
+    exps.sort(key=lambda e: e.fecha.valor)
+    return txs, exps
+
+
+def _streaming(cfg, txs, exps, audit=None):
+    return list(
+        conciliar_streaming(
+            cfg=cfg,
+            transacciones=lambda: iter(txs),
+            esperados=lambda: iter(exps),
+            audit=audit or AuditMemoria(),  # type: ignore[arg-type]
+            run_id="r",
+        )
+    )
+
+
+@pytest.mark.parametrize("seed", range(6))
+@pytest.mark.parametrize("ventana", [0, 3, 10])
+def test_streaming_equivale_a_conciliar(seed: int, ventana: int) -> None:
+    cfg = ConfiguracionCliente(
+        cliente="X",
+        ventana_dias_monto_fecha=ventana,
+        max_candidatos_ambiguedad=50 - 48 * (seed % 2),
+    )
+    txs, exps = _dataset(seed)
+    audit_ref = AuditMemoria()
+    ref = conciliar_con(cfg, txs, exps, audit_ref)
+    audit = AuditMemoria()
+    salida = _streaming(cfg, txs, exps, audit)
+
+    hallazgos = sorted((x for x in salida if isinstance(x, Hallazgo)), key=lambda h: h.id)
+    matches = sorted((x for x in salida if not isinstance(x, Hallazgo)), key=lambda m: m.id)
+    assert matches == ref.matches
+    assert hallazgos == ref.hallazgos
+
+    # Mismos eventos de auditoria (en orden de streaming), salvo el resumen del modo.
+    def _eventos(a: AuditMemoria) -> Counter:
+        return Counter(
+            repr((e.tipo, e.mensaje, e.detalles))
+            for e in a.eventos
+            if e.mensaje != "Matching streaming"
+        )
+
+    assert _eventos(audit) == _eventos(audit_ref)
+
+
+def test_memoria_acotada_por_la_ventana() -> None:
+    cfg = ConfiguracionCliente(cliente="X", ventana_dias_monto_fecha=3)
+    txs, exps = _dataset(1, dias=3650, n=2000)
+    audit = AuditMemoria()
+    _streaming(cfg, txs, exps, audit)
+    (stats,) = audit.detalles("Matching streaming")
+    assert stats["max_entidades_en_memoria"] < 100
+    assert stats["clusters_resueltos"] > 1000
+
+
+def test_entrada_no_ordenada_es_error_de_entrada() -> None:
+    cfg = ConfiguracionCliente(cliente="X")
+    txs, exps = _dataset(2)
+    with pytest.raises(ErrorEntradaUsuario):
+        _streaming(cfg, list(reversed(txs)), exps)
+
+
+def test_reglas_opcionales_no_soportadas() -> None:
+    cfg = ConfiguracionCliente(
+        cliente="X", regla_pagos_divididos=ReglaPagosDivididos(habilitada=True)
+    )
+    with pytest.raises(ErrorConfiguracion):
+        _streaming(cfg, [], [])
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+from _factories import AuditMemoria, conciliar_con, esperado, transaccion
+from conciliador_bancario.errors import ErrorConfiguracion, ErrorContrato
+from conciliador_bancario.matching.tipo_cambio import cargar_tabla_tipo_cambio
+from conciliador_bancario.models import ConfiguracionCliente, EstadoMatch, ReglaTipoCambio
+from pydantic import ValidationError
+
+_TABLA = """fecha,moneda,tasa
+2026-01-02,USD,"950,00"
+2026-01-05,USD,960.00
+2026-01-05,EUR,1040.00
+"""
+
+
+@pytest.fixture
+def tabla(tmp_path: Path) -> Path:
+    p = tmp_path / "fx.csv"
+    p.write_text(_TABLA, encoding="utf-8")
+    return p
+
+
+def _conciliar(tabla: Path, txs, exps, **regla):
+    cfg = ConfiguracionCliente(
+        cliente="X", regla_tipo_cambio=ReglaTipoCambio(habilitada=True, archivo=str(tabla), **regla)
+    )
+    audit = AuditMemoria()
+    res = conciliar_con(cfg, txs, exps, audit)
+    (stats,) = audit.detalles("Regla tipo de cambio completada")
+    return res, stats
+
+
+def test_tabla_indexada_por_fecha_con_arrastre(tabla: Path) -> None:
+    t = cargar_tabla_tipo_cambio(tabla, moneda_base="CLP", max_antiguedad_dias=2)
+    assert t.monedas == ["EUR", "USD"]
+    assert t.tasa("USD", date(2026, 1, 2)) == Decimal("950.00")
+    # Fin de semana: arrastra la ultima tasa hasta `max_antiguedad_dias`.
+    assert t.tasa("USD", date(2026, 1, 4)) == Decimal("950.00")
+    assert t.tasa("USD", date(2026, 1, 5)) == Decimal("960.00")
+    assert t.tasa("USD", date(2026, 1, 1)) is None
+    assert t.tasa("EUR", date(2026, 1, 8)) is None
+    assert t.tasa("CLP", date(2020, 1, 1)) == 1
+    assert t.factor("EUR", "USD", date(2026, 1, 5)) == Decimal("1040") / Decimal("960")
+
+
+def test_sugiere_monto_convertido_en_otra_moneda(tabla: Path) -> None:
+    txs = [
+        transaccion("TX-1", "1000", 5, moneda="USD"),
+        transaccion("TX-2", "500", 5, moneda="USD"),
+        transaccion("TX-3", "2000", 5, moneda="CLP"),
+    ]
+    exps = [
+        esperado("EXP-1", "958500", 6),
+        esperado("EXP-2", "480000", 5),
+        esperado("EXP-3", "2010", 5),  # misma moneda: no es de esta regla
+        esperado("EXP-4", "2.20", 5, moneda="USD"),  # 2000 CLP = 2.08 USD: fuera de tolerancia
+    ]
+    res, stats = _conciliar(tabla, txs, exps)
+    got = {m.transacciones_bancarias[0]: m for m in res.matches}
+    assert sorted(got) == ["TX-1", "TX-2"]
+    m = got["TX-1"]
+    assert (m.regla, m.estado, m.movimientos_esperados) == (
+        "monto_tipo_cambio",
+        EstadoMatch.sugerido,
+        ["EXP-1"],
+    )
+    assert 0.65 <= m.score < 0.75
+    assert got["TX-2"].movimientos_esperados == ["EXP-2"]
+    # Un factor por (monedas, dia), no por transaccion.
+    assert stats["conversiones_cacheadas"] == 2
+    assert stats["sugeridos"] == 2
+
+
+def test_sin_tasa_vigente_o_ambiguo(tabla: Path) -> None:
+    res, stats = _conciliar(
+        tabla, [transaccion("TX-1", "1000", 4, moneda="USD")], [esperado("EXP-1", "950000", 4)]
+    )
+    assert [m.regla for m in res.matches] == ["monto_tipo_cambio"]
+    res, stats = _conciliar(
+        tabla,
+        [transaccion("TX-1", "1000", 4, moneda="USD")],
+        [esperado("EXP-1", "950000", 4)],
+        max_antiguedad_dias=1,
+    )
+    assert not res.matches and stats["sin_tasa"] == 1
+
+    exps = [esperado("EXP-1", "960000", 5), esperado("EXP-2", "961000", 6)]
+    res, stats = _conciliar(tabla, [transaccion("TX-1", "1000", 5, moneda="USD")], exps)
+    assert not res.matches and stats["ambiguas"] == 1
+    (h,) = (h for h in res.hallazgos if h.tipo == "ambiguedad_tipo_cambio")
+    assert h.detalles["candidatos"] == ["EXP-1", "EXP-2"]
+
+
+def test_tabla_invalida_es_fail_closed(tmp_path: Path) -> None:
+    with pytest.raises(ValidationError):
+        ReglaTipoCambio(habilitada=True)
+    with pytest.raises(ErrorConfiguracion):
+        cargar_tabla_tipo_cambio(tmp_path / "no.csv", moneda_base="CLP", max_antiguedad_dias=0)
+    for contenido in (
+        "fecha,moneda,tasa\n2026-01-02,USD,0\n",
+        "fecha,moneda,tasa\n2026-01-02,USD,abc\n",
+        "fecha,moneda,tasa\n2026-01-02,USD,950\n02-01-2026,usd,951\n",
+        "fecha,tasa\n2026-01-02,950\n",
+    ):
+        p = tmp_path / "fx.csv"
+        p.write_text(contenido, encoding="utf-8")
+        with pytest.raises(ErrorContrato):
+            cargar_tabla_tipo_cambio(p, moneda_base="CLP", max_antiguedad_dias=0)
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from _factories import conciliar_con, esperado, transaccion
+from conciliador_bancario.matching.indices import IndiceRangoMonto
+from conciliador_bancario.models import ConfiguracionCliente, EstadoMatch, ReglaToleranciaMonto
+from pydantic import ValidationError
+
+
+def _conciliar(txs, exps, **regla):
+    cfg = ConfiguracionCliente(
+        cliente="X",
+        umbral_autoconcilia=0.0,
+        regla_tolerancia_monto=ReglaToleranciaMonto(habilitada=True, **regla),
+    )
+    return conciliar_con(cfg, txs, exps)
+
+
+# 30 dias: ventanas densas; 365: muchos esperados del mismo monto fuera de la ventana.
+@pytest.mark.parametrize("dias", [30, 365])
+def test_indice_rango_equivale_a_filtro_lineal(dias: int) -> None:
+    rng = random.Random(5)
+    base = date(2026, 1, 1)
+    exps = [
+        esperado(
+            f"EXP-{i:04d}",
+            fecha=base + timedelta(days=rng.randint(0, dias)),
+            monto=Decimal(rng.randint(1, 50)) * 100,
+        )
+        for i in range(500)
+    ]
+    indice = IndiceRangoMonto(exps)
+    for _ in range(50):
+        lo = Decimal(rng.randint(0, 5000))
+        hi = lo + rng.randint(0, 500)
+        f = base + timedelta(days=rng.randint(0, dias))
+        oraculo = [
+            e for e in exps if lo <= e.monto.valor <= hi and abs((e.fecha.valor - f).days) <= 3
+        ]
+        assert indice.candidatos(lo, hi, f, 3) == oraculo
+
+
+def test_monto_con_comision_es_sugerido() -> None:
+    res = _conciliar(
+        [transaccion("TX-1", 99_700)], [esperado("EXP-1", 100_000, 11)], tolerancia_absoluta=500
+    )
+    assert [(m.regla, m.estado) for m in res.matches] == [
+        ("monto_tolerancia", EstadoMatch.sugerido)
+    ]
+    assert 0.6 <= res.matches[0].score <= 0.7
+    assert "diferencia 300" in res.matches[0].explicacion
+
+
+def test_tolerancia_porcentual() -> None:
+    assert (
+        _conciliar(
+            [transaccion("TX-1", 99_000)],
+            [esperado("EXP-1", 100_000, 11)],
+            tolerancia_porcentual=0.5,
+        ).matches
+        == []
+    )
+    res = _conciliar(
+        [transaccion("TX-1", 99_000)], [esperado("EXP-1", 100_000, 11)], tolerancia_porcentual=1.5
+    )
+    assert [m.regla for m in res.matches] == ["monto_tolerancia"]
+
+
+def test_fuera_de_ventana_o_signo_distinto_no_sugiere() -> None:
+    assert (
+        _conciliar(
+            [transaccion("TX-1", 99_700)], [esperado("EXP-1", 100_000, 20)], tolerancia_absoluta=500
+        ).matches
+        == []
+    )
+    assert (
+        _conciliar(
+            [transaccion("TX-1", 200)], [esperado("EXP-1", -200, 11)], tolerancia_absoluta=500
+        ).matches
+        == []
+    )
+
+
+def test_varios_candidatos_es_hallazgo() -> None:
+    res = _conciliar(
+        [transaccion("TX-1", 99_700)],
+        [esperado("EXP-1", 100_000, 11), esperado("EXP-2", 99_500, 11)],
+        tolerancia_absoluta=500,
+    )
+    assert res.matches == []
+    assert any(h.tipo == "ambiguedad_monto_tolerancia" for h in res.hallazgos)
+
+
+def test_monto_exacto_queda_para_monto_fecha() -> None:
+    res = _conciliar(
+        [transaccion("TX-1", 100_000)],
+        [esperado("EXP-1", 100_000, 11), esperado("EXP-2", 99_800, 11)],
+        tolerancia_absoluta=500,
+    )
+    assert [m.regla for m in res.matches] == ["monto_fecha"]
+
+
+def test_habilitada_sin_tolerancia_es_error_de_config() -> None:
+    with pytest.raises(ValidationError):
+        ReglaToleranciaMonto(habilitada=True)
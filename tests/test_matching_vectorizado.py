@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+from _factories import AuditMemoria, campo, conciliar_con, esperado
+from conciliador_bancario.audit.audit_log import NullAuditWriter
+from conciliador_bancario.cli import app
+from conciliador_bancario.ingestion.detector import (
+    cargar_movimientos_esperados,
+    cargar_transacciones_bancarias,
+)
+from conciliador_bancario.models import (
+    ConfiguracionCliente,
+    MovimientoEsperado,
+    OrigenDato,
+    TransaccionBancaria,
+)
+from conciliador_bancario.normalization.normalizer import normalizar_lote
+from typer.testing import CliRunner
+
+pytest.importorskip("numpy")
+
+from conciliador_bancario.matching.vectorizado import conciliar_vectorizado  # noqa: E402
+
+
+def _assert_paridad(cfg: ConfiguracionCliente, txs: list, exps: list) -> None:
+    a_ref, a_vec = AuditMemoria(), AuditMemoria()
+    ref = conciliar_con(cfg, txs, exps, a_ref, run_id="r1")
+    vec = conciliar_vectorizado(
+        cfg=cfg, transacciones=txs, esperados=exps, audit=a_vec, run_id="r1"  # type: ignore[arg-type]
+    )
+    assert vec == ref
+    assert a_vec.eventos == a_ref.eventos
+
+
+@pytest.mark.parametrize(
+    "bank,expected",
+    [
+        (
+            "tests/golden/datasets/csv/banco_sucio.csv",
+            "tests/golden/datasets/csv/esperados_sucio.csv",
+        ),
+        (
+            "tests/golden/datasets/xlsx/banco_multisheet_sucio.xlsx",
+            "tests/golden/datasets/xlsx/esperados_sucio.xlsx",
+        ),
+        (
+            "tests/golden/datasets/xml/cartola_ok.xml",
+            "tests/golden/datasets/csv/esperados_sucio.csv",
+        ),
+        (
+            "tests/golden/datasets/pdf_text/cartola_digital.pdf",
+            "tests/golden/datasets/csv/esperados_sucio.csv",
+        ),
+        ("examples/banco_ejemplo.csv", "examples/movimientos_esperados.csv"),
+    ],
+)
+def test_paridad_datasets_golden(bank: str, expected: str) -> None:
+    cfg = ConfiguracionCliente(cliente="X")
+    audit = NullAuditWriter()
+    txs = cargar_transacciones_bancarias(Path(bank), cfg=cfg, audit=audit)  # type: ignore[arg-type]
+    exps = cargar_movimientos_esperados(Path(expected), cfg=cfg, audit=audit)  # type: ignore[arg-type]
+    txs, exps = normalizar_lote(cfg=cfg, transacciones=txs, esperados=exps)
+    _assert_paridad(cfg, txs, exps)
+
+
+def _dataset_aleatorio(seed: int) -> tuple[list[TransaccionBancaria], list[MovimientoEsperado]]:
+    rng = random.Random(seed)
+    base = date(2026, 1, 1)
+    montos = [rng.randint(1, 30) * 1000 for _ in range(10)] + [-5000]
+    refs = [None, None, None, "FAC-1", "FAC-2", "FAC 3", "fac-4", "NC-9"]
+
+    def score() -> float:
+        return 0.5 if rng.random() < 0.1 else 0.9
+
+    txs = []
+    for i in range(rng.randint(0, 80)):
+        ref = rng.choice(refs)
+        bloquea = rng.random() < 0.05
+        txs.append(
+            TransaccionBancaria(
+                id=f"TX-{rng.randrange(16**8):08x}",
+                bloquea_autoconcilia=bloquea,
+                motivo_bloqueo_autoconcilia="OCR" if bloquea else None,
+                fecha_operacion=campo(base + timedelta(days=rng.randint(0, 25)), score()),
+                monto=campo(Decimal(rng.choice(montos)), score()),
+                descripcion=campo(f"Abono {i}", score()),
+                referencia=campo(ref, score()) if ref else None,
+                archivo_origen="x.csv",
+                origen=OrigenDato.csv,
+            )
+        )
+    exps = []
+    for i in range(rng.randint(0, 80)):
+        ref = rng.choice(refs)
+        exps.append(
+            MovimientoEsperado(
+                id=f"EXP-{rng.randrange(16**8):08x}",
+                fecha=campo(base + timedelta(days=rng.randint(0, 25)), score()),
+                monto=campo(Decimal(rng.choice(montos)), score()),
+                descripcion=campo(f"Factura {i}", score()),
+                referencia=campo(ref, score()) if ref else None,
+            )
+        )
+    return txs, exps
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_paridad_datos_aleatorios(seed: int) -> None:
+    txs, exps = _dataset_aleatorio(seed)
+    cfg = ConfiguracionCliente(
+        cliente="X",
+        ventana_dias_monto_fecha=seed % 5,
+        max_candidatos_ambiguedad=50 - 48 * (seed % 2),
+    )
+    _assert_paridad(cfg, txs, exps)
+
+
+def test_monto_no_entero_delegado_en_motor_de_referencia() -> None:
+    txs, exps = _dataset_aleatorio(1)
+    exps.append(esperado("EXP-decimal", "10.5", 2, descripcion="Decimal"))
+    _assert_paridad(ConfiguracionCliente(cliente="X"), txs, exps)
+
+
+def test_cli_run_backend_numpy_genera_artefactos_identicos(tmp_path: Path) -> None:
+    runner = CliRunner()
+    salidas = {}
+    for backend in ("python", "numpy"):
+        out = tmp_path / backend
+        res = runner.invoke(
+            app,
+            [
+                "run",
+                "--config",
+                str(Path("examples") / "config_cliente.yaml"),
+                "--bank",
+                "tests/golden/datasets/csv/banco_sucio.csv",
+                "--expected",
+                "tests/golden/datasets/csv/esperados_sucio.csv",
+                "--out",
+                str(out),
+                "--dry-run",
+                "--matching-backend",
+                backend,
+            ],
+        )
+        assert res.exit_code == 0, res.stdout
+        salidas[backend] = (
+            (out / "run.json").read_bytes(),
+            (out / "audit.jsonl").read_bytes(),
+        )
+    assert salidas["numpy"] == salidas["python"]
+
+
+def test_cli_run_backend_desconocido_es_error_de_entrada(tmp_path: Path) -> None:
+    res = CliRunner().invoke(
+        app,
+        [
+            "run",
+            "--config",
+            str(Path("examples") / "config_cliente.yaml"),
+            "--bank",
+            str(Path("examples") / "banco_ejemplo.csv"),
+            "--expected",
+            str(Path("examples") / "movimientos_esperados.csv"),
+            "--out",
+            str(tmp_path / "out"),
+            "--dry-run",
+            "--matching-backend",
+            "gpu",
+        ],
+    )
+    assert res.exit_code == 2
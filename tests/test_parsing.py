@@ -3,7 +3,12 @@ from __future__ import annotations
 from decimal import Decimal
 
 import pytest
-from conciliador_bancario.utils.parsing import ErrorParseo, parse_fecha_chile, parse_monto_clp
+from conciliador_bancario.utils.parsing import (
+    ErrorParseo,
+    parse_fecha_chile,
+    parse_monto_clp,
+    parse_montos,
+)
 
 
 @pytest.mark.parametrize(
@@ -27,6 +32,17 @@ def test_parse_monto_vacio() -> None:
         parse_monto_clp("")
 
 
+def test_parse_monto_cero_negativo_conserva_signo() -> None:
+    assert parse_monto_clp("-0").as_tuple() == Decimal("-0").as_tuple()
+
+
+def test_parse_montos_en_bloque() -> None:
+    montos, errores = parse_montos(["150000", "$ 1.234.567", "", "abc", "-250000", "9" * 20])
+    assert montos.typecode == "q"
+    assert list(montos) == [150000, 1234567, 0, 0, -250000, 0]
+    assert errores == [2, 3, 5]
+
+
 @pytest.mark.parametrize(
     "raw,iso",
     [
@@ -1,8 +1,17 @@
 from __future__ import annotations
 
 from datetime import date
+from decimal import InvalidOperation
 
-from conciliador_bancario.utils.parsing import parse_fecha_chile, parse_monto_clp
+from conciliador_bancario.utils.parsing import (
+    FORMATOS_FECHA,
+    ErrorParseo,
+    ParserFechaColumna,
+    _parse_monto_memo,
+    parse_fecha_chile,
+    parse_monto_clp,
+    parse_montos,
+)
 from hypothesis import given
 from hypothesis import strategies as st
 
@@ -20,3 +29,78 @@ def test_parse_fecha_chile_formatos_basicos(dt: date) -> None:
     # Soporta dd/mm/yyyy y yyyy-mm-dd
     assert parse_fecha_chile(dt.strftime("%d/%m/%Y")) == dt
     assert parse_fecha_chile(dt.strftime("%Y-%m-%d")) == dt
+
+
+def _resultado(parse, texto: str) -> date | str:
+    try:
+        return parse(texto)
+    except ErrorParseo as e:
+        return str(e)
+
+
+# Celdas "casi fecha": digitos (incluye no ASCII), separadores, espacios y basura.
+_celdas = st.one_of(
+    st.builds(
+        lambda d, fmt: d.strftime(fmt),
+        st.dates(min_value=date(1, 1, 1), max_value=date(9999, 12, 31)),
+        st.sampled_from(FORMATOS_FECHA),
+    ),
+    st.text(alphabet="0123456789-/ \t\u0663x", max_size=12),
+)
+
+
+@given(st.lists(_celdas, max_size=60), st.integers(min_value=1, max_value=8))
+def test_parser_fecha_columna_equivale_a_cascada(celdas: list[str], muestra: int) -> None:
+    # Propiedad: con o sin formato fijado, cada celda da la misma fecha (o el mismo error).
+    parser = ParserFechaColumna(muestra=muestra)
+    for celda in celdas:
+        assert _resultado(parser, celda) == _resultado(parse_fecha_chile, celda)
+
+
+@given(st.lists(st.dates(min_value=date(1000, 1, 1), max_value=date(9999, 12, 31)), min_size=4))
+def test_parser_fecha_columna_fija_el_formato(fechas: list[date]) -> None:
+    parser = ParserFechaColumna(muestra=4)
+    for d in fechas:
+        assert parser(d.strftime("%d/%m/%Y")) == parse_fecha_chile(d.strftime("%d/%m/%Y"))
+    assert parser.formato == "%d/%m/%Y"
+    # Celda atipica en otro formato: vuelve a la cascada.
+    assert parser(" 2026-01-05 ") == date(2026, 1, 5)
+
+
+def _monto_completo(texto: str) -> tuple | str:
+    # Camino completo sin memo ni atajo: la semantica de referencia.
+    try:
+        return _parse_monto_memo.__wrapped__(texto).as_tuple()
+    except (ErrorParseo, InvalidOperation) as e:
+        return type(e).__name__
+
+
+_montos = st.one_of(
+    st.integers(min_value=-(10**20), max_value=10**20).map(str),
+    st.from_regex(r"\A[ $]{0,2}-?0*[0-9]{1,20}([.,][0-9]{1,3}){0,3}[ ]?\Z"),
+    st.text(alphabet="0123456789.,-$ \u0663\u00b2", max_size=14),
+)
+
+
+@given(_montos)
+def test_parse_monto_clp_atajo_identico_bit_a_bit(texto: str) -> None:
+    # Propiedad: mismo signo, digitos y exponente (as_tuple) que el camino completo.
+    try:
+        obtenido: tuple | str = parse_monto_clp(texto).as_tuple()
+    except (ErrorParseo, InvalidOperation) as e:
+        obtenido = type(e).__name__
+    assert obtenido == _monto_completo(texto)
+
+
+@given(st.lists(_montos, max_size=30))
+def test_parse_montos_equivale_a_parse_monto_clp(textos: list[str]) -> None:
+    montos, errores = parse_montos(textos)
+    assert montos.typecode == "q" and len(montos) == len(textos)
+    for i, texto in enumerate(textos):
+        try:
+            esperado = int(parse_monto_clp(texto))
+            assert -(2**63) <= esperado < 2**63
+        except (ErrorParseo, InvalidOperation, AssertionError):
+            assert i in errores and montos[i] == 0
+        else:
+            assert i not in errores and montos[i] == esperado
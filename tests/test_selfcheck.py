@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import json
+import random
+from dataclasses import replace
+from pathlib import Path
+
+import pytest
+from conciliador_bancario.cli import app
+from conciliador_bancario.errors import ErrorEntradaUsuario
+from conciliador_bancario.matching import paralelo
+from conciliador_bancario.pipeline import ejecutar_selfcheck
+from conciliador_bancario.selfcheck import (
+    AUSENTE,
+    comparar_audit,
+    comparar_run_json,
+    primera_divergencia_json,
+)
+from typer.testing import CliRunner
+
+
+def _dataset(tmp_path: Path, n: int = 150) -> tuple[Path, Path, Path]:
+    rng = random.Random(11)
+    banco = ["fecha_operacion,monto,moneda,descripcion,referencia"]
+    esperados = ["id,fecha,monto,moneda,descripcion,referencia"]
+    for i in range(n):
+        monto = rng.choice([15000, 20000, 35000, 120000]) + rng.randint(0, 3)
+        dia = rng.randint(1, 28)
+        ref = f"FAC-{i}" if i % 4 == 0 else ""
+        banco.append(f"{dia:02d}/01/2026,{monto},CLP,Abono cliente {i},{ref}")
+        esperados.append(
+            f"EXP-{i:04d},2026-01-{min(28, dia + rng.randint(0, 2)):02d},{monto},CLP,Venta,{ref}"
+        )
+    cfg = tmp_path / "config.yaml"
+    cfg.write_text("cliente: 'X'\nmax_candidatos_ambiguedad: 3\n", encoding="utf-8")
+    bank = tmp_path / "banco.csv"
+    bank.write_text("\n".join(banco) + "\n", encoding="utf-8")
+    exp = tmp_path / "esperados.csv"
+    exp.write_text("\n".join(esperados) + "\n", encoding="utf-8")
+    return cfg, bank, exp
+
+
+def test_cli_selfcheck_variantes_identicas(tmp_path: Path) -> None:
+    cfg, bank, exp = _dataset(tmp_path)
+    out = tmp_path / "sc"
+    args = ["selfcheck", "--config", str(cfg), "--bank", str(bank), "--expected", str(exp)]
+    res = CliRunner().invoke(app, [*args, "--out", str(out), "--workers", "3", "--ordenes", "3"])
+    assert res.exit_code == 0, res.stdout
+    informe = json.loads((out / "selfcheck.json").read_text(encoding="utf-8"))
+    assert informe["ok"] and informe["primera_divergencia"] is None
+    nombres = [v["variante"] for v in informe["variantes"]]
+    assert nombres[:4] == ["serial", "workers-3", "workers-3-orden-1", "workers-3-orden-2"]
+    assert len({v["run_json_sha256"] for v in informe["variantes"]}) == 1
+    assert len({v["audit_multiconjunto_sha256"] for v in informe["variantes"]}) == 1
+
+    # audit.jsonl es append: un --out con contenido es un error de entrada.
+    res = CliRunner().invoke(app, [*args, "--out", str(out)])
+    assert res.exit_code == 2
+
+
+def test_selfcheck_reporta_primera_divergencia(tmp_path: Path, monkeypatch) -> None:
+    original = paralelo.conciliar_paralelo
+
+    def no_determinista(**kw):
+        res = original(**kw)
+        if kw.get("orden_shards"):
+            m = res.matches[0].model_copy(update={"score": 0.123})
+            return replace(res, matches=[m, *res.matches[1:]])
+        return res
+
+    monkeypatch.setattr(paralelo, "conciliar_paralelo", no_determinista)
+    cfg, bank, exp = _dataset(tmp_path)
+    informe = ejecutar_selfcheck(
+        config=cfg, bank=bank, expected=exp, out_dir=tmp_path / "sc", workers=[2], ordenes=2
+    )
+    assert not informe["ok"]
+    assert [v["ok"] for v in informe["variantes"]][:3] == [True, True, False]
+    div = informe["primera_divergencia"]
+    assert (div["variante"], div["artefacto"], div["ruta"]) == (
+        "workers-2-orden-1",
+        "run.json",
+        "$.matches[0].score",
+    )
+    assert div["obtenido"] == 0.123
+    assert div["contexto"]["id_referencia"] == div["contexto"]["id_obtenido"]
+
+    res = CliRunner().invoke(
+        app,
+        ["selfcheck", "--config", str(cfg), "--bank", str(bank), "--expected", str(exp)]
+        + ["--out", str(tmp_path / "sc2"), "--workers", "2"],
+    )
+    assert res.exit_code == 5
+
+
+def test_comparadores() -> None:
+    a = {"matches": [{"id": "M-1", "x": [1, 2]}], "run_id": "r"}
+    assert primera_divergencia_json(a, json.loads(json.dumps(a))) is None
+    assert primera_divergencia_json(a, {"matches": [{"id": "M-1", "x": [1]}], "run_id": "r"}) == (
+        "$.matches[0].x[1]",
+        2,
+        AUSENTE,
+    )
+    div = comparar_run_json("v", a, {"matches": [{"id": "M-2", "x": [1, 2]}], "run_id": "r"})
+    assert div is not None and div.contexto == {"id_referencia": "M-1", "id_obtenido": "M-2"}
+
+    eventos = [{"seq": i, "mensaje": f"e{i}", "detalles": {}} for i in range(4)]
+    # El orden no importa: se compara el multiconjunto (sin `seq`).
+    permutados = [dict(e, seq=3 - e["seq"]) for e in reversed(eventos)]
+    assert comparar_audit("v", eventos, permutados) is None
+    faltante = comparar_audit("v", eventos, eventos[:2] + eventos[3:])
+    assert faltante is not None
+    assert (faltante.referencia, faltante.obtenido) == (1, 0)
+    assert faltante.contexto["seq_referencia"] == [2]
+    assert faltante.contexto["evento_anterior"] == "e1"
+    sobrante = comparar_audit("v", eventos, eventos + [eventos[0]])
+    assert sobrante is not None and sobrante.contexto["seq_obtenido"] == [0, 4]
+
+
+def test_parametros_invalidos(tmp_path: Path) -> None:
+    cfg, bank, exp = _dataset(tmp_path, n=5)
+    with pytest.raises(ErrorEntradaUsuario):
+        ejecutar_selfcheck(
+            config=cfg, bank=bank, expected=exp, out_dir=tmp_path / "sc", workers=[1]
+        )